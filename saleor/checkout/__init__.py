@@ -13,3 +13,23 @@ class AddressType:
         (BILLING, pgettext_lazy("Type of address used to fulfill order", "Billing")),
         (SHIPPING, pgettext_lazy("Type of address used to fulfill order", "Shipping")),
     ]
+
+
+class CheckoutCompletionStatus:
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+    # The completions in these statuses reserve their checkout
+    IN_PROGRESS = [PENDING, PROCESSING]
+
+    CHOICES = [
+        (
+            PENDING,
+            pgettext_lazy("Status of a checkout completion", "Waiting to be processed"),
+        ),
+        (PROCESSING, pgettext_lazy("Status of a checkout completion", "Processing")),
+        (SUCCESS, pgettext_lazy("Status of a checkout completion", "Order placed")),
+        (FAILED, pgettext_lazy("Status of a checkout completion", "Failed")),
+    ]
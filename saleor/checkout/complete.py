@@ -0,0 +1,232 @@
+"""Complete the checkouts, in the request or in the background.
+
+`complete_checkout` charges the payment of the checkout and creates its order
+in the request. `start_checkout_completion` only validates the checkout and
+reserves it, the payment and the order are processed by a Celery task and the
+client polls the `CheckoutCompletion` for the result, so slow payment gateways
+don't keep the web workers busy. The checkout can't be changed while it's being
+completed.
+
+A completion that doesn't progress within `CHECKOUT_COMPLETION_TIMEOUT`, because
+its task was lost or its worker died, is failed so it doesn't keep its checkout
+reserved forever.
+"""
+from datetime import timedelta
+from enum import Enum
+from typing import Tuple
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..core.exceptions import InsufficientStock
+from ..core.taxes import TaxError
+from ..discount.models import NotApplicable
+from ..discount.utils import fetch_discounts
+from ..order.models import Order
+from ..payment import PaymentError, gateway
+from ..payment.utils import store_customer_id
+from . import CheckoutCompletionStatus
+from .error_codes import CheckoutErrorCode
+from .models import Checkout, CheckoutCompletion
+from .utils import abort_order_data, clean_checkout, create_order, prepare_order_data
+
+CHECKOUT_COMPLETION_TIMEOUT = timedelta(minutes=15)
+
+
+def fail_stale_checkout_completions(**filters) -> int:
+    """Fail the completions in progress that didn't progress in time.
+
+    Return the number of the failed completions.
+    """
+    now = timezone.now()
+    return CheckoutCompletion.objects.filter(
+        status__in=CheckoutCompletionStatus.IN_PROGRESS,
+        updated__lt=now - CHECKOUT_COMPLETION_TIMEOUT,
+        **filters,
+    ).update(
+        status=CheckoutCompletionStatus.FAILED,
+        error_message="The checkout completion timed out.",
+        updated=now,
+    )
+
+
+def validate_checkout_not_being_completed(checkout: Checkout):
+    """Refuse to change a checkout while a completion of it is in progress.
+
+    :raises ValidationError: When the checkout is being completed.
+    """
+    fail_stale_checkout_completions(checkout_token=checkout.token)
+    if CheckoutCompletion.objects.filter(
+        checkout_token=checkout.token, status__in=CheckoutCompletionStatus.IN_PROGRESS
+    ).exists():
+        raise ValidationError(
+            "The checkout is being completed.",
+            code=CheckoutErrorCode.COMPLETION_IN_PROGRESS,
+        )
+
+
+def complete_checkout(
+    checkout: Checkout, discounts, user, store_source=False, tracking_code=""
+) -> Order:
+    """Charge the payment of the checkout, create its order and delete it.
+
+    :raises ValidationError: When the checkout can't be completed.
+    """
+    clean_checkout(checkout, discounts)
+
+    payment = checkout.get_last_active_payment()
+
+    with transaction.atomic():
+        try:
+            order_data = prepare_order_data(
+                checkout=checkout, tracking_code=tracking_code, discounts=discounts
+            )
+        except InsufficientStock as e:
+            raise ValidationError(f"Insufficient product stock: {e.item}", code=e.code)
+        except NotApplicable:
+            raise ValidationError(
+                "Voucher not applicable", code=CheckoutErrorCode.VOUCHER_NOT_APPLICABLE
+            )
+        except TaxError as tax_error:
+            raise ValidationError(
+                "Unable to calculate taxes - %s" % str(tax_error),
+                code=CheckoutErrorCode.TAX_ERROR,
+            )
+
+    # Other checkouts may have charged the gift cards since the payment was
+    # made, the order total is computed from the reserved amounts
+    total_paid = sum(p.total for p in checkout.payments.all() if p.is_active)
+    if order_data["total"].gross.amount > total_paid:
+        abort_order_data(order_data)
+        raise ValidationError(
+            "The balance of the gift cards changed, the payment doesn't cover "
+            "the total anymore.",
+            code=CheckoutErrorCode.CHECKOUT_NOT_FULLY_PAID,
+        )
+
+    try:
+        txn = gateway.process_payment(
+            payment=payment, token=payment.token, store_source=store_source
+        )
+
+        if not txn.is_success:
+            raise PaymentError(txn.error)
+
+    except PaymentError as e:
+        abort_order_data(order_data)
+        raise ValidationError(str(e), code=CheckoutErrorCode.PAYMENT_ERROR)
+
+    if txn.customer_id and user.is_authenticated:
+        store_customer_id(user, payment.gateway, txn.customer_id)
+
+    # create the order into the database
+    order = create_order(checkout=checkout, order_data=order_data, user=user)
+
+    # remove checkout after order is successfully paid
+    checkout.delete()
+    return order
+
+
+def start_checkout_completion(
+    checkout: Checkout,
+    idempotency_key: str,
+    discounts,
+    user,
+    store_source=False,
+    tracking_code="",
+) -> CheckoutCompletion:
+    """Validate the checkout and complete it in the background.
+
+    Return the completion of the checkout with the same idempotency key if
+    there is one, so the retried requests don't complete the checkout twice.
+
+    :raises ValidationError: When the checkout can't be completed or another
+    completion of the checkout is in progress.
+    """
+    from .tasks import complete_checkout_task
+
+    completion = CheckoutCompletion.objects.filter(
+        checkout_token=checkout.token, idempotency_key=idempotency_key
+    ).first()
+    if completion is not None:
+        return completion
+
+    clean_checkout(checkout, discounts)
+    # A lost completion must not keep the checkout reserved
+    fail_stale_checkout_completions(checkout_token=checkout.token)
+    try:
+        with transaction.atomic():
+            completion = CheckoutCompletion.objects.create(
+                checkout_token=checkout.token,
+                idempotency_key=idempotency_key,
+                user=user if user.is_authenticated else None,
+                store_source=store_source,
+                tracking_code=tracking_code,
+            )
+    except IntegrityError:
+        # Either a concurrent request with the same key created the completion
+        # or another completion of the checkout is in progress
+        completion = CheckoutCompletion.objects.filter(
+            checkout_token=checkout.token, idempotency_key=idempotency_key
+        ).first()
+        if completion is None:
+            raise ValidationError(
+                "The checkout is already being completed.",
+                code=CheckoutErrorCode.COMPLETION_IN_PROGRESS,
+            )
+        return completion
+
+    transaction.on_commit(lambda: complete_checkout_task.delay(completion.pk))
+    return completion
+
+
+def _get_error_code_and_message(error: ValidationError) -> Tuple[str, str]:
+    if hasattr(error, "error_dict"):
+        error = next(iter(error.error_dict.values()))[0]
+    else:
+        error = error.error_list[0]
+    code = error.code.value if isinstance(error.code, Enum) else error.code
+    return code or "", error.messages[0]
+
+
+def process_checkout_completion(completion_pk: int):
+    """Charge the payment and create the order of a pending completion."""
+    # Only one worker processes the completion if its task is delivered twice
+    updated = CheckoutCompletion.objects.filter(
+        pk=completion_pk, status=CheckoutCompletionStatus.PENDING
+    ).update(status=CheckoutCompletionStatus.PROCESSING, updated=timezone.now())
+    if not updated:
+        return
+
+    completion = CheckoutCompletion.objects.select_related("user").get(pk=completion_pk)
+    checkout = Checkout.objects.filter(token=completion.checkout_token).first()
+    try:
+        if checkout is None:
+            raise ValidationError(
+                "The checkout doesn't exist anymore.", code=CheckoutErrorCode.NOT_FOUND
+            )
+        completion.order = complete_checkout(
+            checkout,
+            fetch_discounts(timezone.now()),
+            completion.user or AnonymousUser(),
+            store_source=completion.store_source,
+            tracking_code=completion.tracking_code,
+        )
+    except ValidationError as error:
+        completion.status = CheckoutCompletionStatus.FAILED
+        completion.error_code, completion.error_message = _get_error_code_and_message(
+            error
+        )
+    except Exception:
+        # Release the checkout, the error is reported by the task
+        completion.status = CheckoutCompletionStatus.FAILED
+        completion.error_message = "The checkout couldn't be completed."
+        raise
+    else:
+        completion.status = CheckoutCompletionStatus.SUCCESS
+    finally:
+        completion.save(
+            update_fields=["status", "order", "error_code", "error_message", "updated"]
+        )
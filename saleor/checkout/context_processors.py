@@ -1,8 +1,17 @@
 """Checkout-related context processors."""
-from .utils import get_checkout_from_request
+from django.utils.functional import SimpleLazyObject
+
+from .utils import get_checkout_quantity_from_request
 
 
 def checkout_counter(request):
-    """Expose the number of items in checkout."""
-    checkout = get_checkout_from_request(request)
-    return {"checkout_counter": checkout.quantity}
+    """Expose the number of items in checkout.
+
+    The number is only computed when a template reads it and it is usually
+    read from the cache, without querying the checkout.
+    """
+    return {
+        "checkout_counter": SimpleLazyObject(
+            lambda: get_checkout_quantity_from_request(request)
+        )
+    }
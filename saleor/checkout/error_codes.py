@@ -4,6 +4,7 @@ from enum import Enum
 class CheckoutErrorCode(Enum):
     BILLING_ADDRESS_NOT_SET = "billing_address_not_set"
     CHECKOUT_NOT_FULLY_PAID = "checkout_not_fully_paid"
+    COMPLETION_IN_PROGRESS = "completion_in_progress"
     GRAPHQL_ERROR = "graphql_error"
     INSUFFICIENT_STOCK = "insufficient_stock"
     INVALID = "invalid"
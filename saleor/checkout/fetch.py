@@ -0,0 +1,70 @@
+"""Load the lines of a checkout with everything needed to price and ship them.
+
+The lines, their variants, products and categories are loaded in one query and
+the collections of the products in another one, whatever the number of lines.
+The lines are stored on the checkout as prefetched, so its methods iterating
+over the lines (`get_subtotal`, `get_total_weight`, `is_shipping_required`,
+`get_line`...) don't query them again.
+
+The lines are loaded again once Django drops the prefetched lines, which it does
+when lines are added or removed through `checkout.lines`. The code changing the
+lines in other ways calls `invalidate_checkout_lines`.
+"""
+from typing import TYPE_CHECKING, List, NamedTuple
+
+from django.db.models import Prefetch, prefetch_related_objects
+
+from .models import Checkout, CheckoutLine
+
+if TYPE_CHECKING:
+    from ..product.models import Collection, Product, ProductVariant
+
+
+class CheckoutLineInfo(NamedTuple):
+    line: CheckoutLine
+    variant: "ProductVariant"
+    product: "Product"
+    collections: List["Collection"]
+
+
+CheckoutLinesInfo = List[CheckoutLineInfo]
+
+
+def fetch_checkout_lines(checkout: Checkout) -> CheckoutLinesInfo:
+    """Load the lines of the checkout, even if they were already loaded."""
+    invalidate_checkout_lines(checkout)
+    lines = CheckoutLine.objects.select_related(
+        "variant__product__category"
+    ).prefetch_related("variant__product__collections")
+    prefetch_related_objects([checkout], Prefetch("lines", queryset=lines))
+
+    lines_info = []
+    for line in checkout.lines.all():
+        line.checkout = checkout
+        variant = line.variant
+        product = variant.product
+        lines_info.append(
+            CheckoutLineInfo(
+                line=line,
+                variant=variant,
+                product=product,
+                collections=list(product.collections.all()),
+            )
+        )
+    checkout._lines_info = (checkout._prefetched_objects_cache["lines"], lines_info)
+    return lines_info
+
+
+def get_checkout_lines_info(checkout: Checkout) -> CheckoutLinesInfo:
+    """Return the lines of the checkout, load them if they aren't loaded yet."""
+    lines, lines_info = getattr(checkout, "_lines_info", (None, None))
+    prefetched_lines = getattr(checkout, "_prefetched_objects_cache", {}).get("lines")
+    if lines is None or lines is not prefetched_lines:
+        return fetch_checkout_lines(checkout)
+    return lines_info
+
+
+def invalidate_checkout_lines(checkout: Checkout):
+    """Drop the loaded lines of the checkout after they were changed."""
+    getattr(checkout, "_prefetched_objects_cache", {}).pop("lines", None)
+    checkout._lines_info = (None, None)
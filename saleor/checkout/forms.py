@@ -320,15 +320,20 @@ class CheckoutShippingMethodForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         shipping_address = self.instance.shipping_address
         country_code = shipping_address.country.code
-        qs = get_valid_shipping_methods_for_checkout(
-            self.instance, discounts, country_code=country_code
+        shipping_methods = (
+            get_valid_shipping_methods_for_checkout(
+                self.instance, discounts, country_code=country_code
+            )
+            or []
         )
+        qs = ShippingMethod.objects.filter(
+            pk__in=[method.pk for method in shipping_methods]
+        ).order_by("price_amount")
         self.fields["shipping_method"].queryset = qs
         self.fields["shipping_method"].shipping_address = shipping_address
         self.fields["shipping_method"].extensions = extensions
 
         if self.initial.get("shipping_method") is None:
-            shipping_methods = qs.all()
             if shipping_methods:
                 self.initial["shipping_method"] = shipping_methods[0]
 
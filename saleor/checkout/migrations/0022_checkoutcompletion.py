@@ -0,0 +1,88 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("order", "0078_variantdailysales"),
+        ("checkout", "0021_django_price_2"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CheckoutCompletion",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("checkout_token", models.UUIDField()),
+                ("idempotency_key", models.CharField(max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Waiting to be processed"),
+                            ("processing", "Processing"),
+                            ("success", "Order placed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=32,
+                    ),
+                ),
+                ("store_source", models.BooleanField(default=False)),
+                ("tracking_code", models.CharField(blank=True, max_length=255)),
+                ("error_code", models.CharField(blank=True, max_length=255)),
+                ("error_message", models.TextField(blank=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="order.Order",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created",),
+                "unique_together": {("checkout_token", "idempotency_key")},
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="checkoutcompletion",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(status__in=["pending", "processing"]),
+                fields=("checkout_token",),
+                name="unique_checkout_completion_in_progress",
+            ),
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.contrib.postgres.fields import JSONField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.dispatch import receiver
 from django.utils.encoding import smart_str
 from django_prices.models import MoneyField
 from prices import Money
@@ -17,6 +18,7 @@ from ..core.taxes import zero_money
 from ..core.weight import zero_weight
 from ..giftcard.models import GiftCard
 from ..shipping.models import ShippingMethod
+from . import CheckoutCompletionStatus
 
 CENTS = Decimal("0.01")
 
@@ -124,11 +126,12 @@ class Checkout(ModelWithMetadata):
 
     def get_total_gift_cards_balance(self):
         """Return the total balance of the gift cards assigned to the checkout."""
-        balance = self.gift_cards.aggregate(models.Sum("current_balance_amount"))[
-            "current_balance_amount__sum"
-        ]
-        if balance is None:
-            return zero_money(currency=self.currency)
+        # The balances are read from the ledgers, the cached ones are updated
+        # only after the charges of the other checkouts are committed
+        balance = sum(
+            (gift_card.ledger_balance for gift_card in self.gift_cards.with_balance()),
+            Decimal(0),
+        )
         return Money(balance, self.currency)
 
     def get_total_weight(self):
@@ -199,3 +202,69 @@ class CheckoutLine(models.Model):
     def is_shipping_required(self):
         """Return `True` if the related product variant requires shipping."""
         return self.variant.is_shipping_required()
+
+
+class CheckoutCompletion(models.Model):
+    """A completion of a checkout processed in the background.
+
+    The payment is charged and the order is created by a Celery task, the
+    client polls the completion by its token for the result. Completing a
+    checkout again with the same idempotency key returns the same completion.
+    A checkout can only have one completion in progress.
+    """
+
+    token = models.UUIDField(default=uuid4, unique=True, editable=False)
+    checkout_token = models.UUIDField()
+    idempotency_key = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=32,
+        choices=CheckoutCompletionStatus.CHOICES,
+        default=CheckoutCompletionStatus.PENDING,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        null=True,
+        related_name="+",
+        on_delete=models.SET_NULL,
+    )
+    store_source = models.BooleanField(default=False)
+    tracking_code = models.CharField(max_length=255, blank=True)
+    order = models.ForeignKey(
+        "order.Order",
+        blank=True,
+        null=True,
+        related_name="+",
+        on_delete=models.SET_NULL,
+    )
+    error_code = models.CharField(max_length=255, blank=True)
+    error_message = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-created",)
+        unique_together = (("checkout_token", "idempotency_key"),)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["checkout_token"],
+                condition=models.Q(status__in=CheckoutCompletionStatus.IN_PROGRESS),
+                name="unique_checkout_completion_in_progress",
+            )
+        ]
+
+
+@receiver(models.signals.post_save, sender=Checkout)
+def cache_quantity_on_user_change(sender, instance, update_fields, **kwargs):
+    """Cache the quantity of the checkout under its new user."""
+    if update_fields is None or "user" in update_fields:
+        from .utils import cache_checkout_quantity
+
+        cache_checkout_quantity(instance)
+
+
+@receiver(models.signals.post_delete, sender=Checkout)
+def invalidate_quantity_on_delete(sender, instance, **kwargs):
+    from .utils import invalidate_checkout_quantity
+
+    invalidate_checkout_quantity(instance)
@@ -0,0 +1,7 @@
+from ..celeryconf import app
+from .complete import process_checkout_completion
+
+
+@app.task
+def complete_checkout_task(completion_pk):
+    process_checkout_completion(completion_pk)
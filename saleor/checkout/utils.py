@@ -1,13 +1,15 @@
 """Checkout-related utility functions."""
 from datetime import date, timedelta
+from decimal import Decimal
 from functools import wraps
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Max, Min, Sum
+from django.db.models import Sum
 from django.utils import timezone
 from django.utils.encoding import smart_text
 from django.utils.translation import get_language, pgettext, pgettext_lazy
@@ -38,13 +40,17 @@ from ..discount.utils import (
 from ..extensions.manager import get_extensions_manager
 from ..giftcard.utils import (
     add_gift_card_code_to_checkout,
+    attach_gift_card_entries,
+    release_gift_card_entries,
     remove_gift_card_code_from_checkout,
+    reserve_gift_cards,
 )
 from ..order.actions import order_created
 from ..order.emails import send_order_confirmation
 from ..order.models import Order, OrderLine
-from ..shipping.models import ShippingMethod
+from ..shipping.utils import get_applicable_shipping_methods_for_instance
 from . import AddressType, logger
+from .fetch import CheckoutLinesInfo, get_checkout_lines_info, invalidate_checkout_lines
 from .forms import (
     AddressChoiceForm,
     AnonymousUserBillingForm,
@@ -55,6 +61,13 @@ from .models import Checkout, CheckoutLine
 
 COOKIE_NAME = "checkout"
 
+# The quantities of the checkouts are cached by the checkout token and, for
+# the checkouts of the users, by the user, so rendering the checkout counter
+# doesn't touch the checkouts
+QUANTITY_CACHE_KEY = "checkout-quantity:{}"
+USER_QUANTITY_CACHE_KEY = "checkout-quantity:user:{}"
+QUANTITY_CACHE_TIMEOUT = 60 * 60
+
 
 def set_checkout_cookie(simple_checkout, response):
     """Update response with a checkout token cookie."""
@@ -96,7 +109,9 @@ def remove_unavailable_variants(checkout):
             add_variant_to_checkout(checkout, line.variant, quantity, replace=True)
 
 
-def get_prices_of_discounted_specific_product(lines, voucher, discounts=None):
+def get_prices_of_discounted_specific_product(
+    lines_info: CheckoutLinesInfo, voucher, discounts=None
+):
     """Get prices of variants belonging to the discounted specific products.
 
     Specific products are products, collections and categories.
@@ -110,20 +125,17 @@ def get_prices_of_discounted_specific_product(lines, voucher, discounts=None):
     line_prices = []
     discounted_lines = []
     if discounted_products or discounted_collections or discounted_categories:
-        for line in lines:
-            line_product = line.variant.product
-            line_category = line.variant.product.category
-            line_collections = set(line.variant.product.collections.all())
-            if line.variant and (
-                line_product in discounted_products
-                or line_category in discounted_categories
-                or line_collections.intersection(discounted_collections)
+        for line_info in lines_info:
+            if (
+                line_info.product in discounted_products
+                or line_info.product.category in discounted_categories
+                or discounted_collections.intersection(line_info.collections)
             ):
-                discounted_lines.append(line)
+                discounted_lines.append(line_info.line)
     else:
         # If there's no discounted products, collections or categories,
         # it means that all products are discounted
-        discounted_lines.extend(list(lines))
+        discounted_lines.extend(line_info.line for line_info in lines_info)
 
     manager = get_extensions_manager()
     for line in discounted_lines:
@@ -289,6 +301,42 @@ def update_checkout_quantity(checkout):
         total_lines = 0
     checkout.quantity = total_lines
     checkout.save(update_fields=["quantity"])
+    cache_checkout_quantity(checkout)
+
+
+def _get_quantity_cache_keys(checkout) -> List[str]:
+    keys = [QUANTITY_CACHE_KEY.format(checkout.token)]
+    if checkout.user_id:
+        keys.append(USER_QUANTITY_CACHE_KEY.format(checkout.user_id))
+    return keys
+
+
+def cache_checkout_quantity(checkout):
+    """Store the quantity of the checkout read by the checkout counter."""
+    cache.set_many(
+        {key: checkout.quantity for key in _get_quantity_cache_keys(checkout)},
+        QUANTITY_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_checkout_quantity(checkout):
+    cache.delete_many(_get_quantity_cache_keys(checkout))
+
+
+def get_checkout_quantity_from_request(request) -> int:
+    """Return the quantity of the request's checkout, from the cache if possible."""
+    if request.user.is_authenticated:
+        key = USER_QUANTITY_CACHE_KEY.format(request.user.pk)
+    else:
+        token = request.get_signed_cookie(COOKIE_NAME, default=None)
+        if not token_is_valid(token):
+            return 0
+        key = QUANTITY_CACHE_KEY.format(token)
+    quantity = cache.get(key)
+    if quantity is None:
+        quantity = get_checkout_from_request(request).quantity
+        cache.set(key, quantity, QUANTITY_CACHE_TIMEOUT)
+    return quantity
 
 
 def check_variant_in_stock(
@@ -339,6 +387,7 @@ def add_variant_to_checkout(
     elif new_quantity > 0:
         line.quantity = new_quantity
         line.save(update_fields=["quantity"])
+    invalidate_checkout_lines(checkout)
 
     update_checkout_quantity(checkout)
 
@@ -658,6 +707,8 @@ def change_shipping_address_in_checkout(checkout, address):
 
 def get_checkout_context(checkout, discounts, currency=None, shipping_range=None):
     """Retrieve the data shared between views in checkout process."""
+    # The lines are loaded once for all the calculations
+    get_checkout_lines_info(checkout)
     manager = get_extensions_manager()
     checkout_total = (
         manager.calculate_checkout_total(checkout=checkout, discounts=discounts)
@@ -728,7 +779,9 @@ def _get_products_voucher_discount(checkout, voucher, discounts=None):
     """Calculate products discount value for a voucher, depending on its type."""
     prices = None
     if voucher.type == VoucherType.SPECIFIC_PRODUCT:
-        prices = get_prices_of_discounted_specific_product(checkout, voucher, discounts)
+        prices = get_prices_of_discounted_specific_product(
+            get_checkout_lines_info(checkout), voucher, discounts
+        )
     if not prices:
         msg = pgettext(
             "Voucher not applicable", "This offer is only valid for selected items."
@@ -775,6 +828,8 @@ def recalculate_checkout_discount(checkout, discounts):
     Will clear both voucher and discount if the discount is no longer
     applicable.
     """
+    # The lines are loaded once for all the calculations
+    get_checkout_lines_info(checkout)
     voucher = get_voucher_for_checkout(checkout)
     if voucher is not None:
         try:
@@ -895,8 +950,10 @@ def remove_voucher_from_checkout(checkout: Checkout):
 def get_valid_shipping_methods_for_checkout(
     checkout: Checkout, discounts, country_code=None
 ):
+    # The lines are loaded once for all the calculations
+    get_checkout_lines_info(checkout)
     manager = get_extensions_manager()
-    return ShippingMethod.objects.applicable_shipping_methods_for_instance(
+    return get_applicable_shipping_methods_for_instance(
         checkout,
         price=manager.calculate_checkout_subtotal(checkout, discounts).gross,
         country_code=country_code,
@@ -925,13 +982,13 @@ def get_shipping_price_estimate(checkout: Checkout, discounts, country_code):
     if shipping_methods is None:
         return None
 
-    min_price_amount, max_price_amount = shipping_methods.aggregate(
-        price_amount_min=Min("price_amount"), price_amount_max=Max("price_amount")
-    ).values()
-
-    if min_price_amount is None:
+    if not shipping_methods:
         return None
 
+    # The methods are sorted by their price
+    min_price_amount = shipping_methods[0].price_amount
+    max_price_amount = shipping_methods[-1].price_amount
+
     manager = get_extensions_manager()
     prices = MoneyRange(
         start=Money(min_price_amount, checkout.currency),
@@ -952,7 +1009,9 @@ def _get_voucher_data_for_order(checkout):
 
     :raises NotApplicable: When the voucher is not applicable in the current checkout.
     """
-    voucher = get_voucher_for_checkout(checkout, with_lock=True)
+    # The usage limit is enforced by the voucher's usage counters, the voucher
+    # isn't locked so the concurrent checkouts using it don't wait for each other
+    voucher = get_voucher_for_checkout(checkout)
 
     if checkout.voucher_code and not voucher:
         msg = pgettext(
@@ -1066,26 +1125,25 @@ def create_line_for_order(checkout_line: "CheckoutLine", discounts) -> OrderLine
 def prepare_order_data(*, checkout: Checkout, tracking_code: str, discounts) -> dict:
     """Run checks and return all the data from a given checkout to create an order.
 
+    The voucher usage and the gift cards are reserved for the order, the data
+    must be passed to `abort_order_data` if the order isn't created.
+
     :raises NotApplicable InsufficientStock:
     """
     order_data = {}
 
+    # The lines are loaded once for all the calculations
+    get_checkout_lines_info(checkout)
     manager = get_extensions_manager()
-    total = (
-        manager.calculate_checkout_total(checkout=checkout, discounts=discounts)
-        - checkout.get_total_gift_cards_balance()
+    checkout_total = manager.calculate_checkout_total(
+        checkout=checkout, discounts=discounts
     )
-    total = max(total, zero_taxed_money(total.currency))
 
     shipping_total = manager.calculate_checkout_shipping(checkout, discounts)
     order_data.update(_process_shipping_data_for_order(checkout, shipping_total))
     order_data.update(_process_user_data_for_order(checkout))
     order_data.update(
-        {
-            "language_code": get_language(),
-            "tracking_client_id": tracking_code,
-            "total": total,
-        }
+        {"language_code": get_language(), "tracking_client_id": tracking_code}
     )
 
     order_data["lines"] = [
@@ -1099,18 +1157,26 @@ def prepare_order_data(*, checkout: Checkout, tracking_code: str, discounts) ->
     # Get voucher data (last) as they require a transaction
     order_data.update(_get_voucher_data_for_order(checkout))
 
-    # assign gift cards to the order
-    order_data["total_price_left"] = (
+    total_price_left = (
         manager.calculate_checkout_subtotal(checkout, discounts)
         + shipping_total
         - checkout.discount
     ).gross
 
     manager.preprocess_order_creation(checkout, discounts)
+
+    # The gift cards are reserved last, so the transaction adding the debits
+    # ends right after and the checkouts sharing the cards don't wait for it
+    gift_card_entries = reserve_gift_cards(checkout.gift_cards.all(), total_price_left)
+    order_data["gift_card_entries"] = gift_card_entries
+    reserved = sum((-entry.amount for entry in gift_card_entries), Decimal(0))
+    total = checkout_total - Money(reserved, checkout_total.currency)
+    order_data["total"] = max(total, zero_taxed_money(total.currency))
     return order_data
 
 
 def abort_order_data(order_data: dict):
+    release_gift_card_entries(order_data.pop("gift_card_entries", []))
     if "voucher" in order_data:
         voucher = order_data["voucher"]
         decrease_voucher_usage(voucher)
@@ -1131,13 +1197,14 @@ def create_order(*, checkout: Checkout, order_data: dict, user: User) -> Order:
     which language to use when sending email.
     """
     from ..product.utils import allocate_stock
-    from ..order.utils import add_gift_card_to_order
 
     order = Order.objects.filter(checkout_token=checkout.token).first()
     if order is not None:
+        # The order was created from other data, its gift cards are charged
+        release_gift_card_entries(order_data.pop("gift_card_entries", []))
         return order
 
-    total_price_left = order_data.pop("total_price_left")
+    gift_card_entries = order_data.pop("gift_card_entries")
     order_lines = order_data.pop("lines")
 
     order = Order.objects.create(**order_data, checkout_token=checkout.token)
@@ -1149,9 +1216,8 @@ def create_order(*, checkout: Checkout, order_data: dict, user: User) -> Order:
         if variant.track_inventory:
             allocate_stock(variant, line.quantity)
 
-    # Add gift cards to the order
-    for gift_card in checkout.gift_cards.select_for_update():
-        total_price_left = add_gift_card_to_order(order, gift_card, total_price_left)
+    # The gift cards were charged when the order data was prepared
+    attach_gift_card_entries(gift_card_entries, order)
 
     # assign checkout payments to the order
     checkout.payments.update(order=order)
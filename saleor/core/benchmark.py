@@ -0,0 +1,358 @@
+"""Measure the storefront, dashboard and checkout flows against a dataset.
+
+Every scenario sends a request through the Django test client, so the whole
+stack of middlewares, views and the GraphQL API is measured. The scenarios
+are run against the data already in the database, usually generated with the
+`generate_benchmark_catalog` command, and everything they write is rolled back.
+
+The results are compared with the ones stored in a JSON baseline and a metric
+is a regression when it exceeds the baseline by more than its budget.
+"""
+import json
+import math
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import graphene
+from django.db import connection, transaction
+from django.shortcuts import reverse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from graphql_jwt.shortcuts import get_token
+
+from ..account.models import User
+from ..product.models import Category, Product, ProductVariant
+
+# The metrics may exceed the baseline by these ratios
+DEFAULT_BUDGETS = {
+    "p50_ms": 1.25,
+    "p95_ms": 1.5,
+    "queries": 1.0,
+    "sql_ms": 1.5,
+    "allocated_kb": 1.25,
+}
+
+STAFF_EMAIL = "benchmark-staff@example.com"
+
+
+class BenchmarkError(Exception):
+    """Raised when a scenario can't be run."""
+
+
+@dataclass(frozen=True)
+class BenchmarkContext:
+    product: Product
+    variant: ProductVariant
+    category: Category
+    customer: User
+    staff: User
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # One of "storefront", "dashboard" and "checkout"
+    flow: str
+    request: Callable[[Client, BenchmarkContext], object]
+    # The attribute of the context logged in the client, if any
+    user: Optional[str] = None
+
+
+def get_context() -> BenchmarkContext:
+    """Pick the objects the scenarios request from the current database."""
+    variant = (
+        ProductVariant.objects.filter(product__is_published=True)
+        .select_related("product__category")
+        .order_by("pk")
+        .first()
+    )
+    customer = User.objects.filter(orders__isnull=False).order_by("pk").first()
+    if variant is None or customer is None:
+        raise BenchmarkError(
+            "The database has no published products or orders, "
+            "run the generate_benchmark_catalog command first."
+        )
+    staff, _ = User.objects.get_or_create(
+        email=STAFF_EMAIL, defaults={"is_staff": True, "is_superuser": True}
+    )
+    return BenchmarkContext(
+        product=variant.product,
+        variant=variant,
+        category=variant.product.category,
+        customer=customer,
+        staff=staff,
+    )
+
+
+def post_graphql(client: Client, query: str, variables=None, user=None):
+    extra = {"HTTP_AUTHORIZATION": "JWT %s" % get_token(user)} if user else {}
+    response = client.post(
+        reverse("api"),
+        json.dumps({"query": query, "variables": variables or {}}),
+        content_type="application/json",
+        **extra,
+    )
+    if response.status_code == 200 and json.loads(response.content).get("errors"):
+        raise BenchmarkError(response.content.decode())
+    return response
+
+
+def _global_id(instance) -> str:
+    return graphene.Node.to_global_id(type(instance).__name__, instance.pk)
+
+
+PRODUCT_LIST_QUERY = """
+query ProductList($categoryId: ID!) {
+  products(first: 20, categories: [$categoryId]) {
+    edges {
+      node {
+        id
+        name
+        thumbnail { url alt }
+        pricing {
+          priceRange { start { gross { amount currency } } }
+        }
+      }
+    }
+  }
+}
+"""
+
+PRODUCT_DETAILS_QUERY = """
+query ProductDetails($id: ID!) {
+  product(id: $id) {
+    id
+    name
+    descriptionJson
+    images { id url }
+    variants {
+      id
+      name
+      sku
+      isAvailable
+      pricing { price { gross { amount currency } } }
+    }
+  }
+}
+"""
+
+DASHBOARD_ORDER_LIST_QUERY = """
+query OrderList {
+  orders(first: 20) {
+    edges {
+      node {
+        id
+        number
+        created
+        paymentStatus
+        status
+        total { gross { amount currency } }
+        userEmail
+      }
+    }
+  }
+}
+"""
+
+DASHBOARD_PRODUCT_LIST_QUERY = """
+query ProductList {
+  products(first: 20) {
+    edges {
+      node {
+        id
+        name
+        isPublished
+        thumbnail { url }
+        basePrice { amount currency }
+      }
+    }
+  }
+}
+"""
+
+CHECKOUT_CREATE_MUTATION = """
+mutation CheckoutCreate($variantId: ID!) {
+  checkoutCreate(input: {lines: [{quantity: 1, variantId: $variantId}]}) {
+    errors { field message }
+    checkout {
+      token
+      totalPrice { gross { amount currency } }
+      lines { quantity variant { id } }
+    }
+  }
+}
+"""
+
+SCENARIOS = [
+    Scenario(
+        "home_page", "storefront", lambda client, ctx: client.get(reverse("home"))
+    ),
+    Scenario(
+        "category_page",
+        "storefront",
+        lambda client, ctx: client.get(ctx.category.get_absolute_url()),
+    ),
+    Scenario(
+        "product_page",
+        "storefront",
+        lambda client, ctx: client.get(ctx.product.get_absolute_url()),
+    ),
+    Scenario(
+        "courses_page",
+        "storefront",
+        lambda client, ctx: client.get(reverse("product:all")),
+    ),
+    Scenario(
+        "account_page",
+        "storefront",
+        lambda client, ctx: client.get(reverse("account:details")),
+        user="customer",
+    ),
+    Scenario(
+        "graphql_product_list",
+        "storefront",
+        lambda client, ctx: post_graphql(
+            client, PRODUCT_LIST_QUERY, {"categoryId": _global_id(ctx.category)}
+        ),
+    ),
+    Scenario(
+        "graphql_product_details",
+        "storefront",
+        lambda client, ctx: post_graphql(
+            client, PRODUCT_DETAILS_QUERY, {"id": _global_id(ctx.product)}
+        ),
+    ),
+    Scenario(
+        "dashboard_order_list",
+        "dashboard",
+        lambda client, ctx: post_graphql(
+            client, DASHBOARD_ORDER_LIST_QUERY, user=ctx.staff
+        ),
+    ),
+    Scenario(
+        "dashboard_product_list",
+        "dashboard",
+        lambda client, ctx: post_graphql(
+            client, DASHBOARD_PRODUCT_LIST_QUERY, user=ctx.staff
+        ),
+    ),
+    Scenario(
+        "add_to_checkout",
+        "checkout",
+        lambda client, ctx: client.post(
+            reverse(
+                "product:add-to-checkout",
+                kwargs={"slug": ctx.product.get_slug(), "product_id": ctx.product.pk},
+            ),
+            {"variant": ctx.variant.pk, "quantity": 1},
+        ),
+    ),
+    Scenario(
+        "checkout_page",
+        "checkout",
+        lambda client, ctx: client.get(reverse("checkout:index")),
+        user="customer",
+    ),
+    Scenario(
+        "graphql_checkout_create",
+        "checkout",
+        lambda client, ctx: post_graphql(
+            client, CHECKOUT_CREATE_MUTATION, {"variantId": _global_id(ctx.variant)}
+        ),
+    ),
+]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Return the nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _request(scenario: Scenario, client: Client, context: BenchmarkContext):
+    # Roll back what the scenario writes, so every run sees the same data
+    with transaction.atomic():
+        response = scenario.request(client, context)
+        transaction.set_rollback(True)
+    if response.status_code >= 400:
+        raise BenchmarkError(
+            "%s responded with %d" % (scenario.name, response.status_code)
+        )
+
+
+def measure_scenario(
+    scenario: Scenario, context: BenchmarkContext, repeat: int = 20, warmup: int = 3
+) -> Dict[str, float]:
+    client = Client()
+    if scenario.user:
+        client.force_login(getattr(context, scenario.user))
+
+    for _ in range(warmup):
+        _request(scenario, client, context)
+
+    latencies = []
+    query_counts = []
+    sql_times = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            _request(scenario, client, context)
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_counts.append(len(queries))
+        sql_times.append(sum(float(query["time"]) for query in queries) * 1000)
+
+    # Tracing the allocations slows the code down, it is measured separately
+    tracemalloc.start()
+    try:
+        _request(scenario, client, context)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "queries": max(query_counts),
+        "sql_ms": round(percentile(sql_times, 50), 3),
+        "allocated_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(
+    scenarios: List[Scenario], repeat: int = 20, warmup: int = 3
+) -> Dict[str, Dict[str, float]]:
+    """Measure the scenarios, roll back everything they created afterwards."""
+    with transaction.atomic():
+        context = get_context()
+        results = {
+            scenario.name: measure_scenario(scenario, context, repeat, warmup)
+            for scenario in scenarios
+        }
+        transaction.set_rollback(True)
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: dict) -> List[str]:
+    """Return the metrics exceeding their budget over the baseline.
+
+    The budgets stored in the baseline override the default ones.
+    """
+    budgets = {**DEFAULT_BUDGETS, **baseline.get("budgets", {})}
+    regressions = []
+    for name, metrics in results.items():
+        baseline_metrics = baseline.get("results", {}).get(name)
+        if baseline_metrics is None:
+            continue
+        for metric, budget in budgets.items():
+            if metric not in metrics or metric not in baseline_metrics:
+                continue
+            limit = baseline_metrics[metric] * budget
+            if metrics[metric] > limit:
+                regressions.append(
+                    "%s: %s is %s, the budget is %s"
+                    % (name, metric, metrics[metric], round(limit, 3))
+                )
+    return regressions
@@ -0,0 +1,246 @@
+"""Export orders, order lines, customers and products as CSV or NDJSON.
+
+The rows are read with a server-side cursor and written out one by one, either
+streamed in the response or, for the largest exports, written into the storage
+by a background task, so the memory used doesn't grow with the export.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from ..account.models import User
+from ..order import OrderStatus
+from ..order.models import Order, OrderLine
+from ..product.models import Product
+
+# Number of rows fetched from the server-side cursor at once
+CHUNK_SIZE = 2000
+
+EXPORT_PATH = "exports/{name}-{timestamp}.{format}"
+
+
+class ExportError(ValueError):
+    """Raised when the export parameters are not valid."""
+
+
+@dataclass(frozen=True)
+class Export:
+    get_queryset: Callable[[], QuerySet]
+    # The columns in their default order, mapped to their lookups
+    columns: Dict[str, str]
+    # The lookup of the date the exported rows are filtered by
+    date_field: str
+
+
+EXPORTS = {
+    "orders": Export(
+        get_queryset=lambda: Order.objects.confirmed(),
+        columns={
+            "id": "pk",
+            "created": "created",
+            "status": "status",
+            "customer_email": "user_email",
+            "customer_id": "user_id",
+            "currency": "currency",
+            "total_net": "total_net_amount",
+            "total_gross": "total_gross_amount",
+            "shipping_price_gross": "shipping_price_gross_amount",
+            "shipping_method": "shipping_method_name",
+            "discount": "discount_amount",
+            "voucher_code": "voucher__code",
+        },
+        date_field="created",
+    ),
+    "order_lines": Export(
+        get_queryset=lambda: OrderLine.objects.exclude(order__status=OrderStatus.DRAFT),
+        columns={
+            "id": "pk",
+            "order_id": "order_id",
+            "order_created": "order__created",
+            "order_status": "order__status",
+            "product_name": "product_name",
+            "variant_name": "variant_name",
+            "sku": "product_sku",
+            "quantity": "quantity",
+            "quantity_fulfilled": "quantity_fulfilled",
+            "currency": "currency",
+            "unit_price_net": "unit_price_net_amount",
+            "unit_price_gross": "unit_price_gross_amount",
+            "tax_rate": "tax_rate",
+        },
+        date_field="order__created",
+    ),
+    "customers": Export(
+        get_queryset=lambda: User.objects.customers().distinct(),
+        columns={
+            "id": "pk",
+            "email": "email",
+            "first_name": "first_name",
+            "last_name": "last_name",
+            "is_active": "is_active",
+            "date_joined": "date_joined",
+            "country": "default_billing_address__country",
+            "city": "default_billing_address__city",
+            "postal_code": "default_billing_address__postal_code",
+            "phone": "default_billing_address__phone",
+        },
+        date_field="date_joined",
+    ),
+    "products": Export(
+        get_queryset=lambda: Product.objects.all(),
+        columns={
+            "id": "pk",
+            "name": "name",
+            "category": "category__name",
+            "currency": "currency",
+            "price": "price_amount",
+            "minimal_variant_price": "minimal_variant_price_amount",
+            "is_published": "is_published",
+            "publication_date": "publication_date",
+            "updated_at": "updated_at",
+        },
+        date_field="updated_at",
+    ),
+}
+
+
+class _Echo:
+    """Return what is written, so the CSV writer produces the lines."""
+
+    def write(self, value):
+        return value
+
+
+def write_csv(columns: List[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_ndjson(columns: List[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+FORMATS = {
+    "csv": ("text/csv", write_csv),
+    "ndjson": ("application/x-ndjson", write_ndjson),
+}
+
+
+def _get_datetime(value: date) -> datetime:
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def get_export_rows(
+    export_name: str,
+    columns: List[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Iterator[tuple]:
+    """Yield the values of the columns of the rows in the given days."""
+    export = EXPORTS[export_name]
+    qs = export.get_queryset()
+    if date_from:
+        qs = qs.filter(**{"%s__gte" % export.date_field: _get_datetime(date_from)})
+    if date_to:
+        qs = qs.filter(
+            **{"%s__lt" % export.date_field: _get_datetime(date_to + timedelta(days=1))}
+        )
+    lookups = [export.columns[column] for column in columns]
+    return qs.order_by("pk").values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def generate_export(
+    export_name: str,
+    columns: List[str],
+    export_format: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Iterator[str]:
+    _content_type, write = FORMATS[export_format]
+    rows = get_export_rows(export_name, columns, date_from, date_to)
+    return write(columns, rows)
+
+
+def parse_export_params(export_name: str, params) -> dict:
+    """Return the export parameters from the query string.
+
+    `columns` is a comma separated list of columns, all of them by default,
+    `format` is "csv" or "ndjson", `date_from` and `date_to` are the first and
+    the last exported day, formatted as YYYY-MM-DD.
+    """
+    export = EXPORTS[export_name]
+    columns = [column for column in params.get("columns", "").split(",") if column]
+    unknown_columns = [column for column in columns if column not in export.columns]
+    if unknown_columns:
+        raise ExportError("Unknown columns: %s." % ", ".join(unknown_columns))
+
+    export_format = params.get("format", "csv")
+    if export_format not in FORMATS:
+        raise ExportError("Unknown format: %s." % export_format)
+
+    dates = {}
+    for param in ("date_from", "date_to"):
+        value = params.get(param)
+        try:
+            dates[param] = date.fromisoformat(value) if value else None
+        except ValueError:
+            raise ExportError("Invalid date: %s." % value)
+
+    return {
+        "columns": columns or list(export.columns),
+        "export_format": export_format,
+        **dates,
+    }
+
+
+def get_export_response(request, export_name: str):
+    """Stream the export or, with `background=1`, write it into the storage.
+
+    A background export responds with the path and the URL its file will be
+    available at once the task is done.
+    """
+    from .tasks import export_to_storage_task
+
+    try:
+        params = parse_export_params(export_name, request.GET)
+    except ExportError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    file_name = EXPORT_PATH.format(
+        name=export_name,
+        timestamp=timezone.now().strftime("%Y%m%d%H%M%S"),
+        format=params["export_format"],
+    )
+
+    if request.GET.get("background"):
+        file_path = default_storage.get_available_name(file_name)
+        export_to_storage_task.delay(
+            export_name,
+            file_path,
+            params["columns"],
+            params["export_format"],
+            params["date_from"].isoformat() if params["date_from"] else None,
+            params["date_to"].isoformat() if params["date_to"] else None,
+        )
+        return JsonResponse(
+            {"file": file_path, "url": default_storage.url(file_path)}, status=202
+        )
+
+    content_type, _write = FORMATS[params["export_format"]]
+    response = StreamingHttpResponse(
+        generate_export(export_name, **params), content_type=content_type
+    )
+    response["Content-Disposition"] = 'attachment; filename="%s"' % (
+        file_name.rsplit("/", 1)[-1]
+    )
+    return response
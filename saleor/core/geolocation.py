@@ -0,0 +1,109 @@
+"""Resolve countries and currencies of clients by their IP addresses.
+
+The country and currency middlewares run on every request, so the GeoLite2
+database is opened memory-mapped once per process and lookups are memoized
+in an LRU cache keyed by the network the address belongs to. Currencies of
+all the countries are computed once, instead of asking babel every time.
+"""
+import ipaddress
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Optional
+
+import maxminddb
+from babel.numbers import get_territory_currencies
+from django.conf import settings
+from django_countries import countries
+from django_countries.fields import Country
+from geolite2 import geolite2
+
+# Clients from the same /24 IPv4 or /64 IPv6 network are practically always
+# located in the same country, so they can share a cache entry.
+IPV4_PREFIX_LENGTH = 24
+IPV6_PREFIX_LENGTH = 64
+
+
+def get_network_address(ip_address: str) -> str:
+    """Return the address of the network the given IP address belongs to."""
+    octets = ip_address.split(".")
+    if len(octets) == 4:
+        # Fast path for IPv4, the database validates the address on lookup
+        return "%s.%s.%s.0" % (octets[0], octets[1], octets[2])
+    address = ipaddress.ip_address(ip_address)
+    prefix_length = IPV4_PREFIX_LENGTH if address.version == 4 else IPV6_PREFIX_LENGTH
+    network = ipaddress.ip_network((address, prefix_length), strict=False)
+    return str(network.network_address)
+
+
+class CountryResolver:
+    def __init__(self, database_path: str = None, cache_size: int = None):
+        self.database_path = database_path or geolite2.filename
+        self.cache_size = (
+            settings.GEOIP_CACHE_SIZE if cache_size is None else cache_size
+        )
+        self._lock = Lock()
+        self._reader = None
+        self._currencies = None
+        self._get_country = lru_cache(maxsize=self.cache_size)(self._lookup_country)
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            with self._lock:
+                if self._reader is None:
+                    # Uses the C extension over a memory map when it's available
+                    self._reader = maxminddb.open_database(
+                        self.database_path, mode=maxminddb.MODE_AUTO
+                    )
+        return self._reader
+
+    @property
+    def currencies(self) -> Dict[str, str]:
+        if self._currencies is None:
+            currencies = {}
+            for code, _name in countries:
+                territory_currencies = get_territory_currencies(code)
+                if territory_currencies:
+                    currencies[code] = territory_currencies[0]
+            self._currencies = currencies
+        return self._currencies
+
+    def _lookup_country(self, network_address: str) -> Optional[Country]:
+        geo_data = self.reader.get(network_address)
+        if geo_data and "country" in geo_data and "iso_code" in geo_data["country"]:
+            country_iso_code = geo_data["country"]["iso_code"]
+            if country_iso_code in countries:
+                return Country(country_iso_code)
+        return None
+
+    def get_country(self, ip_address: str) -> Optional[Country]:
+        return self._get_country(get_network_address(ip_address))
+
+    def get_currency(self, country: Country) -> str:
+        return self.currencies.get(country.code, settings.DEFAULT_CURRENCY)
+
+    def get_stats(self) -> dict:
+        """Return the LRU cache metrics."""
+        info = self._get_country.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+
+    def clear(self):
+        self._get_country.cache_clear()
+        self._currencies = None
+
+    def close(self):
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+        self.clear()
+
+
+resolver = CountryResolver()
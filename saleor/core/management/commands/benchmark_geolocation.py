@@ -0,0 +1,97 @@
+import random
+import timeit
+from unittest.mock import patch
+
+from babel.numbers import get_territory_currencies
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django_countries import countries
+from django_countries.fields import Country
+from geolite2 import geolite2
+
+from ...geolocation import CountryResolver
+from ...middleware import country, currency
+
+
+def get_country_by_ip_uncached(ip_address):
+    """Look up the country the way the middleware did before it was cached."""
+    geo_data = geolite2.reader().get(ip_address)
+    if geo_data and "country" in geo_data and "iso_code" in geo_data["country"]:
+        country_iso_code = geo_data["country"]["iso_code"]
+        if country_iso_code in countries:
+            return Country(country_iso_code)
+    return None
+
+
+def get_currency_for_country_uncached(country):
+    currencies = get_territory_currencies(country.code)
+    if currencies:
+        return currencies[0]
+    return settings.DEFAULT_CURRENCY
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of the country and currency middlewares "
+        "with and without the cached geolocation resolver."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=10000, help="Number of requests to run."
+        )
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=1000,
+            help="Number of distinct client addresses the requests come from.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated addresses."
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        addresses = [
+            ".".join(str(rng.randint(1, 223)) for _ in range(4))
+            for _ in range(options["clients"])
+        ]
+        factory = RequestFactory()
+        requests = [
+            factory.get("/", REMOTE_ADDR=rng.choice(addresses))
+            for _ in range(options["requests"])
+        ]
+
+        # Warm up the database reader so opening it isn't part of the measurement
+        geolite2.reader()
+        uncached_time = self.run_middlewares(
+            requests, get_country_by_ip_uncached, get_currency_for_country_uncached
+        )
+        resolver = CountryResolver()
+        cached_time = self.run_middlewares(
+            requests, resolver.get_country, resolver.get_currency
+        )
+
+        stats = resolver.get_stats()
+        self.stdout.write(
+            "Uncached: %.1f µs/request" % (uncached_time / len(requests) * 10 ** 6)
+        )
+        self.stdout.write(
+            "Cached: %.1f µs/request" % (cached_time / len(requests) * 10 ** 6)
+        )
+        self.stdout.write(
+            "Cache hit rate: %.1f%% (%d entries)"
+            % (stats["hit_rate"] * 100, stats["size"])
+        )
+
+    def run_middlewares(self, requests, get_country_by_ip, get_currency_for_country):
+        handler = country(currency(lambda request: None))
+        with patch(
+            "saleor.core.middleware.get_country_by_ip", get_country_by_ip
+        ), patch(
+            "saleor.core.middleware.get_currency_for_country", get_currency_for_country
+        ):
+            return timeit.timeit(
+                lambda: [handler(request) for request in requests], number=1
+            )
@@ -1,9 +1,10 @@
 import logging
+import os
 
 from django.core.management.base import BaseCommand
-from versatileimagefield.image_warmer import VersatileImageFieldWarmer
 
 from ....product.models import ProductImage
+from ...thumbnails import warm_thumbnails
 
 logger = logging.getLogger(__name__)
 
@@ -11,19 +12,39 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = "Generate thumbnails for all images"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of processes generating the thumbnails.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of images whose thumbnails are generated at once.",
+        )
+
     def handle(self, *args, **options):
-        self.warm_products()
+        self.warm_products(options["workers"], options["batch_size"])
 
-    def warm_products(self):
+    def warm_products(self, workers, batch_size):
         self.stdout.write("Products thumbnails generation:")
-        warmer = VersatileImageFieldWarmer(
-            instance_or_queryset=ProductImage.objects.all(),
-            rendition_key_set="products",
-            image_attr="image",
-            verbose=True,
-        )
-        num_created, failed_to_create = warmer.warm()
-        self.log_failed_images(failed_to_create)
+        pks = list(ProductImage.objects.values_list("pk", flat=True))
+        total_created = 0
+        for start in range(0, len(pks), batch_size):
+            end = start + batch_size
+            num_created, failed_to_create = warm_thumbnails(
+                ProductImage,
+                pks[start:end],
+                rendition_key_set="products",
+                image_attr="image",
+                workers=workers,
+            )
+            total_created += num_created
+            self.log_failed_images(failed_to_create)
+        self.stdout.write("Created %d thumbnails." % total_created)
 
     def log_failed_images(self, failed_to_create):
         if failed_to_create:
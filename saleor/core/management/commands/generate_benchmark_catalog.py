@@ -0,0 +1,92 @@
+import os
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ...utils.benchmark_data import BATCH_SIZE, CatalogSize, generate_benchmark_catalog
+
+SEQUENCE_APP_LABELS = ("account", "order", "product")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create a large catalog with users and orders to measure the "
+        "performance against. The same options generate the same dataset in an "
+        "empty database."
+    )
+
+    def add_arguments(self, parser):
+        defaults = CatalogSize()
+        for name, help_text in (
+            ("categories", "Number of categories."),
+            ("products", "Number of products."),
+            ("variants_per_product", "Number of variants of each product."),
+            ("videos_per_product", "Number of course videos of each product."),
+            ("attributes", "Number of attributes of each product."),
+            ("values_per_attribute", "Number of values of each attribute."),
+            ("users", "Number of customers."),
+            ("orders", "Number of orders."),
+            ("lines_per_order", "Number of lines of each order."),
+            ("days", "Number of days the orders are spread over."),
+        ):
+            parser.add_argument(
+                "--%s" % name.replace("_", "-"),
+                type=int,
+                default=getattr(defaults, name),
+                help=help_text,
+            )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated data."
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            default=None,
+            help="Day of the most recent orders, YYYY-MM-DD. Today by default.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of processes creating the rows.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of rows created at once by a process.",
+        )
+
+    def sequence_reset(self):
+        """Move the sequences past the primary keys assigned by the generator."""
+        commands = StringIO()
+        for app_label in SEQUENCE_APP_LABELS:
+            call_command("sqlsequencereset", app_label, stdout=commands, no_color=True)
+        with connection.cursor() as cursor:
+            cursor.execute(commands.getvalue())
+
+    def handle(self, *args, **options):
+        size = CatalogSize(
+            categories=options["categories"],
+            products=options["products"],
+            variants_per_product=options["variants_per_product"],
+            videos_per_product=options["videos_per_product"],
+            attributes=options["attributes"],
+            values_per_attribute=options["values_per_attribute"],
+            users=options["users"],
+            orders=options["orders"],
+            lines_per_order=options["lines_per_order"],
+            days=options["days"],
+        )
+        for msg in generate_benchmark_catalog(
+            size,
+            seed=options["seed"],
+            end_date=options["end_date"],
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+        ):
+            self.stdout.write(msg)
+        self.sequence_reset()
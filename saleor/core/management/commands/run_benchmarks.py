@@ -0,0 +1,93 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import (
+    DEFAULT_BUDGETS,
+    SCENARIOS,
+    BenchmarkError,
+    find_regressions,
+    run_benchmarks,
+)
+
+METRICS = ("p50_ms", "p95_ms", "queries", "sql_ms", "allocated_kb")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the latency, the SQL queries and the allocations of the "
+        "storefront, dashboard and checkout flows and compare them with a baseline. "
+        "Run generate_benchmark_catalog first to measure them against a large "
+        "dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            default="benchmark-baseline.json",
+            help="Path of the JSON file with the baseline results.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of comparing them.",
+        )
+        parser.add_argument(
+            "--flow",
+            action="append",
+            choices=sorted({scenario.flow for scenario in SCENARIOS}),
+            help="Only measure the scenarios of the given flows.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Number of measured requests."
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=3, help="Number of requests not measured."
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [
+            scenario
+            for scenario in SCENARIOS
+            if not options["flow"] or scenario.flow in options["flow"]
+        ]
+        try:
+            results = run_benchmarks(scenarios, options["repeat"], options["warmup"])
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        self.print_results(results)
+
+        baseline_path = options["baseline"]
+        if options["update_baseline"]:
+            budgets = DEFAULT_BUDGETS
+            if os.path.exists(baseline_path):
+                with open(baseline_path) as f:
+                    budgets = json.load(f).get("budgets", budgets)
+            with open(baseline_path, "w") as f:
+                json.dump(
+                    {"budgets": budgets, "results": results},
+                    f,
+                    indent=2,
+                    sort_keys=True,
+                )
+            self.stdout.write("Baseline stored in %s" % baseline_path)
+            return
+
+        if not os.path.exists(baseline_path):
+            raise CommandError(
+                "No baseline in %s, create it with --update-baseline." % baseline_path
+            )
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline)
+        if regressions:
+            raise CommandError("Regressions found:\n" + "\n".join(regressions))
+        self.stdout.write("No regressions.")
+
+    def print_results(self, results):
+        self.stdout.write("%-28s" % "scenario" + "".join("%14s" % m for m in METRICS))
+        for name, metrics in results.items():
+            self.stdout.write(
+                "%-28s" % name + "".join("%14s" % metrics[m] for m in METRICS)
+            )
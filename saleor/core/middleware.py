@@ -83,20 +83,16 @@ def currency(get_response):
 
 
 def site(get_response):
-    """Clear the Sites cache and assign the current site to `request.site`.
+    """Assign the current site to `request.site`.
 
-    By default django.contrib.sites caches Site instances at the module
-    level. This leads to problems when updating Site instances, as it's
-    required to restart all application servers in order to invalidate
-    the cache. Using this middleware solves this problem.
+    The site, its settings and their translations are loaded from the shared
+    cache, which is invalidated by bumping its version whenever the site or
+    its settings change. This way updates are visible to all application
+    servers without querying the database on every request.
     """
 
-    def _get_site():
-        Site.objects.clear_cache()
-        return Site.objects.get_current()
-
     def middleware(request):
-        request.site = SimpleLazyObject(_get_site)
+        request.site = SimpleLazyObject(Site.objects.get_current)
         return get_response(request)
 
     return middleware
@@ -0,0 +1,26 @@
+import tempfile
+from datetime import date
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from ..celeryconf import app
+from .export import generate_export
+
+
+@app.task
+def export_to_storage_task(
+    export_name, file_path, columns, export_format, date_from=None, date_to=None
+):
+    # The export is spooled on the disk, the storage then copies it in chunks
+    with tempfile.TemporaryFile() as export_file:
+        for chunk in generate_export(
+            export_name,
+            columns,
+            export_format,
+            date.fromisoformat(date_from) if date_from else None,
+            date.fromisoformat(date_to) if date_to else None,
+        ):
+            export_file.write(chunk.encode())
+        export_file.seek(0)
+        default_storage.save(file_path, File(export_file))
@@ -0,0 +1,140 @@
+"""Create the thumbnails of images once, in parallel and on demand.
+
+Renditions that were created are recorded in a manifest kept in the cache, so
+warming them again doesn't check the storage for every rendition. Creating a
+rendition is guarded by a lock in the cache: concurrent warmings of the same
+image skip the renditions being created by the other one, and concurrent
+on-demand requests wait for the first one instead of resizing the image again.
+"""
+import hashlib
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from versatileimagefield.utils import get_url_from_image_key
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_CACHE_KEY = "thumbnail_manifest:{}:{}"
+LOCK_CACHE_KEY = "thumbnail_lock:{}:{}"
+
+# How long a rendition may take to be created before its lock expires
+LOCK_TIMEOUT = 60
+# How long an on-demand request waits for a rendition created by another one
+RENDER_WAIT_TIMEOUT = 10
+RENDER_POLL_INTERVAL = 0.1
+
+CREATED = "created"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+def get_rendition_keys(rendition_key_set: str) -> List[str]:
+    """Return the size keys, e.g. "thumbnail__60x60", of the rendition key set."""
+    renditions = settings.VERSATILEIMAGEFIELD_RENDITION_KEY_SETS[rendition_key_set]
+    return [size_key for _name, size_key in renditions]
+
+
+def _get_cache_key(key_format: str, image_name: str, size_key: str) -> str:
+    # Names of the images may contain characters not allowed in the cache keys
+    name_hash = hashlib.md5(image_name.encode()).hexdigest()
+    return key_format.format(name_hash, size_key)
+
+
+def is_rendition_created(image_file, size_key: str) -> bool:
+    manifest_key = _get_cache_key(MANIFEST_CACHE_KEY, image_file.name, size_key)
+    return cache.get(manifest_key) is not None
+
+
+def get_rendition_url(image_file, size_key: str, create: bool = False) -> str:
+    # The storage isn't touched at all when the rendition isn't created
+    image_file.create_on_demand = create
+    return get_url_from_image_key(image_file, size_key)
+
+
+def create_rendition(image_file, size_key: str, wait: bool = True) -> Optional[str]:
+    """Create the rendition of the image unless it was already created.
+
+    Return the URL of the rendition. When another process is creating it,
+    wait for that process or, if `wait` is false, return None right away.
+    """
+    if is_rendition_created(image_file, size_key):
+        return get_rendition_url(image_file, size_key)
+
+    manifest_key = _get_cache_key(MANIFEST_CACHE_KEY, image_file.name, size_key)
+    lock_key = _get_cache_key(LOCK_CACHE_KEY, image_file.name, size_key)
+    if cache.add(lock_key, True, LOCK_TIMEOUT):
+        try:
+            url = get_rendition_url(image_file, size_key, create=True)
+            cache.set(manifest_key, True, None)
+        finally:
+            cache.delete(lock_key)
+        return url
+
+    if not wait:
+        return None
+    deadline = time.monotonic() + RENDER_WAIT_TIMEOUT
+    while time.monotonic() < deadline and cache.get(lock_key) is not None:
+        time.sleep(RENDER_POLL_INTERVAL)
+    return get_rendition_url(image_file, size_key)
+
+
+def _warm_rendition(task: Tuple[str, int, str, str]) -> Tuple[str, str]:
+    model_label, pk, image_attr, size_key = task
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    image_file = getattr(instance, image_attr, None)
+    if not image_file:
+        return SKIPPED, ""
+    try:
+        url = create_rendition(image_file, size_key, wait=False)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Thumbnail creation failed", extra={"size_key": size_key})
+        return FAILED, "%s (%s)" % (image_file.name, size_key)
+    return (CREATED if url else SKIPPED), image_file.name
+
+
+def warm_thumbnails(
+    model, pks: Iterable[int], rendition_key_set: str, image_attr="image", workers=1
+) -> Tuple[int, List[str]]:
+    """Create the missing renditions of the images of the given instances.
+
+    The renditions are created in a pool of `workers` processes. Return the
+    number of the created renditions and the renditions that failed.
+    """
+    size_keys = get_rendition_keys(rendition_key_set)
+    images = model.objects.filter(pk__in=set(pks)).exclude(**{image_attr: ""})
+    image_names = dict(images.values_list("pk", image_attr))
+
+    # Skip the renditions recorded in the manifest, in a single cache lookup
+    tasks = {
+        _get_cache_key(MANIFEST_CACHE_KEY, name, size_key): (
+            model._meta.label,
+            pk,
+            image_attr,
+            size_key,
+        )
+        for pk, name in image_names.items()
+        for size_key in size_keys
+    }
+    for manifest_key in cache.get_many(list(tasks)):
+        del tasks[manifest_key]
+    if not tasks:
+        return 0, []
+
+    if workers > 1 and len(tasks) > 1:
+        # The forked workers must not share the connections of this process
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_warm_rendition, tasks.values()))
+    else:
+        results = [_warm_rendition(task) for task in tasks.values()]
+
+    num_created = sum(1 for status, _path in results if status == CREATED)
+    failed_to_create = [path for status, path in results if status == FAILED]
+    return num_created, failed_to_create
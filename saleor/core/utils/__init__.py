@@ -4,7 +4,6 @@ import socket
 from json import JSONEncoder
 from urllib.parse import urljoin
 
-from babel.numbers import get_territory_currencies
 from django import forms
 from django.conf import settings
 from django.contrib.sites.models import Site
@@ -13,18 +12,15 @@ from django.core.paginator import InvalidPage, Paginator
 from django.http import Http404
 from django.utils.encoding import iri_to_uri, smart_text
 from django_babel.templatetags.babel import currencyfmt
-from django_countries import countries
-from django_countries.fields import Country
-from django_prices_openexchangerates import exchange_currency
+from django_prices_openexchangerates import exchange_currency, get_conversion_rate
 from django_prices_openexchangerates.tasks import update_conversion_rates
-from geolite2 import geolite2
 from prices import MoneyRange
-from versatileimagefield.image_warmer import VersatileImageFieldWarmer
 
 from ...celeryconf import app
 from ...core.i18n import COUNTRY_CODE_CHOICES
+from ..geolocation import resolver
+from ..thumbnails import warm_thumbnails
 
-georeader = geolite2.reader()
 logger = logging.getLogger(__name__)
 
 
@@ -87,19 +83,11 @@ def get_client_ip(request):
 
 
 def get_country_by_ip(ip_address):
-    geo_data = georeader.get(ip_address)
-    if geo_data and "country" in geo_data and "iso_code" in geo_data["country"]:
-        country_iso_code = geo_data["country"]["iso_code"]
-        if country_iso_code in countries:
-            return Country(country_iso_code)
-    return None
+    return resolver.get_country(ip_address)
 
 
 def get_currency_for_country(country):
-    currencies = get_territory_currencies(country.code)
-    if currencies:
-        return currencies[0]
-    return settings.DEFAULT_CURRENCY
+    return resolver.get_currency(country)
 
 
 def get_paginator_items(items, paginate_by, page_number):
@@ -125,7 +113,7 @@ def format_money(money):
     return currencyfmt(money.amount, money.currency)
 
 
-def to_local_currency(price, currency):
+def to_local_currency(price, currency, conversion_rate=None):
     if price is None:
         return None
     if not settings.OPENEXCHANGERATES_API_KEY:
@@ -136,12 +124,26 @@ def to_local_currency(price, currency):
         from_currency = price.currency
     if currency != from_currency:
         try:
-            return exchange_currency(price, currency)
+            return exchange_currency(price, currency, conversion_rate=conversion_rate)
         except ValueError:
             pass
     return None
 
 
+def get_local_currency_conversion_rate(from_currency, currency):
+    """Return the rate converting prices to the local currency.
+
+    Return None if the prices aren't converted, it's looked up once to convert
+    many prices with `to_local_currency`.
+    """
+    if not settings.OPENEXCHANGERATES_API_KEY or currency == from_currency:
+        return None
+    try:
+        return get_conversion_rate(from_currency, currency)
+    except ValueError:
+        return None
+
+
 @app.task
 def update_conversion_rates_from_openexchangerates():
     conversion_rates_queryset = update_conversion_rates()
@@ -163,18 +165,12 @@ def serialize_decimal(obj):
 
 
 def create_thumbnails(pk, model, size_set, image_attr=None):
-    instance = model.objects.get(pk=pk)
     if not image_attr:
         image_attr = "image"
-    image_instance = getattr(instance, image_attr)
-    if image_instance.name == "":
-        # There is no file, skip processing
-        return
-    warmer = VersatileImageFieldWarmer(
-        instance_or_queryset=instance, rendition_key_set=size_set, image_attr=image_attr
-    )
     logger.info("Creating thumbnails for  %s", pk)
-    num_created, failed_to_create = warmer.warm()
+    num_created, failed_to_create = warm_thumbnails(
+        model, [pk], rendition_key_set=size_set, image_attr=image_attr
+    )
     if num_created:
         logger.info("Created %d thumbnails", num_created)
     if failed_to_create:
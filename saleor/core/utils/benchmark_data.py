@@ -0,0 +1,397 @@
+"""Generate a large catalog to measure the performance of the shop against.
+
+The rows are bulk created in batches, in parallel processes. The primary keys
+of all the rows are allocated up front, so the batches don't depend on each
+other and every batch is generated only from the seed and its own range of
+rows: the same options always generate the same dataset in an empty database.
+"""
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connections
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ...account.models import User
+from ...order.models import Order, OrderLine
+from ...order.rollups import rebuild_sales
+from ...product.models import (
+    AssignedProductAttribute,
+    Attribute,
+    AttributeProduct,
+    AttributeValue,
+    Category,
+    Product,
+    ProductType,
+    ProductVariant,
+    ProductVideo,
+)
+from ...product.utils.attributes import update_attribute_sort_keys
+
+BATCH_SIZE = 5000
+
+CATEGORY_SLUG_PREFIX = "benchmark-"
+ATTRIBUTE_SLUG_PREFIX = "benchmark-"
+PRODUCT_TYPE_NAME = "Benchmark course"
+EMAIL_DOMAIN = "benchmark.example.com"
+
+
+@dataclass(frozen=True)
+class CatalogSize:
+    categories: int = 100
+    products: int = 100000
+    variants_per_product: int = 10
+    videos_per_product: int = 10
+    attributes: int = 10
+    values_per_attribute: int = 10
+    users: int = 1000000
+    orders: int = 1000000
+    lines_per_order: int = 5
+    days: int = 365
+
+
+@dataclass(frozen=True)
+class BenchmarkAttribute:
+    attribute_id: int
+    # The assignment of the attribute to the product type of the products
+    assignment_id: int
+    value_ids: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class BenchmarkCatalog:
+    """Describe the generated dataset, shared with the worker processes."""
+
+    seed: int
+    size: CatalogSize
+    end_date: date
+    category_ids: Tuple[int, ...]
+    attributes: Tuple[BenchmarkAttribute, ...]
+    # The primary key of the first generated row of each model
+    first_pks: Dict[str, int]
+
+    def get_pk(self, model, number: int) -> int:
+        return self.first_pks[model._meta.label] + number
+
+
+def get_product_price(catalog: BenchmarkCatalog, product_number: int) -> Decimal:
+    # Prices are derived from the number, so the order lines can use them
+    # without reading the variants back from the database
+    cents = (product_number * 7919 + catalog.seed) % 9901 + 100
+    return Decimal(cents) / 100
+
+
+def get_attribute_value_ids(
+    catalog: BenchmarkCatalog, product_number: int
+) -> List[int]:
+    """Return the ids of the values of the product, one for each attribute."""
+    # The values are derived from the number, like the prices, so the products
+    # can store their ids without reading the assignments back
+    rng = random.Random("%d:values:%d" % (catalog.seed, product_number))
+    return [rng.choice(attribute.value_ids) for attribute in catalog.attributes]
+
+
+def get_email(catalog: BenchmarkCatalog, user_number: int) -> str:
+    return "user-%d@%s" % (catalog.get_pk(User, user_number), EMAIL_DOMAIN)
+
+
+def generate_products(catalog, rng, numbers):
+    for number in numbers:
+        price = get_product_price(catalog, number)
+        yield Product(
+            pk=catalog.get_pk(Product, number),
+            name="Course %d" % number,
+            description="Benchmark course %d." % number,
+            category_id=rng.choice(catalog.category_ids),
+            price_amount=price,
+            minimal_variant_price_amount=price,
+            currency=settings.DEFAULT_CURRENCY,
+            is_published=rng.random() < 0.9,
+            attribute_value_ids=sorted(get_attribute_value_ids(catalog, number)),
+        )
+
+
+def generate_variants(catalog, _rng, numbers):
+    per_product = catalog.size.variants_per_product
+    for number in numbers:
+        product_number = number // per_product
+        yield ProductVariant(
+            pk=catalog.get_pk(ProductVariant, number),
+            product_id=catalog.get_pk(Product, product_number),
+            sku="BENCH-%d" % catalog.get_pk(ProductVariant, number),
+            name="Variant %d" % (number % per_product),
+            quantity=100,
+            quantity_allocated=0,
+        )
+
+
+def generate_videos(catalog, _rng, numbers):
+    per_product = catalog.size.videos_per_product
+    for number in numbers:
+        product_number = number // per_product
+        yield ProductVideo(
+            pk=catalog.get_pk(ProductVideo, number),
+            product_id=catalog.get_pk(Product, product_number),
+            video="products/benchmark-%d.mp4" % number,
+            title="Lesson %d" % (number % per_product + 1),
+            sort_order=number % per_product,
+        )
+
+
+def generate_assigned_attributes(catalog, _rng, numbers):
+    per_product = len(catalog.attributes)
+    for number in numbers:
+        yield AssignedProductAttribute(
+            pk=catalog.get_pk(AssignedProductAttribute, number),
+            product_id=catalog.get_pk(Product, number // per_product),
+            assignment_id=catalog.attributes[number % per_product].assignment_id,
+        )
+
+
+def generate_assigned_values(catalog, _rng, numbers):
+    per_product = len(catalog.attributes)
+    product_number, value_ids = None, []
+    for number in numbers:
+        if number // per_product != product_number:
+            product_number = number // per_product
+            value_ids = get_attribute_value_ids(catalog, product_number)
+        yield AssignedProductAttribute.values.through(
+            pk=catalog.get_pk(AssignedProductAttribute.values.through, number),
+            assignedproductattribute_id=catalog.get_pk(
+                AssignedProductAttribute, number
+            ),
+            attributevalue_id=value_ids[number % per_product],
+        )
+
+
+def generate_users(catalog, rng, numbers):
+    start = datetime.combine(catalog.end_date, time.min, tzinfo=timezone.utc)
+    for number in numbers:
+        yield User(
+            pk=catalog.get_pk(User, number),
+            email=get_email(catalog, number),
+            first_name="User",
+            last_name=str(number),
+            password=UNUSABLE_PASSWORD_PREFIX,
+            date_joined=start - timedelta(seconds=rng.randrange(86400 * 2 * 365)),
+        )
+
+
+def generate_orders(catalog, rng, numbers):
+    start = datetime.combine(catalog.end_date, time.min, tzinfo=timezone.utc)
+    for number in numbers:
+        user_number = rng.randrange(catalog.size.users) if catalog.size.users else None
+        yield Order(
+            pk=catalog.get_pk(Order, number),
+            created=start - timedelta(seconds=rng.randrange(86400 * catalog.size.days)),
+            user_id=(
+                catalog.get_pk(User, user_number) if user_number is not None else None
+            ),
+            user_email=(
+                get_email(catalog, user_number) if user_number is not None else ""
+            ),
+            token=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            currency=settings.DEFAULT_CURRENCY,
+        )
+
+
+def generate_lines(catalog, rng, numbers):
+    size = catalog.size
+    num_variants = size.products * size.variants_per_product
+    for number in numbers:
+        variant_number = rng.randrange(num_variants)
+        product_number = variant_number // size.variants_per_product
+        price = get_product_price(catalog, product_number)
+        yield OrderLine(
+            pk=catalog.get_pk(OrderLine, number),
+            order_id=catalog.get_pk(Order, number // size.lines_per_order),
+            variant_id=catalog.get_pk(ProductVariant, variant_number),
+            product_name="Course %d" % product_number,
+            variant_name="Variant %d" % (variant_number % size.variants_per_product),
+            product_sku="BENCH-%d" % catalog.get_pk(ProductVariant, variant_number),
+            is_shipping_required=False,
+            quantity=rng.randint(1, 3),
+            currency=settings.DEFAULT_CURRENCY,
+            unit_price_net_amount=price,
+            unit_price_gross_amount=price,
+        )
+
+
+# The models in the order they are created in, as the later ones refer to
+# the earlier ones, with the function generating them and their total number
+GENERATORS: List[Tuple[type, Callable, Callable[[CatalogSize], int]]] = [
+    (Product, generate_products, lambda size: size.products),
+    (
+        ProductVariant,
+        generate_variants,
+        lambda size: size.products * size.variants_per_product,
+    ),
+    (
+        ProductVideo,
+        generate_videos,
+        lambda size: size.products * size.videos_per_product,
+    ),
+    (
+        AssignedProductAttribute,
+        generate_assigned_attributes,
+        lambda size: size.products * size.attributes
+        if size.values_per_attribute
+        else 0,
+    ),
+    (
+        AssignedProductAttribute.values.through,
+        generate_assigned_values,
+        lambda size: size.products * size.attributes
+        if size.values_per_attribute
+        else 0,
+    ),
+    (User, generate_users, lambda size: size.users),
+    (Order, generate_orders, lambda size: size.orders),
+    (
+        OrderLine,
+        generate_lines,
+        lambda size: size.orders * size.lines_per_order
+        if size.products and size.variants_per_product
+        else 0,
+    ),
+]
+
+
+def _create_batch(task: Tuple[BenchmarkCatalog, int, int, int]) -> int:
+    catalog, index, start, stop = task
+    model, generate, _count = GENERATORS[index]
+    # Every batch has its own random generator, so it doesn't matter which
+    # process creates it and in which order
+    rng = random.Random(
+        "%d:%s:%d" % (catalog.seed, model._meta.label, catalog.get_pk(model, start))
+    )
+    objects = list(generate(catalog, rng, range(start, stop)))
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return len(objects)
+
+
+def _create_categories(size: CatalogSize) -> Tuple[int, ...]:
+    categories = [
+        Category.objects.get_or_create(
+            slug="%s%d" % (CATEGORY_SLUG_PREFIX, number),
+            defaults={"name": "Benchmark category %d" % number},
+        )[0]
+        for number in range(max(size.categories, 1))
+    ]
+    return tuple(category.pk for category in categories)
+
+
+def _create_attributes(size: CatalogSize) -> Tuple[BenchmarkAttribute, ...]:
+    if not size.values_per_attribute:
+        return ()
+    product_type, _ = ProductType.objects.get_or_create(name=PRODUCT_TYPE_NAME)
+    attributes = []
+    for number in range(size.attributes):
+        attribute, _ = Attribute.objects.get_or_create(
+            slug="%s%d" % (ATTRIBUTE_SLUG_PREFIX, number),
+            defaults={"name": "Benchmark attribute %d" % number},
+        )
+        assignment, _ = AttributeProduct.objects.get_or_create(
+            attribute=attribute, product_type=product_type
+        )
+        values = [
+            AttributeValue.objects.get_or_create(
+                attribute=attribute,
+                slug="value-%d" % value_number,
+                defaults={"name": "Value %d" % value_number},
+            )[0]
+            for value_number in range(size.values_per_attribute)
+        ]
+        attributes.append(
+            BenchmarkAttribute(
+                attribute_id=attribute.pk,
+                assignment_id=assignment.pk,
+                value_ids=tuple(value.pk for value in values),
+            )
+        )
+    return tuple(attributes)
+
+
+def _get_first_pks() -> Dict[str, int]:
+    return {
+        model._meta.label: (model.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0)
+        + 1
+        for model, _generate, _count in GENERATORS
+    }
+
+
+def _update_order_totals(catalog: BenchmarkCatalog):
+    amount_field = DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+    )
+    totals = (
+        OrderLine.objects.filter(order_id=OuterRef("pk"))
+        .order_by()
+        .values("order_id")
+        .annotate(
+            total=Sum(
+                F("unit_price_gross_amount") * F("quantity"), output_field=amount_field
+            )
+        )
+        .values("total")
+    )
+    total = Coalesce(Subquery(totals, output_field=amount_field), Value(0))
+    first_pk = catalog.get_pk(Order, 0)
+    Order.objects.filter(
+        pk__gte=first_pk, pk__lt=first_pk + catalog.size.orders
+    ).update(total_net_amount=total, total_gross_amount=total)
+
+
+def generate_benchmark_catalog(
+    size: CatalogSize,
+    seed: int = 0,
+    end_date: Optional[date] = None,
+    workers: int = 1,
+    batch_size: int = BATCH_SIZE,
+):
+    """Bulk create a catalog of the given size, yield the progress messages.
+
+    The orders are spread over `size.days` days up to `end_date`, today by
+    default, so the reports covering the last days find them.
+    """
+    catalog = BenchmarkCatalog(
+        seed=seed,
+        size=size,
+        end_date=end_date or timezone.now().date(),
+        category_ids=_create_categories(size),
+        attributes=_create_attributes(size),
+        first_pks=_get_first_pks(),
+    )
+    for index, (model, _generate, count) in enumerate(GENERATORS):
+        total = count(size)
+        tasks = [
+            (catalog, index, start, min(start + batch_size, total))
+            for start in range(0, total, batch_size)
+        ]
+        if workers > 1 and len(tasks) > 1:
+            # The forked workers must not share the connections of this process
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                num_created = sum(executor.map(_create_batch, tasks))
+        else:
+            num_created = sum(_create_batch(task) for task in tasks)
+        yield "Created %d %s" % (num_created, model._meta.verbose_name_plural)
+
+    # The products are sorted by an attribute through keys that no signal
+    # computed for the created assignments
+    for attribute in catalog.attributes:
+        update_attribute_sort_keys(Attribute(pk=attribute.attribute_id))
+    yield "Updated the attribute sort keys"
+
+    _update_order_totals(catalog)
+    rebuild_sales()
+    yield "Updated the order totals and the sales"
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     url(r"^$", views.customer_list, name="customers"),
     url(r"^create/$", views.customer_create, name="customer-create"),
+    url(r"^export/$", views.customer_export, name="customer-export"),
     url(r"^(?P<pk>[0-9]+)/$", views.customer_details, name="customer-details"),
     url(r"^(?P<pk>[0-9]+)/update/$", views.customer_edit, name="customer-update"),
     url(r"^(?P<pk>[0-9]+)/delete/$", views.customer_delete, name="customer-delete"),
@@ -10,6 +10,7 @@ from django.utils.translation import pgettext_lazy
 
 from ...account import events as account_events
 from ...account.models import CustomerNote, User
+from ...core.export import get_export_response
 from ...core.utils import get_paginator_items
 from ..emails import send_set_password_email
 from ..views import staff_member_required
@@ -41,6 +42,12 @@ def customer_list(request):
     return TemplateResponse(request, "dashboard/customer/list.html", ctx)
 
 
+@staff_member_required
+@permission_required("account.manage_users")
+def customer_export(request):
+    return get_export_response(request, "customers")
+
+
 @staff_member_required
 @permission_required("account.manage_users")
 def customer_details(request, pk):
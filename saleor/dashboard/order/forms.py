@@ -13,7 +13,11 @@ from ...checkout.forms import QuantityField
 from ...core.exceptions import InsufficientStock
 from ...core.taxes import zero_taxed_money
 from ...discount.models import Voucher
-from ...discount.utils import decrease_voucher_usage, increase_voucher_usage
+from ...discount.utils import (
+    decrease_voucher_usage,
+    get_voucher_usage,
+    increase_voucher_usage,
+)
 from ...extensions.manager import get_extensions_manager
 from ...order import OrderStatus, events
 from ...order.actions import (
@@ -270,6 +274,24 @@ class OrderEditVoucherForm(forms.ModelForm):
         if self.instance.voucher:
             self.fields["voucher"].set_initial(self.instance.voucher)
 
+    def clean(self):
+        cleaned_data = super().clean()
+        voucher = cleaned_data.get("voucher")
+        if (
+            voucher
+            and voucher != self.old_voucher
+            and voucher.usage_limit is not None
+            and get_voucher_usage(voucher) >= voucher.usage_limit
+        ):
+            self.add_error(
+                "voucher",
+                pgettext_lazy(
+                    "Edit order voucher form error",
+                    "This voucher has reached its usage limit.",
+                ),
+            )
+        return cleaned_data
+
     def save(self, commit=True):
         voucher = self.instance.voucher
         if self.old_voucher != voucher:
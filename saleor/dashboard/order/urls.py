@@ -5,6 +5,8 @@ from . import views
 urlpatterns = [
     url(r"^$", views.order_list, name="orders"),
     url(r"^add/$", views.order_create, name="order-create"),
+    url(r"^export/$", views.order_export, name="order-export"),
+    url(r"^export/lines/$", views.order_lines_export, name="order-lines-export"),
     url(
         r"^(?P<order_pk>\d+)/create/$",
         views.create_order_from_draft,
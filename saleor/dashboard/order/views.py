@@ -13,6 +13,7 @@ from django.views.decorators.http import require_POST
 from django_prices.templatetags import prices
 
 from ...core.exceptions import InsufficientStock
+from ...core.export import get_export_response
 from ...core.utils import get_paginator_items
 from ...order import OrderStatus, events
 from ...order.actions import (
@@ -79,6 +80,18 @@ def order_list(request):
     return TemplateResponse(request, "dashboard/order/list.html", ctx)
 
 
+@staff_member_required
+@permission_required("order.manage_orders")
+def order_export(request):
+    return get_export_response(request, "orders")
+
+
+@staff_member_required
+@permission_required("order.manage_orders")
+def order_lines_export(request):
+    return get_export_response(request, "order_lines")
+
+
 @require_POST
 @staff_member_required
 @permission_required("order.manage_orders")
@@ -142,19 +155,25 @@ def order_details(request, order_pk):
         "user", "shipping_address", "billing_address"
     ).prefetch_related(
         "payments__transactions",
-        "events__user",
         "lines__variant__product",
         "fulfillments__lines__order_line",
     )
     order = get_object_or_404(qs, pk=order_pk)
     all_payments = order.payments.order_by("-pk").all()
     payment = order.get_last_payment()
+    # The history is read once, newest first, through the (order, date) index
+    order_events = list(order.events.select_related("user").order_by("-date"))
+    notes = [
+        event
+        for event in reversed(order_events)
+        if event.type == events.OrderEvents.NOTE_ADDED
+    ]
     ctx = {
         "order": order,
         "all_payments": all_payments,
         "payment": payment,
-        "notes": order.events.filter(type=events.OrderEvents.NOTE_ADDED),
-        "events": order.events.order_by("-date").all(),
+        "notes": notes,
+        "events": order_events,
         "order_fulfillments": order.fulfillments.all(),
     }
     return TemplateResponse(request, "dashboard/order/detail.html", ctx)
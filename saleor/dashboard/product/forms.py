@@ -297,6 +297,7 @@ class ProductForm(MoneyModelForm, AttributesMixin):
             "price_amount",
             "currency",
             "minimal_variant_price_amount",
+            "attribute_value_ids",
         ]
         labels = {
             "name": pgettext_lazy("Item name", "Name"),
@@ -4,6 +4,7 @@ from . import views
 
 urlpatterns = [
     url(r"^$", views.product_list, name="product-list"),
+    url(r"^export/$", views.product_export, name="product-export"),
     url(r"^(?P<pk>[0-9]+)/$", views.product_details, name="product-details"),
     url(
         r"^(?P<pk>[0-9]+)/publish/$",
@@ -8,6 +8,7 @@ from django.template.response import TemplateResponse
 from django.utils.translation import npgettext_lazy, pgettext_lazy
 from django.views.decorators.http import require_POST
 
+from ...core.export import get_export_response
 from ...core.utils import get_paginator_items
 from ...product.models import (
     Attribute,
@@ -48,6 +49,12 @@ def product_list(request):
     return TemplateResponse(request, "dashboard/product/list.html", ctx)
 
 
+@staff_member_required
+@permission_required("product.manage_products")
+def product_export(request):
+    return get_export_response(request, "products")
+
+
 @staff_member_required
 @permission_required("product.manage_products")
 def product_details(request, pk):
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+
+from ... import DiscountValueType, VoucherType
+from ...models import NotApplicable, Voucher
+from ...utils import get_voucher_usage, increase_voucher_usage
+
+
+def increase_voucher_usage_locked(voucher):
+    """Count a usage the way it was done before the usage counters were sharded."""
+    voucher = Voucher.objects.select_for_update().get(pk=voucher.pk)
+    if voucher.usage_limit is not None and voucher.used >= voucher.usage_limit:
+        raise NotApplicable("Usage limit reached.")
+    voucher.used = F("used") + 1
+    voucher.save(update_fields=["used"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput of concurrent checkouts using the same voucher, "
+        "with the voucher row locked and with the sharded usage counters. The "
+        "vouchers are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--checkouts", type=int, default=1000, help="Number of checkouts."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Number of threads."
+        )
+        parser.add_argument(
+            "--usage-limit", type=int, default=800, help="Usage limit of the voucher."
+        )
+        parser.add_argument(
+            "--hold-ms",
+            type=float,
+            default=5,
+            help="Time a checkout keeps its transaction open after the usage.",
+        )
+
+    def handle(self, *args, **options):
+        for name, increase in (
+            ("Locked voucher", increase_voucher_usage_locked),
+            ("Sharded counters", increase_voucher_usage),
+        ):
+            voucher = Voucher.objects.create(
+                code="BENCHMARK-USE",
+                type=VoucherType.ENTIRE_ORDER,
+                discount_value_type=DiscountValueType.FIXED,
+                discount_value=1,
+                usage_limit=options["usage_limit"],
+            )
+            try:
+                total_time, accepted = self.measure(voucher, increase, options)
+                counted = get_voucher_usage(voucher)
+            finally:
+                voucher.delete()
+            self.stdout.write(
+                "%s: %.0f checkouts/s, %d usages accepted, %d counted, limit %d"
+                % (
+                    name,
+                    options["checkouts"] / total_time,
+                    accepted,
+                    counted,
+                    options["usage_limit"],
+                )
+            )
+
+    def measure(self, voucher, increase, options):
+        hold_time = options["hold_ms"] / 1000
+
+        def checkout(_):
+            try:
+                with transaction.atomic():
+                    increase(voucher)
+                    time.sleep(hold_time)
+                return True
+            except NotApplicable:
+                return False
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(checkout, range(options["checkouts"])))
+        return time.perf_counter() - start, results.count(True)
@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("discount", "0018_auto_20190827_0315")]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoucherUsageCounter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("used", models.PositiveIntegerField(default=0)),
+                ("limit", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "voucher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage_counters",
+                        to="discount.Voucher",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("voucher", "shard")}},
+        )
+    ]
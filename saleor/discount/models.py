@@ -4,6 +4,7 @@ from functools import partial
 from django.conf import settings
 from django.db import models
 from django.db.models import F, Q
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import pgettext, pgettext_lazy
 from django_countries.fields import CountryField
@@ -178,6 +179,27 @@ class VoucherCustomer(models.Model):
         unique_together = (("voucher", "customer_email"),)
 
 
+class VoucherUsageCounter(models.Model):
+    """A shard of the usage counter of a voucher.
+
+    The usages of a voucher are counted in several rows, so the concurrent
+    checkouts using it don't wait for each other on a single row lock. Each
+    shard may be used up to its share of the voucher's usage limit, the shares
+    add up to the limit. `Voucher.used` is the sum of the shards, updated after
+    the usages are committed.
+    """
+
+    voucher = models.ForeignKey(
+        Voucher, related_name="usage_counters", on_delete=models.CASCADE
+    )
+    shard = models.PositiveSmallIntegerField()
+    used = models.PositiveIntegerField(default=0)
+    limit = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = (("voucher", "shard"),)
+
+
 class SaleQueryset(models.QuerySet):
     def active(self, date=None):
         if date is None:
@@ -261,3 +283,23 @@ class SaleTranslation(models.Model):
 
     class Meta:
         unique_together = (("language_code", "sale"),)
+
+
+@receiver(models.signals.post_save, sender=Sale)
+@receiver(models.signals.post_delete, sender=Sale)
+@receiver(models.signals.m2m_changed, sender=Sale.products.through)
+@receiver(models.signals.m2m_changed, sender=Sale.categories.through)
+@receiver(models.signals.m2m_changed, sender=Sale.collections.through)
+def invalidate_product_fragments_on_sale_change(sender, **kwargs):
+    from ..product.fragment_cache import invalidate_pricing_version
+
+    invalidate_pricing_version()
+
+
+@receiver(models.signals.post_save, sender=Voucher)
+def update_usage_limits_on_voucher_change(sender, instance, created, **kwargs):
+    """Share the changed usage limit of the voucher between its counters."""
+    from .utils import update_voucher_usage_limits
+
+    if not created:
+        update_voucher_usage_limits(instance)
@@ -0,0 +1,7 @@
+from ..celeryconf import app
+from .utils import update_voucher_used
+
+
+@app.task
+def update_voucher_used_task(voucher_pk):
+    update_voucher_used(voucher_pk)
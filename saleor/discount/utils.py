@@ -1,41 +1,155 @@
 import datetime
+import random
 from collections import defaultdict
 from typing import Iterable
 
-from django.db.models import F
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import pgettext
 
 from ..core.taxes import zero_money
 from ..extensions.manager import get_extensions_manager
 from . import DiscountInfo
-from .models import NotApplicable, Sale, VoucherCustomer
+from .models import NotApplicable, Sale, Voucher, VoucherCustomer, VoucherUsageCounter
+
+# The usages of a voucher are counted in this number of rows
+USAGE_COUNTER_SHARDS = 16
+
+
+def _get_shard_limits(usage_limit, used_by_shard):
+    """Share what is left of the usage limit between the shards."""
+    if usage_limit is None:
+        return [None] * len(used_by_shard)
+    remaining = max(usage_limit - sum(used_by_shard), 0)
+    share, rest = divmod(remaining, len(used_by_shard))
+    return [
+        used + share + (1 if shard < rest else 0)
+        for shard, used in enumerate(used_by_shard)
+    ]
+
+
+def _create_usage_counters(voucher):
+    """Create the counters of the voucher, the past usages go to the first one."""
+    used = Voucher.objects.filter(pk=voucher.pk).values_list("used", flat=True).get()
+    used_by_shard = [used] + [0] * (USAGE_COUNTER_SHARDS - 1)
+    limits = _get_shard_limits(voucher.usage_limit, used_by_shard)
+    # Concurrent checkouts may create the same counters
+    VoucherUsageCounter.objects.bulk_create(
+        [
+            VoucherUsageCounter(voucher=voucher, shard=shard, used=used, limit=limit)
+            for shard, (used, limit) in enumerate(zip(used_by_shard, limits))
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _change_voucher_usage(voucher, change: int) -> bool:
+    """Change one of the counters of the voucher, return False if none could be.
+
+    The counters are tried starting from a random one, so the concurrent
+    usages of the voucher lock different rows.
+    """
+    counters = VoucherUsageCounter.objects.filter(voucher=voucher)
+    if change > 0:
+        counters = counters.filter(Q(limit__isnull=True) | Q(used__lt=F("limit")))
+    else:
+        counters = counters.filter(used__gt=0)
+    first_shard = random.randrange(USAGE_COUNTER_SHARDS)
+    for offset in range(USAGE_COUNTER_SHARDS):
+        shard = (first_shard + offset) % USAGE_COUNTER_SHARDS
+        if counters.filter(shard=shard).update(used=F("used") + change):
+            return True
+    return False
+
+
+def _update_voucher_usage(voucher, change: int) -> bool:
+    changed = _change_voucher_usage(voucher, change)
+    if not changed and not voucher.usage_counters.exists():
+        _create_usage_counters(voucher)
+        changed = _change_voucher_usage(voucher, change)
+    if changed:
+        from .tasks import update_voucher_used_task
+
+        transaction.on_commit(lambda: update_voucher_used_task.delay(voucher.pk))
+    return changed
 
 
 def increase_voucher_usage(voucher):
-    """Increase voucher uses by 1."""
-    voucher.used = F("used") + 1
-    voucher.save(update_fields=["used"])
+    """Increase voucher uses by 1.
+
+    :raises NotApplicable: When the usage limit of the voucher is reached.
+    """
+    if not _update_voucher_usage(voucher, 1):
+        raise NotApplicable(
+            pgettext(
+                "Voucher not applicable", "This offer has reached its usage limit."
+            )
+        )
 
 
 def decrease_voucher_usage(voucher):
     """Decrease voucher uses by 1."""
-    voucher.used = F("used") - 1
-    voucher.save(update_fields=["used"])
+    _update_voucher_usage(voucher, -1)
 
 
-def add_voucher_usage_by_customer(voucher, customer_email):
-    voucher_customer = VoucherCustomer.objects.filter(
-        voucher=voucher, customer_email=customer_email
+def get_voucher_usage(voucher) -> int:
+    """Return the number of uses of the voucher, including the uncommitted ones."""
+    used = voucher.usage_counters.aggregate(used=Sum("used"))["used"]
+    if used is None:
+        return (
+            Voucher.objects.filter(pk=voucher.pk).values_list("used", flat=True).get()
+        )
+    return used
+
+
+def update_voucher_used(voucher_pk: int):
+    """Store the sum of the usage counters of the voucher in `Voucher.used`."""
+    used = (
+        VoucherUsageCounter.objects.filter(voucher_id=OuterRef("pk"))
+        .order_by()
+        .values("voucher_id")
+        .annotate(used_sum=Sum("used"))
+        .values("used_sum")
     )
-    if voucher_customer:
+    Voucher.objects.filter(pk=voucher_pk).update(
+        used=Coalesce(Subquery(used), F("used"))
+    )
+
+
+def update_voucher_usage_limits(voucher):
+    """Share the usage limit of the voucher between its existing counters."""
+    with transaction.atomic():
+        counters = list(
+            VoucherUsageCounter.objects.select_for_update()
+            .filter(voucher=voucher)
+            .order_by("shard")
+        )
+        if not counters:
+            return
+        limits = _get_shard_limits(
+            voucher.usage_limit, [counter.used for counter in counters]
+        )
+        for counter, limit in zip(counters, limits):
+            counter.limit = limit
+        VoucherUsageCounter.objects.bulk_update(counters, ["limit"])
+
+
+def add_voucher_usage_by_customer(voucher, customer_email):
+    try:
+        # The unique constraint guards against concurrent usages by the customer
+        with transaction.atomic():
+            VoucherCustomer.objects.create(
+                voucher=voucher, customer_email=customer_email
+            )
+    except IntegrityError:
         raise NotApplicable(
             pgettext(
                 "Voucher not applicable",
                 ("This offer is only valid once per customer."),
             )
         )
-    VoucherCustomer.objects.create(voucher=voucher, customer_email=customer_email)
 
 
 def remove_voucher_usage_by_customer(voucher, customer_email):
@@ -189,6 +189,50 @@ class BasePlugin:
         """
         return NotImplemented
 
+    def apply_taxes_to_products(
+        self,
+        product: "Product",
+        prices: List[Money],
+        country: Country,
+        previous_value: List[TaxedMoney],
+    ) -> List[TaxedMoney]:
+        """Apply taxes to several prices of the product at once.
+
+        By default taxes are applied to each price separately. Overwrite this method
+        if the plugin can look up the product taxes only once for all the prices.
+        """
+        taxed_prices = []
+        for price, previous_price in zip(prices, previous_value):
+            taxed_price = self.apply_taxes_to_product(
+                product, price, country, previous_value=previous_price
+            )
+            if taxed_price is NotImplemented:
+                taxed_price = previous_price
+            taxed_prices.append(taxed_price)
+        return taxed_prices
+
+    def apply_taxes_to_products_prices(
+        self,
+        products: List["Product"],
+        prices: List[List[Money]],
+        country: Country,
+        previous_value: List[List[TaxedMoney]],
+    ) -> List[List[TaxedMoney]]:
+        """Apply taxes to the prices of several products at once.
+
+        By default taxes are applied to the prices of each product separately.
+        Overwrite this method if the plugin can look up the taxes only once for all
+        the products.
+        """
+        return [
+            self.apply_taxes_to_products(
+                product, product_prices, country, previous_value=previous_prices
+            )
+            for product, product_prices, previous_prices in zip(
+                products, prices, previous_value
+            )
+        ]
+
     def preprocess_order_creation(
         self, checkout: "Checkout", discounts: List["DiscountInfo"], previous_value: Any
     ):
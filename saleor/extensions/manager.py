@@ -154,6 +154,36 @@ class ExtensionsManager(PaymentInterface):
             "apply_taxes_to_product", default_value, product, price, country
         )
 
+    def apply_taxes_to_products(
+        self, product: "Product", prices: List[Money], country: Country
+    ) -> List[TaxedMoney]:
+        """Apply taxes to several prices of the product in one pass of the plugins."""
+        default_value = [
+            quantize_price(TaxedMoney(net=price, gross=price), price.currency)
+            for price in prices
+        ]
+        return self.__run_method_on_plugins(
+            "apply_taxes_to_products", default_value, product, prices, country
+        )
+
+    def apply_taxes_to_products_prices(
+        self, products: List["Product"], prices: List[List[Money]], country: Country
+    ) -> List[List[TaxedMoney]]:
+        """Apply taxes to the prices of several products in one pass of the plugins.
+
+        The prices are given and returned as a list per product.
+        """
+        default_value = [
+            [
+                quantize_price(TaxedMoney(net=price, gross=price), price.currency)
+                for price in product_prices
+            ]
+            for product_prices in prices
+        ]
+        return self.__run_method_on_plugins(
+            "apply_taxes_to_products_prices", default_value, products, prices, country
+        )
+
     def apply_taxes_to_shipping(
         self, price: Money, shipping_address: "Address"
     ) -> TaxedMoney:
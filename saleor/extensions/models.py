@@ -1,9 +1,12 @@
 from django.contrib.postgres.fields import JSONField
 from django.db import models
+from django.dispatch import receiver
 from django.utils.translation import pgettext_lazy
 
 from saleor.core.utils.json_serializer import CustomJsonEncoder
 
+from .plugins.vatlayer import invalidate_tax_rates_table
+
 
 class PluginConfiguration(models.Model):
     name = models.CharField(max_length=128, unique=True)
@@ -20,3 +23,22 @@ class PluginConfiguration(models.Model):
 
     def __str__(self):
         return f"Configuration of {self.name}, active: {self.active}"
+
+
+@receiver(models.signals.post_save, sender="django_prices_vatlayer.VAT")
+@receiver(models.signals.post_delete, sender="django_prices_vatlayer.VAT")
+def invalidate_tax_rates_table_on_vat_change(sender, **kwargs):
+    """Rebuild the tax rates tables once the VAT rates are fetched again."""
+    from ..product.fragment_cache import invalidate_pricing_version
+
+    invalidate_tax_rates_table()
+    invalidate_pricing_version()
+
+
+@receiver(models.signals.post_save, sender=PluginConfiguration)
+@receiver(models.signals.post_delete, sender=PluginConfiguration)
+def invalidate_product_fragments_on_plugin_change(sender, **kwargs):
+    """Drop the cached product fragments, the plugins calculate their prices."""
+    from ..product.fragment_cache import invalidate_pricing_version
+
+    invalidate_pricing_version()
@@ -1,5 +1,7 @@
+import hashlib
 import json
 import logging
+import threading
 from dataclasses import dataclass
 from datetime import date
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
@@ -10,6 +12,7 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.cache import cache
 from django.utils.translation import pgettext_lazy
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 if TYPE_CHECKING:
@@ -25,6 +28,7 @@ TAX_CODES_CACHE_TIME = 60 * 60 * 24 * 7  # 7 days
 CACHE_KEY = "avatax_request_id_"
 TAX_CODES_CACHE_KEY = "avatax_tax_codes_cache_key"
 TIMEOUT = 10  # API HTTP Requests Timeout
+POOL_MAXSIZE = 10  # Number of kept-alive connections to Avatax per thread
 
 # Common carrier code used to identify the line as a shipping service
 COMMON_CARRIER_CODE = "FR020100"
@@ -64,17 +68,52 @@ class CustomerErrors:
 
 def get_api_url(use_sandbox=True) -> str:
     """Based on settings return sanbox or production url."""
+    if settings.AVATAX_API_URL:
+        return settings.AVATAX_API_URL
     if use_sandbox:
         return "https://sandbox-rest.avatax.com/api/v2/"
     return "https://rest.avatax.com/api/v2/"
 
 
-def api_post_request(
+def get_request_data_hash(data: Dict[str, Any]) -> str:
+    """Return a key identifying the content of a request sent to Avatax."""
+    serialized_data = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(serialized_data.encode()).hexdigest()
+
+
+_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """Return a session keeping connections to Avatax alive between requests."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+class _InFlightRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Dict[str, Any] = {}
+
+
+_in_flight_requests: Dict[str, _InFlightRequest] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _post_request(
     url: str, data: Dict[str, Any], config: AvataxConfiguration
 ) -> Dict[str, Any]:
     try:
         auth = HTTPBasicAuth(config.username_or_account, config.password_or_license)
-        response = requests.post(url, auth=auth, data=json.dumps(data), timeout=TIMEOUT)
+        response = get_session().post(
+            url, auth=auth, data=json.dumps(data), timeout=TIMEOUT
+        )
         logger.debug("Hit to Avatax to calculate taxes %s", url)
     except requests.exceptions.RequestException:
         logger.warning("Fetching taxes failed %s", url)
@@ -82,10 +121,41 @@ def api_post_request(
     return response.json()
 
 
+def api_post_request(
+    url: str, data: Dict[str, Any], config: AvataxConfiguration
+) -> Dict[str, Any]:
+    """Send the request to Avatax unless an identical one is already in flight.
+
+    Concurrent identical requests, e.g. the checkout totals computed for the same
+    checkout at once, wait for the response of the first one instead of
+    hitting Avatax again.
+    """
+    key = get_request_data_hash(
+        {"url": url, "account": config.username_or_account, "data": data}
+    )
+    with _in_flight_lock:
+        in_flight = _in_flight_requests.get(key)
+        is_first = in_flight is None
+        if is_first:
+            in_flight = _in_flight_requests[key] = _InFlightRequest()
+
+    if not is_first:
+        in_flight.done.wait(TIMEOUT)
+        return in_flight.response
+
+    try:
+        in_flight.response = _post_request(url, data, config)
+    finally:
+        with _in_flight_lock:
+            del _in_flight_requests[key]
+        in_flight.done.set()
+    return in_flight.response
+
+
 def api_get_request(url: str, config: AvataxConfiguration):
     try:
         auth = HTTPBasicAuth(config.username_or_account, config.password_or_license)
-        response = requests.get(url, auth=auth, timeout=TIMEOUT)
+        response = get_session().get(url, auth=auth, timeout=TIMEOUT)
         logger.debug("[GET] Hit to %s", url)
     except requests.exceptions.RequestException:
         logger.warning("Failed to fetch data from %s", url)
@@ -148,8 +218,8 @@ def checkout_needs_new_fetch(data, checkout_token: str) -> bool:
     if not cached_checkout:
         return True
 
-    cached_request_data, cached_response = cached_checkout
-    if data != cached_request_data:
+    cached_request_data_hash, cached_response = cached_checkout
+    if get_request_data_hash(data) != cached_request_data_hash:
         return True
     return False
 
@@ -165,8 +235,8 @@ def taxes_need_new_fetch(data: Dict[str, Any], taxes_token: str) -> bool:
     if not cached_data:
         return True
 
-    cached_request_data, _ = cached_data
-    if data != cached_request_data:
+    cached_request_data_hash, _ = cached_data
+    if get_request_data_hash(data) != cached_request_data_hash:
         return True
     return False
 
@@ -211,27 +281,21 @@ def append_shipping_to_data(data: List[Dict], shipping_method):
 def get_checkout_lines_data(
     checkout: "Checkout", discounts=None
 ) -> List[Dict[str, str]]:
+    from ....checkout.fetch import get_checkout_lines_info
+
     data = []
-    lines = checkout.lines.prefetch_related(
-        "variant__product__category",
-        "variant__product__collections",
-        "variant__product__product_type",
-    )
-    for line in lines:
-        if not line.variant.product.charge_taxes:
+    for line_info in get_checkout_lines_info(checkout):
+        product = line_info.product
+        if not product.charge_taxes:
             continue
-        description = line.variant.product.plain_text_description
-        product = line.variant.product
-        product_type = line.variant.product.product_type
         tax_code = retrieve_tax_code_from_meta(product)
-        tax_code = tax_code or retrieve_tax_code_from_meta(product_type)
         append_line_to_data(
             data=data,
-            quantity=line.quantity,
-            amount=str(line.get_total(discounts).amount),
+            quantity=line_info.line.quantity,
+            amount=str(line_info.line.get_total(discounts).amount),
             tax_code=tax_code,
-            item_code=line.variant.sku,
-            description=description,
+            item_code=line_info.variant.sku,
+            description=product.plain_text_description,
         )
 
     append_shipping_to_data(data, checkout.shipping_method)
@@ -359,11 +423,12 @@ def _fetch_new_taxes_data(
         get_api_url(config.use_sandbox), "transactions/createoradjust"
     )
     response = api_post_request(transaction_url, data, config)
+    data_hash = get_request_data_hash(data)
     if response and "error" not in response:
-        cache.set(data_cache_key, (data, response), CACHE_TIME)
+        cache.set(data_cache_key, (data_hash, response), CACHE_TIME)
     else:
         # cache failed response to limit hits to avatax.
-        cache.set(data_cache_key, (data, response), 10)
+        cache.set(data_cache_key, (data_hash, response), 10)
     return response
 
 
@@ -0,0 +1,148 @@
+"""A local stand-in for the Avatax API used by tests and benchmarks.
+
+It implements just enough of the API for the plugin to work: tax calculation
+of transactions, with a single tax rate applied to all the lines, and the list
+of tax codes. The latency of the real API can be simulated, so the checkout
+performance with Avatax enabled can be measured without network access.
+
+    with FakeAvataxServer(latency=0.1) as server:
+        settings.AVATAX_API_URL = server.api_url
+"""
+import json
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, List
+
+TAX_CODES = {
+    "O9999999": "Temporary Unmapped Other SKU - taxable default",
+    "FR020100": "Shipping Only - common carrier - FOB destination",
+    "OD010000": "Discount",
+    "PC040156": "Clothing and related products",
+}
+
+
+def _quantize(amount: Decimal) -> Decimal:
+    return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def calculate_transaction(model: Dict[str, Any], tax_rate: Decimal) -> Dict[str, Any]:
+    """Return the response of the `transactions/createoradjust` endpoint."""
+    ship_to = model.get("addresses", {}).get("shipTo", {})
+    if not ship_to.get("country"):
+        return {
+            "error": {"code": "MissingAddress", "message": "An address is missing."}
+        }
+
+    lines: List[Dict[str, Any]] = []
+    for number, line in enumerate(model.get("lines", []), start=1):
+        amount = Decimal(line["amount"])
+        if line.get("taxIncluded"):
+            line_amount = _quantize(amount / (1 + tax_rate))
+            tax = amount - line_amount
+        else:
+            line_amount = amount
+            tax = _quantize(amount * tax_rate)
+        lines.append(
+            {
+                "lineNumber": str(number),
+                "itemCode": line.get("itemCode"),
+                "taxCode": line.get("taxCode"),
+                "quantity": line.get("quantity"),
+                "lineAmount": float(line_amount),
+                "tax": float(tax),
+                "taxIncluded": line.get("taxIncluded"),
+            }
+        )
+
+    return {
+        "code": model.get("code"),
+        "type": model.get("type"),
+        "status": "Committed" if model.get("commit") else "Temporary",
+        "currencyCode": model.get("currencyCode"),
+        "totalAmount": float(sum(Decimal(str(line["lineAmount"])) for line in lines)),
+        "totalTax": float(sum(Decimal(str(line["tax"])) for line in lines)),
+        "lines": lines,
+    }
+
+
+class _FakeAvataxRequestHandler(BaseHTTPRequestHandler):
+    server: "FakeAvataxServer"
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/definitions/taxcodes"):
+            self.server.record_request(self.command, self.path, None)
+            self._respond(
+                {
+                    "value": [
+                        {"taxCode": code, "description": description, "isActive": True}
+                        for code, description in TAX_CODES.items()
+                    ]
+                }
+            )
+        else:
+            self._respond({"error": {"code": "NotFound"}}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record_request(self.command, self.path, data)
+        if self.path.rstrip("/").endswith("/transactions/createoradjust"):
+            model = data.get("createTransactionModel", {})
+            self._respond(calculate_transaction(model, self.server.tax_rate))
+        else:
+            self._respond({"error": {"code": "NotFound"}}, status=404)
+
+    def _respond(self, data, status=200):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class FakeAvataxServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, tax_rate="0.23", latency=0.0, host="127.0.0.1", port=0):
+        super().__init__((host, port), _FakeAvataxRequestHandler)
+        self.tax_rate = Decimal(tax_rate)
+        self.latency = latency
+        self.requests: List[Dict[str, Any]] = []
+        self._requests_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://%s:%s/api/v2/" % (host, port)
+
+    def record_request(self, method, path, data):
+        with self._requests_lock:
+            self.requests.append({"method": method, "path": path, "data": data})
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -4,4 +4,9 @@ from . import api_post_request
 
 @app.task
 def api_post_request_task(transaction_url, data):
-    api_post_request(transaction_url, data)
+    # The credentials aren't sent through the broker, they're read again here
+    from .plugin import AvataxPlugin
+
+    plugin = AvataxPlugin()
+    plugin._initialize_plugin_configuration()
+    api_post_request(transaction_url, data, plugin.config)
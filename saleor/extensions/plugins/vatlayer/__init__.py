@@ -1,5 +1,10 @@
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.cache import cache
 from django.utils.translation import pgettext_lazy
-from django_prices_vatlayer.utils import get_tax_for_rate, get_tax_rates_for_country
+from django_prices_vatlayer.models import VAT
+from django_prices_vatlayer.utils import get_tax_for_rate
 from prices import Money, MoneyRange, TaxedMoney, TaxedMoneyRange
 
 from ....core.taxes import charge_taxes_on_shipping, include_taxes_in_prices
@@ -75,6 +80,13 @@ class TaxRateType:
 
 DEFAULT_TAX_RATE_NAME = TaxRateType.STANDARD
 
+TAX_RATES_TABLE_VERSION_KEY = "vatlayer:tax_rates_table:version"
+
+# Taxes of all the countries built from the VAT rates stored in the database,
+# shared by all the requests handled by the process, with the version they
+# were built for.
+_tax_rates_table: Tuple[Optional[str], Dict[str, Any]] = (None, {})
+
 
 def _convert_to_naive_taxed_money(base, taxes, rate_name):
     """Naively convert Money to TaxedMoney.
@@ -107,11 +119,7 @@ def apply_tax_to_price(taxes, rate_name, base):
     return tax_to_apply(base, keep_gross=keep_gross)
 
 
-def get_taxes_for_country(country):
-    tax_rates = get_tax_rates_for_country(country.code)
-    if tax_rates is None:
-        return None
-
+def get_taxes_from_rates(tax_rates: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     taxes = {
         DEFAULT_TAX_RATE_NAME: {
             "value": tax_rates["standard_rate"],
@@ -131,6 +139,45 @@ def get_taxes_for_country(country):
     return taxes
 
 
+def get_tax_rates_table_version() -> str:
+    version = cache.get(TAX_RATES_TABLE_VERSION_KEY)
+    if version is None:
+        # Another process may set the version in the meantime, the first one wins
+        cache.add(TAX_RATES_TABLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(TAX_RATES_TABLE_VERSION_KEY)
+    return version
+
+
+def invalidate_tax_rates_table():
+    """Make all the processes rebuild their tax rates tables on the next use."""
+    cache.set(TAX_RATES_TABLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_tax_rates_table() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Return taxes of all the countries, indexed by the country code.
+
+    The table is built once per process from a single query and rebuilt only
+    when the VAT rates change, which bumps its version in the shared cache.
+    """
+    global _tax_rates_table
+
+    version = get_tax_rates_table_version()
+    table_version, table = _tax_rates_table
+    if table_version != version:
+        # The rates are read from the instances, `values_list` doesn't decode
+        # the JSON field
+        table = {
+            vat.country_code: get_taxes_from_rates(vat.data)
+            for vat in VAT.objects.only("country_code", "data")
+        }
+        _tax_rates_table = (version, table)
+    return table
+
+
+def get_taxes_for_country(country) -> Optional[Dict[str, Dict[str, Any]]]:
+    return get_tax_rates_table().get(country.code)
+
+
 def get_tax_rate_by_name(rate_name, taxes=None):
     """Return value of tax rate for current taxes."""
     if not taxes or not rate_name:
@@ -93,23 +93,24 @@ class VatlayerPlugin(BasePlugin):
         if self._skip_plugin(previous_value):
             return previous_value
 
+        from ....checkout.fetch import get_checkout_lines_info
+
         address = checkout.shipping_address or checkout.billing_address
-        lines = checkout.lines.prefetch_related("variant__product__product_type")
         zero_total = Money(0, currency=previous_value.currency)
 
         lines_total = TaxedMoney(net=zero_total, gross=zero_total)
-        for line in lines:
-            price = line.variant.get_price(discounts)
-            lines_total += line.quantity * self.__apply_taxes_to_product(
-                line.variant.product, price, address.country if address else None
+        for line_info in get_checkout_lines_info(checkout):
+            price = line_info.variant.get_price(discounts)
+            lines_total += line_info.line.quantity * self.__apply_taxes_to_product(
+                line_info.product, price, address.country if address else None
             )
         return lines_total
 
     def _get_taxes_for_country(self, country: Country):
         """Try to fetch cached taxes on the plugin level.
 
-        If the plugin doesn't have cached taxes for a given country it will fetch it
-        from cache or db.
+        If the plugin doesn't have cached taxes for a given country it will take
+        them from the tax rates table shared by the whole process.
         """
         if not country:
             country = Country(settings.DEFAULT_COUNTRY)
@@ -257,18 +258,75 @@ class VatlayerPlugin(BasePlugin):
             return previous_value
         return self.__apply_taxes_to_product(product, price, country)
 
-    def __apply_taxes_to_product(
-        self, product: "Product", price: Money, country: Country
-    ):
-        taxes = None
-        if country and product.charge_taxes:
-            taxes = self._get_taxes_for_country(country)
+    def apply_taxes_to_products(
+        self,
+        product: "Product",
+        prices: List[Money],
+        country: Country,
+        previous_value: List[TaxedMoney],
+    ) -> List[TaxedMoney]:
+        self._initialize_plugin_configuration()
+
+        if all(self._skip_plugin(previous) for previous in previous_value):
+            return previous_value
+
+        # Taxes of the product are looked up once for all the prices
+        taxes, tax_rate = self.__get_product_taxes(product, country)
+        return [
+            previous
+            if self._skip_plugin(previous)
+            else apply_tax_to_price(taxes, tax_rate, price)
+            for price, previous in zip(prices, previous_value)
+        ]
+
+    def apply_taxes_to_products_prices(
+        self,
+        products: List["Product"],
+        prices: List[List[Money]],
+        country: Country,
+        previous_value: List[List[TaxedMoney]],
+    ) -> List[List[TaxedMoney]]:
+        self._initialize_plugin_configuration()
+
+        if not self.active or not settings.VATLAYER_ACCESS_KEY:
+            return previous_value
 
+        # Taxes of the country are looked up once for all the products
+        country_taxes = self._get_taxes_for_country(country) if country else None
+        taxed_prices = []
+        for product, product_prices, previous_prices in zip(
+            products, prices, previous_value
+        ):
+            taxes = country_taxes if product.charge_taxes else None
+            tax_rate = self.__get_product_tax_rate(product)
+            taxed_prices.append(
+                [
+                    previous
+                    if self._skip_plugin(previous)
+                    else apply_tax_to_price(taxes, tax_rate, price)
+                    for price, previous in zip(product_prices, previous_prices)
+                ]
+            )
+        return taxed_prices
+
+    def __get_product_tax_rate(self, product: "Product"):
         product_tax_rate = self.__get_tax_code_from_object_meta(product).code
-        tax_rate = (
+        return (
             product_tax_rate
             or self.__get_tax_code_from_object_meta(product.product_type).code
         )
+
+    def __get_product_taxes(self, product: "Product", country: Country):
+        taxes = None
+        if country and product.charge_taxes:
+            taxes = self._get_taxes_for_country(country)
+
+        return taxes, self.__get_product_tax_rate(product)
+
+    def __apply_taxes_to_product(
+        self, product: "Product", price: Money, country: Country
+    ):
+        taxes, tax_rate = self.__get_product_taxes(product, country)
         return apply_tax_to_price(taxes, tax_rate, price)
 
     def assign_tax_code_to_object_meta(
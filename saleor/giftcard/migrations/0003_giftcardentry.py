@@ -0,0 +1,79 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0078_variantdailysales"),
+        ("giftcard", "0002_auto_20190814_0413"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GiftCardEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.PositiveIntegerField()),
+                (
+                    "created",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                (
+                    "currency",
+                    models.CharField(
+                        default=settings.DEFAULT_CURRENCY,
+                        max_length=settings.DEFAULT_CURRENCY_CODE_LENGTH,
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+                        max_digits=settings.DEFAULT_MAX_DIGITS,
+                    ),
+                ),
+                (
+                    "balance",
+                    models.DecimalField(
+                        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+                        max_digits=settings.DEFAULT_MAX_DIGITS,
+                    ),
+                ),
+                (
+                    "gift_card",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="giftcard.GiftCard",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="gift_card_entries",
+                        to="order.Order",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("gift_card", "sequence"),
+                "unique_together": {("gift_card", "sequence")},
+            },
+        )
+    ]
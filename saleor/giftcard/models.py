@@ -2,7 +2,9 @@ from datetime import date
 
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
 from django.utils.translation import pgettext_lazy
 from django_prices.models import MoneyField
 
@@ -15,6 +17,18 @@ class GiftCardQueryset(models.QuerySet):
             is_active=True,
         )
 
+    def with_balance(self):
+        """Annotate the balance of the last entry of the ledger of the cards."""
+        last_entries = GiftCardEntry.objects.filter(
+            gift_card_id=OuterRef("pk")
+        ).order_by("-sequence")
+        return self.annotate(
+            ledger_balance=Coalesce(
+                Subquery(last_entries.values("balance")[:1]),
+                F("current_balance_amount"),
+            )
+        )
+
 
 class GiftCard(models.Model):
     code = models.CharField(max_length=16, unique=True, db_index=True)
@@ -65,3 +79,51 @@ class GiftCard(models.Model):
     @property
     def display_code(self):
         return "****%s" % self.code[-4:]
+
+
+class GiftCardEntry(models.Model):
+    """An entry of the ledger of a gift card, debiting or crediting its balance.
+
+    The entries are only ever added, each one stores the balance of the card
+    after it, so the balance is read from the last entry. The entries of a card
+    are numbered, two checkouts charging the card at the same time can't add
+    an entry with the same number: the second insert waits until the first
+    entry is committed, then reads the balance again and retries. The entries
+    are therefore added in short transactions of their own.
+
+    `GiftCard.current_balance` caches the balance of the last entry for
+    display, it is updated after the entries are committed. The amounts to pay
+    are computed from the ledger.
+    """
+
+    gift_card = models.ForeignKey(
+        GiftCard, related_name="entries", on_delete=models.CASCADE
+    )
+    sequence = models.PositiveIntegerField()
+    order = models.ForeignKey(
+        "order.Order",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="gift_card_entries",
+    )
+    created = models.DateTimeField(default=now, editable=False)
+
+    currency = models.CharField(
+        max_length=settings.DEFAULT_CURRENCY_CODE_LENGTH,
+        default=settings.DEFAULT_CURRENCY,
+    )
+
+    # Negative for the debits, positive for the credits
+    amount = models.DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+    )
+    balance = models.DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+    )
+
+    class Meta:
+        ordering = ("gift_card", "sequence")
+        unique_together = (("gift_card", "sequence"),)
@@ -0,0 +1,7 @@
+from ..celeryconf import app
+from .utils import update_gift_card_balance
+
+
+@app.task
+def update_gift_card_balance_task(gift_card_pk):
+    update_gift_card_balance(gift_card_pk)
@@ -1,8 +1,15 @@
 from datetime import date
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from prices import Money
 
 from ..checkout.models import Checkout
 from ..core.utils.promo_code import InvalidPromoCode
-from .models import GiftCard
+from .models import GiftCard, GiftCardEntry
 
 
 def add_gift_card_code_to_checkout(checkout: Checkout, promo_code: str):
@@ -36,3 +43,130 @@ def activate_gift_card(gift_card: GiftCard):
     if not gift_card.is_active:
         gift_card.is_active = True
         gift_card.save(update_fields=["is_active"])
+
+
+def _get_last_balance(gift_card: GiftCard) -> Tuple[int, Decimal]:
+    """Return the number of the last entry of the gift card and its balance."""
+    last_entry = (
+        gift_card.entries.order_by("-sequence").values_list("sequence", "balance")
+    ).first()
+    if last_entry is not None:
+        return last_entry
+    # The balance the card was given before it had any entry
+    balance = (
+        GiftCard.objects.filter(pk=gift_card.pk)
+        .values_list("current_balance_amount", flat=True)
+        .get()
+    )
+    return 0, balance
+
+
+def _add_gift_card_entry(
+    gift_card: GiftCard, get_amount: Callable[[Decimal], Decimal], order=None
+) -> Optional[GiftCardEntry]:
+    """Add an entry of the amount computed from the balance, return the entry.
+
+    The card row is not locked, but an insert of the same entry number waits on
+    the unique index until the transaction adding the first entry ends. If
+    another entry was added in the meantime, the amount is computed again from
+    the new balance.
+    """
+    from .tasks import update_gift_card_balance_task
+
+    while True:
+        sequence, balance = _get_last_balance(gift_card)
+        amount = get_amount(balance)
+        if not amount:
+            return None
+        try:
+            with transaction.atomic():
+                entry = GiftCardEntry.objects.create(
+                    gift_card=gift_card,
+                    sequence=sequence + 1,
+                    order=order,
+                    currency=gift_card.currency,
+                    amount=amount,
+                    balance=balance + amount,
+                )
+        except IntegrityError:
+            continue
+        transaction.on_commit(lambda: update_gift_card_balance_task.delay(gift_card.pk))
+        return entry
+
+
+def charge_gift_card(gift_card: GiftCard, amount: Money, order=None) -> Money:
+    """Debit the gift card by the amount or by all its balance if it's lower.
+
+    Return the debited amount.
+    """
+    entry = _add_gift_card_entry(
+        gift_card, lambda balance: -min(balance, amount.amount), order=order
+    )
+    return Money(-entry.amount if entry else 0, amount.currency)
+
+
+def reserve_gift_cards(
+    gift_cards: Iterable[GiftCard], amount: Money
+) -> List[GiftCardEntry]:
+    """Debit the gift cards one after another until the amount is covered.
+
+    The debits reserve the balance for an order that is not created yet. Each
+    one is committed right away when called outside of a transaction, so the
+    checkouts sharing a card don't wait for each other's payment and order.
+    The debits are attached to the order by `attach_gift_card_entries`, or
+    credited back by `release_gift_card_entries` if the order isn't created.
+    """
+    entries = []
+    for gift_card in gift_cards:
+        if amount.amount <= 0:
+            break
+        entry = _add_gift_card_entry(
+            gift_card, lambda balance: -min(balance, amount.amount)
+        )
+        if entry is not None:
+            entries.append(entry)
+            amount += Money(entry.amount, amount.currency)
+    return entries
+
+
+def attach_gift_card_entries(entries: List[GiftCardEntry], order):
+    """Assign the reserved debits and their gift cards to the created order."""
+    if not entries:
+        return
+    GiftCardEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+        order=order
+    )
+    order.gift_cards.add(*{entry.gift_card for entry in entries})
+
+
+def release_gift_card_entries(entries: List[GiftCardEntry]):
+    """Credit back the debits reserved for an order that wasn't created."""
+    for entry in entries:
+        _add_gift_card_entry(entry.gift_card, lambda balance: -entry.amount)
+
+
+def set_gift_card_balance(gift_card: GiftCard, balance: Decimal):
+    """Credit or debit the gift card so its balance becomes the given one."""
+    _add_gift_card_entry(gift_card, lambda current_balance: balance - current_balance)
+
+
+def get_gift_card_balance(gift_card: GiftCard) -> Money:
+    """Return the balance of the gift card, including the uncommitted entries."""
+    _sequence, balance = _get_last_balance(gift_card)
+    return Money(balance, gift_card.currency)
+
+
+def update_gift_card_balance(gift_card_pk: int):
+    """Store the balance of the last entry of the gift card in the card."""
+    entries = GiftCardEntry.objects.filter(gift_card_id=OuterRef("pk")).order_by(
+        "-sequence"
+    )
+    debits = entries.filter(amount__lt=0)
+    GiftCard.objects.filter(pk=gift_card_pk).update(
+        current_balance_amount=Coalesce(
+            Subquery(entries.values("balance")[:1]), F("current_balance_amount")
+        ),
+        last_used_on=Coalesce(
+            Subquery(debits.values("created")[:1]), F("last_used_on")
+        ),
+    )
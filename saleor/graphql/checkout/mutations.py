@@ -7,31 +7,29 @@ from django.db import transaction
 from django.utils import timezone
 
 from ...checkout import models
+from ...checkout.complete import (
+    complete_checkout,
+    start_checkout_completion,
+    validate_checkout_not_being_completed,
+)
 from ...checkout.error_codes import CheckoutErrorCode
+from ...checkout.fetch import invalidate_checkout_lines
 from ...checkout.utils import (
-    abort_order_data,
     add_promo_code_to_checkout,
     add_variant_to_checkout,
     add_voucher_to_checkout,
     change_billing_address_in_checkout,
     change_shipping_address_in_checkout,
-    clean_checkout,
-    create_order,
     get_user_checkout,
     get_valid_shipping_methods_for_checkout,
     get_voucher_for_checkout,
-    prepare_order_data,
     recalculate_checkout_discount,
     remove_promo_code_from_checkout,
     remove_voucher_from_checkout,
 )
 from ...core import analytics
 from ...core.exceptions import InsufficientStock
-from ...core.taxes import TaxError
 from ...discount import models as voucher_model
-from ...payment import PaymentError, gateway
-from ...payment.interface import AddressData
-from ...payment.utils import store_customer_id
 from ...product import models as product_models
 from ..account.i18n import I18nMixin
 from ..account.types import AddressInput, User
@@ -46,7 +44,7 @@ from ..core.utils import from_global_id_strict_type
 from ..order.types import Order
 from ..product.types import ProductVariant
 from ..shipping.types import ShippingMethod
-from .types import Checkout, CheckoutLine
+from .types import Checkout, CheckoutCompletion, CheckoutLine
 
 ERROR_DOES_NOT_SHIP = "This checkout doesn't need shipping"
 
@@ -87,9 +85,8 @@ def update_checkout_shipping_method_if_invalid(checkout: models.Checkout, discou
     )
 
     if not is_valid:
-        cheapest_alternative = get_valid_shipping_methods_for_checkout(
-            checkout, discounts
-        ).first()
+        valid_methods = get_valid_shipping_methods_for_checkout(checkout, discounts)
+        cheapest_alternative = valid_methods[0] if valid_methods else None
         checkout.shipping_method = cheapest_alternative
         checkout.save(update_fields=["shipping_method"])
 
@@ -326,6 +323,7 @@ class CheckoutLinesAdd(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
 
         variant_ids = [line.get("variant_id") for line in lines]
         variants = cls.get_nodes_or_error(variant_ids, "variant_id", ProductVariant)
@@ -380,12 +378,14 @@ class CheckoutLineDelete(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
         line = cls.get_node_or_error(
             info, line_id, only_type=CheckoutLine, field="line_id"
         )
 
         if line and line in checkout.lines.all():
             line.delete()
+            invalidate_checkout_lines(checkout)
 
         update_checkout_shipping_method_if_invalid(checkout, info.context.discounts)
         recalculate_checkout_discount(checkout, info.context.discounts)
@@ -410,6 +410,7 @@ class CheckoutCustomerAttach(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
         customer = cls.get_node_or_error(
             info, customer_id, only_type=User, field="customer_id"
         )
@@ -434,6 +435,7 @@ class CheckoutCustomerDetach(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
         checkout.user = None
         checkout.save(update_fields=["user"])
         return CheckoutCustomerDetach(checkout=checkout)
@@ -471,6 +473,7 @@ class CheckoutShippingAddressUpdate(BaseMutation, I18nMixin):
                     )
                 }
             )
+        validate_checkout_not_being_completed(checkout)
 
         if not checkout.is_shipping_required():
             raise ValidationError(
@@ -515,6 +518,7 @@ class CheckoutBillingAddressUpdate(CheckoutShippingAddressUpdate):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
 
         billing_address = cls.validate_address(
             billing_address, instance=checkout.billing_address
@@ -542,6 +546,7 @@ class CheckoutEmailUpdate(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
 
         checkout.email = email
         cls.clean_instance(checkout)
@@ -581,6 +586,7 @@ class CheckoutShippingMethodUpdate(BaseMutation):
                     )
                 }
             )
+        validate_checkout_not_being_completed(checkout)
 
         if not checkout.is_shipping_required():
             raise ValidationError(
@@ -646,65 +652,70 @@ class CheckoutComplete(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
+        order = complete_checkout(
+            checkout,
+            info.context.discounts,
+            info.context.user,
+            store_source=store_source,
+            tracking_code=analytics.get_client_id(info.context),
+        )
+        # return the success response with the newly created order data
+        return CheckoutComplete(order=order)
 
-        user = info.context.user
-        clean_checkout(checkout, info.context.discounts)
-
-        payment = checkout.get_last_active_payment()
-
-        with transaction.atomic():
-            try:
-                order_data = prepare_order_data(
-                    checkout=checkout,
-                    tracking_code=analytics.get_client_id(info.context),
-                    discounts=info.context.discounts,
-                )
-            except InsufficientStock as e:
-                raise ValidationError(
-                    f"Insufficient product stock: {e.item}", code=e.code
-                )
-            except voucher_model.NotApplicable:
-                raise ValidationError(
-                    "Voucher not applicable",
-                    code=CheckoutErrorCode.VOUCHER_NOT_APPLICABLE,
-                )
-            except TaxError as tax_error:
-                return ValidationError(
-                    "Unable to calculate taxes - %s" % str(tax_error),
-                    code=CheckoutErrorCode.TAX_ERROR,
-                )
 
-        billing_address = order_data["billing_address"]
-        shipping_address = order_data.get("shipping_address", None)
+class CheckoutCompleteAsync(BaseMutation):
+    completion = graphene.Field(
+        CheckoutCompletion, description="The completion processing the checkout."
+    )
 
-        billing_address = AddressData(**billing_address.as_data())
+    class Arguments:
+        checkout_id = graphene.ID(description="Checkout ID.", required=True)
+        idempotency_key = graphene.String(
+            required=True,
+            description=(
+                "Key chosen by the client, the requests retried with the same key "
+                "return the same completion."
+            ),
+        )
+        store_source = graphene.Boolean(
+            default_value=False,
+            description=(
+                "Determines whether to store the payment source for future usage."
+            ),
+        )
 
-        if shipping_address is not None:
-            shipping_address = AddressData(**shipping_address.as_data())
+    class Meta:
+        description = (
+            "Validates the checkout and completes it in the background. The "
+            "payment is charged and the order is created once the returned "
+            "completion succeeds, query it with `checkoutCompletion` for the result."
+        )
+        error_type_class = CheckoutError
+        error_type_field = "checkout_errors"
 
-        try:
-            txn = gateway.process_payment(
-                payment=payment, token=payment.token, store_source=store_source
+    @classmethod
+    def perform_mutation(cls, _root, info, checkout_id, idempotency_key, store_source):
+        checkout_token = from_global_id_strict_type(
+            checkout_id, Checkout, field="checkout_id"
+        )
+        # The checkout of a completed retry doesn't exist anymore
+        completion = models.CheckoutCompletion.objects.filter(
+            checkout_token=checkout_token, idempotency_key=idempotency_key
+        ).first()
+        if completion is None:
+            checkout = cls.get_node_or_error(
+                info, checkout_id, only_type=Checkout, field="checkout_id"
             )
-
-            if not txn.is_success:
-                raise PaymentError(txn.error)
-
-        except PaymentError as e:
-            abort_order_data(order_data)
-            raise ValidationError(str(e), code=CheckoutErrorCode.PAYMENT_ERROR)
-
-        if txn.customer_id and user.is_authenticated:
-            store_customer_id(user, payment.gateway, txn.customer_id)
-
-        # create the order into the database
-        order = create_order(checkout=checkout, order_data=order_data, user=user)
-
-        # remove checkout after order is successfully paid
-        checkout.delete()
-
-        # return the success response with the newly created order data
-        return CheckoutComplete(order=order)
+            completion = start_checkout_completion(
+                checkout,
+                idempotency_key,
+                info.context.discounts,
+                info.context.user,
+                store_source=store_source,
+                tracking_code=analytics.get_client_id(info.context),
+            )
+        return CheckoutCompleteAsync(completion=completion)
 
 
 class CheckoutUpdateVoucher(BaseMutation):
@@ -728,6 +739,7 @@ class CheckoutUpdateVoucher(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
 
         if voucher_code:
             try:
@@ -784,6 +796,7 @@ class CheckoutAddPromoCode(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
         add_promo_code_to_checkout(checkout, promo_code, info.context.discounts)
         return CheckoutAddPromoCode(checkout=checkout)
 
@@ -809,6 +822,7 @@ class CheckoutRemovePromoCode(BaseMutation):
         checkout = cls.get_node_or_error(
             info, checkout_id, only_type=Checkout, field="checkout_id"
         )
+        validate_checkout_not_being_completed(checkout)
         remove_promo_code_from_checkout(checkout, promo_code)
         return CheckoutUpdateVoucher(checkout=checkout)
 
@@ -1,4 +1,5 @@
 from ...checkout import models
+from ...checkout.complete import fail_stale_checkout_completions
 
 
 def resolve_checkout_lines():
@@ -13,3 +14,9 @@ def resolve_checkouts():
 
 def resolve_checkout(token):
     return models.Checkout.objects.filter(token=token).first()
+
+
+def resolve_checkout_completion(token):
+    # The clients polling a lost completion see it failed once it timed out
+    fail_stale_checkout_completions(token=token)
+    return models.CheckoutCompletion.objects.filter(token=token).first()
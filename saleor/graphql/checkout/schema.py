@@ -9,6 +9,7 @@ from .mutations import (
     CheckoutClearMeta,
     CheckoutClearPrivateMeta,
     CheckoutComplete,
+    CheckoutCompleteAsync,
     CheckoutCreate,
     CheckoutCustomerAttach,
     CheckoutCustomerDetach,
@@ -23,8 +24,13 @@ from .mutations import (
     CheckoutUpdatePrivateMeta,
     CheckoutUpdateVoucher,
 )
-from .resolvers import resolve_checkout, resolve_checkout_lines, resolve_checkouts
-from .types import Checkout, CheckoutLine
+from .resolvers import (
+    resolve_checkout,
+    resolve_checkout_completion,
+    resolve_checkout_lines,
+    resolve_checkouts,
+)
+from .types import Checkout, CheckoutCompletion, CheckoutLine
 
 
 class CheckoutQueries(graphene.ObjectType):
@@ -33,6 +39,13 @@ class CheckoutQueries(graphene.ObjectType):
         description="Look up a checkout by token.",
         token=graphene.Argument(graphene.UUID, description="The checkout's token."),
     )
+    checkout_completion = graphene.Field(
+        CheckoutCompletion,
+        description="Look up a checkout completion by token.",
+        token=graphene.Argument(
+            graphene.UUID, description="The completion's token.", required=True
+        ),
+    )
     # FIXME we could optimize the below field
     checkouts = BaseDjangoConnectionField(Checkout, description="List of checkouts.")
     checkout_line = graphene.Field(
@@ -47,6 +60,9 @@ class CheckoutQueries(graphene.ObjectType):
     def resolve_checkout(self, *_args, token):
         return resolve_checkout(token)
 
+    def resolve_checkout_completion(self, *_args, token):
+        return resolve_checkout_completion(token)
+
     @permission_required("order.manage_orders")
     def resolve_checkouts(self, *_args, **_kwargs):
         resolve_checkouts()
@@ -63,6 +79,7 @@ class CheckoutMutations(graphene.ObjectType):
     checkout_add_promo_code = CheckoutAddPromoCode.Field()
     checkout_billing_address_update = CheckoutBillingAddressUpdate.Field()
     checkout_complete = CheckoutComplete.Field()
+    checkout_complete_async = CheckoutCompleteAsync.Field()
     checkout_create = CheckoutCreate.Field()
     checkout_customer_attach = CheckoutCustomerAttach.Field()
     checkout_customer_detach = CheckoutCustomerDetach.Field()
@@ -202,3 +202,26 @@ class Checkout(MetadataObjectType, CountableDjangoObjectType):
     @staticmethod
     def resolve_discount_amount(root: models.Checkout, _info):
         return root.discount
+
+
+class CheckoutCompletion(CountableDjangoObjectType):
+    order = graphene.Field(
+        "saleor.graphql.order.types.Order",
+        description="The order placed by the completion.",
+    )
+
+    class Meta:
+        only_fields = [
+            "token",
+            "status",
+            "order",
+            "error_code",
+            "error_message",
+            "created",
+            "updated",
+        ]
+        description = (
+            "A completion of a checkout processed in the background. Poll it "
+            "until its status is success or failed."
+        )
+        model = models.CheckoutCompletion
@@ -50,9 +50,11 @@ class CountableDjangoObjectType(OptimizedDjangoObjectType):
         abstract = True
 
     @classmethod
-    def __init_subclass_with_meta__(cls, *args, **kwargs):
+    def __init_subclass_with_meta__(
+        cls, *args, connection_class=CountableConnection, **kwargs
+    ):
         # Force it to use the countable connection
-        countable_conn = CountableConnection.create_type(
+        countable_conn = connection_class.create_type(
             "{}CountableConnection".format(cls.__name__), node=cls
         )
         super().__init_subclass_with_meta__(*args, connection=countable_conn, **kwargs)
@@ -0,0 +1,44 @@
+from typing import Generic, Iterable, List, TypeVar
+
+from promise import Promise
+from promise.dataloader import DataLoader as BaseLoader
+
+K = TypeVar("K")
+R = TypeVar("R")
+
+
+class DataLoader(BaseLoader, Generic[K, R]):
+    """Batch the loads of a single request.
+
+    A loader is instantiated once per request and stored on its context, so all
+    the fields resolved within the request share its batches and its cache.
+    """
+
+    context_key = None
+    context = None
+
+    def __new__(cls, context):
+        key = cls.context_key
+        if key is None:
+            raise TypeError("Data loader %r does not define a context key" % (cls,))
+        if not hasattr(context, "dataloaders"):
+            context.dataloaders = {}
+        if key not in context.dataloaders:
+            context.dataloaders[key] = super().__new__(cls)
+        loader = context.dataloaders[key]
+        loader.__init__(context)
+        return loader
+
+    def __init__(self, context):
+        if self.context != context:
+            self.context = context
+            super().__init__()
+
+    def batch_load_fn(self, keys: Iterable[K]) -> Promise:
+        results = self.batch_load(keys)
+        if not isinstance(results, Promise):
+            return Promise.resolve(results)
+        return results
+
+    def batch_load(self, keys: Iterable[K]) -> List[R]:
+        raise NotImplementedError()
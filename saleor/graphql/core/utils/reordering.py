@@ -1,155 +1,172 @@
-from collections import OrderedDict
-from dataclasses import dataclass
-from typing import Dict, Tuple
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
 
-from django.db import transaction
+from django.db import connections, transaction
 from django.db.models import F, QuerySet
-from django.utils.functional import cached_property
 
 __all__ = ["perform_reordering"]
 
+# Distance between the sort orders of the renumbered nodes, leaving room
+# to move the nodes between their neighbours without renumbering the others
+SORT_ORDER_GAP = 1000
 
-@dataclass(frozen=True)
-class FinalSortOrder:
-    """Describe a final sort order value for a given PK.
+UPDATE_SORT_ORDERS = (
+    "UPDATE {table} SET {sort_order} = v.sort_order "
+    "FROM (VALUES {values}) AS v (id, sort_order) "
+    "WHERE {table}.{pk} = v.id"
+)
 
-    This is needed to tell django which objects and values to associate and update.
+
+def apply_moves(
+    ordered_pks: List[int], operations: Dict[int, Optional[int]]
+) -> Tuple[List[int], Set[int]]:
+    """Apply the relative moves to the ordered nodes.
+
+    The moves are applied one after another and are clamped to the bounds of
+    the list. Return the final order of the nodes and the nodes that moved.
+
+    Every node gets a position key kept in a sorted list, so finding a node and
+    moving it takes a binary search instead of a scan of the whole list.
     """
+    keys = [float(position) for position in range(len(ordered_pks))]
+    node_keys = dict(zip(ordered_pks, keys))
+    key_nodes = dict(zip(keys, ordered_pks))
+    moved = set()
+
+    for pk, move in operations.items():
+        # Skip operation if it was deleted in concurrence
+        if pk not in node_keys:
+            continue
+
+        # Skip if noting to do
+        if move == 0:
+            continue
+        if move is None:
+            move = +1
 
-    pk: int
-    sort_order: int
+        node_pos = bisect_left(keys, node_keys[pk])
+        target_pos = max(0, min(len(keys) - 1, node_pos + move))
+        if target_pos == node_pos:
+            continue
+
+        del keys[node_pos]
+        del key_nodes[node_keys[pk]]
+        new_key = _get_key_between(keys, target_pos)
+        if new_key is None:
+            # The floats between the neighbours ran out, renumber the keys
+            key_nodes = {float(i): key_nodes[key] for i, key in enumerate(keys)}
+            keys = list(key_nodes)
+            node_keys = {node: key for key, node in key_nodes.items()}
+            new_key = _get_key_between(keys, target_pos)
+
+        insort(keys, new_key)
+        node_keys[pk] = new_key
+        key_nodes[new_key] = pk
+        moved.add(pk)
+
+    return [key_nodes[key] for key in keys], moved
+
+
+def _get_key_between(keys: List[float], position: int) -> Optional[float]:
+    """Return a key placing a node at the given position, None if there is none."""
+    if not keys:
+        return 0.0
+    if position == 0:
+        return keys[0] - 1
+    if position == len(keys):
+        return keys[-1] + 1
+    lower, upper = keys[position - 1], keys[position]
+    key = (lower + upper) / 2
+    return key if lower < key < upper else None
+
+
+def get_sort_orders(
+    ordered_pks: List[int], sort_orders: Dict[int, Optional[int]], moved: Set[int]
+) -> Dict[int, int]:
+    """Return the sort orders of the nodes in their final order.
+
+    The nodes that didn't move keep their sort order and the ones that moved,
+    or had none, are spread between their neighbours. Only when there is no
+    room left between the neighbours, all the nodes are renumbered with gaps.
+    """
+    new_sort_orders = {}
+    pending: List[int] = []
+    # Sort orders are not negative, the first nodes go down to zero
+    lower = -1
+    for pk in ordered_pks:
+        sort_order = sort_orders[pk]
+        if pk in moved or sort_order is None:
+            pending.append(pk)
+            continue
+        if pending:
+            step = (sort_order - lower) // (len(pending) + 1)
+            if step < 1:
+                return _get_gapped_sort_orders(ordered_pks)
+            for position, pending_pk in enumerate(pending, 1):
+                new_sort_orders[pending_pk] = lower + step * position
+        new_sort_orders[pk] = sort_order
+        pending = []
+        lower = sort_order
+
+    # Nothing limits the last nodes
+    start = lower if new_sort_orders else -SORT_ORDER_GAP
+    for position, pending_pk in enumerate(pending, 1):
+        new_sort_orders[pending_pk] = start + SORT_ORDER_GAP * position
+    return new_sort_orders
+
+
+def _get_gapped_sort_orders(ordered_pks: List[int]) -> Dict[int, int]:
+    # The first node is not at zero to leave room to move the nodes before it
+    return {pk: SORT_ORDER_GAP * position for position, pk in enumerate(ordered_pks, 1)}
 
 
 class Reordering:
     def __init__(self, qs: QuerySet, operations: Dict[int, int], field: str):
-        self.qs = qs
+        self.qs = qs.all()
         self.operations = operations
         self.field = field
 
-        # Will contain the original data, before sorting
-        # This will be useful to look for the sort orders that
-        # actually were changed
-        self.old_sort_map = {}
-
-        # Will contain the list of keys kept
-        # in correct order in accordance to their sort order
-        self.ordered_pks = []
-
-    @cached_property
-    def ordered_node_map(self):
-        ordering_map = OrderedDict(
+    def get_sort_orders(self) -> Dict[int, Optional[int]]:
+        return dict(
             self.qs.select_for_update()
             .values_list("pk", "sort_order")
             .order_by(F("sort_order").asc(nulls_last=True), "id")
         )
-        self.old_sort_map = ordering_map.copy()
-        self.ordered_pks = list(ordering_map.keys())
-
-        previous_sort_order = 0
-
-        # Add sort order to null values
-        for pk, sort_order in ordering_map.items():
-            if sort_order is not None:
-                previous_sort_order = sort_order
-                continue
-
-            previous_sort_order += 1
-            ordering_map[pk] = previous_sort_order
-
-        return ordering_map
-
-    def calculate_new_sort_order(self, pk, move) -> Tuple[int, int, int]:
-        """Return the proper sort order for the current operation.
-
-        Allows to properly move the node in a given direction with by amount.
-
-        This ensures the new sort order is not biased from gaps between the sort orders.
-        """
-
-        # Retrieve the position of the node to move
-        node_pos = self.ordered_pks.index(pk)
-
-        # Set the target position from the current position
-        # of the node + the relative position to move from
-        target_pos = node_pos + move
-
-        # Make sure we are not getting out of bounds
-        target_pos = max(0, target_pos)
-        target_pos = min(len(self.ordered_pks) - 1, target_pos)
-
-        # Retrieve the target node and its sort order
-        target_pk = self.ordered_pks[target_pos]
-        target_position = self.ordered_node_map[target_pk]
 
-        # Return the new position
-        return node_pos, target_pos, target_position
-
-    def process_move_operation(self, pk, move):
-        old_sort_order = self.ordered_node_map[pk]
+    def commit(self, batch: List[Tuple[int, int]]):
+        """Update the sort orders of all the given nodes in a single query."""
+        opts = self.qs.model._meta
+        connection = connections[self.qs.db]
+        quote_name = connection.ops.quote_name
+        query = UPDATE_SORT_ORDERS.format(
+            table=quote_name(opts.db_table),
+            sort_order=quote_name(opts.get_field("sort_order").column),
+            pk=quote_name(opts.pk.column),
+            values=", ".join(["(%s, %s)"] * len(batch)),
+        )
+        params = [value for pk_and_sort_order in batch for value in pk_and_sort_order]
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
 
-        # Skip if noting to do
-        if move == 0:
+    def run(self):
+        if not self.operations:
             return
-        if move is None:
-            move = +1
-
-        node_pos, target_pos, new_sort_order = self.calculate_new_sort_order(pk, move)
-
-        # Determine how we should shift for this operation
-        if move > 0:
-            shift = -1
-            range_ = old_sort_order + 1, new_sort_order
-        else:
-            shift = +1
-            range_ = new_sort_order, old_sort_order - 1
-
-        # Shift the sort orders within the moving range
-        self.add_to_sort_value_if_in_range(shift, *range_)
-
-        # Update the sort order of the node to move
-        self.ordered_node_map[pk] = new_sort_order
-
-        # Reorder the pk list
-        self.ordered_pks.remove(pk)
-        self.ordered_pks.insert(target_pos, pk)
 
-    def add_to_sort_value_if_in_range(self, value_to_add, start, end):
-        for pk, sort_order in self.ordered_node_map.items():
-            if not start <= sort_order <= end:
-                continue
+        sort_orders = self.get_sort_orders()
+        ordered_pks, moved = apply_moves(list(sort_orders), self.operations)
 
-            self.ordered_node_map[pk] += value_to_add
-
-    def commit(self):
-        # Do nothing if nothing was done
-        if not self.old_sort_map:
+        # Do not update if nothing changed
+        if not moved and None not in sort_orders.values():
             return
 
-        # Create the bulk update to run
-        # But only if data was changed
+        new_sort_orders = get_sort_orders(ordered_pks, sort_orders, moved)
         batch = [
-            FinalSortOrder(pk, sort_order)
-            for pk, sort_order in self.ordered_node_map.items()
-            if sort_order != self.old_sort_map[pk]
+            (pk, sort_order)
+            for pk, sort_order in new_sort_orders.items()
+            if sort_order != sort_orders[pk]
         ]
-
-        # Do not update if nothing changed
-        if not batch:
-            return
-
-        # Update everything that was changed
-        self.qs.model.objects.bulk_update(batch, ["sort_order"])
-
-    def run(self):
-
-        for pk, move in self.operations.items():
-            # Skip operation if it was deleted in concurrence
-            if pk not in self.ordered_node_map:
-                continue
-
-            self.process_move_operation(pk, move)
-
-        self.commit()
+        if batch:
+            self.commit(batch)
 
 
 def perform_reordering(qs: QuerySet, operations: Dict[int, int], field: str = "moves"):
@@ -159,7 +176,8 @@ def perform_reordering(qs: QuerySet, operations: Dict[int, int], field: str = "m
     and a relative sort order. It then converts the relative sorting
     to an absolute sorting.
 
-    This will then commit the changes onto the nodes.
+    This will then commit the changes onto the nodes, updating only the nodes
+    whose sort order changed in a single query.
 
     :param qs: The query set on which we want to retrieve and reorder the node.
     :param operations: The operations to make: {pk_to_move: +/- 123}.
@@ -9,7 +9,11 @@ from ...core.utils.promo_code import (
 )
 from ...giftcard import models
 from ...giftcard.error_codes import GiftCardErrorCode
-from ...giftcard.utils import activate_gift_card, deactivate_gift_card
+from ...giftcard.utils import (
+    activate_gift_card,
+    deactivate_gift_card,
+    set_gift_card_balance,
+)
 from ..core.mutations import BaseMutation, ModelMutation
 from ..core.scalars import Decimal
 from ..core.types.common import GiftCardError
@@ -55,7 +59,7 @@ class GiftCardCreate(ModelMutation):
             raise PromoCodeAlreadyExists(code=GiftCardErrorCode.ALREADY_EXISTS)
         cleaned_input = super().clean_input(info, instance, data)
         balance = cleaned_input.get("balance", None)
-        if balance:
+        if balance is not None:
             cleaned_input["current_balance_amount"] = balance
             cleaned_input["initial_balance_amount"] = balance
         user_email = data.get("user_email", None)
@@ -73,6 +77,14 @@ class GiftCardCreate(ModelMutation):
                 )
         return cleaned_input
 
+    @classmethod
+    def save(cls, info, instance, cleaned_input):
+        instance.save()
+        balance = cleaned_input.get("balance", None)
+        if balance is not None:
+            # The balance of a card that was used is kept in its entries
+            set_gift_card_balance(instance, balance)
+
 
 class GiftCardUpdate(GiftCardCreate):
     class Arguments:
@@ -34,9 +34,10 @@ class OrderBulkCancel(BaseBulkMutation):
 
     @classmethod
     def bulk_action(cls, queryset, user, restock):
-        for order in queryset:
-            cancel_order(order=order, user=user, restock=restock)
-            if restock:
-                events.fulfillment_restocked_items_event(
-                    order=order, user=user, fulfillment=order
-                )
+        with events.collect_order_events():
+            for order in queryset:
+                cancel_order(order=order, user=user, restock=restock)
+                if restock:
+                    events.fulfillment_restocked_items_event(
+                        order=order, user=user, fulfillment=order
+                    )
@@ -43,9 +43,7 @@ def clean_order_update_shipping(order, method):
         )
 
     valid_methods = get_valid_shipping_methods_for_order(order)
-    if valid_methods is None or method.pk not in valid_methods.values_list(
-        "id", flat=True
-    ):
+    if valid_methods is None or method not in valid_methods:
         raise ValidationError(
             {
                 "shipping_method": ValidationError(
@@ -6,14 +6,19 @@ from django.db import transaction
 
 from ....product import models
 from ....product.error_codes import ProductErrorCode
-from ....product.tasks import update_product_minimal_variant_price_task
+from ....product.tasks import (
+    finish_products_import_task,
+    update_product_minimal_variant_price_task,
+)
 from ....product.utils.attributes import generate_name_for_variant
+from ....product.utils.bulk_import import ProductBulkImporter
 from ...core.mutations import (
     BaseBulkMutation,
     BaseMutation,
     ModelBulkDeleteMutation,
     ModelMutation,
 )
+from ...core.scalars import Decimal
 from ...core.types.common import BulkProductError, ProductError
 from ..mutations.products import (
     AttributeAssignmentMixin,
@@ -21,7 +26,7 @@ from ..mutations.products import (
     ProductVariantCreate,
     ProductVariantInput,
 )
-from ..types import ProductVariant
+from ..types import Product, ProductVariant
 from ..utils import get_used_variants_attribute_values
 
 
@@ -91,6 +96,118 @@ class ProductBulkDelete(ModelBulkDeleteMutation):
         error_type_field = "product_errors"
 
 
+class BulkAttributeValueInput(graphene.InputObjectType):
+    slug = graphene.String(required=True, description="Slug of an attribute.")
+    values = graphene.List(
+        graphene.String,
+        required=True,
+        description=(
+            "Names of the values of the attribute, " "the missing values are created."
+        ),
+    )
+
+
+class ProductBulkCreateVariantInput(graphene.InputObjectType):
+    sku = graphene.String(description="Stock keeping unit.")
+    name = graphene.String(
+        description=(
+            "Name of the variant, generated from the values "
+            "of its attributes by default."
+        )
+    )
+    price_override = Decimal(description="Special price of the particular variant.")
+    cost_price = Decimal(description="Cost price of the variant.")
+    quantity = graphene.Int(description="The total quantity of this variant available.")
+    track_inventory = graphene.Boolean(
+        description="Determines if the inventory of this variant should be tracked."
+    )
+    attributes = graphene.List(
+        BulkAttributeValueInput, description="List of attributes of the variant."
+    )
+
+
+class ProductBulkCreateInput(graphene.InputObjectType):
+    name = graphene.String(required=True, description="Product name.")
+    description = graphene.String(description="Product description (HTML/text).")
+    category = graphene.String(required=True, description="Slug of the category.")
+    product_type = graphene.String(
+        required=True, description="Name of the product type."
+    )
+    base_price = Decimal(required=True, description="Product price.")
+    is_published = graphene.Boolean(
+        description="Determines if product is visible to customers."
+    )
+    charge_taxes = graphene.Boolean(description="Determine if taxes are being charged.")
+    attributes = graphene.List(
+        BulkAttributeValueInput, description="List of attributes of the product."
+    )
+    images = graphene.List(
+        graphene.String, description="Paths of the images already in the storage."
+    )
+    variants = graphene.List(
+        ProductBulkCreateVariantInput, description="List of variants of the product."
+    )
+
+
+class ProductBulkCreate(BaseMutation):
+    count = graphene.Int(
+        required=True,
+        default_value=0,
+        description="Returns how many objects were created.",
+    )
+    products = graphene.List(
+        graphene.NonNull(Product),
+        required=True,
+        default_value=[],
+        description="List of the created products.",
+    )
+
+    class Arguments:
+        products = graphene.List(
+            ProductBulkCreateInput,
+            required=True,
+            description="Input list of products to create.",
+        )
+
+    class Meta:
+        description = (
+            "Creates products with their variants in bulk. The minimal variant "
+            "prices, the search index and the thumbnails are updated afterwards "
+            "in a single background task."
+        )
+        permissions = ("product.manage_products",)
+        error_type_class = BulkProductError
+        error_type_field = "bulk_product_errors"
+
+    @classmethod
+    def perform_mutation(cls, root, info, **data):
+        rows = [
+            dict(product_data, price=product_data.get("base_price"))
+            for product_data in data["products"]
+        ]
+        importer = ProductBulkImporter()
+        cleaned_products = importer.clean(rows)
+        if importer.errors:
+            raise ValidationError(importer.errors)
+        products = importer.save(cleaned_products)
+        finish_products_import_task.delay([product.pk for product in products])
+        return ProductBulkCreate(count=len(products), products=products)
+
+    @classmethod
+    def handle_typed_errors(cls, errors: list, **extra):
+        typed_errors = [
+            cls._meta.error_type_class(
+                field=e.field,
+                message=e.message,
+                code=code,
+                index=params.get("index") if params else None,
+            )
+            for e, code, params in errors
+        ]
+        extra.update({cls._meta.error_type_field: typed_errors})
+        return cls(errors=[e[0] for e in errors], **extra)
+
+
 class ProductVariantBulkCreateInput(ProductVariantInput):
     attributes = graphene.List(
         AttributeValueInput,
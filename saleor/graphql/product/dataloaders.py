@@ -0,0 +1,16 @@
+from ...product.utils.availability import get_products_availability
+from ..core.dataloaders import DataLoader
+
+
+class ProductAvailabilityByProductLoader(DataLoader):
+    context_key = "product_availability_by_product"
+
+    def batch_load(self, keys):
+        context = self.context
+        return get_products_availability(
+            keys,
+            context.discounts,
+            context.country,
+            context.currency,
+            context.extensions,
+        )
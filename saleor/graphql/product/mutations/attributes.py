@@ -8,6 +8,7 @@ from django.template.defaultfilters import slugify
 
 from ....product import AttributeInputType, models
 from ....product.error_codes import ProductErrorCode
+from ....product.utils.attributes import update_attribute_sort_keys
 from ...core.mutations import (
     BaseMutation,
     ClearMetaBaseMutation,
@@ -810,5 +811,6 @@ class AttributeReorderValues(BaseMutation):
 
         with transaction.atomic():
             perform_reordering(values_m2m, operations)
+            update_attribute_sort_keys(attribute)
         attribute.refresh_from_db(fields=["values"])
         return AttributeReorderValues(attribute=attribute)
@@ -5,10 +5,15 @@ from django.db.models import Sum
 from graphql import GraphQLError
 from graphql_relay import from_global_id
 
-from ...order import OrderStatus
+from ...order.rollups import get_sales_date
 from ...product import models
 from ...search.backends import picker
-from ..utils import filter_by_period, filter_by_query_param, get_database_id, get_nodes
+from ..utils import (
+    filter_by_query_param,
+    get_database_id,
+    get_nodes,
+    reporting_period_to_date,
+)
 from .enums import AttributeSortField, OrderDirection
 from .filters import (
     filter_attributes_by_product_types,
@@ -182,16 +187,14 @@ def resolve_product_variants(info, ids=None):
 
 def resolve_report_product_sales(period):
     qs = models.ProductVariant.objects.prefetch_related(
-        "product", "product__images", "order_lines__order"
+        "product", "product__images"
     ).all()
 
-    # exclude draft and canceled orders
-    exclude_status = [OrderStatus.DRAFT, OrderStatus.CANCELED]
-    qs = qs.exclude(order_lines__order__status__in=exclude_status)
-
-    # filter by period
-    qs = filter_by_period(qs, period, "order_lines__order__created")
+    # read the daily sales rollups of the period, draft and canceled orders
+    # are not counted in them
+    start_date = get_sales_date(reporting_period_to_date(period))
+    qs = qs.filter(daily_sales__date__gte=start_date)
 
-    qs = qs.annotate(quantity_ordered=Sum("order_lines__quantity"))
+    qs = qs.annotate(quantity_ordered=Sum("daily_sales__quantity"))
     qs = qs.filter(quantity_ordered__isnull=False)
     return qs.order_by("-quantity_ordered")
@@ -17,6 +17,7 @@ from .bulk_mutations.products import (
     CategoryBulkDelete,
     CollectionBulkDelete,
     CollectionBulkPublish,
+    ProductBulkCreate,
     ProductBulkDelete,
     ProductBulkPublish,
     ProductImageBulkDelete,
@@ -367,6 +368,7 @@ class ProductMutations(graphene.ObjectType):
 
     product_create = ProductCreate.Field()
     product_delete = ProductDelete.Field()
+    product_bulk_create = ProductBulkCreate.Field()
     product_bulk_delete = ProductBulkDelete.Field()
     product_bulk_publish = ProductBulkPublish.Field()
     product_update = ProductUpdate.Field()
@@ -3,23 +3,18 @@ from typing import List, Union
 import graphene
 import graphene_django_optimizer as gql_optimizer
 from django.conf import settings
-from django.db.models import Prefetch
+from django.db.models import Prefetch, QuerySet
 from graphene import relay
 from graphene_federation import key
 from graphql.error import GraphQLError
 
 from ....product import models
-from ....product.templatetags.product_images import (
-    get_product_image_thumbnail,
-    get_thumbnail,
-)
+from ....product.facets import get_product_facets
+from ....product.templatetags.product_images import get_product_image_thumbnail
 from ....product.utils import calculate_revenue_for_variant
-from ....product.utils.availability import (
-    get_product_availability,
-    get_variant_availability,
-)
+from ....product.utils.availability import get_variant_availability
 from ....product.utils.costs import get_margin_for_variant, get_product_costs_data
-from ...core.connection import CountableDjangoObjectType
+from ...core.connection import CountableConnection, CountableDjangoObjectType
 from ...core.enums import ReportingPeriod, TaxRateType
 from ...core.fields import FilterInputConnectionField, PrefetchingConnectionField
 from ...core.resolvers import resolve_meta, resolve_private_meta
@@ -42,10 +37,11 @@ from ...translations.types import (
     ProductVariantTranslation,
 )
 from ...utils import get_database_id, reporting_period_to_date
+from ..dataloaders import ProductAvailabilityByProductLoader
 from ..enums import OrderDirection, ProductOrderField
 from ..filters import AttributeFilterInput
 from ..resolvers import resolve_attributes
-from .attributes import Attribute, SelectedAttribute
+from .attributes import Attribute, AttributeValue, SelectedAttribute
 from .digital_contents import DigitalContent
 
 
@@ -422,6 +418,85 @@ class ProductVariant(CountableDjangoObjectType, MetadataObjectType):
         return graphene.Node.get_node_from_global_id(_info, root.id)
 
 
+class AttributeValueFacet(graphene.ObjectType):
+    value = graphene.Field(AttributeValue, required=True, description="The value.")
+    count = graphene.Int(
+        required=True, description="Number of the products having the value."
+    )
+
+    class Meta:
+        description = "Number of the products having an attribute value."
+
+
+class PriceRangeFacet(graphene.ObjectType):
+    start = graphene.Field(
+        Money, description="Lower bound of the range, null if it has no lower bound."
+    )
+    stop = graphene.Field(
+        Money, description="Upper bound of the range, null if it has no upper bound."
+    )
+    count = graphene.Int(
+        required=True, description="Number of the products priced in the range."
+    )
+
+    class Meta:
+        description = "Number of the products priced in a price range."
+
+
+class ProductFacets(graphene.ObjectType):
+    attribute_values = graphene.List(
+        graphene.NonNull(AttributeValueFacet),
+        required=True,
+        description="Numbers of the products having each attribute value.",
+    )
+    price_ranges = graphene.List(
+        graphene.NonNull(PriceRangeFacet),
+        required=True,
+        description="Numbers of the products priced in each price range.",
+    )
+
+    class Meta:
+        description = "Numbers of the products matching each filter option."
+
+    @staticmethod
+    def resolve_attribute_values(root, _info, **_kwargs):
+        values = models.AttributeValue.objects.in_bulk(root.attribute_values.keys())
+        return [
+            AttributeValueFacet(value=values[value_id], count=count)
+            for value_id, count in root.attribute_values.items()
+            if value_id in values
+        ]
+
+    @staticmethod
+    def resolve_price_ranges(root, _info, **_kwargs):
+        return [
+            PriceRangeFacet(start=start, stop=stop, count=count)
+            for start, stop, count in root.price_ranges
+        ]
+
+
+class ProductCountableConnection(CountableConnection):
+    class Meta:
+        abstract = True
+
+    facets = graphene.Field(
+        ProductFacets,
+        description=(
+            "Numbers of the products from the filtered collection matching "
+            "each attribute value and price range."
+        ),
+    )
+
+    @staticmethod
+    def resolve_facets(root, _info, **_kwargs):
+        products = root.iterable
+        if not isinstance(products, QuerySet):
+            products = models.Product.objects.filter(
+                pk__in=[product.pk for product in products]
+            )
+        return get_product_facets(products)
+
+
 @key(fields="id")
 class Product(CountableDjangoObjectType, MetadataObjectType):
     url = graphene.String(
@@ -512,6 +587,7 @@ class Product(CountableDjangoObjectType, MetadataObjectType):
         description = "Represents an individual item for sale in the storefront."
         interfaces = [relay.Node]
         model = models.Product
+        connection_class = ProductCountableConnection
         only_fields = [
             "category",
             "charge_taxes",
@@ -553,15 +629,11 @@ class Product(CountableDjangoObjectType, MetadataObjectType):
         only=["publication_date", "charge_taxes", "price_amount", "currency", "meta"],
     )
     def resolve_pricing(root: models.Product, info):
-        context = info.context
-        availability = get_product_availability(
-            root,
-            context.discounts,
-            context.country,
-            context.currency,
-            context.extensions,
+        return (
+            ProductAvailabilityByProductLoader(info.context)
+            .load(root)
+            .then(lambda availability: ProductPricingInfo(**availability._asdict()))
         )
-        return ProductPricingInfo(**availability._asdict())
 
     resolve_availability = resolve_pricing
 
@@ -947,7 +1019,7 @@ class ProductImage(CountableDjangoObjectType):
     @staticmethod
     def resolve_url(root: models.ProductImage, info, *, size=None):
         if size:
-            url = get_thumbnail(root.image, size, method="thumbnail")
+            url = get_product_image_thumbnail(root, size, method="thumbnail")
         else:
             url = root.image.url
         return info.context.build_absolute_uri(url)
@@ -1,15 +1,16 @@
 import graphene
 from django.conf import settings
 from django.utils import translation
+from django.utils.translation import get_language
 from django_countries import countries
 from django_prices_vatlayer.models import VAT
 from phonenumbers import COUNTRY_CODE_TO_REGION_CODE
 
 from ...core.permissions import get_permissions
 from ...core.utils import get_client_ip, get_country_by_ip
-from ...menu import models as menu_models
 from ...product import models as product_models
 from ...site import models as site_models
+from ...site.navigation import get_menu_from_payload, get_navigation
 from ..account.types import Address
 from ..core.enums import WeightUnitsEnum
 from ..core.types.common import CountryDisplay, LanguageDisplay, PermissionDisplay
@@ -226,12 +227,12 @@ class Shop(graphene.ObjectType):
         return info.context.site.name
 
     @staticmethod
-    def resolve_navigation(_, info):
-        site_settings = info.context.site.settings
-        qs = menu_models.Menu.objects.all()
-        top_menu = get_node_optimized(qs, {"pk": site_settings.top_menu_id}, info)
-        bottom_menu = get_node_optimized(qs, {"pk": site_settings.bottom_menu_id}, info)
-        return Navigation(main=top_menu, secondary=bottom_menu)
+    def resolve_navigation(_, _info):
+        navigation = get_navigation(get_language())["navigation"]
+        return Navigation(
+            main=get_menu_from_payload(navigation["main"]),
+            secondary=get_menu_from_payload(navigation["secondary"]),
+        )
 
     @staticmethod
     def resolve_permissions(_, _info):
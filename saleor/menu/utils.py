@@ -57,7 +57,7 @@ def get_menu_item_as_dict(menu_item):
     return data
 
 
-def get_menu_as_json(menu):
+def get_menu_as_json(menu, item_serializer=get_menu_item_as_dict):
     """Build a tree structure from top menu items, its children and grandchildren."""
     top_items = menu.items.filter(parent=None).prefetch_related(
         "category",
@@ -75,14 +75,14 @@ def get_menu_as_json(menu):
     )
     menu_data = []
     for item in top_items:
-        top_item_data = get_menu_item_as_dict(item)
+        top_item_data = item_serializer(item)
         top_item_data["child_items"] = []
         children = item.children.all()
         for child in children:
-            child_data = get_menu_item_as_dict(child)
+            child_data = item_serializer(child)
             grand_children = child.children.all()
             grand_children_data = [
-                get_menu_item_as_dict(grand_child) for grand_child in grand_children
+                item_serializer(grand_child) for grand_child in grand_children
             ]
             child_data["child_items"] = grand_children_data
             top_item_data["child_items"].append(child_data)
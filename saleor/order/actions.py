@@ -34,6 +34,7 @@ def order_created(order: "Order", user: "User", from_draft: bool = False):
     manager.order_created(order)
 
 
+@events.collect_order_events()
 def handle_fully_paid_order(order: "Order"):
     events.order_fully_paid_event(order=order)
 
@@ -53,6 +54,7 @@ def handle_fully_paid_order(order: "Order"):
     manager.order_updated(order)
 
 
+@events.collect_order_events()
 def cancel_order(order: "Order", user: "User", restock: bool):
     """Cancel order and associated fulfillments.
 
@@ -151,6 +153,7 @@ def fulfillment_tracking_updated(
     get_extensions_manager().order_updated(fulfillment.order)
 
 
+@events.collect_order_events()
 def cancel_fulfillment(fulfillment: "Fulfillment", user: "User", restock: bool):
     """Cancel fulfillment.
 
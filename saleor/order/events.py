@@ -1,6 +1,10 @@
+import threading
+from contextlib import contextmanager
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple, Union
 
+from django.db import transaction
+
 from ..account import events as account_events
 from ..account.models import Address, User
 from ..order.models import Fulfillment, FulfillmentLine, Order, OrderLine
@@ -10,6 +14,62 @@ from .models import OrderEvent
 
 UserType = User
 
+_local = threading.local()
+
+
+class OrderEventCollector:
+    """Buffer the order events to insert them in a single query."""
+
+    def __init__(self):
+        self.events: List[OrderEvent] = []
+
+    def add(self, event: OrderEvent):
+        self.events.append(event)
+
+    def flush(self):
+        if self.events:
+            OrderEvent.objects.bulk_create(self.events)
+            self.events = []
+
+
+@contextmanager
+def collect_order_events():
+    """Insert the order events created in the block at once when it exits.
+
+    The events are inserted with a single `bulk_create` instead of a query per
+    event. Within a transaction they're committed or rolled back with the
+    changes they describe. The events get their primary keys once inserted,
+    the code in the block must not query them in the meantime. Nested blocks
+    buffer the events in the outermost collector.
+    """
+    collector = getattr(_local, "collector", None)
+    if collector is not None:
+        yield collector
+        return
+
+    collector = OrderEventCollector()
+    _local.collector = collector
+    try:
+        yield collector
+    except Exception:
+        # Without a transaction the changes made before the error are kept,
+        # so are their events
+        if not transaction.get_connection().in_atomic_block:
+            collector.flush()
+        raise
+    finally:
+        _local.collector = None
+    collector.flush()
+
+
+def _create_event(**kwargs) -> OrderEvent:
+    collector = getattr(_local, "collector", None)
+    if collector is None:
+        return OrderEvent.objects.create(**kwargs)
+    event = OrderEvent(**kwargs)
+    collector.add(event)
+    return event
+
 
 def _lines_per_quantity_to_line_object_list(quantities_per_order_line):
     return [
@@ -43,7 +103,7 @@ def email_sent_event(
     else:
         kwargs = {}
 
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.EMAIL_SENT,
         parameters={"email": order.get_customer_email(), "email_type": email_type},
@@ -58,16 +118,14 @@ def email_resent_event(
 
 
 def draft_order_created_event(*, order: Order, user: UserType) -> OrderEvent:
-    return OrderEvent.objects.create(
-        order=order, type=OrderEvents.DRAFT_CREATED, user=user
-    )
+    return _create_event(order=order, type=OrderEvents.DRAFT_CREATED, user=user)
 
 
 def draft_order_added_products_event(
     *, order: Order, user: UserType, order_lines: List[Tuple[int, OrderLine]]
 ) -> OrderEvent:
 
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.DRAFT_ADDED_PRODUCTS,
         user=user,
@@ -79,7 +137,7 @@ def draft_order_removed_products_event(
     *, order: Order, user: UserType, order_lines: List[Tuple[int, OrderLine]]
 ) -> OrderEvent:
 
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.DRAFT_REMOVED_PRODUCTS,
         user=user,
@@ -99,13 +157,13 @@ def order_created_event(
     if user.is_anonymous:
         user = None
 
-    return OrderEvent.objects.create(order=order, type=event_type, user=user)
+    return _create_event(order=order, type=event_type, user=user)
 
 
 def draft_order_oversold_items_event(
     *, order: Order, user: UserType, oversold_items: List[str]
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.OVERSOLD_ITEMS,
         user=user,
@@ -114,23 +172,21 @@ def draft_order_oversold_items_event(
 
 
 def order_canceled_event(*, order: Order, user: UserType) -> OrderEvent:
-    return OrderEvent.objects.create(order=order, type=OrderEvents.CANCELED, user=user)
+    return _create_event(order=order, type=OrderEvents.CANCELED, user=user)
 
 
 def order_manually_marked_as_paid_event(*, order: Order, user: UserType) -> OrderEvent:
-    return OrderEvent.objects.create(
-        order=order, type=OrderEvents.ORDER_MARKED_AS_PAID, user=user
-    )
+    return _create_event(order=order, type=OrderEvents.ORDER_MARKED_AS_PAID, user=user)
 
 
 def order_fully_paid_event(*, order: Order) -> OrderEvent:
-    return OrderEvent.objects.create(order=order, type=OrderEvents.ORDER_FULLY_PAID)
+    return _create_event(order=order, type=OrderEvents.ORDER_FULLY_PAID)
 
 
 def payment_captured_event(
     *, order: Order, user: UserType, amount: Decimal, payment: Payment
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.PAYMENT_CAPTURED,
         user=user,
@@ -141,7 +197,7 @@ def payment_captured_event(
 def payment_refunded_event(
     *, order: Order, user: UserType, amount: Decimal, payment: Payment
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.PAYMENT_REFUNDED,
         user=user,
@@ -152,7 +208,7 @@ def payment_refunded_event(
 def payment_voided_event(
     *, order: Order, user: UserType, payment: Payment
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.PAYMENT_VOIDED,
         user=user,
@@ -169,7 +225,7 @@ def payment_failed_event(
     if payment:
         parameters.update({"gateway": payment.gateway, "payment_id": payment.token})
 
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order, type=OrderEvents.PAYMENT_FAILED, user=user, parameters=parameters
     )
 
@@ -177,7 +233,7 @@ def payment_failed_event(
 def fulfillment_canceled_event(
     *, order: Order, user: UserType, fulfillment: Fulfillment
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.FULFILLMENT_CANCELED,
         user=user,
@@ -188,7 +244,7 @@ def fulfillment_canceled_event(
 def fulfillment_restocked_items_event(
     *, order: Order, user: UserType, fulfillment: Union[Order, Fulfillment]
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.FULFILLMENT_RESTOCKED_ITEMS,
         user=user,
@@ -199,7 +255,7 @@ def fulfillment_restocked_items_event(
 def fulfillment_fulfilled_items_event(
     *, order: Order, user: UserType, fulfillment_lines: List[FulfillmentLine]
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.FULFILLMENT_FULFILLED_ITEMS,
         user=user,
@@ -210,7 +266,7 @@ def fulfillment_fulfilled_items_event(
 def fulfillment_tracking_updated_event(
     *, order: Order, user: UserType, tracking_number: str, fulfillment: Fulfillment
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.TRACKING_UPDATED,
         user=user,
@@ -230,7 +286,7 @@ def order_note_added_event(*, order: Order, user: UserType, message: str) -> Ord
             )
         kwargs["user"] = user
 
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.NOTE_ADDED,
         parameters={"message": message},
@@ -241,7 +297,7 @@ def order_note_added_event(*, order: Order, user: UserType, message: str) -> Ord
 def order_updated_address_event(
     *, order: Order, user: UserType, address: Address
 ) -> OrderEvent:
-    return OrderEvent.objects.create(
+    return _create_event(
         order=order,
         type=OrderEvents.UPDATED_ADDRESS,
         user=user,
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...models import VariantDailySales
+from ...rollups import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales of all the product variants from the orders."
+
+    def handle(self, *args, **options):
+        rebuild_sales()
+        self.stdout.write(
+            "Rebuilt %d daily sales rollups." % VariantDailySales.objects.count()
+        )
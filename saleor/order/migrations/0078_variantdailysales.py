@@ -0,0 +1,83 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+INSERT_VARIANT_DAILY_SALES = """
+INSERT INTO order_variantdailysales (
+    variant_id, date, currency, quantity, net_amount, gross_amount
+)
+SELECT
+    line.variant_id,
+    (orders.created AT TIME ZONE 'UTC')::date,
+    line.currency,
+    SUM(line.quantity),
+    SUM(line.unit_price_net_amount * line.quantity),
+    SUM(line.unit_price_gross_amount * line.quantity)
+FROM order_orderline AS line
+JOIN order_order AS orders ON orders.id = line.order_id
+WHERE line.variant_id IS NOT NULL AND orders.status NOT IN ('draft', 'canceled')
+GROUP BY 1, 2, 3
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0119_productattributesortkey"),
+        ("order", "0077_auto_20200109_2112"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VariantDailySales",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True)),
+                ("quantity", models.IntegerField(default=0)),
+                (
+                    "currency",
+                    models.CharField(
+                        default=settings.DEFAULT_CURRENCY,
+                        max_length=settings.DEFAULT_CURRENCY_CODE_LENGTH,
+                    ),
+                ),
+                (
+                    "net_amount",
+                    models.DecimalField(
+                        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+                        default=0,
+                        max_digits=settings.DEFAULT_MAX_DIGITS,
+                    ),
+                ),
+                (
+                    "gross_amount",
+                    models.DecimalField(
+                        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+                        default=0,
+                        max_digits=settings.DEFAULT_MAX_DIGITS,
+                    ),
+                ),
+                (
+                    "variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="product.ProductVariant",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("date", "pk"),
+                "unique_together": {("variant", "date", "currency")},
+            },
+        ),
+        migrations.RunSQL(INSERT_VARIANT_DAILY_SALES, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("order", "0078_variantdailysales")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orderevent",
+            index=models.Index(fields=["order", "date"], name="order_event_date_idx"),
+        )
+    ]
@@ -7,6 +7,7 @@ from django.contrib.postgres.fields import JSONField
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db.models import F, Max, Sum
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import pgettext_lazy
@@ -506,6 +507,105 @@ class OrderEvent(models.Model):
 
     class Meta:
         ordering = ("date",)
+        indexes = [models.Index(fields=["order", "date"], name="order_event_date_idx")]
 
     def __repr__(self):
         return f"{self.__class__.__name__}(type={self.type!r}, user={self.user!r})"
+
+
+class VariantDailySales(models.Model):
+    """Sales of a product variant on a day, aggregated from the order lines.
+
+    Lines of draft and canceled orders are not counted. The days are in UTC,
+    as the reporting periods are.
+    """
+
+    variant = models.ForeignKey(
+        "product.ProductVariant", related_name="daily_sales", on_delete=models.CASCADE
+    )
+    date = models.DateField(db_index=True)
+    quantity = models.IntegerField(default=0)
+
+    currency = models.CharField(
+        max_length=settings.DEFAULT_CURRENCY_CODE_LENGTH,
+        default=settings.DEFAULT_CURRENCY,
+    )
+
+    net_amount = models.DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=0,
+    )
+    net = MoneyField(amount_field="net_amount", currency_field="currency")
+
+    gross_amount = models.DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=0,
+    )
+    gross = MoneyField(amount_field="gross_amount", currency_field="currency")
+
+    revenue = TaxedMoneyField(
+        net_amount_field="net_amount",
+        gross_amount_field="gross_amount",
+        currency="currency",
+    )
+
+    class Meta:
+        ordering = ("date", "pk")
+        unique_together = (("variant", "date", "currency"),)
+
+
+@receiver(models.signals.pre_save, sender=Order)
+def store_previous_order_status(sender, instance, update_fields, **kwargs):
+    if not instance.pk or (update_fields is not None and "status" not in update_fields):
+        # The status can't change, there's nothing to compare it with
+        instance._previous_status = None
+        return
+    instance._previous_status = (
+        Order.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+    )
+
+
+@receiver(models.signals.post_save, sender=Order)
+def update_sales_on_order_status_change(sender, instance, created, **kwargs):
+    """Count or stop counting the lines when the order is placed or canceled."""
+    from .rollups import is_counted_in_sales, update_order_sales
+
+    previous_status = getattr(instance, "_previous_status", None)
+    if created or previous_status is None:
+        return
+    if is_counted_in_sales(previous_status) != is_counted_in_sales(instance.status):
+        update_order_sales(instance)
+
+
+@receiver(models.signals.pre_save, sender=OrderLine)
+def store_previous_line_sales(sender, instance, update_fields, **kwargs):
+    from .rollups import LINE_SALES_FIELDS, get_line_sales_fields
+
+    instance._saved_sales_fields = get_line_sales_fields(update_fields)
+    if not instance.pk or not instance._saved_sales_fields:
+        # The line is new or its sales can't change
+        instance._previous_sales_values = None
+        return
+    instance._previous_sales_values = (
+        OrderLine.objects.filter(pk=instance.pk).values(*LINE_SALES_FIELDS).first()
+    )
+
+
+@receiver(models.signals.post_save, sender=OrderLine)
+def update_sales_on_line_save(sender, instance, created, **kwargs):
+    from .rollups import update_line_sales
+
+    saved_fields = getattr(instance, "_saved_sales_fields", None)
+    if not saved_fields:
+        return
+    previous_values = None if created else instance._previous_sales_values
+    update_line_sales(instance, previous_values, saved_fields)
+
+
+@receiver(models.signals.post_delete, sender=OrderLine)
+def update_sales_on_line_delete(sender, instance, **kwargs):
+    from .rollups import remove_line_sales
+
+    remove_line_sales(instance)
@@ -0,0 +1,272 @@
+"""Keep the daily sales of the product variants aggregated.
+
+Reports read the `VariantDailySales` rollups instead of all the order lines of
+the variants, so they don't get slower as the order history grows. The sales
+of an order line are added to or subtracted from the rollup of its variant and
+day in place whenever the line or the status of its order change, and all the
+rollups can be rebuilt with the `rebuild_sales_rollups` command.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import OrderStatus
+from .models import Order, OrderLine, VariantDailySales
+
+# Lines of the orders in these statuses are not counted as sales
+EXCLUDED_ORDER_STATUSES = (OrderStatus.DRAFT, OrderStatus.CANCELED)
+
+BATCH_SIZE = 1000
+
+# Fields of the order lines their sales are computed from
+LINE_SALES_FIELDS = (
+    "variant_id",
+    "quantity",
+    "currency",
+    "unit_price_net_amount",
+    "unit_price_gross_amount",
+)
+
+# Add the sales in place, so the concurrent transactions adding the sales of the
+# same variant and day only wait for each other's row lock
+ADD_VARIANT_SALES = """
+INSERT INTO order_variantdailysales (
+    variant_id, date, currency, quantity, net_amount, gross_amount
+)
+VALUES {values}
+ON CONFLICT (variant_id, date, currency) DO UPDATE SET
+    quantity = order_variantdailysales.quantity + EXCLUDED.quantity,
+    net_amount = order_variantdailysales.net_amount + EXCLUDED.net_amount,
+    gross_amount = order_variantdailysales.gross_amount + EXCLUDED.gross_amount
+"""
+
+# Lock the (variant, day) pairs in a consistent order, so the transactions
+# recomputing the same pairs wait for each other without deadlocking
+LOCK_VARIANT_SALES = """
+SELECT pg_advisory_xact_lock(keys.variant_id, keys.day)
+FROM (
+    SELECT unnest(%s::integer[]) AS variant_id, unnest(%s::integer[]) AS day
+    ORDER BY 1, 2
+) AS keys
+"""
+
+
+def is_counted_in_sales(status: str) -> bool:
+    return status not in EXCLUDED_ORDER_STATUSES
+
+
+def get_sales_date(value: datetime) -> date:
+    """Return the day of the given time, the reporting periods start at UTC."""
+    return value.astimezone(timezone.utc).date()
+
+
+def _aggregate_sales(lines):
+    """Yield the unsaved daily sales of the given order lines.
+
+    Must be called in the UTC time zone, the dates of the orders are
+    truncated in the current time zone.
+    """
+    lines = lines.filter(variant__isnull=False).exclude(
+        order__status__in=EXCLUDED_ORDER_STATUSES
+    )
+    amount_field = DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+    )
+    sales = (
+        lines.annotate(date=TruncDate("order__created"))
+        .order_by()
+        .values("variant_id", "date", "currency")
+        .annotate(
+            quantity_sum=Sum("quantity"),
+            net_amount_sum=Sum(
+                F("unit_price_net_amount") * F("quantity"), output_field=amount_field
+            ),
+            gross_amount_sum=Sum(
+                F("unit_price_gross_amount") * F("quantity"), output_field=amount_field
+            ),
+        )
+    )
+    for row in sales.iterator():
+        yield VariantDailySales(
+            variant_id=row["variant_id"],
+            date=row["date"],
+            currency=row["currency"],
+            quantity=row["quantity_sum"],
+            net_amount=row["net_amount_sum"],
+            gross_amount=row["gross_amount_sum"],
+        )
+
+
+def _lock_variant_sales(variant_ids: Iterable[int], dates: Iterable[date]):
+    """Lock the sales of the variants on the days until the transaction ends."""
+    keys = [(pk, day.toordinal()) for pk in variant_ids for day in dates]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            LOCK_VARIANT_SALES, [[key[0] for key in keys], [key[1] for key in keys]]
+        )
+
+
+def update_variant_sales(variant_ids: Iterable[int], dates: Iterable[date]):
+    """Recompute the sales of the given variants on the given days.
+
+    Repairs the rollups of the variants, the order changes only add or subtract
+    the sales of their lines.
+    """
+    variant_ids = set(variant_ids)
+    dates = set(dates)
+    if not variant_ids or not dates:
+        return
+
+    start = datetime.combine(min(dates), time.min, tzinfo=timezone.utc)
+    end = datetime.combine(
+        max(dates) + timedelta(days=1), time.min, tzinfo=timezone.utc
+    )
+    lines = OrderLine.objects.filter(
+        variant_id__in=variant_ids, order__created__gte=start, order__created__lt=end
+    )
+    with transaction.atomic(), timezone.override(timezone.utc):
+        _lock_variant_sales(variant_ids, dates)
+        # Once locked, the lines committed by a concurrent update are visible
+        VariantDailySales.objects.filter(
+            variant_id__in=variant_ids, date__in=dates
+        ).delete()
+        sales = [sale for sale in _aggregate_sales(lines) if sale.date in dates]
+        VariantDailySales.objects.bulk_create(sales)
+
+
+def get_line_sales_fields(update_fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """Return the sales fields of the order lines saved with the update fields."""
+    if update_fields is None:
+        return frozenset(LINE_SALES_FIELDS)
+    update_fields = {"variant_id" if f == "variant" else f for f in update_fields}
+    return frozenset(update_fields.intersection(LINE_SALES_FIELDS))
+
+
+def get_line_sales(values: Dict, sales_date: date, sign: int = 1) -> VariantDailySales:
+    """Return the unsaved sales of a line with the given sales field values.
+
+    The sales are subtracted rather than added when `sign` is -1.
+    """
+    quantity = sign * values["quantity"]
+    return VariantDailySales(
+        variant_id=values["variant_id"],
+        date=sales_date,
+        currency=values["currency"],
+        quantity=quantity,
+        net_amount=values["unit_price_net_amount"] * quantity,
+        gross_amount=values["unit_price_gross_amount"] * quantity,
+    )
+
+
+def add_variant_sales(sales: Iterable[VariantDailySales]):
+    """Add the given sales to the daily sales of their variants.
+
+    The daily sales that drop to zero are removed.
+    """
+    totals: Dict[Tuple[int, date, str], VariantDailySales] = {}
+    for sale in sales:
+        if not sale.variant_id:
+            continue
+        key = (sale.variant_id, sale.date, sale.currency)
+        if key not in totals:
+            totals[key] = VariantDailySales(
+                variant_id=sale.variant_id, date=sale.date, currency=sale.currency
+            )
+        total = totals[key]
+        total.quantity += sale.quantity
+        total.net_amount += sale.net_amount
+        total.gross_amount += sale.gross_amount
+    # Update the rows in a consistent order, so the transactions don't deadlock
+    totals_list = [
+        totals[key]
+        for key in sorted(totals)
+        if totals[key].quantity or totals[key].net_amount or totals[key].gross_amount
+    ]
+    if not totals_list:
+        return
+
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(totals_list))
+    params = [
+        param
+        for total in totals_list
+        for param in (
+            total.variant_id,
+            total.date,
+            total.currency,
+            total.quantity,
+            total.net_amount,
+            total.gross_amount,
+        )
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(ADD_VARIANT_SALES.format(values=values), params)
+    if any(total.quantity < 0 for total in totals_list):
+        VariantDailySales.objects.filter(
+            variant_id__in={total.variant_id for total in totals_list},
+            date__in={total.date for total in totals_list},
+            quantity=0,
+        ).delete()
+
+
+def update_line_sales(
+    line: OrderLine,
+    previous_values: Optional[Dict],
+    saved_fields: FrozenSet[str] = frozenset(LINE_SALES_FIELDS),
+):
+    """Replace the previous sales of a saved order line with its current ones.
+
+    `previous_values` are the stored sales fields of the line before it was
+    saved, `None` when the line is created. The fields that weren't saved keep
+    their previous values.
+    """
+    order = line.order
+    if not is_counted_in_sales(order.status):
+        return
+    sales_date = get_sales_date(order.created)
+    values = {field: getattr(line, field) for field in LINE_SALES_FIELDS}
+    sales = []
+    if previous_values is not None:
+        values.update(
+            {
+                field: value
+                for field, value in previous_values.items()
+                if field not in saved_fields
+            }
+        )
+        sales.append(get_line_sales(previous_values, sales_date, sign=-1))
+    sales.append(get_line_sales(values, sales_date))
+    add_variant_sales(sales)
+
+
+def remove_line_sales(line: OrderLine):
+    """Subtract the sales of a deleted order line."""
+    order = line.order
+    if not is_counted_in_sales(order.status):
+        return
+    values = {field: getattr(line, field) for field in LINE_SALES_FIELDS}
+    add_variant_sales([get_line_sales(values, get_sales_date(order.created), -1)])
+
+
+def update_order_sales(order: Order):
+    """Add or subtract the sales of an order depending on its status."""
+    sign = 1 if is_counted_in_sales(order.status) else -1
+    sales_date = get_sales_date(order.created)
+    add_variant_sales(
+        get_line_sales(values, sales_date, sign)
+        for values in order.lines.values(*LINE_SALES_FIELDS)
+    )
+
+
+def rebuild_sales():
+    """Recompute the sales of all the variants from all the order lines."""
+    with transaction.atomic(), timezone.override(timezone.utc):
+        VariantDailySales.objects.all().delete()
+        VariantDailySales.objects.bulk_create(
+            _aggregate_sales(OrderLine.objects.all()), batch_size=BATCH_SIZE
+        )
@@ -3,7 +3,6 @@ from functools import wraps
 from django.conf import settings
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect
-from django.utils import timezone
 from prices import Money, TaxedMoney
 
 from ..account.utils import store_user_address
@@ -13,11 +12,12 @@ from ..core.weight import zero_weight
 from ..dashboard.order.utils import get_voucher_discount_for_order
 from ..discount.models import NotApplicable
 from ..extensions.manager import get_extensions_manager
+from ..giftcard.utils import charge_gift_card
 from ..order import OrderStatus
 from ..order.models import Order, OrderLine
 from ..product.utils import allocate_stock, deallocate_stock, increase_stock
 from ..product.utils.digital_products import get_default_digital_content_settings
-from ..shipping.models import ShippingMethod
+from ..shipping.utils import get_applicable_shipping_methods_for_instance
 from . import events
 
 
@@ -80,18 +80,35 @@ def update_voucher_discount(func):
     return decorator
 
 
+def get_order_lines(order: Order):
+    """Load the order lines with their variants and products.
+
+    The lines are always fetched again, the ones prefetched on the order may be
+    stale.
+    """
+    lines = list(
+        OrderLine.objects.filter(order_id=order.pk)
+        .select_related("variant__product")
+        .order_by("pk")
+    )
+    for line in lines:
+        line.order = order
+    return lines
+
+
 @update_voucher_discount
-def recalculate_order(order: Order, **kwargs):
+def recalculate_order(order: Order, lines=None, **kwargs):
     """Recalculate and assign total price of order.
 
     Total price is a sum of items in order and order shipping price minus
-    discount amount.
+    discount amount. The order weight is recalculated too, pass the lines
+    loaded with `get_order_lines` if they were already fetched.
 
     Voucher discount amount is recalculated by default. To avoid this, pass
     update_voucher_discount argument set to False.
     """
-    # avoid using prefetched order lines
-    lines = [OrderLine.objects.get(pk=line.pk) for line in order]
+    if lines is None:
+        lines = get_order_lines(order)
     prices = [line.get_total() for line in lines]
     total = sum(prices, order.shipping_price)
     # discount amount can't be greater than order total
@@ -99,48 +116,54 @@ def recalculate_order(order: Order, **kwargs):
     if order.discount:
         total -= order.discount
     order.total = total
+    order.weight = get_order_lines_weight(lines)
     order.save()
-    recalculate_order_weight(order)
 
 
-def recalculate_order_weight(order):
-    """Recalculate order weights."""
+def get_order_lines_weight(lines):
     weight = zero_weight()
-    for line in order:
+    for line in lines:
         if line.variant:
             weight += line.variant.get_weight() * line.quantity
-    order.weight = weight
+    return weight
+
+
+def recalculate_order_weight(order, lines=None):
+    """Recalculate order weights."""
+    if lines is None:
+        lines = get_order_lines(order)
+    order.weight = get_order_lines_weight(lines)
     order.save(update_fields=["weight"])
 
 
 def update_order_prices(order, discounts):
     """Update prices in order with given discounts and proper taxes."""
     manager = get_extensions_manager()
-    for line in order:  # type: OrderLine
-        if line.variant:
-            unit_price = line.variant.get_price(discounts)
-            unit_price = TaxedMoney(unit_price, unit_price)
-            line.unit_price = unit_price
-            line.save(
-                update_fields=[
-                    "currency",
-                    "unit_price_net_amount",
-                    "unit_price_gross_amount",
-                ]
-            )
-
-            price = manager.calculate_order_line_unit(line)
-            if price != line.unit_price:
-                line.unit_price = price
-                if price.tax and price.net:
-                    line.tax_rate = price.tax / price.net
-                line.save()
+    all_lines = get_order_lines(order)
+    lines = [line for line in all_lines if line.variant]
+    price_fields = ["currency", "unit_price_net_amount", "unit_price_gross_amount"]
+
+    for line in lines:
+        unit_price = line.variant.get_price(discounts)
+        line.unit_price = TaxedMoney(unit_price, unit_price)
+    # The tax plugins may read the net prices of all the lines from the database
+    OrderLine.objects.bulk_update(lines, price_fields)
+
+    taxed_lines = []
+    for line in lines:
+        price = manager.calculate_order_line_unit(line)
+        if price != line.unit_price:
+            line.unit_price = price
+            if price.tax and price.net:
+                line.tax_rate = price.tax / price.net
+            taxed_lines.append(line)
+    if taxed_lines:
+        OrderLine.objects.bulk_update(taxed_lines, price_fields + ["tax_rate"])
 
     if order.shipping_method:
         order.shipping_price = manager.calculate_order_shipping(order)
-        order.save()
 
-    recalculate_order(order)
+    recalculate_order(order, lines=all_lines)
 
 
 def update_order_status(order):
@@ -240,14 +263,7 @@ def add_gift_card_to_order(order, gift_card, total_price_left):
     """
     if total_price_left > zero_money(total_price_left.currency):
         order.gift_cards.add(gift_card)
-        if total_price_left < gift_card.current_balance:
-            gift_card.current_balance = gift_card.current_balance - total_price_left
-            total_price_left = zero_money(total_price_left.currency)
-        else:
-            total_price_left = total_price_left - gift_card.current_balance
-            gift_card.current_balance_amount = 0
-        gift_card.last_used_on = timezone.now()
-        gift_card.save(update_fields=["current_balance_amount", "last_used_on"])
+        total_price_left -= charge_gift_card(gift_card, total_price_left, order=order)
     return total_price_left
 
 
@@ -305,6 +321,6 @@ def sum_order_totals(qs):
 
 
 def get_valid_shipping_methods_for_order(order: Order):
-    return ShippingMethod.objects.applicable_shipping_methods_for_instance(
+    return get_applicable_shipping_methods_for_instance(
         order, price=order.get_subtotal().gross
     )
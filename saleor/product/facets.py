@@ -0,0 +1,98 @@
+"""Count the products matching each attribute value and price range.
+
+The counts are computed for the already filtered product queryset in a single
+grouped query, which reads the denormalized "attribute_value_ids" of the
+products, and are cached for a short time under a key derived from the SQL of
+the queryset, so the same listing with the same filters reuses them.
+"""
+import hashlib
+from collections import namedtuple
+from decimal import Decimal
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from prices import Money
+
+FACETS_CACHE_KEY = "product_facets:{}"
+FACETS_CACHE_TIMEOUT = 60
+
+# Boundaries of the price ranges products are grouped into
+PRICE_RANGE_BOUNDARIES = [Decimal(amount) for amount in (10, 25, 50, 100, 250, 500)]
+
+ATTRIBUTE_VALUE_FACET = "attribute_value"
+PRICE_RANGE_FACET = "price_range"
+
+FACETS_QUERY = """
+WITH products AS ({products})
+SELECT %s, value_id, COUNT(*)
+FROM products, unnest(products.attribute_value_ids) AS value_id
+GROUP BY value_id
+UNION ALL
+SELECT %s, width_bucket(products.minimal_variant_price_amount, %s::numeric[]), COUNT(*)
+FROM products
+GROUP BY 2
+"""
+
+ProductFacets = namedtuple("ProductFacets", ("attribute_values", "price_ranges"))
+
+PriceRangeFacet = namedtuple("PriceRangeFacet", ("start", "stop", "count"))
+
+
+def get_price_range(bucket: int, currency: str):
+    """Return the price range of the "width_bucket" with the given number."""
+    start = stop = None
+    if bucket > 0:
+        start = Money(PRICE_RANGE_BOUNDARIES[bucket - 1], currency)
+    if bucket < len(PRICE_RANGE_BOUNDARIES):
+        stop = Money(PRICE_RANGE_BOUNDARIES[bucket], currency)
+    return start, stop
+
+
+def _get_products_sql(qs):
+    # Primary keys are selected to keep the distinct products distinct
+    products = qs.order_by().values(
+        "pk", "attribute_value_ids", "minimal_variant_price_amount"
+    )
+    return products.query.sql_with_params()
+
+
+def _count_facets(qs) -> ProductFacets:
+    sql, params = _get_products_sql(qs)
+    query = FACETS_QUERY.format(products=sql)
+    params = (*params, ATTRIBUTE_VALUE_FACET, PRICE_RANGE_FACET, PRICE_RANGE_BOUNDARIES)
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    attribute_values: Dict[int, int] = {}
+    bucket_counts: Dict[int, int] = {}
+    for facet, key, count in rows:
+        if facet == ATTRIBUTE_VALUE_FACET:
+            attribute_values[key] = count
+        elif key is not None:
+            bucket_counts[key] = count
+
+    currency = settings.DEFAULT_CURRENCY
+    price_ranges = [
+        PriceRangeFacet(*get_price_range(bucket, currency), bucket_counts[bucket])
+        for bucket in sorted(bucket_counts)
+    ]
+    return ProductFacets(attribute_values=attribute_values, price_ranges=price_ranges)
+
+
+def get_facets_cache_key(qs) -> str:
+    sql, params = _get_products_sql(qs)
+    key = "%s:%r" % (sql, params)
+    return FACETS_CACHE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def get_product_facets(qs) -> ProductFacets:
+    """Return the numbers of products from the queryset in each facet."""
+    cache_key = get_facets_cache_key(qs)
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = _count_facets(qs)
+        cache.set(cache_key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
@@ -30,14 +30,20 @@ T_PRODUCT_FILTER_QUERIES = Dict[int, Iterable[int]]
 def filter_products_by_attributes_values(qs, queries: T_PRODUCT_FILTER_QUERIES):
     # Combine filters of the same attribute with OR operator
     # and then combine full query with AND operator.
-    combine_and = [
-        Q(**{"attributes__values__pk__in": values_pk})
-        | Q(**{"variants__attributes__values__pk__in": values_pk})
-        for _, values_pk in queries.items()
-    ]
+    # Values of the products and their variants are denormalized into
+    # the GIN indexed "attribute_value_ids", so no joins are needed.
+    required_values = []
+    combine_and = []
+    for _, values_pk in queries.items():
+        values_pk = list(values_pk)
+        if len(values_pk) == 1:
+            required_values.extend(values_pk)
+        else:
+            combine_and.append(Q(attribute_value_ids__overlap=values_pk))
+    if required_values:
+        combine_and.append(Q(attribute_value_ids__contains=required_values))
     query = functools.reduce(operator.and_, combine_and)
-    qs = qs.filter(query).distinct()
-    return qs
+    return qs.filter(query)
 
 
 class AttributeValuesFilter(MultipleChoiceFilter):
@@ -109,6 +115,15 @@ class ProductFilter(SortedFilterSet):
             (choice.pk, choice.translated.name) for choice in attribute.values.all()
         ]
 
+    def add_facet_counts(self, facets):
+        """Show the number of matching products next to each attribute value."""
+        for name, field in self.form.fields.items():
+            if isinstance(self.filters[name], AttributeValuesFilter):
+                field.choices = [
+                    (pk, "%s (%d)" % (label, facets.attribute_values.get(pk, 0)))
+                    for pk, label in field.choices
+                ]
+
     def filter_queryset(self, queryset):
         """Temporary workaround for filtering products by their attributes values.
 
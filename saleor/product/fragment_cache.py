@@ -0,0 +1,90 @@
+"""Cache the rendered fragments of the storefront product pages.
+
+A fragment of a product's card or details only depends on the language, the
+currency and the country of the request, on the product and on the prices, so
+these are the parts of the key it's cached under:
+
+- the product's version is its `updated_at`, which is also touched when its
+  variants (but not their stock), images, translations, attributes or
+  attribute values change,
+- whether the product is visible, which changes without a save once its
+  publication date has passed,
+- the pricing version changes whenever a sale, the tax configuration or the
+  site's tax settings change. It includes the active sales, so the sales
+  starting or ending are noticed within `ACTIVE_SALES_CACHE_TIMEOUT`.
+
+The stale fragments are never deleted, they are no longer read and expire.
+"""
+import hashlib
+import uuid
+from typing import Callable, TypeVar
+
+from django.core.cache import cache
+from django.utils import timezone, translation
+
+from ..discount.models import Sale
+
+FRAGMENT_CACHE_KEY = "product-fragment:{name}:{product_id}:{digest}"
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+PRICING_VERSION_CACHE_KEY = "product-fragment:pricing-version"
+ACTIVE_SALES_CACHE_KEY = "product-fragment:active-sales:{version}"
+ACTIVE_SALES_CACHE_TIMEOUT = 60
+
+T = TypeVar("T")
+
+
+def invalidate_pricing_version():
+    """Make all the cached fragments stale after the prices changed."""
+    cache.set(PRICING_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_pricing_version() -> str:
+    version = cache.get(PRICING_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(PRICING_VERSION_CACHE_KEY, version, None)
+
+    active_sales_key = ACTIVE_SALES_CACHE_KEY.format(version=version)
+    active_sales = cache.get(active_sales_key)
+    if active_sales is None:
+        active_sales = ",".join(
+            str(pk)
+            for pk in Sale.objects.active(timezone.now())
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        cache.set(active_sales_key, active_sales, ACTIVE_SALES_CACHE_TIMEOUT)
+    return "%s:%s" % (version, active_sales)
+
+
+def _get_request_pricing_version(request) -> str:
+    # The version is read once per request, for all the fragments it renders
+    if not hasattr(request, "_product_fragment_pricing_version"):
+        request._product_fragment_pricing_version = get_pricing_version()
+    return request._product_fragment_pricing_version
+
+
+def get_product_fragment_key(request, name: str, product) -> str:
+    dimensions = (
+        translation.get_language(),
+        getattr(request, "currency", None),
+        getattr(request, "country", None),
+        _get_request_pricing_version(request),
+        product.updated_at.isoformat() if product.updated_at else None,
+        product.is_visible,
+    )
+    digest = hashlib.md5(":".join(map(str, dimensions)).encode()).hexdigest()
+    return FRAGMENT_CACHE_KEY.format(name=name, product_id=product.pk, digest=digest)
+
+
+def get_or_set_product_fragment(
+    request, name: str, product, compute: Callable[[], T]
+) -> T:
+    """Return the cached fragment of the product, compute and cache it if missing."""
+    key = get_product_fragment_key(request, name, product)
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = compute()
+        cache.set(key, fragment, FRAGMENT_CACHE_TIMEOUT)
+    return fragment
@@ -0,0 +1,190 @@
+import random
+import timeit
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FilteredRelation, Q, When
+from django.db.models.functions import Coalesce
+
+from ...models import (
+    AssignedProductAttribute,
+    Attribute,
+    AttributeProduct,
+    AttributeValue,
+    Category,
+    Product,
+    ProductType,
+)
+from ...utils.attributes import update_attribute_sort_keys
+
+
+def sort_by_attribute_aggregated(qs, attribute_pk, ascending=True):
+    """Sort the products the way it was done before the sort keys were stored."""
+    attribute_associations = tuple(
+        AttributeProduct.objects.filter(attribute_id=attribute_pk).values_list(
+            "pk", flat=True
+        )
+    )
+    qs = qs.annotate(
+        filtered_attribute=FilteredRelation(
+            relation_name="attributes",
+            condition=Q(attributes__assignment_id__in=attribute_associations),
+        ),
+        grouped_ids=Count("id"),
+        concatenated_values=Case(
+            # The products without the attribute are sorted last
+            When(
+                Q(filtered_attribute=None),
+                then=models.Value(None, output_field=models.CharField()),
+            ),
+            # The products having the attribute without any value are empty
+            default=Coalesce(
+                StringAgg(
+                    F("filtered_attribute__values__name"),
+                    delimiter=",",
+                    ordering=[
+                        f"filtered_attribute__values__{field_name}"
+                        for field_name in AttributeValue._meta.ordering
+                    ],
+                ),
+                models.Value(""),
+            ),
+            output_field=models.CharField(),
+        ),
+    )
+    qs = qs.extra(
+        order_by=[
+            Case(
+                When(concatenated_values=None, then=2),
+                When(concatenated_values="", then=1),
+                default=0,
+                output_field=models.IntegerField(),
+            ),
+            "concatenated_values",
+            "name",
+        ]
+    )
+    return qs if ascending else qs.reverse()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure sorting the products by an attribute with the stored sort keys "
+        "and with the values aggregated in the query. The generated catalog is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", type=int, default=200000, help="Number of products."
+        )
+        parser.add_argument(
+            "--values", type=int, default=100, help="Number of attribute values."
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=100, help="Number of products fetched."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of measured queries."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated values."
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            attribute = self.create_catalog(options)
+            self.stdout.write("Catalog of %d products created." % options["products"])
+            for ascending in (True, False):
+                direction = "ascending" if ascending else "descending"
+                aggregated_time = self.measure(
+                    lambda: sort_by_attribute_aggregated(
+                        Product.objects.all(), attribute.pk, ascending
+                    ),
+                    options,
+                )
+                stored_time = self.measure(
+                    lambda: Product.objects.sort_by_attribute(attribute.pk, ascending),
+                    options,
+                )
+                self.stdout.write(
+                    "Aggregated values, %s: %.1f ms/query"
+                    % (direction, aggregated_time * 1000)
+                )
+                self.stdout.write(
+                    "Stored sort keys, %s: %.1f ms/query"
+                    % (direction, stored_time * 1000)
+                )
+            transaction.set_rollback(True)
+
+    def create_catalog(self, options) -> Attribute:
+        rng = random.Random(options["seed"])
+        category = Category.objects.create(name="Benchmark", slug="benchmark-sorting")
+        product_type = ProductType.objects.create(name="Benchmark sorting")
+        attribute = Attribute.objects.create(
+            name="Benchmark sorting", slug="benchmark-sorting"
+        )
+        assignment = AttributeProduct.objects.create(
+            attribute=attribute, product_type=product_type
+        )
+        values = AttributeValue.objects.bulk_create(
+            [
+                AttributeValue(
+                    attribute=attribute,
+                    name="Value %d" % number,
+                    slug="value-%d" % number,
+                    sort_order=number,
+                )
+                for number in range(options["values"])
+            ]
+        )
+
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    name="Product %d" % number,
+                    category=category,
+                    price_amount=Decimal(10),
+                    minimal_variant_price_amount=Decimal(10),
+                    currency=settings.DEFAULT_CURRENCY,
+                )
+                for number in range(options["products"])
+            ],
+            batch_size=1000,
+        )
+        # Leave some of the products without any value
+        assigned_products = [product for product in products if rng.random() < 0.9]
+        assignments = AssignedProductAttribute.objects.bulk_create(
+            [
+                AssignedProductAttribute(product=product, assignment=assignment)
+                for product in assigned_products
+            ],
+            batch_size=1000,
+        )
+        through_model = AssignedProductAttribute.values.through
+        through_model.objects.bulk_create(
+            [
+                through_model(
+                    assignedproductattribute_id=product_assignment.pk,
+                    attributevalue_id=value.pk,
+                )
+                for product_assignment in assignments
+                for value in rng.sample(values, rng.randint(1, 2))
+            ],
+            batch_size=1000,
+        )
+        update_attribute_sort_keys(attribute)
+        return attribute
+
+    def measure(self, get_queryset, options) -> float:
+        page_size = options["page_size"]
+        # Run the query once so the caches are warm for both implementations
+        list(get_queryset()[:page_size].values_list("pk", flat=True))
+        total_time = timeit.timeit(
+            lambda: list(get_queryset()[:page_size].values_list("pk", flat=True)),
+            number=options["repeat"],
+        )
+        return total_time / options["repeat"]
@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.bulk_import import (
+    BATCH_SIZE,
+    READERS,
+    ProductImportError,
+    finish_products_import,
+    import_products,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products with their variants from a CSV file with a row per "
+        "variant or from a file with a JSON object per product and line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the imported file.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Format of the file, guessed from its extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of products validated and saved at once.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1].lstrip(".")
+        if file_format not in READERS:
+            raise CommandError("Unknown format: %s." % file_format)
+
+        with open(path, newline="", encoding="utf-8") as import_file:
+            try:
+                product_ids, errors = import_products(
+                    READERS[file_format](import_file), options["batch_size"]
+                )
+            except ProductImportError as e:
+                raise CommandError(str(e))
+        self.stdout.write("Imported %d products." % len(product_ids))
+
+        errors = sorted(
+            (error.params["index"], field, error.message)
+            for field, field_errors in errors.items()
+            for error in field_errors
+        )
+        for index, field, message in errors:
+            self.stderr.write("Product %d: %s: %s" % (index + 1, field, message))
+
+        self.stdout.write("Updating the prices, the search index and the thumbnails.")
+        finish_products_import(product_ids)
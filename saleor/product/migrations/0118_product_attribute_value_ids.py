@@ -0,0 +1,45 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+UPDATE_ATTRIBUTE_VALUE_IDS = """
+UPDATE product_product AS product
+SET attribute_value_ids = ARRAY(
+    SELECT product_values.attributevalue_id
+    FROM product_assignedproductattribute AS product_assignment
+    JOIN product_assignedproductattribute_values AS product_values
+        ON product_values.assignedproductattribute_id = product_assignment.id
+    WHERE product_assignment.product_id = product.id
+    UNION
+    SELECT variant_values.attributevalue_id
+    FROM product_productvariant AS variant
+    JOIN product_assignedvariantattribute AS variant_assignment
+        ON variant_assignment.variant_id = variant.id
+    JOIN product_assignedvariantattribute_values AS variant_values
+        ON variant_values.assignedvariantattribute_id = variant_assignment.id
+    WHERE variant.product_id = product.id
+    ORDER BY 1
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("product", "0117_productvideo_thumbnail")]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="attribute_value_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(), blank=True, default=list, size=None
+            ),
+        ),
+        migrations.RunSQL(UPDATE_ATTRIBUTE_VALUE_IDS, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["attribute_value_ids"], name="product_attr_value_ids_idx"
+            ),
+        ),
+    ]
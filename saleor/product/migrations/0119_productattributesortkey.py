@@ -0,0 +1,66 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+INSERT_ATTRIBUTE_SORT_KEYS = """
+INSERT INTO product_productattributesortkey (product_id, attribute_id, sort_key)
+SELECT
+    assignment.product_id,
+    attribute_product.attribute_id,
+    string_agg(value.name, ',' ORDER BY value.sort_order, value.id)
+FROM product_assignedproductattribute AS assignment
+JOIN product_attributeproduct AS attribute_product
+    ON attribute_product.id = assignment.assignment_id
+JOIN product_assignedproductattribute_values AS assignment_values
+    ON assignment_values.assignedproductattribute_id = assignment.id
+JOIN product_attributevalue AS value
+    ON value.id = assignment_values.attributevalue_id
+GROUP BY assignment.product_id, attribute_product.attribute_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("product", "0118_product_attribute_value_ids")]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductAttributeSortKey",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sort_key", models.TextField()),
+                (
+                    "attribute",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="product_sort_keys",
+                        to="product.Attribute",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attribute_sort_keys",
+                        to="product.Product",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("product", "attribute")}},
+        ),
+        migrations.RunSQL(INSERT_ATTRIBUTE_SORT_KEYS, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="productattributesortkey",
+            index=models.Index(
+                fields=["attribute", "sort_key", "product"],
+                name="product_attr_sort_key_idx",
+            ),
+        ),
+    ]
@@ -4,12 +4,13 @@ from uuid import uuid4
 import os
 
 from django.conf import settings
-from django.contrib.postgres.aggregates import StringAgg
-from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.db import models
-from django.db.models import Case, Count, F, FilteredRelation, Q, When
+from django.db.models import Case, F, FilteredRelation, Func, Q, Value, When
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.encoding import smart_text
 from django.utils.html import strip_tags
 from django.utils.text import slugify
@@ -170,74 +171,43 @@ class ProductsQueryset(PublishedQuerySet):
         """
         qs: models.QuerySet = self
 
-        # Retrieve all the products' attribute data IDs (assignments) and
-        # product types that have the given attribute associated to them
-        associated_values = tuple(
-            AttributeProduct.objects.filter(attribute_id=attribute_pk).values_list(
-                "pk", "product_type_id"
-            )
-        )
-
-        if not associated_values:
+        if not AttributeProduct.objects.filter(attribute_id=attribute_pk).exists():
             if not ascending:
                 return qs.reverse()
             return qs
 
-        attribute_associations, product_types_associated_to_attribute = zip(
-            *associated_values
-        )
+        # The products having the given attribute assigned, with or without values
+        products_with_attribute = AssignedProductAttribute.objects.filter(
+            assignment__attribute_id=attribute_pk
+        ).values("product_id")
 
         qs = qs.annotate(
-            # Contains to retrieve the attribute data (singular) of each product
-            # Refer to `AttributeProduct`.
-            filtered_attribute=FilteredRelation(
-                relation_name="attributes",
-                condition=Q(attributes__assignment_id__in=attribute_associations),
-            ),
-            # Implicit `GROUP BY` required for the `StringAgg` aggregation
-            grouped_ids=Count("id"),
-            # String aggregation of the attribute's values to efficiently sort them
-            concatenated_values=Case(
-                # If the product has no association data but has the given attribute
-                # associated to its product type, then consider the concatenated values
-                # as empty (non-null).
-                When(
-                    Q(product_type_id__in=product_types_associated_to_attribute)
-                    & Q(filtered_attribute=None),
-                    then=models.Value(""),
-                ),
-                default=StringAgg(
-                    F("filtered_attribute__values__name"),
-                    delimiter=",",
-                    ordering=(
-                        [
-                            f"filtered_attribute__values__{field_name}"
-                            for field_name in AttributeValue._meta.ordering
-                        ]
-                    ),
-                ),
-                output_field=models.CharField(),
-            ),
-        )
+            # Join the precomputed sort key (singular) of each product,
+            # refer to `ProductAttributeSortKey`
+            filtered_sort_key=FilteredRelation(
+                relation_name="attribute_sort_keys",
+                condition=Q(attribute_sort_keys__attribute_id=attribute_pk),
+            )
+        ).annotate(concatenated_values=F("filtered_sort_key__sort_key"))
 
-        qs = qs.extra(
-            order_by=[
-                Case(
-                    # Make the products having no such attribute be last in the sorting
-                    When(concatenated_values=None, then=2),
-                    # Put the products having an empty attribute value at the bottom of
-                    # the other products.
-                    When(concatenated_values="", then=1),
-                    # Put the products having an attribute value to be always at the top
-                    default=0,
-                    output_field=models.IntegerField(),
-                ),
-                # Sort each group of products (0, 1, 2, ...) per attribute values
-                "concatenated_values",
-                # Sort each group of products by name,
-                # if they have the same values or not values
-                "name",
-            ]
+        qs = qs.annotate(
+            concatenated_values_order=Case(
+                # Put the products having an attribute value to be always at the top
+                When(Q(concatenated_values__isnull=False), then=0),
+                # Put the products having an empty attribute value at the bottom of
+                # the other products.
+                When(Q(pk__in=products_with_attribute), then=1),
+                # Make the products having no such attribute be last in the sorting
+                default=2,
+                output_field=models.IntegerField(),
+            )
+        ).order_by(
+            "concatenated_values_order",
+            # Sort each group of products (0, 1, 2, ...) per attribute values
+            "concatenated_values",
+            # Sort each group of products by name,
+            # if they have the same values or not values
+            "name",
         )
 
         # Descending sorting
@@ -279,6 +249,9 @@ class Product(SeoModel, ModelWithMetadata, PublishableModel):
     weight = MeasurementField(
         measurement=Weight, unit_choices=WeightUnits.CHOICES, blank=True, null=True
     )
+    # Ids of the attribute values assigned to the product and to its variants,
+    # so the products can be filtered by attributes without any joins
+    attribute_value_ids = ArrayField(models.IntegerField(), blank=True, default=list)
     objects = ProductsQueryset.as_manager()
     translated = TranslationProxy()
 
@@ -291,6 +264,9 @@ class Product(SeoModel, ModelWithMetadata, PublishableModel):
                 pgettext_lazy("Permission description", "Manage products."),
             ),
         )
+        indexes = [
+            GinIndex(fields=["attribute_value_ids"], name="product_attr_value_ids_idx")
+        ]
 
     def __iter__(self):
         if not hasattr(self, "__variants"):
@@ -315,6 +291,15 @@ class Product(SeoModel, ModelWithMetadata, PublishableModel):
         # Make sure the "minimal_variant_price_amount" is set
         if self.minimal_variant_price_amount is None:
             self.minimal_variant_price_amount = self.price_amount
+        # The "attribute_value_ids" are kept up to date in the database when the
+        # values change, saving a product loaded earlier must not override them
+        if update_fields is None and not force_insert and not self._state.adding:
+            skipped_fields = self.get_deferred_fields() | {"attribute_value_ids"}
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped_fields
+            ]
         return super().save(force_insert, force_update, using, update_fields)
 
     @property
@@ -665,6 +650,32 @@ class AssignedVariantAttribute(BaseAssignedAttribute):
         unique_together = (("variant", "assignment"),)
 
 
+class ProductAttributeSortKey(models.Model):
+    """Store the key a product is sorted by when sorting by the given attribute.
+
+    The key is the names of the values assigned to the product, concatenated in
+    the order of the values. It is kept in sync with the assigned values by
+    `update_products_attribute_sort_keys`.
+    """
+
+    product = models.ForeignKey(
+        Product, related_name="attribute_sort_keys", on_delete=models.CASCADE
+    )
+    attribute = models.ForeignKey(
+        "Attribute", related_name="product_sort_keys", on_delete=models.CASCADE
+    )
+    sort_key = models.TextField()
+
+    class Meta:
+        unique_together = (("product", "attribute"),)
+        indexes = [
+            models.Index(
+                fields=["attribute", "sort_key", "product"],
+                name="product_attr_sort_key_idx",
+            )
+        ]
+
+
 class AssociatedAttributeQuerySet(BaseAttributeQuerySet):
     def get_public_attributes(self):
         return self.filter(attribute__visible_in_storefront=True)
@@ -1028,3 +1039,141 @@ class CollectionTranslation(SeoModelTranslation):
 
     def __str__(self):
         return self.name
+
+
+@receiver(models.signals.m2m_changed, sender=AssignedProductAttribute.values.through)
+@receiver(models.signals.m2m_changed, sender=AssignedVariantAttribute.values.through)
+def update_attribute_value_ids_on_values_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Keep the products' attribute value ids in sync with the assigned values."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    from .utils.attributes import (
+        get_products_ids_of_assignments,
+        update_products_attribute_sort_keys,
+        update_products_attribute_value_ids,
+    )
+
+    if reverse:
+        # The assignments of an attribute value were changed
+        product_ids = set(
+            Product.objects.filter(
+                attribute_value_ids__contains=[instance.pk]
+            ).values_list("pk", flat=True)
+        )
+        if pk_set:
+            product_ids.update(get_products_ids_of_assignments(sender, pk_set))
+    else:
+        product_ids = get_products_ids_of_assignments(sender, [instance.pk])
+    update_products_attribute_value_ids(product_ids)
+    if sender is AssignedProductAttribute.values.through:
+        update_products_attribute_sort_keys(product_ids)
+
+
+@receiver(models.signals.post_delete, sender=AssignedProductAttribute)
+@receiver(models.signals.post_delete, sender=AssignedVariantAttribute)
+@receiver(models.signals.post_delete, sender=ProductVariant)
+def update_attribute_value_ids_on_delete(sender, instance, **kwargs):
+    from .utils.attributes import (
+        update_products_attribute_sort_keys,
+        update_products_attribute_value_ids,
+    )
+
+    if sender is AssignedVariantAttribute:
+        product_ids = ProductVariant.objects.filter(
+            pk=instance.variant_id
+        ).values_list("product_id", flat=True)
+    else:
+        product_ids = [instance.product_id]
+    update_products_attribute_value_ids(product_ids)
+    if sender is AssignedProductAttribute:
+        update_products_attribute_sort_keys(product_ids)
+
+
+@receiver(models.signals.post_delete, sender=AttributeValue)
+def remove_attribute_value_id_on_delete(sender, instance, **kwargs):
+    from .utils.attributes import update_products_attribute_sort_keys
+
+    products = Product.objects.filter(attribute_value_ids__contains=[instance.pk])
+    product_ids = list(products.values_list("pk", flat=True))
+    products.update(
+        attribute_value_ids=Func(
+            F("attribute_value_ids"), Value(instance.pk), function="array_remove"
+        ),
+        # The cached fragments of the products rendered the value
+        updated_at=timezone.now(),
+    )
+    update_products_attribute_sort_keys(product_ids)
+
+
+@receiver(models.signals.post_save, sender=AttributeValue)
+def update_attribute_sort_keys_on_value_change(sender, instance, created, **kwargs):
+    """Keep the sort keys in sync with the names and the order of the values."""
+    if created:
+        return
+
+    from .utils.attributes import update_products_attribute_sort_keys
+
+    update_products_attribute_sort_keys(
+        Product.objects.filter(attribute_value_ids__contains=[instance.pk]).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+# The fields of the variants rendered in the cached fragments of their products,
+# the stock changes don't make the fragments stale
+VARIANT_FRAGMENT_FIELDS = {"sku", "name", "currency", "price_override_amount"}
+
+
+@receiver(models.signals.post_save, sender=ProductVariant)
+@receiver(models.signals.post_delete, sender=ProductVariant)
+@receiver(models.signals.post_save, sender=ProductImage)
+@receiver(models.signals.post_delete, sender=ProductImage)
+@receiver(models.signals.post_save, sender=ProductTranslation)
+@receiver(models.signals.post_delete, sender=ProductTranslation)
+def touch_product_on_variant_or_image_change(
+    sender, instance, update_fields=None, **kwargs
+):
+    """Bump the product's `updated_at`, which versions its cached fragments."""
+    if (
+        sender is ProductVariant
+        and update_fields is not None
+        and not VARIANT_FRAGMENT_FIELDS.intersection(update_fields)
+    ):
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(models.signals.post_save, sender=AttributeValue)
+@receiver(models.signals.post_save, sender=AttributeValueTranslation)
+@receiver(models.signals.post_delete, sender=AttributeValueTranslation)
+def touch_products_on_attribute_value_change(sender, instance, created=False, **kwargs):
+    """Bump the `updated_at` of the products rendering the changed value."""
+    if sender is AttributeValue:
+        if created:
+            return
+        value_pk = instance.pk
+    else:
+        value_pk = instance.attribute_value_id
+    Product.objects.filter(attribute_value_ids__contains=[value_pk]).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(models.signals.post_save, sender=Attribute)
+@receiver(models.signals.post_save, sender=AttributeTranslation)
+@receiver(models.signals.post_delete, sender=AttributeTranslation)
+def touch_products_on_attribute_change(sender, instance, created=False, **kwargs):
+    """Bump the `updated_at` of the products rendering the changed attribute."""
+    if sender is Attribute:
+        if created:
+            return
+        attribute_pk = instance.pk
+    else:
+        attribute_pk = instance.attribute_id
+    Product.objects.filter(attributes__assignment__attribute_id=attribute_pk).update(
+        updated_at=timezone.now()
+    )
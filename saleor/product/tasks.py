@@ -2,6 +2,7 @@ from ..celeryconf import app
 from ..discount.models import Sale
 from .models import Attribute, Product, ProductType, ProductVariant
 from .utils.attributes import generate_name_for_variant
+from .utils.bulk_import import finish_products_import
 from .utils.variant_prices import (
     update_product_minimal_variant_price,
     update_products_minimal_variant_prices,
@@ -64,3 +65,8 @@ def update_products_minimal_variant_prices_of_discount_task(discount_pk):
 def update_all_products_minimal_variant_prices_task():
     products = Product.objects.iterator()
     update_products_minimal_variant_prices(products)
+
+
+@app.task
+def finish_products_import_task(product_ids):
+    finish_products_import(product_ids)
@@ -0,0 +1,48 @@
+from django import template
+
+from ..fragment_cache import get_or_set_product_fragment
+
+register = template.Library()
+
+
+class ProductFragmentNode(template.Node):
+    def __init__(self, nodelist, name, product):
+        self.nodelist = nodelist
+        self.name = name
+        self.product = product
+
+    def render(self, context):
+        request = context.get("request")
+        if request is None:
+            return self.nodelist.render(context)
+        return get_or_set_product_fragment(
+            request,
+            self.name.resolve(context),
+            self.product.resolve(context),
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def cache_product_fragment(parser, token):
+    """Cache the enclosed fragment of a product's card or details.
+
+    Usage:
+
+        {% cache_product_fragment "card" product %}
+            ...
+        {% endcache_product_fragment %}
+
+    The fragment must not depend on the user, see `fragment_cache` for what
+    it may depend on.
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            "%r tag requires a fragment name and a product." % bits[0]
+        )
+    nodelist = parser.parse(("endcache_product_fragment",))
+    parser.delete_first_token()
+    return ProductFragmentNode(
+        nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2])
+    )
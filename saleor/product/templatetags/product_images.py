@@ -5,6 +5,9 @@ import warnings
 from django import template
 from django.conf import settings
 from django.templatetags.static import static
+from django.urls import reverse
+
+from ...core.thumbnails import get_rendition_url, is_rendition_created
 
 logger = logging.getLogger(__name__)
 register = template.Library()
@@ -97,7 +100,28 @@ def get_thumbnail(image_file, size, method, rendition_key_set="products"):
     return static(choose_placeholder("%sx%s" % (size, size)))
 
 
+def get_product_image_rendition_url(instance, size_key):
+    """Return the URL of the rendition or of the view creating it on demand."""
+    if is_rendition_created(instance.image, size_key):
+        return get_rendition_url(instance.image, size_key)
+    return reverse(
+        "product:image-thumbnail",
+        kwargs={"image_id": instance.pk, "size_key": size_key},
+    )
+
+
 @register.simple_tag()
 def get_product_image_thumbnail(instance, size, method):
     image_file = instance.image if instance else None
+    if not image_file or not instance.pk:
+        return get_thumbnail(image_file, size, method)
+
+    used_size = get_thumbnail_size(size, method, "products")
+    if used_size is None:
+        return static(choose_placeholder("%sx%s" % (size, size)))
+    size_key = "%s__%s" % (method, used_size)
+    if size_key in AVAILABLE_SIZES["products"]:
+        # Don't create missing renditions while rendering the page,
+        # the view creates each of them once for all the visitors
+        return get_product_image_rendition_url(instance, size_key)
     return get_thumbnail(image_file, size, method)
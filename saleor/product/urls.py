@@ -13,6 +13,11 @@ urlpatterns = [
         views.digital_product,
         name="digital-product",
     ),
+    url(
+        r"^image/(?P<image_id>[0-9]+)/(?P<size_key>[a-z]+__[0-9]+x[0-9]+)/$",
+        views.product_image_thumbnail,
+        name="image-thumbnail",
+    ),
     url(
         r"^category/(?P<slug>[a-z0-9-_]+?)-(?P<category_id>[0-9]+)/$",
         views.category_index,
@@ -1,11 +1,13 @@
 from urllib.parse import urlencode
 
 from django.conf import settings
-from django.db.models import F
+from django.db.models import F, Sum
+from prices import Money
 
 from ...core.taxes import TaxedMoney, zero_taxed_money
 from ...core.utils import get_paginator_items
 from ...core.utils.filters import get_now_sorted_by
+from ..facets import get_product_facets
 from .availability import products_with_availability
 
 import os
@@ -112,8 +114,12 @@ def get_product_list_context(request, filter_set):
     from ..filters import SORT_BY_FIELDS
 
     qs = filter_set.qs
+    facets = None
     if not filter_set.form.is_valid():
         qs = qs.none()
+    else:
+        facets = get_product_facets(qs)
+        filter_set.add_facet_counts(facets)
     products_paginated = get_paginator_items(
         qs, settings.PAGINATE_BY, request.GET.get("page")
     )
@@ -136,6 +142,7 @@ def get_product_list_context(request, filter_set):
         "sort_by_choices": SORT_BY_FIELDS,
         "now_sorted_by": now_sorted_by,
         "is_descending": is_descending,
+        "facets": facets,
     }
 
 
@@ -150,13 +157,18 @@ def collections_visible_to_user(user):
 
 def calculate_revenue_for_variant(variant, start_date):
     """Calculate total revenue generated by a product variant."""
-    revenue = zero_taxed_money()
-    for order_line in variant.order_lines.all():
-        if order_line.order.created >= start_date:
-            net = order_line.unit_price_net * order_line.quantity
-            gross = order_line.unit_price_gross * order_line.quantity
-            revenue += TaxedMoney(net, gross)
-    return revenue
+    # pylint: disable=cyclic-import
+    from ...order.rollups import get_sales_date
+
+    sales = variant.daily_sales.filter(
+        date__gte=get_sales_date(start_date), currency=settings.DEFAULT_CURRENCY
+    ).aggregate(net_amount=Sum("net_amount"), gross_amount=Sum("gross_amount"))
+    if sales["net_amount"] is None:
+        return zero_taxed_money()
+    return TaxedMoney(
+        net=Money(sales["net_amount"], settings.DEFAULT_CURRENCY),
+        gross=Money(sales["gross_amount"], settings.DEFAULT_CURRENCY),
+    )
 
 class RangeFileWrapper(object):
     def __init__(self, filelike, blksize=8192, offset=0, length=None):
@@ -1,4 +1,8 @@
-from typing import Set, Union
+from collections import defaultdict
+from itertools import chain
+from typing import Iterable, Set, Union
+
+from django.db import connection
 
 from ..models import (
     AssignedProductAttribute,
@@ -6,11 +10,30 @@ from ..models import (
     Attribute,
     AttributeValue,
     Product,
+    ProductAttributeSortKey,
     ProductVariant,
 )
 
 AttributeAssignmentType = Union[AssignedProductAttribute, AssignedVariantAttribute]
 
+# The values are concatenated in the order of `AttributeValue._meta.ordering`
+INSERT_ATTRIBUTE_SORT_KEYS = """
+INSERT INTO product_productattributesortkey (product_id, attribute_id, sort_key)
+SELECT
+    assignment.product_id,
+    attribute_product.attribute_id,
+    string_agg(value.name, ',' ORDER BY value.sort_order, value.id)
+FROM product_assignedproductattribute AS assignment
+JOIN product_attributeproduct AS attribute_product
+    ON attribute_product.id = assignment.assignment_id
+JOIN product_assignedproductattribute_values AS assignment_values
+    ON assignment_values.assignedproductattribute_id = assignment.id
+JOIN product_attributevalue AS value
+    ON value.id = assignment_values.attributevalue_id
+WHERE {condition}
+GROUP BY assignment.product_id, attribute_product.attribute_id
+"""
+
 
 def generate_name_for_variant(variant: ProductVariant) -> str:
     """Generate ProductVariant's name based on its attributes."""
@@ -80,4 +103,79 @@ def associate_attribute_values_to_instance(
     # Associate the attribute and the passed values
     assignment = _associate_attribute_to_instance(instance, attribute.pk)
     assignment.values.set(values)
+
+    # The values ids of the product were updated in the database,
+    # don't let saving the loaded product override them
+    if isinstance(instance, Product):
+        instance.refresh_from_db(fields=["attribute_value_ids"])
+    elif ProductVariant.product.is_cached(instance):
+        instance.product.refresh_from_db(fields=["attribute_value_ids"])
     return assignment
+
+
+def get_products_ids_of_assignments(
+    values_through_model, assignment_ids: Iterable[int]
+) -> Set[int]:
+    """Return ids of the products having the given product or variant assignments."""
+    if values_through_model is AssignedProductAttribute.values.through:
+        lookup = "product_id"
+        assignments = AssignedProductAttribute.objects
+    else:
+        lookup = "variant__product_id"
+        assignments = AssignedVariantAttribute.objects
+    return set(assignments.filter(pk__in=assignment_ids).values_list(lookup, flat=True))
+
+
+def update_products_attribute_value_ids(product_ids: Iterable[int]):
+    """Store the ids of the values assigned to the products and their variants."""
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+
+    product_values = AssignedProductAttribute.values.through.objects.filter(
+        assignedproductattribute__product_id__in=product_ids
+    ).values_list("assignedproductattribute__product_id", "attributevalue_id")
+    variant_values = AssignedVariantAttribute.values.through.objects.filter(
+        assignedvariantattribute__variant__product_id__in=product_ids
+    ).values_list("assignedvariantattribute__variant__product_id", "attributevalue_id")
+
+    value_ids = defaultdict(set)
+    for product_id, value_id in chain(product_values, variant_values):
+        value_ids[product_id].add(value_id)
+
+    products = [
+        Product(pk=product_id, attribute_value_ids=sorted(value_ids[product_id]))
+        for product_id in product_ids
+    ]
+    Product.objects.bulk_update(products, ["attribute_value_ids"])
+
+
+def _refresh_attribute_sort_keys(sort_keys, condition: str, ids: Iterable[int]):
+    sort_keys.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_ATTRIBUTE_SORT_KEYS.format(condition=condition), [ids])
+
+
+def update_products_attribute_sort_keys(product_ids: Iterable[int]):
+    """Store the keys the products are sorted by when sorting by an attribute."""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+    _refresh_attribute_sort_keys(
+        ProductAttributeSortKey.objects.filter(product_id__in=product_ids),
+        "assignment.product_id = ANY(%s)",
+        product_ids,
+    )
+
+
+def update_attribute_sort_keys(attribute: Attribute):
+    """Store the keys of all the products when the attribute's values changed.
+
+    Must be called after the values of the attribute were reordered
+    in bulk, as no signals are sent then.
+    """
+    _refresh_attribute_sort_keys(
+        ProductAttributeSortKey.objects.filter(attribute=attribute),
+        "attribute_product.attribute_id = ANY(%s)",
+        [attribute.pk],
+    )
@@ -1,13 +1,15 @@
+import operator
 from collections import namedtuple
 from decimal import Decimal
-from typing import Iterable, Union
+from functools import partial
+from typing import Iterable, List, Union
 
-from prices import TaxedMoneyRange
+from django.utils.functional import SimpleLazyObject
+from prices import MoneyRange, TaxedMoney, TaxedMoneyRange
 
-from saleor.graphql.core.types import MoneyRange
 from saleor.product.models import Product, ProductVariant
 
-from ...core.utils import to_local_currency
+from ...core.utils import get_local_currency_conversion_rate, to_local_currency
 from ...discount import DiscountInfo
 from ...extensions.manager import get_extensions_manager
 from .. import ProductAvailabilityStatus, VariantAvailabilityStatus
@@ -42,12 +44,26 @@ VariantAvailability = namedtuple(
 def products_with_availability(
     products, discounts, country, local_currency, extensions
 ):
-    for product in products:
+    """Yield the products with their availability.
+
+    The availability of all the products is computed in one batch when any of
+    them is read, so it isn't computed at all when their cards are cached.
+    """
+    products = list(products)
+    availabilities = SimpleLazyObject(
+        partial(
+            get_products_availability,
+            products,
+            discounts,
+            country,
+            local_currency,
+            extensions=extensions,
+        )
+    )
+    for index, product in enumerate(products):
         yield (
             product,
-            get_product_availability(
-                product, discounts, country, local_currency, extensions=extensions
-            ),
+            SimpleLazyObject(partial(operator.getitem, availabilities, index)),
         )
 
 
@@ -102,13 +118,18 @@ def _get_product_price_range(
     discounted: Union[MoneyRange, TaxedMoneyRange],
     undiscounted: Union[MoneyRange, TaxedMoneyRange],
     local_currency: str = None,
+    conversion_rate: Decimal = None,
 ):
     price_range_local = None
     discount_local_currency = None
 
     if local_currency:
-        price_range_local = to_local_currency(discounted, local_currency)
-        undiscounted_local = to_local_currency(undiscounted, local_currency)
+        price_range_local = to_local_currency(
+            discounted, local_currency, conversion_rate=conversion_rate
+        )
+        undiscounted_local = to_local_currency(
+            undiscounted, local_currency, conversion_rate=conversion_rate
+        )
         if undiscounted_local and undiscounted_local.start > price_range_local.start:
             discount_local_currency = undiscounted_local.start - price_range_local.start
 
@@ -127,26 +148,100 @@ def get_product_availability(
         extensions = get_extensions_manager()
     discounted_net_range = product.get_price_range(discounts=discounts)
     undiscounted_net_range = product.get_price_range()
-    discounted = TaxedMoneyRange(
-        start=extensions.apply_taxes_to_product(
-            product, discounted_net_range.start, country
-        ),
-        stop=extensions.apply_taxes_to_product(
-            product, discounted_net_range.stop, country
-        ),
+    prices = extensions.apply_taxes_to_products(
+        product,
+        [
+            discounted_net_range.start,
+            discounted_net_range.stop,
+            undiscounted_net_range.start,
+            undiscounted_net_range.stop,
+        ],
+        country,
     )
-    undiscounted = TaxedMoneyRange(
-        start=extensions.apply_taxes_to_product(
-            product, undiscounted_net_range.start, country
-        ),
-        stop=extensions.apply_taxes_to_product(
-            product, undiscounted_net_range.stop, country
-        ),
+    return _get_product_availability(product, prices, local_currency)
+
+
+def get_products_availability(
+    products: Iterable[Product],
+    discounts: Iterable[DiscountInfo] = None,
+    country=None,
+    local_currency=None,
+    extensions=None,
+) -> List[ProductAvailability]:
+    """Return the availability of several products.
+
+    The taxes of all the price ranges are applied in a single call of the plugins
+    and the exchange rate to the local currency is looked up once.
+    """
+    if not extensions:
+        extensions = get_extensions_manager()
+    products = list(products)
+    if not products:
+        return []
+
+    prices = []
+    for product in products:
+        discounted_net_range, undiscounted_net_range = _get_price_ranges(
+            product, discounts
+        )
+        prices.append(
+            [
+                discounted_net_range.start,
+                discounted_net_range.stop,
+                undiscounted_net_range.start,
+                undiscounted_net_range.stop,
+            ]
+        )
+    taxed_prices = extensions.apply_taxes_to_products_prices(products, prices, country)
+
+    conversion_rates = {}
+    availabilities = []
+    for product, product_prices in zip(products, taxed_prices):
+        conversion_rate = None
+        if local_currency:
+            currency = product_prices[0].currency
+            if currency not in conversion_rates:
+                conversion_rates[currency] = get_local_currency_conversion_rate(
+                    currency, local_currency
+                )
+            conversion_rate = conversion_rates[currency]
+        # The prices aren't converted when there is no exchange rate
+        availabilities.append(
+            _get_product_availability(
+                product,
+                product_prices,
+                local_currency if conversion_rate else None,
+                conversion_rate,
+            )
+        )
+    return availabilities
+
+
+def _get_price_ranges(product: Product, discounts: Iterable[DiscountInfo] = None):
+    """Return the discounted and the undiscounted price ranges of the product."""
+    variants = product.variants.all()
+    if not variants:
+        return product.get_price_range(discounts), product.get_price_range()
+    discounted = [variant.get_price(discounts) for variant in variants]
+    undiscounted = [variant.get_price() for variant in variants]
+    return (
+        MoneyRange(min(discounted), max(discounted)),
+        MoneyRange(min(undiscounted), max(undiscounted)),
     )
 
+
+def _get_product_availability(
+    product: Product,
+    prices: List[TaxedMoney],
+    local_currency: str = None,
+    conversion_rate: Decimal = None,
+) -> ProductAvailability:
+    discounted = TaxedMoneyRange(start=prices[0], stop=prices[1])
+    undiscounted = TaxedMoneyRange(start=prices[2], stop=prices[3])
+
     discount = _get_total_discount(undiscounted, discounted)
     price_range_local, discount_local_currency = _get_product_price_range(
-        discounted, undiscounted, local_currency
+        discounted, undiscounted, local_currency, conversion_rate
     )
 
     is_on_sale = product.is_visible and discount is not None
@@ -172,11 +267,10 @@ def get_variant_availability(
 
     if not extensions:
         extensions = get_extensions_manager()
-    discounted = extensions.apply_taxes_to_product(
-        variant.product, variant.get_price(discounts=discounts), country
-    )
-    undiscounted = extensions.apply_taxes_to_product(
-        variant.product, variant.get_price(), country
+    discounted, undiscounted = extensions.apply_taxes_to_products(
+        variant.product,
+        [variant.get_price(discounts=discounts), variant.get_price()],
+        country,
     )
 
     discount = _get_total_discount(undiscounted, discounted)
@@ -0,0 +1,681 @@
+"""Import products with their variants in bulk.
+
+The rows are validated in batches against lookups fetched once per batch, so
+there is no query per category, product type or attribute value, and they are
+written with `bulk_create`. No signals are sent, so the work done on saving a
+single product, the minimal variant prices, the search index and the
+thumbnails, is done once for all the imported products by
+`finish_products_import`.
+
+A row describes a product and its variants:
+
+    {
+        "name": "Juice",
+        "description": "Fresh juice.",
+        "category": "<slug of the category>",
+        "product_type": "<name of the product type>",
+        "price": "10.00",
+        "is_published": true,
+        "charge_taxes": true,
+        "attributes": [{"slug": "<slug of the attribute>", "values": ["Apple"]}],
+        "images": ["<path of an image already in the storage>"],
+        "variants": [
+            {
+                "sku": "JUICE-1L",
+                "name": "1l",
+                "price_override": "12.00",
+                "cost_price": "5.00",
+                "quantity": 10,
+                "track_inventory": true,
+                "attributes": [{"slug": "<slug of the attribute>", "values": ["1l"]}],
+            }
+        ],
+    }
+
+The missing attribute values are created, like when assigning the values of
+a single product.
+"""
+import csv
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max
+from django.template.defaultfilters import slugify
+
+from ...core.thumbnails import warm_thumbnails
+from ..error_codes import ProductErrorCode
+from ..models import (
+    AssignedProductAttribute,
+    AssignedVariantAttribute,
+    AttributeProduct,
+    AttributeValue,
+    AttributeVariant,
+    Category,
+    Product,
+    ProductImage,
+    ProductType,
+    ProductVariant,
+)
+from .attributes import update_products_attribute_sort_keys
+from .variant_prices import update_products_minimal_variant_prices
+
+BATCH_SIZE = 1000
+
+# The lists of values in a CSV cell are separated by this character
+CSV_SEPARATOR = "|"
+CSV_PRODUCT_ATTRIBUTE_PREFIX = "attribute:"
+CSV_VARIANT_ATTRIBUTE_PREFIX = "variant-attribute:"
+CSV_VARIANT_COLUMNS = [
+    "sku",
+    "variant_name",
+    "price_override",
+    "cost_price",
+    "quantity",
+    "track_inventory",
+]
+
+# The values of the boolean fields read from the files
+BOOLEAN_VALUES = {"1": True, "true": True, "yes": True, "0": False, "false": False}
+
+AttributeAssignment = Union[AttributeProduct, AttributeVariant]
+Errors = Dict[str, List[ValidationError]]
+
+
+class ProductImportError(ValueError):
+    """Raised when the imported file can't be read."""
+
+
+@dataclass
+class CleanedVariant:
+    variant: ProductVariant
+    # The attributes of the variant with the names of their values
+    attributes: List[Tuple[AttributeVariant, List[str]]]
+
+
+@dataclass
+class CleanedProduct:
+    product: Product
+    # The attributes of the product with the names of their values
+    attributes: List[Tuple[AttributeProduct, List[str]]]
+    variants: List[CleanedVariant]
+    images: List[str]
+
+
+class ImportLookups:
+    """The objects the rows of a batch refer to, fetched in a few queries."""
+
+    def __init__(self, rows: List[dict]):
+        category_slugs = {row.get("category") for row in rows}
+        type_names = {row.get("product_type") for row in rows}
+        skus = {
+            variant.get("sku")
+            for row in rows
+            for variant in row.get("variants") or []
+            if isinstance(variant, dict) and variant.get("sku")
+        }
+
+        # Neither the slugs of the categories nor the names of the product types
+        # are unique, the oldest object is used
+        self.categories: Dict[str, Category] = {}
+        for category in Category.objects.filter(slug__in=category_slugs).order_by("pk"):
+            self.categories.setdefault(category.slug, category)
+        self.product_types: Dict[str, ProductType] = {}
+        for product_type in ProductType.objects.filter(name__in=type_names).order_by(
+            "pk"
+        ):
+            self.product_types.setdefault(product_type.name, product_type)
+
+        type_ids = [product_type.pk for product_type in self.product_types.values()]
+        self.product_attributes = self._get_assignments(AttributeProduct, type_ids)
+        self.variant_attributes = self._get_assignments(AttributeVariant, type_ids)
+        self.existing_skus = set(
+            ProductVariant.objects.filter(sku__in=skus).values_list("sku", flat=True)
+        )
+
+    @staticmethod
+    def _get_assignments(model, type_ids) -> Dict[int, Dict[str, AttributeAssignment]]:
+        """Return the attributes of the product types by their slugs."""
+        assignments: Dict[int, Dict[str, AttributeAssignment]] = defaultdict(dict)
+        for assignment in model.objects.filter(
+            product_type_id__in=type_ids
+        ).select_related("attribute"):
+            assignments[assignment.product_type_id][
+                assignment.attribute.slug
+            ] = assignment
+        return assignments
+
+
+class ProductBulkImporter:
+    """Validate and save the rows, collecting the errors of all of them.
+
+    The errors are stored by the field, with the index of the row in the
+    `index` param. The SKUs of the valid rows are remembered, so the duplicates
+    are found across the batches.
+    """
+
+    def __init__(self):
+        self.errors: Errors = defaultdict(list)
+        self.seen_skus: Set[str] = set()
+        self.num_errors = 0
+
+    def add_error(self, field: str, message: str, code: ProductErrorCode, index: int):
+        self.errors[field].append(
+            ValidationError(message, code=code, params={"index": index})
+        )
+        self.num_errors += 1
+
+    def clean(self, rows: List[dict], first_index: int = 0) -> List[CleanedProduct]:
+        """Return the valid rows of the batch, ready to be saved."""
+        rows = [row if isinstance(row, dict) else {} for row in rows]
+        lookups = ImportLookups(rows)
+        cleaned = []
+        for index, row in enumerate(rows, first_index):
+            num_errors = self.num_errors
+            cleaned_product = self.clean_product(row, index, lookups)
+            if self.num_errors == num_errors:
+                cleaned.append(cleaned_product)
+                self.seen_skus.update(
+                    cleaned_variant.variant.sku
+                    for cleaned_variant in cleaned_product.variants
+                    if cleaned_variant.variant.sku
+                )
+        return cleaned
+
+    def clean_product(self, row: dict, index: int, lookups: ImportLookups):
+        name = (row.get("name") or "").strip()
+        if not name:
+            self.add_error(
+                "name", "This field is required.", ProductErrorCode.REQUIRED, index
+            )
+        category = lookups.categories.get(row.get("category"))
+        if category is None:
+            self.add_error(
+                "category",
+                "Category %r doesn't exist." % row.get("category"),
+                ProductErrorCode.NOT_FOUND,
+                index,
+            )
+        product_type = lookups.product_types.get(row.get("product_type"))
+        if product_type is None:
+            self.add_error(
+                "product_type",
+                "Product type %r doesn't exist." % row.get("product_type"),
+                ProductErrorCode.NOT_FOUND,
+                index,
+            )
+        price = self.clean_decimal(row.get("price"), "price", index, required=True)
+
+        product = Product(
+            name=name,
+            description=row.get("description") or "",
+            category_id=category.pk if category else None,
+            currency=settings.DEFAULT_CURRENCY,
+            price_amount=price,
+            # Updated from the prices of the variants after the import
+            minimal_variant_price_amount=price,
+        )
+        for field in ("is_published", "charge_taxes"):
+            value = self.clean_bool(row.get(field), field, index)
+            if value is not None:
+                setattr(product, field, value)
+
+        images = row.get("images") or []
+        if not isinstance(images, list) or not all(
+            isinstance(image, str) and image for image in images
+        ):
+            self.add_error(
+                "images", "Enter a list of paths.", ProductErrorCode.INVALID, index
+            )
+
+        if product_type is None:
+            return None
+        attributes = self.clean_attributes(
+            row.get("attributes"),
+            lookups.product_attributes[product_type.pk],
+            "attributes",
+            index,
+        )
+        variants = self.clean_variants(
+            row.get("variants") or [], product_type, index, lookups
+        )
+        return CleanedProduct(product, attributes, variants, images)
+
+    def clean_attributes(
+        self, attributes, assignments: Dict[str, AttributeAssignment], field, index
+    ) -> List[Tuple[AttributeAssignment, List[str]]]:
+        if not isinstance(attributes, list):
+            attributes = []
+        cleaned = []
+        assigned_slugs = set()
+        for attribute in attributes:
+            slug = attribute.get("slug") if isinstance(attribute, dict) else None
+            assignment = assignments.get(slug)
+            if assignment is None:
+                self.add_error(
+                    field,
+                    "Attribute %r can't be assigned, it doesn't belong "
+                    "to the product type." % slug,
+                    ProductErrorCode.ATTRIBUTE_CANNOT_BE_ASSIGNED,
+                    index,
+                )
+                continue
+            if slug in assigned_slugs:
+                self.add_error(
+                    field,
+                    "Attribute %r is assigned more than once." % slug,
+                    ProductErrorCode.ATTRIBUTE_ALREADY_ASSIGNED,
+                    index,
+                )
+                continue
+            assigned_slugs.add(slug)
+
+            values = attribute.get("values") or []
+            if not isinstance(values, list):
+                self.add_error(
+                    field,
+                    "Values of attribute %r must be a list." % slug,
+                    ProductErrorCode.INVALID,
+                    index,
+                )
+                continue
+
+            names = {}
+            for name in values:
+                name = str(name).strip()
+                value_slug = slugify(name)
+                if name and not value_slug:
+                    self.add_error(
+                        field,
+                        "Value %r of attribute %r is not valid." % (name, slug),
+                        ProductErrorCode.INVALID,
+                        index,
+                    )
+                # The values with the same slug are the same value
+                elif name:
+                    names.setdefault(value_slug, name)
+            if names:
+                cleaned.append((assignment, list(names.values())))
+
+        assigned_slugs = {assignment.attribute.slug for assignment, _names in cleaned}
+        for slug, assignment in assignments.items():
+            if assignment.attribute.value_required and slug not in assigned_slugs:
+                self.add_error(
+                    field,
+                    "Attribute %r requires a value." % slug,
+                    ProductErrorCode.REQUIRED,
+                    index,
+                )
+        return cleaned
+
+    def clean_variants(
+        self, variants, product_type: ProductType, index: int, lookups: ImportLookups
+    ) -> List[CleanedVariant]:
+        if not isinstance(variants, list) or not all(
+            isinstance(variant, dict) for variant in variants
+        ):
+            self.add_error(
+                "variants", "Enter a list of variants.", ProductErrorCode.INVALID, index
+            )
+            return []
+        if not product_type.has_variants and len(variants) != 1:
+            self.add_error(
+                "variants",
+                "Product type %r doesn't have variants, "
+                "exactly one variant must be created." % product_type.name,
+                ProductErrorCode.ATTRIBUTE_VARIANTS_DISABLED,
+                index,
+            )
+
+        cleaned = []
+        skus: Set[str] = set()
+        for data in variants:
+            sku = str(data.get("sku") or "").strip() or None
+            if sku in self.seen_skus or sku in lookups.existing_skus or sku in skus:
+                self.add_error(
+                    "sku",
+                    "SKU %r is already used." % sku,
+                    ProductErrorCode.UNIQUE,
+                    index,
+                )
+            elif sku:
+                skus.add(sku)
+
+            attributes = self.clean_attributes(
+                data.get("attributes"),
+                lookups.variant_attributes[product_type.pk],
+                "variant_attributes",
+                index,
+            )
+            name = str(data.get("name") or "").strip() or " / ".join(
+                ", ".join(names) for _assignment, names in attributes
+            )
+            quantity = self.clean_quantity(data.get("quantity"), index)
+            track_inventory = self.clean_bool(
+                data.get("track_inventory"), "track_inventory", index
+            )
+            variant = ProductVariant(
+                sku=sku,
+                name=name,
+                currency=settings.DEFAULT_CURRENCY,
+                price_override_amount=self.clean_decimal(
+                    data.get("price_override"), "price_override", index
+                ),
+                cost_price_amount=self.clean_decimal(
+                    data.get("cost_price"), "cost_price", index
+                ),
+                quantity=quantity,
+                quantity_allocated=0,
+                track_inventory=True if track_inventory is None else track_inventory,
+            )
+            cleaned.append(CleanedVariant(variant, attributes))
+        return cleaned
+
+    def clean_decimal(self, value, field, index, required=False) -> Optional[Decimal]:
+        if value is None or value == "":
+            if required:
+                self.add_error(
+                    field, "This field is required.", ProductErrorCode.REQUIRED, index
+                )
+            return None
+        try:
+            amount = Decimal(str(value).strip())
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite() or amount < 0:
+            self.add_error(
+                field, "Enter a positive number.", ProductErrorCode.INVALID, index
+            )
+            return None
+        return amount
+
+    def clean_quantity(self, value, index) -> int:
+        if value is None or value == "":
+            return 0
+        try:
+            quantity = int(value)
+        except (TypeError, ValueError):
+            quantity = -1
+        if quantity < 0:
+            self.add_error(
+                "quantity", "Enter a positive integer.", ProductErrorCode.INVALID, index
+            )
+        return quantity
+
+    def clean_bool(self, value, field, index) -> Optional[bool]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, bool):
+            return value
+        value = str(value).strip().lower()
+        if value in BOOLEAN_VALUES:
+            return BOOLEAN_VALUES[value]
+        self.add_error(field, "Enter true or false.", ProductErrorCode.INVALID, index)
+        return None
+
+    @transaction.atomic
+    def save(self, cleaned: List[CleanedProduct]) -> List[Product]:
+        """Save the cleaned rows in a few queries."""
+        values = get_or_create_attribute_values(
+            chain.from_iterable(
+                chain(
+                    item.attributes, *(variant.attributes for variant in item.variants)
+                )
+                for item in cleaned
+            )
+        )
+        for item in cleaned:
+            # The filters read the values from the product, there are no signals
+            # to set them when the assignments are bulk created
+            item.product.attribute_value_ids = sorted(
+                {
+                    values[assignment.attribute_id, slugify(name)].pk
+                    for assignment, names in chain(
+                        item.attributes,
+                        *(variant.attributes for variant in item.variants),
+                    )
+                    for name in names
+                }
+            )
+        # The primary keys are set by `bulk_create` on PostgreSQL
+        products = Product.objects.bulk_create([item.product for item in cleaned])
+
+        for item in cleaned:
+            for cleaned_variant in item.variants:
+                cleaned_variant.variant.product = item.product
+        ProductVariant.objects.bulk_create(
+            [
+                cleaned_variant.variant
+                for item in cleaned
+                for cleaned_variant in item.variants
+            ]
+        )
+
+        _assign_values(
+            AssignedProductAttribute,
+            [
+                (item.product, assignment, names)
+                for item in cleaned
+                for assignment, names in item.attributes
+            ],
+            values,
+        )
+        _assign_values(
+            AssignedVariantAttribute,
+            [
+                (cleaned_variant.variant, assignment, names)
+                for item in cleaned
+                for cleaned_variant in item.variants
+                for assignment, names in cleaned_variant.attributes
+            ],
+            values,
+        )
+        ProductImage.objects.bulk_create(
+            [
+                ProductImage(product=item.product, image=image, sort_order=sort_order)
+                for item in cleaned
+                for sort_order, image in enumerate(item.images)
+            ]
+        )
+        update_products_attribute_sort_keys(product.pk for product in products)
+        return products
+
+
+def get_or_create_attribute_values(
+    assignments: Iterable[Tuple[AttributeAssignment, List[str]]]
+) -> Dict[Tuple[int, str], AttributeValue]:
+    """Return the values by their attribute and slug, creating the missing ones."""
+    names: Dict[Tuple[int, str], str] = {}
+    for assignment, value_names in assignments:
+        for name in value_names:
+            names.setdefault((assignment.attribute_id, slugify(name)), name)
+    if not names:
+        return {}
+
+    attribute_ids = {attribute_id for attribute_id, _slug in names}
+    slugs = {slug for _attribute_id, slug in names}
+
+    def get_values():
+        return {
+            (value.attribute_id, value.slug): value
+            for value in AttributeValue.objects.filter(
+                attribute_id__in=attribute_ids, slug__in=slugs
+            )
+        }
+
+    values = get_values()
+    missing = [key for key in names if key not in values]
+    if missing:
+        max_sort_orders = dict(
+            AttributeValue.objects.filter(attribute_id__in=attribute_ids)
+            .order_by()
+            .values("attribute_id")
+            .annotate(max_sort_order=Max("sort_order"))
+            .values_list("attribute_id", "max_sort_order")
+        )
+        new_values = []
+        for attribute_id, slug in missing:
+            sort_order = max_sort_orders.get(attribute_id)
+            sort_order = 0 if sort_order is None else sort_order + 1
+            max_sort_orders[attribute_id] = sort_order
+            new_values.append(
+                AttributeValue(
+                    attribute_id=attribute_id,
+                    slug=slug,
+                    name=names[attribute_id, slug],
+                    sort_order=sort_order,
+                )
+            )
+        # The values created concurrently are fetched again below
+        AttributeValue.objects.bulk_create(new_values, ignore_conflicts=True)
+        values = get_values()
+    return values
+
+
+def _assign_values(model, assignments, values: Dict[Tuple[int, str], AttributeValue]):
+    """Bulk create the assignments of the attributes and their values."""
+    owner_field = "product" if model is AssignedProductAttribute else "variant"
+    instances = model.objects.bulk_create(
+        [
+            model(**{owner_field: owner, "assignment": assignment})
+            for owner, assignment, _names in assignments
+        ]
+    )
+    through = model.values.through
+    through.objects.bulk_create(
+        [
+            through(
+                **{
+                    "%s_id" % model._meta.model_name: instance.pk,
+                    "attributevalue_id": values[
+                        assignment.attribute_id, slugify(name)
+                    ].pk,
+                }
+            )
+            for instance, (_owner, assignment, names) in zip(instances, assignments)
+            for name in names
+        ]
+    )
+
+
+def _get_batches(rows: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
+
+
+def import_products(
+    rows: Iterable[dict], batch_size: int = BATCH_SIZE
+) -> Tuple[List[int], Errors]:
+    """Import the valid rows in batches.
+
+    Return the ids of the imported products and the errors of the rows that
+    were not imported. `finish_products_import` must be run for the imported
+    products afterwards.
+    """
+    importer = ProductBulkImporter()
+    product_ids: List[int] = []
+    first_index = 0
+    for batch in _get_batches(rows, batch_size):
+        products = importer.save(importer.clean(batch, first_index))
+        product_ids.extend(product.pk for product in products)
+        first_index += len(batch)
+    return product_ids, importer.errors
+
+
+def finish_products_import(product_ids: List[int], batch_size: int = BATCH_SIZE):
+    """Do the work skipped by the bulk import once for all the imported products."""
+    for start in range(0, len(product_ids), batch_size):
+        end = start + batch_size
+        products = Product.objects.filter(pk__in=product_ids[start:end])
+        products = products.prefetch_related("variants__product")
+        update_products_minimal_variant_prices(products)
+        if settings.ES_URL:
+            from ...search.documents import ProductDocument
+
+            ProductDocument().update(products)
+
+    image_pks = ProductImage.objects.filter(product_id__in=product_ids).values_list(
+        "pk", flat=True
+    )
+    warm_thumbnails(ProductImage, list(image_pks), rendition_key_set="products")
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(CSV_SEPARATOR) if item.strip()]
+
+
+def _read_csv_attributes(row: dict, prefix: str) -> List[dict]:
+    return [
+        {"slug": column.split(":", 1)[1], "values": _split(value)}
+        for column, value in row.items()
+        if column and column.startswith(prefix) and _split(value)
+    ]
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[dict]:
+    """Yield the products of a CSV file with a row per variant.
+
+    The consecutive rows with the same value in the "product" column are the
+    variants of a single product, its fields are read from the first of them.
+    The "attribute:<slug>" and "variant-attribute:<slug>" columns hold the
+    values of the attributes of the product and of the variant, the lists of
+    values and the "images" are separated by "|".
+    """
+    product = None
+    product_key = None
+    for row in csv.DictReader(lines):
+        key = row.get("product")
+        if product is None or not key or key != product_key:
+            if product is not None:
+                yield product
+            product_key = key
+            product = {
+                "name": row.get("name"),
+                "description": row.get("description"),
+                "category": row.get("category"),
+                "product_type": row.get("product_type"),
+                "price": row.get("price"),
+                "is_published": row.get("is_published"),
+                "charge_taxes": row.get("charge_taxes"),
+                "attributes": _read_csv_attributes(row, CSV_PRODUCT_ATTRIBUTE_PREFIX),
+                "images": _split(row.get("images")),
+                "variants": [],
+            }
+        variant_attributes = _read_csv_attributes(row, CSV_VARIANT_ATTRIBUTE_PREFIX)
+        if variant_attributes or any(row.get(column) for column in CSV_VARIANT_COLUMNS):
+            product["variants"].append(
+                {
+                    "sku": row.get("sku"),
+                    "name": row.get("variant_name"),
+                    "price_override": row.get("price_override"),
+                    "cost_price": row.get("cost_price"),
+                    "quantity": row.get("quantity"),
+                    "track_inventory": row.get("track_inventory"),
+                    "attributes": variant_attributes,
+                }
+            )
+    if product is not None:
+        yield product
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[dict]:
+    """Yield the products of a file with a JSON object per line."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            raise ProductImportError("Line %d is not valid JSON." % number)
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
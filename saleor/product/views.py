@@ -6,6 +6,7 @@ from typing import Union
 
 from django.http import (
     FileResponse,
+    Http404,
     HttpResponseNotFound,
     HttpResponsePermanentRedirect,
     HttpResponseForbidden,
@@ -15,6 +16,7 @@ from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
 from draftjs_sanitizer import SafeJSONEncoder
 from django.contrib.auth.decorators import login_required
 
@@ -23,11 +25,13 @@ from ..checkout.utils import (
     get_or_create_checkout_from_request,
     set_checkout_cookie,
 )
+from ..core.thumbnails import create_rendition, get_rendition_keys
 from ..core.utils import serialize_decimal
 from ..seo.schema.product import product_json_ld
 from .filters import ProductCategoryFilter, ProductCollectionFilter, ProductGeneralFilter
 from .forms import ProductForm
-from .models import Category, DigitalContentUrl, Product
+from .fragment_cache import get_or_set_product_fragment
+from .models import Category, DigitalContentUrl, Product, ProductImage
 from .utils import (
     collections_visible_to_user,
     get_product_images,
@@ -114,26 +118,29 @@ def product_details(request, slug, product_id, form=None):
             country=request.country,
             extensions=request.extensions,
         )
-    availability = get_product_availability(
-        product,
-        discounts=request.discounts,
-        country=request.country,
-        local_currency=request.currency,
-        extensions=request.extensions,
+    # The availability and the structured data are only computed when the
+    # fragments rendering them are not cached
+    availability = SimpleLazyObject(
+        lambda: get_product_availability(
+            product,
+            discounts=request.discounts,
+            country=request.country,
+            local_currency=request.currency,
+            extensions=request.extensions,
+        )
     )
     product_images = get_product_images(product)
-    variant_picker_data = get_variant_picker_data(
+    variant_picker = get_or_set_product_fragment(
+        request,
+        "variant-picker",
         product,
-        request.discounts,
-        request.extensions,
-        request.currency,
-        request.country,
+        lambda: get_variant_picker_context(request, product),
     )
-    # show_variant_picker determines if variant picker is used or select input
-    show_variant_picker = all(
-        [v["attributes"] for v in variant_picker_data["variants"]]
+    json_ld_data = SimpleLazyObject(
+        lambda: json.dumps(
+            product_json_ld(product), default=serialize_decimal, cls=SafeJSONEncoder
+        )
     )
-    json_ld_data = product_json_ld(product)
     ctx = {
         "description_json": product.translated.description_json,
         "description_html": product.translated.description,
@@ -142,16 +149,31 @@ def product_details(request, slug, product_id, form=None):
         "availability": availability,
         "product": product,
         "product_images": product_images,
+        "json_ld_product_data": json_ld_data,
+        "product_purchased": is_product_purchased(request, product_id),
+        **variant_picker,
+    }
+    return TemplateResponse(request, "product/details.html", ctx)
+
+
+def get_variant_picker_context(request, product):
+    variant_picker_data = get_variant_picker_data(
+        product,
+        request.discounts,
+        request.extensions,
+        request.currency,
+        request.country,
+    )
+    # show_variant_picker determines if variant picker is used or select input
+    show_variant_picker = all(
+        [v["attributes"] for v in variant_picker_data["variants"]]
+    )
+    return {
         "show_variant_picker": show_variant_picker,
         "variant_picker_data": json.dumps(
             variant_picker_data, default=serialize_decimal, cls=SafeJSONEncoder
         ),
-        "json_ld_product_data": json.dumps(
-            json_ld_data, default=serialize_decimal, cls=SafeJSONEncoder
-        ),
-        "product_purchased": is_product_purchased(request, product_id)
     }
-    return TemplateResponse(request, "product/details.html", ctx)
 
 
 def digital_product(request, token: str) -> Union[FileResponse, HttpResponseNotFound]:
@@ -179,6 +201,14 @@ def digital_product(request, token: str) -> Union[FileResponse, HttpResponseNotF
     return response
 
 
+def product_image_thumbnail(request, image_id, size_key):
+    """Redirect to the rendition of the product image, creating it if missing."""
+    if size_key not in get_rendition_keys("products"):
+        raise Http404("Unknown rendition: %s" % size_key)
+    image = get_object_or_404(ProductImage, pk=image_id)
+    return redirect(create_rendition(image.image, size_key))
+
+
 def product_add_to_checkout(request, slug, product_id):
     # types: (int, str, dict) -> None
 
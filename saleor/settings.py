@@ -175,6 +175,7 @@ context_processors = [
     "saleor.checkout.context_processors.checkout_counter",
     "saleor.core.context_processors.search_enabled",
     "saleor.site.context_processors.site",
+    "saleor.site.context_processors.navigation",
     "social_django.context_processors.backends",
     "social_django.context_processors.login_redirect",
 ]
@@ -377,6 +378,9 @@ COUNTRIES_OVERRIDE = {
 
 OPENEXCHANGERATES_API_KEY = os.environ.get("OPENEXCHANGERATES_API_KEY")
 
+# Number of client networks whose countries are memoized by each process
+GEOIP_CACHE_SIZE = int(os.environ.get("GEOIP_CACHE_SIZE", 10000))
+
 # VAT configuration
 # Enabling vat requires valid vatlayer access key.
 # If you are subscribed to a paid vatlayer plan, you can enable HTTPS.
@@ -389,6 +393,8 @@ AVATAX_PASSWORD_OR_LICENSE = os.environ.get("AVATAX_PASSWORD_OR_LICENSE")
 AVATAX_USE_SANDBOX = get_bool_from_env("AVATAX_USE_SANDBOX", DEBUG)
 AVATAX_COMPANY_NAME = os.environ.get("AVATAX_COMPANY_NAME", "DEFAULT")
 AVATAX_AUTOCOMMIT = get_bool_from_env("AVATAX_AUTOCOMMIT", False)
+# Overrides the Avatax API URL, e.g. to point it at a local fake Avatax server
+AVATAX_API_URL = os.environ.get("AVATAX_API_URL")
 
 ACCOUNT_ACTIVATION_DAYS = 3
 
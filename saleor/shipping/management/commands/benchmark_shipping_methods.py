@@ -0,0 +1,124 @@
+import random
+import timeit
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django_countries import countries
+from measurement.measures import Weight
+from prices import Money
+
+from ... import ShippingMethodType
+from ...models import ShippingMethod, ShippingZone
+from ...utils import get_applicable_shipping_methods, get_shipping_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure resolving the applicable shipping methods with queries and from "
+        "the shipping table. The generated zones are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--zones", type=int, default=50, help="Number of shipping zones."
+        )
+        parser.add_argument(
+            "--methods", type=int, default=10, help="Number of methods per zone."
+        )
+        parser.add_argument(
+            "--lookups", type=int, default=1000, help="Number of measured lookups."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated zones."
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            self.create_zones(rng, options)
+            lookups = [
+                (
+                    Money(Decimal(rng.randint(0, 500)), settings.DEFAULT_CURRENCY),
+                    Weight(kg=rng.randint(0, 50)),
+                    rng.choice(list(countries)).code,
+                )
+                for _ in range(options["lookups"])
+            ]
+
+            queryset_time, queryset_queries = self.measure(
+                lambda price, weight, code: list(
+                    ShippingMethod.objects.applicable_shipping_methods(
+                        price, weight, code
+                    )
+                ),
+                lookups,
+            )
+            # Build the table once, like the first request of a process does
+            get_shipping_table()
+            table_time, table_queries = self.measure(
+                get_applicable_shipping_methods, lookups
+            )
+            transaction.set_rollback(True)
+
+        for name, total_time, queries in (
+            ("Queryset", queryset_time, queryset_queries),
+            ("Shipping table", table_time, table_queries),
+        ):
+            self.stdout.write(
+                "%s: %.1f µs/lookup, %.2f queries/lookup"
+                % (name, total_time / len(lookups) * 10 ** 6, queries / len(lookups))
+            )
+
+    def create_zones(self, rng, options):
+        country_codes = [country.code for country in countries]
+        zones = [
+            ShippingZone.objects.create(
+                name="Benchmark zone %d" % number,
+                countries=rng.sample(country_codes, rng.randint(1, 10)),
+            )
+            for number in range(options["zones"])
+        ]
+        if not ShippingZone.objects.filter(default=True).exists():
+            ShippingZone.objects.create(name="Benchmark default zone", default=True)
+        methods = []
+        for zone in zones:
+            for number in range(options["methods"]):
+                min_value = rng.randint(0, 100)
+                if rng.random() < 0.5:
+                    methods.append(
+                        ShippingMethod(
+                            name="Price %d" % number,
+                            shipping_zone=zone,
+                            type=ShippingMethodType.PRICE_BASED,
+                            price_amount=Decimal(rng.randint(1, 50)),
+                            minimum_order_price_amount=Decimal(min_value),
+                            maximum_order_price_amount=Decimal(min_value + 300),
+                            currency=settings.DEFAULT_CURRENCY,
+                        )
+                    )
+                else:
+                    methods.append(
+                        ShippingMethod(
+                            name="Weight %d" % number,
+                            shipping_zone=zone,
+                            type=ShippingMethodType.WEIGHT_BASED,
+                            price_amount=Decimal(rng.randint(1, 50)),
+                            minimum_order_weight=Weight(kg=min_value // 10),
+                            maximum_order_weight=None,
+                            currency=settings.DEFAULT_CURRENCY,
+                        )
+                    )
+        ShippingMethod.objects.bulk_create(methods, batch_size=1000)
+
+    def measure(self, get_methods, lookups):
+        with CaptureQueriesContext(connection) as queries:
+            total_time = timeit.timeit(
+                lambda: [
+                    get_methods(price, weight, code) for price, weight, code in lookups
+                ],
+                number=1,
+            )
+        return total_time, len(queries)
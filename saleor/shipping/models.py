@@ -4,6 +4,7 @@ from django.conf import settings
 from django.contrib.postgres.fields import JSONField
 from django.db import models
 from django.db.models import Q
+from django.dispatch import receiver
 from django.utils.safestring import mark_safe
 from django.utils.translation import pgettext_lazy
 from django_countries.fields import CountryField
@@ -268,3 +269,16 @@ class ShippingMethodTranslation(models.Model):
 
     class Meta:
         unique_together = (("language_code", "shipping_method"),)
+
+
+@receiver(models.signals.post_save, sender=ShippingZone)
+@receiver(models.signals.post_delete, sender=ShippingZone)
+@receiver(models.signals.post_save, sender=ShippingMethod)
+@receiver(models.signals.post_delete, sender=ShippingMethod)
+@receiver(models.signals.post_save, sender=ShippingMethodTranslation)
+@receiver(models.signals.post_delete, sender=ShippingMethodTranslation)
+def invalidate_shipping_table_on_change(sender, **kwargs):
+    """Rebuild the shipping tables after the dashboard or the API changed them."""
+    from .utils import invalidate_shipping_table
+
+    invalidate_shipping_table()
@@ -0,0 +1,144 @@
+import uuid
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from django.core.cache import cache
+from django.db import transaction
+from prices import Money
+
+from . import ShippingMethodType
+from .models import ShippingMethod
+
+if TYPE_CHECKING:
+    from ..checkout.models import Checkout
+    from ..order.models import Order
+
+SHIPPING_TABLE_VERSION_KEY = "shipping:table:version"
+
+
+class ShippingTable:
+    """The shipping methods of all the zones indexed by country and currency.
+
+    The methods are shared by all the requests handled by the process, they
+    must not be changed.
+    """
+
+    def __init__(self, shipping_methods: List[ShippingMethod]):
+        self.methods_by_country: Dict[
+            Tuple[str, str], List[ShippingMethod]
+        ] = defaultdict(list)
+        self.default_methods: Dict[str, List[ShippingMethod]] = defaultdict(list)
+        for method in shipping_methods:
+            zone = method.shipping_zone
+            if zone.default:
+                self.default_methods[method.currency].append(method)
+            else:
+                for country in zone.countries:
+                    self.methods_by_country[(country.code, method.currency)].append(
+                        method
+                    )
+
+    def get_methods(self, country_code: str, currency: str) -> List[ShippingMethod]:
+        """Return the methods of the country's zones or of the default zone."""
+        methods = self.methods_by_country.get((country_code, currency))
+        if methods:
+            return methods
+        return self.default_methods.get(currency, [])
+
+
+# The shipping table of the process with the version it was built for
+_shipping_table: Tuple[Optional[str], Optional[ShippingTable]] = (None, None)
+
+
+def get_shipping_table_version() -> str:
+    version = cache.get(SHIPPING_TABLE_VERSION_KEY)
+    if version is None:
+        # Another process may set the version in the meantime, the first one wins
+        cache.add(SHIPPING_TABLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(SHIPPING_TABLE_VERSION_KEY)
+    return version
+
+
+def bump_shipping_table_version():
+    cache.set(SHIPPING_TABLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_shipping_table():
+    """Make all the processes rebuild their shipping tables on the next use.
+
+    The version is bumped right away, so the current transaction sees its own
+    changes, and once again after commit to discard any tables that other
+    processes could have built from the data that was not committed yet.
+    """
+    bump_shipping_table_version()
+    transaction.on_commit(bump_shipping_table_version)
+
+
+def get_shipping_table() -> ShippingTable:
+    """Return the shipping table, built once per process.
+
+    The table is rebuilt only when the shipping zones or methods change, which
+    bumps its version in the shared cache.
+    """
+    global _shipping_table
+
+    version = get_shipping_table_version()
+    table_version, table = _shipping_table
+    if table is None or table_version != version:
+        shipping_methods = ShippingMethod.objects.select_related(
+            "shipping_zone"
+        ).prefetch_related("translations")
+        table = ShippingTable(list(shipping_methods))
+        _shipping_table = (version, table)
+    return table
+
+
+def _is_applicable(method: ShippingMethod, price: Money, weight) -> bool:
+    if method.type == ShippingMethodType.PRICE_BASED:
+        min_price = method.minimum_order_price_amount
+        max_price = method.maximum_order_price_amount
+        return (
+            min_price is not None
+            and min_price <= price.amount
+            and (max_price is None or max_price >= price.amount)
+        )
+    if method.type == ShippingMethodType.WEIGHT_BASED:
+        min_weight = method.minimum_order_weight
+        max_weight = method.maximum_order_weight
+        return (
+            min_weight is not None
+            and min_weight <= weight
+            and (max_weight is None or max_weight >= weight)
+        )
+    return False
+
+
+def get_applicable_shipping_methods(
+    price: Money, weight, country_code: str
+) -> List[ShippingMethod]:
+    """Return the ShippingMethods that can be used on an order with shipment.
+
+    It works like `ShippingMethod.objects.applicable_shipping_methods` but
+    resolves the methods from the shipping table, without queries. The methods
+    are sorted by their price.
+    """
+    methods = get_shipping_table().get_methods(country_code, price.currency)
+    applicable_methods = [
+        method for method in methods if _is_applicable(method, price, weight)
+    ]
+    return sorted(applicable_methods, key=lambda method: method.price_amount)
+
+
+def get_applicable_shipping_methods_for_instance(
+    instance: Union["Checkout", "Order"], price: Money, country_code=None
+) -> Optional[List[ShippingMethod]]:
+    if not instance.is_shipping_required():
+        return None
+    if not instance.shipping_address:
+        return None
+
+    return get_applicable_shipping_methods(
+        price=price,
+        weight=instance.get_total_weight(),
+        country_code=country_code or instance.shipping_address.country.code,
+    )
@@ -1,6 +1,10 @@
 import django.http.request
 from django.contrib.sites.shortcuts import get_current_site
 from django.db.models import prefetch_related_objects
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import get_language
+
+from .navigation import get_menu_from_payload, get_navigation
 
 
 def site(request):
@@ -9,3 +13,17 @@ def site(request):
     site = get_current_site(request)
     prefetch_related_objects([site], "settings__translations")
     return {"site": site}
+
+
+def _get_navigation_menus():
+    navigation = get_navigation(get_language())["navigation"]
+    return {
+        "main": get_menu_from_payload(navigation["main"]),
+        "secondary": get_menu_from_payload(navigation["secondary"]),
+    }
+
+
+def navigation(request):
+    # type: (django.http.request.HttpRequest) -> dict
+    """Add the cached navigation menus to the context under the 'navigation' key."""
+    return {"navigation": SimpleLazyObject(_get_navigation_menus)}
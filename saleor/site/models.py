@@ -6,14 +6,17 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.exceptions import ImproperlyConfigured
 from django.core.validators import MaxLengthValidator, RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
 from django.utils.translation import pgettext_lazy
 
 from ..core.utils.translations import TranslationProxy
 from ..core.weight import WeightUnits
 from . import AuthenticationBackends
 from .error_codes import SiteErrorCode
-from .patch_sites import patch_contrib_sites
+from .navigation import invalidate_navigation_cache
+from .patch_sites import invalidate_site_cache, patch_contrib_sites
+from .tasks import update_navigation_cache_task
 
 patch_contrib_sites()
 
@@ -148,3 +151,67 @@ class AuthorizationKey(models.Model):
 
     def key_and_secret(self):
         return self.key, self.password
+
+
+@receiver(models.signals.post_save, sender=Site)
+@receiver(models.signals.post_delete, sender=Site)
+@receiver(models.signals.post_save, sender=SiteSettings)
+@receiver(models.signals.post_save, sender=SiteSettingsTranslation)
+def invalidate_site_cache_on_change(sender, **kwargs):
+    """Make all the processes reload the current site and its settings."""
+    invalidate_site_cache()
+
+
+@receiver(models.signals.post_save, sender=SiteSettings)
+@receiver(models.signals.post_save, sender="menu.Menu")
+@receiver(models.signals.post_delete, sender="menu.Menu")
+def update_navigation_cache_on_change(sender, **kwargs):
+    """Regenerate the cached navigation after menus or site settings change.
+
+    Stale entries are dropped immediately so reads within the current
+    transaction see the new data, while the regeneration runs in the
+    background once the changes are committed.
+    """
+    invalidate_navigation_cache()
+    transaction.on_commit(update_navigation_cache_task.delay)
+
+
+@receiver(models.signals.post_save, sender="menu.MenuItem")
+@receiver(models.signals.post_delete, sender="menu.MenuItem")
+@receiver(models.signals.post_save, sender="menu.MenuItemTranslation")
+def invalidate_navigation_cache_on_menu_item_change(sender, **kwargs):
+    """Drop the cached navigation when menu items change.
+
+    Items are usually changed in batches followed by `update_menu`, which saves
+    the menu and schedules a single regeneration.
+    """
+    invalidate_navigation_cache()
+
+
+@receiver(models.signals.post_save, sender="product.Category")
+@receiver(models.signals.post_delete, sender="product.Category")
+@receiver(models.signals.post_save, sender="product.CategoryTranslation")
+@receiver(models.signals.post_delete, sender="product.CategoryTranslation")
+@receiver(models.signals.post_save, sender="product.Collection")
+@receiver(models.signals.post_delete, sender="product.Collection")
+@receiver(models.signals.post_save, sender="product.CollectionTranslation")
+@receiver(models.signals.post_delete, sender="product.CollectionTranslation")
+@receiver(models.signals.post_save, sender="page.Page")
+@receiver(models.signals.post_delete, sender="page.Page")
+@receiver(models.signals.post_save, sender="page.PageTranslation")
+@receiver(models.signals.post_delete, sender="page.PageTranslation")
+def invalidate_navigation_cache_on_linked_object_change(sender, **kwargs):
+    """Drop the cached navigation when the objects linked from menus change.
+
+    The menu items embed the names and slugs of their categories, collections
+    and pages. The navigation is built again on the next read.
+    """
+    invalidate_navigation_cache()
+
+
+@receiver(models.signals.post_save, sender=SiteSettings)
+def invalidate_product_fragments_on_settings_change(sender, **kwargs):
+    """Drop the cached product fragments, which display the prices with taxes."""
+    from ..product.fragment_cache import invalidate_pricing_version
+
+    invalidate_pricing_version()
@@ -0,0 +1,165 @@
+"""Precomputed storefront navigation served from the cache.
+
+Almost every storefront page renders the shop's navigation menus. Instead of
+walking the menu tree and its linked objects on every request, a per-language
+payload is built once, stored in the cache and regenerated asynchronously
+whenever menus or site settings change. The site and its settings are not part
+of the payload, they are already cached by `patch_sites`.
+"""
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import translation
+
+from ..menu.models import Menu, MenuItem
+from ..menu.utils import get_menu_as_json, get_menu_item_as_dict
+from ..page.models import Page
+from ..product.models import Category, Collection
+
+NAVIGATION_CACHE_KEY = "navigation:{site_id}:{language_code}"
+
+LINKED_OBJECTS = {
+    "category": (Category, ("id", "name", "slug")),
+    "collection": (Collection, ("id", "name", "slug")),
+    "page": (Page, ("id", "title", "slug")),
+}
+
+
+def get_navigation_cache_key(language_code: str) -> str:
+    return NAVIGATION_CACHE_KEY.format(
+        site_id=settings.SITE_ID, language_code=language_code
+    )
+
+
+def get_menu_item_payload(menu_item: MenuItem) -> dict:
+    """Serialize a menu item along with the fields of its linked object.
+
+    The result is compatible with `Menu.json_content` so it can be rendered
+    by the storefront templates as is.
+    """
+    data = get_menu_item_as_dict(menu_item)
+    data["fields"] = {
+        field.attname: getattr(menu_item, field.attname)
+        for field in MenuItem._meta.concrete_fields
+    }
+    for name, (_model, field_names) in LINKED_OBJECTS.items():
+        linked_object = getattr(menu_item, name)
+        data[name] = (
+            {field: getattr(linked_object, field) for field in field_names}
+            if linked_object
+            else None
+        )
+    return data
+
+
+def get_menu_payload(menu: Optional[Menu]) -> Optional[dict]:
+    if menu is None:
+        return None
+    return {
+        "id": menu.pk,
+        "name": menu.name,
+        "items": get_menu_as_json(menu, item_serializer=get_menu_item_payload),
+    }
+
+
+def build_navigation(language_code: str) -> dict:
+    """Build the navigation payload for the given language."""
+    site_settings = (
+        Site.objects.select_related("settings__top_menu", "settings__bottom_menu")
+        .get(pk=settings.SITE_ID)
+        .settings
+    )
+    with translation.override(language_code):
+        return {
+            "navigation": {
+                "main": get_menu_payload(site_settings.top_menu),
+                "secondary": get_menu_payload(site_settings.bottom_menu),
+            }
+        }
+
+
+def get_navigation(language_code: Optional[str] = None) -> dict:
+    """Return the cached navigation payload, building it on a cache miss."""
+    language_code = language_code or settings.LANGUAGE_CODE
+    key = get_navigation_cache_key(language_code)
+    navigation = cache.get(key)
+    if navigation is None:
+        navigation = build_navigation(language_code)
+        cache.set(key, navigation, timeout=None)
+    return navigation
+
+
+def update_navigation_cache():
+    """Regenerate the cached navigation for all the shop's languages."""
+    cache.set_many(
+        {
+            get_navigation_cache_key(language_code): build_navigation(language_code)
+            for language_code, _name in settings.LANGUAGES
+        },
+        timeout=None,
+    )
+
+
+def invalidate_navigation_cache():
+    cache.delete_many(
+        [
+            get_navigation_cache_key(language_code)
+            for language_code, _name in settings.LANGUAGES
+        ]
+    )
+
+
+def _instance_from_payload(model, data: dict):
+    """Create a model instance from cached values.
+
+    Fields that are not part of the payload are deferred, so accessing them
+    loads the real values from the database instead of returning defaults.
+    """
+    field_names = [
+        field.attname for field in model._meta.concrete_fields if field.attname in data
+    ]
+    values = [data[field_name] for field_name in field_names]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def _menu_items_from_payload(items_data, menu, parent=None):
+    items = []
+    for item_data in items_data:
+        item = _instance_from_payload(MenuItem, item_data["fields"])
+        item.menu = menu
+        item.parent = parent
+        for name, (model, _field_names) in LINKED_OBJECTS.items():
+            linked_data = item_data[name]
+            setattr(
+                item,
+                name,
+                _instance_from_payload(model, linked_data) if linked_data else None,
+            )
+        children = MenuItem.objects.all()
+        children._result_cache = _menu_items_from_payload(
+            item_data["child_items"], menu, parent=item
+        )
+        children._prefetch_done = True
+        item._prefetched_objects_cache = {"children": children}
+        items.append(item)
+    return items
+
+
+def get_menu_from_payload(menu_data: Optional[dict]) -> Optional[Menu]:
+    """Rebuild a menu and its item tree from the cached payload without queries.
+
+    Top level items are exposed as `prefetched_items` and children through the
+    prefetch cache, so the GraphQL `Menu` and `MenuItem` types can resolve the
+    whole tree. `json_content` holds the payload used by storefront templates.
+    """
+    if menu_data is None:
+        return None
+    menu = _instance_from_payload(
+        Menu, {"id": menu_data["id"], "name": menu_data["name"]}
+    )
+    menu.json_content = menu_data["items"]
+    menu.prefetched_items = _menu_items_from_payload(menu_data["items"], menu)
+    return menu
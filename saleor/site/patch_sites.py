@@ -1,18 +1,60 @@
-"""A hack to allow safe clearing of the cache in django.contrib.sites.
+"""A hack to share the cache of django.contrib.sites between processes.
 
-Since django.contrib.sites may not be thread-safe when there are
-multiple instances of the application server, we're patching it with
-a thread-safe structure and methods that use it underneath.
+By default django.contrib.sites caches Site instances at the module level.
+This leads to problems when updating Site instances, as all application
+servers would have to be restarted in order to invalidate the cache.
+Instead, the current site is stored together with its settings and their
+translations in the shared cache, under a key containing a version that is
+bumped whenever the site or its settings change.
 """
-import threading
+import uuid
 
 from django.contrib.sites.models import Site, SiteManager
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.http.request import split_domain_port
 
-lock = threading.Lock()
-with lock:
-    THREADED_SITE_CACHE = {}
+SITE_CACHE_KEY = "site:{version}:{lookup}"
+SITE_CACHE_VERSION_KEY = "site:version"
+SITE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_site_cache_version() -> str:
+    version = cache.get(SITE_CACHE_VERSION_KEY)
+    if version is None:
+        # Another process may set the version in the meantime, the first one wins
+        cache.add(SITE_CACHE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(SITE_CACHE_VERSION_KEY)
+    return version
+
+
+def bump_site_cache_version():
+    cache.set(SITE_CACHE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_site_cache():
+    """Invalidate the cached site in all the processes.
+
+    The version is bumped right away, so the current transaction sees its own
+    changes, and once again after commit to discard any copies that other
+    processes could have cached from the data that was not committed yet.
+    """
+    bump_site_cache_version()
+    transaction.on_commit(bump_site_cache_version)
+
+
+def _get_cached_site(manager, lookup, **filters):
+    key = SITE_CACHE_KEY.format(version=get_site_cache_version(), lookup=lookup)
+    site = cache.get(key)
+    if site is None:
+        site = (
+            manager.select_related("settings")
+            .prefetch_related("settings__translations")
+            .get(**filters)
+        )
+        cache.set(key, site, timeout=SITE_CACHE_TIMEOUT)
+    return site
 
 
 def new_get_current(self, request=None):
@@ -20,32 +62,16 @@ def new_get_current(self, request=None):
 
     if getattr(settings, "SITE_ID", ""):
         site_id = settings.SITE_ID
-        if site_id not in THREADED_SITE_CACHE:
-            with lock:
-                site = self.prefetch_related("settings").filter(pk=site_id)[0]
-                THREADED_SITE_CACHE[site_id] = site
-        return THREADED_SITE_CACHE[site_id]
+        return _get_cached_site(self, site_id, pk=site_id)
     elif request:
         host = request.get_host()
         try:
             # First attempt to look up the site by host with or without port.
-            if host not in THREADED_SITE_CACHE:
-                with lock:
-                    site = self.prefetch_related("settings").filter(
-                        domain__iexact=host
-                    )[0]
-                    THREADED_SITE_CACHE[host] = site
-            return THREADED_SITE_CACHE[host]
+            return _get_cached_site(self, host, domain__iexact=host)
         except Site.DoesNotExist:
             # Fallback to looking up site after stripping port from the host.
             domain, dummy_port = split_domain_port(host)
-            if domain not in THREADED_SITE_CACHE:
-                with lock:
-                    site = self.prefetch_related("settings").filter(
-                        domain__iexact=domain
-                    )[0]
-                    THREADED_SITE_CACHE[domain] = site
-        return THREADED_SITE_CACHE[domain]
+            return _get_cached_site(self, domain, domain__iexact=domain)
 
     raise ImproperlyConfigured(
         "You're using the Django sites framework without having"
@@ -56,9 +82,7 @@ def new_get_current(self, request=None):
 
 
 def new_clear_cache(self):
-    global THREADED_SITE_CACHE
-    with lock:
-        THREADED_SITE_CACHE = {}
+    bump_site_cache_version()
 
 
 def new_get_by_natural_key(self, domain):
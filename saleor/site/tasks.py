@@ -0,0 +1,7 @@
+from ..celeryconf import app
+from .navigation import update_navigation_cache
+
+
+@app.task
+def update_navigation_cache_task():
+    update_navigation_cache()
@@ -1,17 +1,26 @@
 import uuid
+from datetime import timedelta
 from unittest import mock
 from unittest.mock import ANY, patch
 
 import graphene
 import pytest
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from prices import Money, TaxedMoney
 
+from saleor.checkout import CheckoutCompletionStatus
+from saleor.checkout.complete import (
+    CHECKOUT_COMPLETION_TIMEOUT,
+    process_checkout_completion,
+)
 from saleor.checkout.error_codes import CheckoutErrorCode
-from saleor.checkout.models import Checkout
+from saleor.checkout.models import Checkout, CheckoutCompletion
 from saleor.checkout.utils import clean_checkout, is_fully_paid
 from saleor.core.payments import PaymentInterface
 from saleor.core.taxes import zero_money
+from saleor.discount.utils import get_voucher_usage
+from saleor.giftcard.utils import get_gift_card_balance
 from saleor.graphql.checkout.mutations import (
     clean_shipping_method,
     update_checkout_shipping_method_if_invalid,
@@ -1077,6 +1086,25 @@ def test_checkout_email_update_validation(user_api_client, checkout_with_item):
     assert checkout_errors[0]["code"] == CheckoutErrorCode.REQUIRED.name
 
 
+def test_checkout_email_update_completion_in_progress(
+    user_api_client, checkout_with_item
+):
+    checkout = checkout_with_item
+    CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="key"
+    )
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    variables = {"checkoutId": checkout_id, "email": "test@example.com"}
+
+    response = user_api_client.post_graphql(CHECKOUT_EMAIL_UPDATE_MUTATION, variables)
+    content = get_graphql_content(response)
+
+    checkout_errors = content["data"]["checkoutEmailUpdate"]["checkoutErrors"]
+    assert checkout_errors[0]["code"] == CheckoutErrorCode.COMPLETION_IN_PROGRESS.name
+    checkout.refresh_from_db()
+    assert not checkout.email
+
+
 MUTATION_CHECKOUT_COMPLETE = """
     mutation checkoutComplete($checkoutId: ID!) {
         checkoutComplete(checkoutId: $checkoutId) {
@@ -1152,9 +1180,8 @@ def test_checkout_complete(
     assert order_payment == payment
     assert payment.transactions.count() == 1
 
-    gift_card.refresh_from_db()
-    assert gift_card.current_balance == zero_money()
-    assert gift_card.last_used_on
+    assert get_gift_card_balance(gift_card) == zero_money()
+    assert gift_card.entries.get().order == order
 
     assert not Checkout.objects.filter(
         pk=checkout.pk
@@ -1246,8 +1273,7 @@ def test_checkout_complete_does_not_delete_checkout_after_unsuccessful_payment(
     assert payment.order is None
 
     # ensure the voucher usage count was not incremented
-    voucher.refresh_from_db(fields=["used"])
-    assert voucher.used == expected_voucher_usage_count
+    assert get_voucher_usage(voucher) == expected_voucher_usage_count
 
     assert Checkout.objects.filter(
         pk=checkout.pk
@@ -1317,6 +1343,289 @@ def test_checkout_complete_insufficient_stock(
     assert orders_count == Order.objects.count()
 
 
+@pytest.fixture
+def checkout_ready_to_complete(
+    checkout_with_item, address, payment_dummy, shipping_method
+):
+    checkout = checkout_with_item
+    checkout.shipping_address = address
+    checkout.shipping_method = shipping_method
+    checkout.billing_address = address
+    checkout.save()
+    total = checkout.get_total()
+    payment = payment_dummy
+    payment.is_active = True
+    payment.order = None
+    payment.total = total.amount
+    payment.currency = total.currency
+    payment.checkout = checkout
+    payment.save()
+    return checkout
+
+
+MUTATION_CHECKOUT_COMPLETE_ASYNC = """
+    mutation checkoutCompleteAsync($checkoutId: ID!, $idempotencyKey: String!) {
+        checkoutCompleteAsync(
+            checkoutId: $checkoutId, idempotencyKey: $idempotencyKey
+        ) {
+            completion {
+                token
+                status
+            }
+            checkoutErrors {
+                field
+                code
+                message
+            }
+        }
+    }
+    """
+
+
+def test_checkout_complete_async(user_api_client, checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+    orders_count = Order.objects.count()
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert not data["checkoutErrors"]
+    assert data["completion"]["status"] == CheckoutCompletionStatus.PENDING.upper()
+
+    completion = CheckoutCompletion.objects.get()
+    assert str(completion.token) == data["completion"]["token"]
+    assert completion.checkout_token == checkout.token
+    assert completion.user == user_api_client.user
+    # the order is created by the task
+    assert Order.objects.count() == orders_count
+    assert Checkout.objects.filter(pk=checkout.pk).exists()
+
+
+def test_checkout_complete_async_retried_with_same_key(
+    user_api_client, checkout_ready_to_complete
+):
+    checkout = checkout_ready_to_complete
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    first_token = get_graphql_content(response)["data"]["checkoutCompleteAsync"][
+        "completion"
+    ]["token"]
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert not data["checkoutErrors"]
+    assert data["completion"]["token"] == first_token
+    assert CheckoutCompletion.objects.count() == 1
+
+
+def test_checkout_complete_async_retried_after_checkout_deleted(
+    user_api_client, checkout_ready_to_complete
+):
+    checkout = checkout_ready_to_complete
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token,
+        idempotency_key="key",
+        status=CheckoutCompletionStatus.SUCCESS,
+    )
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    checkout.delete()
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert not data["checkoutErrors"]
+    assert data["completion"]["token"] == str(completion.token)
+    assert data["completion"]["status"] == CheckoutCompletionStatus.SUCCESS.upper()
+
+
+def test_checkout_complete_async_other_completion_in_progress(
+    user_api_client, checkout_ready_to_complete
+):
+    checkout = checkout_ready_to_complete
+    CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="other-key"
+    )
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert data["completion"] is None
+    assert (
+        data["checkoutErrors"][0]["code"]
+        == CheckoutErrorCode.COMPLETION_IN_PROGRESS.name
+    )
+    assert CheckoutCompletion.objects.count() == 1
+
+
+def test_checkout_complete_async_other_completion_timed_out(
+    user_api_client, checkout_ready_to_complete
+):
+    checkout = checkout_ready_to_complete
+    stale_completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token,
+        idempotency_key="other-key",
+        status=CheckoutCompletionStatus.PROCESSING,
+    )
+    CheckoutCompletion.objects.filter(pk=stale_completion.pk).update(
+        updated=timezone.now() - CHECKOUT_COMPLETION_TIMEOUT - timedelta(minutes=1)
+    )
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout.pk)
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert not data["checkoutErrors"]
+    assert data["completion"]["status"] == CheckoutCompletionStatus.PENDING.upper()
+
+    stale_completion.refresh_from_db()
+    assert stale_completion.status == CheckoutCompletionStatus.FAILED
+    assert stale_completion.error_message == "The checkout completion timed out."
+
+
+def test_checkout_complete_async_invalid_checkout(user_api_client, checkout_with_item):
+    checkout_id = graphene.Node.to_global_id("Checkout", checkout_with_item.pk)
+    variables = {"checkoutId": checkout_id, "idempotencyKey": "key"}
+
+    response = user_api_client.post_graphql(MUTATION_CHECKOUT_COMPLETE_ASYNC, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompleteAsync"]
+    assert data["checkoutErrors"]
+    assert not CheckoutCompletion.objects.exists()
+
+
+def test_process_checkout_completion(customer_user, checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="key", user=customer_user
+    )
+
+    process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletionStatus.SUCCESS
+    assert completion.order.user == customer_user
+    assert not Checkout.objects.filter(pk=checkout.pk).exists()
+
+
+def test_process_checkout_completion_already_processed(checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token,
+        idempotency_key="key",
+        status=CheckoutCompletionStatus.PROCESSING,
+    )
+    orders_count = Order.objects.count()
+
+    process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletionStatus.PROCESSING
+    assert Order.objects.count() == orders_count
+
+
+def test_process_checkout_completion_payment_error(
+    mock_get_manager, checkout_ready_to_complete
+):
+    mock_get_manager.process_payment.side_effect = (
+        _process_payment_transaction_returns_error
+    )
+    checkout = checkout_ready_to_complete
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="key"
+    )
+    orders_count = Order.objects.count()
+
+    process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletionStatus.FAILED
+    assert completion.error_code == CheckoutErrorCode.PAYMENT_ERROR.value
+    assert completion.order is None
+    assert Order.objects.count() == orders_count
+    assert Checkout.objects.filter(pk=checkout.pk).exists()
+
+    # the checkout can be completed again with another key
+    CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="other-key"
+    )
+
+
+def test_process_checkout_completion_checkout_deleted(checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=checkout.token, idempotency_key="key"
+    )
+    checkout.delete()
+
+    process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletionStatus.FAILED
+    assert completion.error_code == CheckoutErrorCode.NOT_FOUND.value
+
+
+QUERY_CHECKOUT_COMPLETION = """
+    query getCheckoutCompletion($token: UUID!) {
+        checkoutCompletion(token: $token) {
+            status
+            order {
+                token
+            }
+            errorCode
+            errorMessage
+        }
+    }
+    """
+
+
+def test_fetch_checkout_completion_by_token(user_api_client, order):
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=uuid.uuid4(),
+        idempotency_key="key",
+        status=CheckoutCompletionStatus.SUCCESS,
+        order=order,
+    )
+    variables = {"token": str(completion.token)}
+
+    response = user_api_client.post_graphql(QUERY_CHECKOUT_COMPLETION, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompletion"]
+    assert data["status"] == CheckoutCompletionStatus.SUCCESS.upper()
+    assert data["order"]["token"] == order.token
+    assert data["errorCode"] == ""
+
+
+def test_fetch_checkout_completion_timed_out(user_api_client):
+    completion = CheckoutCompletion.objects.create(
+        checkout_token=uuid.uuid4(), idempotency_key="key"
+    )
+    CheckoutCompletion.objects.filter(pk=completion.pk).update(
+        updated=timezone.now() - CHECKOUT_COMPLETION_TIMEOUT - timedelta(minutes=1)
+    )
+    variables = {"token": str(completion.token)}
+
+    response = user_api_client.post_graphql(QUERY_CHECKOUT_COMPLETION, variables)
+    content = get_graphql_content(response)
+    data = content["data"]["checkoutCompletion"]
+    assert data["status"] == CheckoutCompletionStatus.FAILED.upper()
+    assert data["errorMessage"] == "The checkout completion timed out."
+
+
+def test_fetch_checkout_completion_by_invalid_token(user_api_client):
+    variables = {"token": str(uuid.uuid4())}
+    response = user_api_client.post_graphql(QUERY_CHECKOUT_COMPLETION, variables)
+    content = get_graphql_content(response)
+    assert content["data"]["checkoutCompletion"] is None
+
+
 def test_fetch_checkout_by_token(user_api_client, checkout_with_item):
     query = """
     query getCheckout($token: UUID!) {
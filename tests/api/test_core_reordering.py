@@ -1,6 +1,10 @@
 import pytest
 
-from saleor.graphql.core.utils.reordering import perform_reordering
+from saleor.graphql.core.utils.reordering import (
+    SORT_ORDER_GAP,
+    apply_moves,
+    perform_reordering,
+)
 from saleor.product import models
 
 SortedModel = models.AttributeValue
@@ -59,14 +63,15 @@ def test_reordering_sequential(sorted_entries_seq):
 
     operations = {nodes[5].pk: -1, nodes[2].pk: +3}
 
+    # There is no room between the nodes, they are renumbered with gaps
     expected = _sorted_by_order(
         [
-            (nodes[0].pk, 0),
-            (nodes[1].pk, 1),
-            (nodes[2].pk, 2 + 3),
-            (nodes[3].pk, 3 - 1),
-            (nodes[4].pk, 4 + 1 - 1),
-            (nodes[5].pk, 5 - 1 - 1),
+            (nodes[0].pk, 1 * SORT_ORDER_GAP),
+            (nodes[1].pk, 2 * SORT_ORDER_GAP),
+            (nodes[2].pk, 6 * SORT_ORDER_GAP),
+            (nodes[3].pk, 3 * SORT_ORDER_GAP),
+            (nodes[4].pk, 5 * SORT_ORDER_GAP),
+            (nodes[5].pk, 4 * SORT_ORDER_GAP),
         ]
     )
 
@@ -86,14 +91,15 @@ def test_reordering_non_sequential(sorted_entries_gaps):
 
     operations = {nodes[5].pk: -1, nodes[2].pk: +3}
 
+    # Only the moved nodes are updated, the others keep their sort orders
     expected = _sorted_by_order(
         [
             (nodes[0].pk, 0),
             (nodes[1].pk, 2),
-            (nodes[2].pk, 4 + (3 * 2) - 1),
-            (nodes[3].pk, 6 - 1),
-            (nodes[4].pk, 8 + 1 - 1),
-            (nodes[5].pk, 10 - (1 * 2) - 1),
+            (nodes[2].pk, 8 + SORT_ORDER_GAP),
+            (nodes[3].pk, 6),
+            (nodes[4].pk, 8),
+            (nodes[5].pk, 7),
         ]
     )
 
@@ -104,10 +110,13 @@ def test_reordering_non_sequential(sorted_entries_gaps):
 
 
 @pytest.mark.parametrize(
-    "operation, expected_operations",
-    [((0, +5), (+5, -1, -1, -1, -1, -1)), ((5, -5), (+1, +1, +1, +1, +1, -5))],
+    "operation, expected_sort_orders",
+    [
+        ((0, +5), (5 + SORT_ORDER_GAP, 1, 2, 3, 4, 5)),
+        ((5, -5), (2000, 3000, 4000, 5000, 6000, 1000)),
+    ],
 )
-def test_inserting_at_the_edges(sorted_entries_seq, operation, expected_operations):
+def test_inserting_at_the_edges(sorted_entries_seq, operation, expected_sort_orders):
     """
     Ensures it is possible to move an item at the top and bottom of the list.
     """
@@ -119,10 +128,7 @@ def test_inserting_at_the_edges(sorted_entries_seq, operation, expected_operatio
     operations = {nodes[target_node_pos].pk: new_rel_sort_order}
 
     expected = _sorted_by_order(
-        [
-            (node.pk, node.sort_order + op)
-            for node, op in zip(nodes, expected_operations)
-        ]
+        [(node.pk, sort_order) for node, sort_order in zip(nodes, expected_sort_orders)]
     )
 
     perform_reordering(qs, operations)
@@ -144,12 +150,12 @@ def test_reordering_out_of_bound(sorted_entries_seq):
 
     expected = _sorted_by_order(
         [
-            (nodes[0].pk, 0 + 5),
+            (nodes[0].pk, 4 + SORT_ORDER_GAP),
             (nodes[1].pk, 1),
             (nodes[2].pk, 2),
             (nodes[3].pk, 3),
             (nodes[4].pk, 4),
-            (nodes[5].pk, 5 - 5),
+            (nodes[5].pk, 0),
         ]
     )
 
@@ -200,9 +206,9 @@ def test_reordering_null_sort_orders(dummy_attribute):
     expected = [
         (non_null_sorted_entries[1].pk, 0),
         (non_null_sorted_entries[0].pk, 1),
-        (null_sorted_entries[0].pk, 2),
-        (null_sorted_entries[2].pk, 3),
-        (null_sorted_entries[1].pk, 4),
+        (null_sorted_entries[0].pk, 1 + SORT_ORDER_GAP),
+        (null_sorted_entries[2].pk, 1 + 2 * SORT_ORDER_GAP),
+        (null_sorted_entries[1].pk, 1 + 3 * SORT_ORDER_GAP),
     ]
 
     perform_reordering(qs, operations)
@@ -275,11 +281,9 @@ def test_reordering_concurrently(dummy_attribute, django_assert_num_queries):
         '"product_attributevalue"."id" ASC FOR UPDATE'
     )
     assert ctx[1]["sql"] == (
-        'UPDATE "product_attributevalue" '
-        'SET "sort_order" = (CASE WHEN ("product_attributevalue"."id" = 1) '
-        'THEN 1 WHEN ("product_attributevalue"."id" = 2) '
-        "THEN 0 ELSE NULL END)::integer "
-        'WHERE "product_attributevalue"."id" IN (1, 2)'
+        'UPDATE "product_attributevalue" SET "sort_order" = v.sort_order '
+        "FROM (VALUES (1, 1001)) AS v (id, sort_order) "
+        'WHERE "product_attributevalue"."id" = v.id'
     )
 
 
@@ -313,9 +317,45 @@ def test_reordering_deleted_node_from_concurrent(
         perform_reordering(qs, operations)
 
     assert ctx[1]["sql"] == (
-        'UPDATE "product_attributevalue" '
-        'SET "sort_order" = (CASE WHEN ("product_attributevalue"."id" = 1) '
-        'THEN 1 WHEN ("product_attributevalue"."id" = 2) '
-        "THEN 0 ELSE NULL END)::integer "
-        'WHERE "product_attributevalue"."id" IN (1, 2)'
+        'UPDATE "product_attributevalue" SET "sort_order" = v.sort_order '
+        "FROM (VALUES (1, 1001)) AS v (id, sort_order) "
+        'WHERE "product_attributevalue"."id" = v.id'
     )
+
+
+def test_moving_between_gaps_updates_only_moved_node(
+    sorted_entries_gaps, django_assert_num_queries
+):
+    """Ensures moving a node between neighbours with a gap between their sort
+    orders doesn't change the sort order of the other nodes.
+    """
+    qs = SortedModel.objects
+    nodes = sorted_entries_gaps
+
+    operations = {nodes[0].pk: +2}
+
+    with django_assert_num_queries(2) as ctx:
+        perform_reordering(qs, operations)
+
+    assert "(VALUES (%d, 5))" % nodes[0].pk in ctx[1]["sql"]
+    assert _get_sorted_map() == [
+        (nodes[1].pk, 2),
+        (nodes[2].pk, 4),
+        (nodes[0].pk, 5),
+        (nodes[3].pk, 6),
+        (nodes[4].pk, 8),
+        (nodes[5].pk, 10),
+    ]
+
+
+def test_apply_moves_many_moves_to_same_position():
+    """Ensures moving many nodes between the same neighbours keeps the order
+    of the moves, even when the positions between them run out.
+    """
+    ordered_pks = list(range(200))
+    operations = {pk: -(pk - 1) for pk in range(100, 200)}
+
+    ordered_pks, moved = apply_moves(ordered_pks, operations)
+
+    assert ordered_pks == [0, *range(199, 99, -1), *range(1, 100)]
+    assert moved == set(operations)
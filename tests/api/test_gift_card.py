@@ -3,6 +3,7 @@ from datetime import date
 import graphene
 
 from saleor.giftcard.error_codes import GiftCardErrorCode
+from saleor.giftcard.utils import get_gift_card_balance
 from tests.api.utils import get_graphql_content
 
 from .utils import assert_no_permission
@@ -430,6 +431,27 @@ def test_update_gift_card(staff_api_client, gift_card, permission_manage_gift_ca
     assert data["user"]["email"] == staff_api_client.user.email
 
 
+def test_update_gift_card_balance_to_zero(
+    staff_api_client, gift_card, permission_manage_gift_card
+):
+    assert gift_card.current_balance.amount
+    variables = {
+        "id": graphene.Node.to_global_id("GiftCard", gift_card.id),
+        "balance": 0,
+        "userEmail": staff_api_client.user.email,
+    }
+    response = staff_api_client.post_graphql(
+        UPDATE_GIFT_CARD_MUTATION, variables, permissions=[permission_manage_gift_card]
+    )
+    content = get_graphql_content(response)
+    errors = content["data"]["giftCardUpdate"]["errors"]
+    data = content["data"]["giftCardUpdate"]["giftCard"]
+
+    assert not errors
+    assert data["currentBalance"]["amount"] == 0
+    assert get_gift_card_balance(gift_card).amount == 0
+
+
 def test_update_gift_card_without_premissions(staff_api_client, gift_card):
     new_code = "new_test_code"
     balance = 150
@@ -528,9 +528,24 @@ def test_menu_reorder(staff_api_client, permission_manage_menus, menu_item_list)
     expected_data = {
         "id": menu_global_id,
         "items": [
-            {"id": items_global_ids[1], "sortOrder": 0, "parent": None, "children": []},
-            {"id": items_global_ids[0], "sortOrder": 1, "parent": None, "children": []},
-            {"id": items_global_ids[2], "sortOrder": 2, "parent": None, "children": []},
+            {
+                "id": items_global_ids[1],
+                "sortOrder": 1000,
+                "parent": None,
+                "children": [],
+            },
+            {
+                "id": items_global_ids[0],
+                "sortOrder": 2000,
+                "parent": None,
+                "children": [],
+            },
+            {
+                "id": items_global_ids[2],
+                "sortOrder": 3000,
+                "parent": None,
+                "children": [],
+            },
         ],
     }
 
@@ -600,13 +615,13 @@ def test_menu_reorder_assign_parent(
                     },
                     {
                         "id": items_global_ids[2],
-                        "sortOrder": 1,
+                        "sortOrder": 1000,
                         "parent": {"id": parent_global_id},
                         "children": [],
                     },
                     {
                         "id": items_global_ids[3],
-                        "sortOrder": 2,
+                        "sortOrder": 2000,
                         "parent": {"id": parent_global_id},
                         "children": [],
                     },
@@ -676,7 +691,7 @@ def test_menu_reorder_assign_parent_to_top_level(
             },
             {
                 "id": root_candidate_global_id,
-                "sortOrder": 3,
+                "sortOrder": 1002,
                 "parent": None,
                 "children": [],
             },
@@ -2814,3 +2814,142 @@ def test_filter_product_types_by_custom_search_value(
     matched_names = sorted([result["node"]["name"] for result in results])
 
     assert matched_names == sorted(expected_names)
+
+
+QUERY_PRODUCTS_WITH_FACETS = """
+    query {
+        products(first: 10) {
+            totalCount
+            facets {
+                attributeValues {
+                    value {
+                        slug
+                    }
+                    count
+                }
+                priceRanges {
+                    start {
+                        amount
+                    }
+                    stop {
+                        amount
+                    }
+                    count
+                }
+            }
+        }
+    }
+"""
+
+
+def test_products_query_with_facets(user_api_client, product):
+    value_slugs = set(product.attributes.values_list("values__slug", flat=True)) | set(
+        product.variants.get().attributes.values_list("values__slug", flat=True)
+    )
+
+    response = user_api_client.post_graphql(QUERY_PRODUCTS_WITH_FACETS)
+    content = get_graphql_content(response)
+
+    facets = content["data"]["products"]["facets"]
+    assert {
+        facet["value"]["slug"] for facet in facets["attributeValues"]
+    } == value_slugs
+    assert all(facet["count"] == 1 for facet in facets["attributeValues"])
+    assert facets["priceRanges"] == [
+        {"start": {"amount": 10.0}, "stop": {"amount": 25.0}, "count": 1}
+    ]
+
+
+PRODUCT_BULK_CREATE_MUTATION = """
+    mutation ProductBulkCreate($products: [ProductBulkCreateInput]!) {
+        productBulkCreate(products: $products) {
+            bulkProductErrors {
+                field
+                code
+                index
+            }
+            products {
+                name
+                variants {
+                    sku
+                    name
+                }
+            }
+            count
+        }
+    }
+"""
+
+
+@patch("saleor.graphql.product.bulk_mutations.products.finish_products_import_task")
+def test_product_bulk_create(
+    mock_finish_products_import_task,
+    staff_api_client,
+    category,
+    product_type,
+    permission_manage_products,
+):
+    products = [
+        {
+            "name": "Juice",
+            "category": category.slug,
+            "productType": product_type.name,
+            "basePrice": "10.00",
+            "attributes": [{"slug": "color", "values": ["Red"]}],
+            "variants": [
+                {"sku": "JUICE-1", "attributes": [{"slug": "size", "values": ["XL"]}]}
+            ],
+        }
+    ]
+
+    response = staff_api_client.post_graphql(
+        PRODUCT_BULK_CREATE_MUTATION,
+        {"products": products},
+        permissions=[permission_manage_products],
+    )
+    content = get_graphql_content(response)
+
+    data = content["data"]["productBulkCreate"]
+    assert not data["bulkProductErrors"]
+    assert data["count"] == 1
+    assert data["products"] == [
+        {"name": "Juice", "variants": [{"sku": "JUICE-1", "name": "XL"}]}
+    ]
+    product = Product.objects.get(name="Juice")
+    mock_finish_products_import_task.delay.assert_called_once_with([product.pk])
+
+
+def test_product_bulk_create_returns_errors_with_indexes(
+    staff_api_client, category, product_type, permission_manage_products
+):
+    products = [
+        {
+            "name": "Juice",
+            "category": category.slug,
+            "productType": product_type.name,
+            "basePrice": "10.00",
+            "variants": [{"sku": "DUPLICATED"}],
+        },
+        {
+            "name": "Tea",
+            "category": "missing",
+            "productType": product_type.name,
+            "basePrice": "10.00",
+            "variants": [{"sku": "DUPLICATED"}],
+        },
+    ]
+
+    response = staff_api_client.post_graphql(
+        PRODUCT_BULK_CREATE_MUTATION,
+        {"products": products},
+        permissions=[permission_manage_products],
+    )
+    content = get_graphql_content(response)
+
+    data = content["data"]["productBulkCreate"]
+    assert data["count"] == 0
+    assert sorted(data["bulkProductErrors"], key=lambda error: error["field"]) == [
+        {"field": "category", "code": "NOT_FOUND", "index": 1},
+        {"field": "sku", "code": "UNIQUE", "index": 1},
+    ]
+    assert not Product.objects.filter(name__in=["Juice", "Tea"]).exists()
@@ -557,3 +557,82 @@ def test_sort_product_by_attribute_using_attribute_having_no_products(
 
     assert len(products) == product_models.Product.objects.count()
     assert products[0]["node"]["name"] == expected_first_product.name
+
+
+def get_sort_keys(attribute):
+    return dict(attribute.product_sort_keys.values_list("product__name", "sort_key"))
+
+
+def test_sort_keys_are_stored_on_assignment(products_structures):
+    colors, trademark, _ = products_structures
+
+    sort_keys = get_sort_keys(colors)
+    assert sort_keys["['Blue', 'Red'] Apple - A (0)"] == "Blue,Red"
+    assert sort_keys["['Green'] Apple - y (4)"] == "Green"
+    assert "Oopsie Dummy" not in sort_keys
+    assert get_sort_keys(trademark)["['Blue', 'Gray'] Orange - A (1)"] == "A"
+
+
+def test_sort_keys_are_updated_on_value_change(products_structures):
+    colors, _, _ = products_structures
+    value = colors.values.get(name="Green")
+
+    value.name = "Another green"
+    value.save()
+
+    assert get_sort_keys(colors)["['Green'] Apple - y (4)"] == "Another green"
+
+
+def test_sort_keys_are_updated_on_value_delete(products_structures):
+    colors, _, _ = products_structures
+
+    colors.values.get(name="Red").delete()
+    colors.values.get(name="Green").delete()
+
+    sort_keys = get_sort_keys(colors)
+    assert sort_keys["['Blue', 'Red'] Apple - A (0)"] == "Blue"
+    assert "['Green'] Apple - y (4)" not in sort_keys
+
+
+def test_sort_keys_are_removed_on_assignment_delete(products_structures):
+    colors, _, _ = products_structures
+
+    product_models.AssignedProductAttribute.objects.filter(
+        product__name="['Blue', 'Red'] Apple - A (0)", assignment__attribute=colors
+    ).delete()
+
+    assert "['Blue', 'Red'] Apple - A (0)" not in get_sort_keys(colors)
+
+
+def test_sort_keys_are_updated_on_values_reorder(
+    staff_api_client, permission_manage_products, products_structures
+):
+    query = """
+    mutation attributeReorderValues($attributeId: ID!, $moves: [ReorderInput]!) {
+      attributeReorderValues(attributeId: $attributeId, moves: $moves) {
+        errors {
+          field
+          message
+        }
+      }
+    }
+    """
+    colors, _, _ = products_structures
+    red = colors.values.get(name="Red")
+    variables = {
+        "attributeId": graphene.Node.to_global_id("Attribute", colors.pk),
+        "moves": [
+            {
+                "id": graphene.Node.to_global_id("AttributeValue", red.pk),
+                "sortOrder": -colors.values.count(),
+            }
+        ],
+    }
+
+    response = staff_api_client.post_graphql(
+        query, variables, permissions=[permission_manage_products]
+    )
+    content = get_graphql_content(response)
+    assert not content["data"]["attributeReorderValues"]["errors"]
+
+    assert get_sort_keys(colors)["['Blue', 'Red'] Apple - A (0)"] == "Red,Blue"
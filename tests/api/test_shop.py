@@ -211,6 +211,43 @@ def test_query_navigation(user_api_client, site_settings):
     assert navigation_data["secondary"]["name"] == site_settings.bottom_menu.name
 
 
+def test_query_navigation_items(api_client, site_settings, menu_with_items, category):
+    site_settings.top_menu = menu_with_items
+    site_settings.save(update_fields=["top_menu"])
+    query = """
+    query {
+        shop {
+            navigation {
+                main {
+                    items {
+                        name
+                        children {
+                            name
+                            category {
+                                name
+                            }
+                            parent {
+                                id
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    response = api_client.post_graphql(query)
+    content = get_graphql_content(response)
+    items = content["data"]["shop"]["navigation"]["main"]["items"]
+    assert [item["name"] for item in items] == ["Link 1", "Link 2"]
+    assert items[0]["children"] == []
+    child_data = items[1]["children"][0]
+    assert child_data["category"]["name"] == category.name
+    assert child_data["parent"]["id"] == graphene.Node.to_global_id(
+        "MenuItem", menu_with_items.items.get(name="Link 2").pk
+    )
+
+
 def test_query_charge_taxes_on_shipping(api_client, site_settings):
     query = """
     query {
@@ -103,7 +103,9 @@ def test_get_variant_pricing_not_on_sale(api_client, product):
 def test_variant_pricing(variant: ProductVariant, monkeypatch, settings):
     taxed_price = TaxedMoney(Money("10.0", "USD"), Money("12.30", "USD"))
     monkeypatch.setattr(
-        ExtensionsManager, "apply_taxes_to_product", Mock(return_value=taxed_price)
+        ExtensionsManager,
+        "apply_taxes_to_products",
+        Mock(side_effect=lambda product, prices, country: [taxed_price] * len(prices)),
     )
 
     pricing = get_variant_availability(variant)
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, Mock
 import pytest
 from django.contrib.auth.models import Permission
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms import ModelForm
@@ -64,6 +65,13 @@ def setup_dummy_gateway(settings):
     return settings
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Don't let the data cached during one test leak into the next ones."""
+    yield
+    cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def site_settings(db, settings) -> SiteSettings:
     """Create a site and matching site settings.
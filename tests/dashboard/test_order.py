@@ -999,6 +999,23 @@ def test_view_order_voucher_edit(admin_client, draft_order, settings, voucher):
     assert draft_order.total == total_before - discount
 
 
+def test_view_order_voucher_edit_usage_limit_reached(
+    admin_client, draft_order, voucher
+):
+    voucher.usage_limit = 1
+    voucher.save(update_fields=["usage_limit"])
+    increase_voucher_usage(voucher)
+    url = reverse("dashboard:order-voucher-edit", kwargs={"order_pk": draft_order.pk})
+    data = {"voucher": voucher.pk}
+
+    response = admin_client.post(url, data)
+
+    assert response.status_code == 400
+    assert response.context["form"].errors["voucher"]
+    draft_order.refresh_from_db()
+    assert draft_order.voucher is None
+
+
 def test_view_order_voucher_remove(admin_client, draft_order, settings, voucher):
     increase_voucher_usage(voucher)
     draft_order.voucher = voucher
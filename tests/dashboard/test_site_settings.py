@@ -8,6 +8,7 @@ from django.utils.encoding import smart_text
 from saleor.dashboard.sites.forms import SiteForm, SiteSettingsForm
 from saleor.site import utils
 from saleor.site.models import AuthorizationKey, SiteSettings
+from saleor.site.patch_sites import get_site_cache_version
 
 
 @pytest.fixture
@@ -227,6 +228,43 @@ def test_new_get_current():
     assert str(result.settings) == "mirumee.com"
 
 
+def test_new_get_current_is_cached(site_settings, django_assert_num_queries):
+    Site.objects.get_current()
+
+    with django_assert_num_queries(0):
+        result = Site.objects.get_current()
+        assert result.settings == site_settings
+        assert result.settings.translated.header_text == site_settings.header_text
+
+
+def test_site_settings_change_invalidates_current_site(site_settings):
+    version = get_site_cache_version()
+    Site.objects.get_current()
+
+    site_settings.header_text = "New header"
+    site_settings.save(update_fields=["header_text"])
+
+    assert get_site_cache_version() != version
+    assert Site.objects.get_current().settings.header_text == "New header"
+
+
+def test_site_update_view_invalidates_current_site(admin_client, site_settings):
+    assert Site.objects.get_current().name == "mirumee.com"
+    url = reverse("dashboard:site-update", kwargs={"pk": site_settings.pk})
+    data = {
+        "name": "Mirumee Labs",
+        "domain": "newmirumee.com",
+        "default_weight_unit": "lb",
+        "form-TOTAL_FORMS": 0,
+        "form-INITIAL_FORMS": 0,
+    }
+
+    response = admin_client.post(url, data)
+
+    assert response.status_code == 302
+    assert Site.objects.get_current().name == "Mirumee Labs"
+
+
 def test_new_get_current_from_request():
     factory = RequestFactory()
     request = factory.get(reverse("dashboard:site-index"))
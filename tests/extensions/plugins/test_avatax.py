@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
@@ -10,11 +11,16 @@ from saleor.extensions.manager import get_extensions_manager
 from saleor.extensions.models import PluginConfiguration
 from saleor.extensions.plugins.avatax import (
     AvataxConfiguration,
+    api_post_request,
     checkout_needs_new_fetch,
     generate_request_data_from_checkout,
     get_cached_tax_codes_or_fetch,
+    get_request_data_hash,
+    taxes_need_new_fetch,
 )
+from saleor.extensions.plugins.avatax.fake_server import FakeAvataxServer
 from saleor.extensions.plugins.avatax.plugin import AvataxPlugin
+from saleor.extensions.plugins.avatax.tasks import api_post_request_task
 
 
 @pytest.fixture
@@ -443,7 +449,9 @@ def test_order_created(settings, order, monkeypatch):
 
     manager.order_created(order)
 
-    assert mocked_task.called
+    # The credentials aren't serialized into the task's message
+    url, data = mocked_task.call_args[0]
+    assert url.endswith("transactions/createoradjust")
 
 
 @pytest.mark.vcr
@@ -488,3 +496,91 @@ def test_plugin_uses_configuration_from_db(
     manager = get_extensions_manager()
     with pytest.raises(TaxError):
         manager.preprocess_order_creation(checkout_with_item, discounts)
+
+
+@pytest.fixture
+def fake_avatax_server(settings):
+    with FakeAvataxServer(latency=0.05) as server:
+        settings.AVATAX_API_URL = server.api_url
+        yield server
+
+
+def test_get_request_data_hash_ignores_key_order():
+    assert get_request_data_hash({"a": 1, "b": [1, 2]}) == get_request_data_hash(
+        {"b": [1, 2], "a": 1}
+    )
+    assert get_request_data_hash({"a": 1}) != get_request_data_hash({"a": 2})
+
+
+def test_taxes_need_new_fetch_compares_request_hash(monkeypatch):
+    data = {"createTransactionModel": {"code": "token", "lines": []}}
+    monkeypatch.setattr(
+        "saleor.extensions.plugins.avatax.cache.get",
+        lambda x: (get_request_data_hash(data), {}),
+    )
+    assert not taxes_need_new_fetch(data, "token")
+
+    changed_data = {"createTransactionModel": {"code": "token", "lines": [{}]}}
+    assert taxes_need_new_fetch(changed_data, "token")
+
+
+def test_api_post_request_deduplicates_concurrent_requests(fake_avatax_server):
+    config = AvataxConfiguration(username_or_account="test", password_or_license="test")
+    url = fake_avatax_server.api_url + "transactions/createoradjust"
+    data = {
+        "createTransactionModel": {
+            "code": "token",
+            "addresses": {"shipTo": {"country": "PL"}},
+            "lines": [{"amount": "10.00", "taxIncluded": False, "quantity": 1}],
+        }
+    }
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(
+            executor.map(lambda _: api_post_request(url, data, config), range(5))
+        )
+
+    assert len(fake_avatax_server.requests) == 1
+    assert all(response == responses[0] for response in responses)
+    assert responses[0]["totalTax"] == 2.3
+
+
+def test_calculate_checkout_total_with_fake_server(
+    fake_avatax_server,
+    settings,
+    site_settings,
+    address_usa,
+    checkout_with_item,
+    address,
+    shipping_zone,
+):
+    settings.PLUGINS = ["saleor.extensions.plugins.avatax.plugin.AvataxPlugin"]
+    settings.AVATAX_USERNAME_OR_ACCOUNT = "test"
+    settings.AVATAX_PASSWORD_OR_LICENSE = "test"
+    manager = get_extensions_manager()
+    site_settings.company_address = address_usa
+    site_settings.save()
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save()
+
+    total = manager.calculate_checkout_total(checkout_with_item, [])
+    manager.calculate_checkout_total(checkout_with_item, [])
+
+    assert total.tax > Money(0, total.currency)
+    # The second calculation uses the cached response
+    transaction_requests = [
+        request for request in fake_avatax_server.requests if request["data"]
+    ]
+    assert len(transaction_requests) == 1
+
+
+def test_api_post_request_task_uses_config(settings, fake_avatax_server):
+    settings.AVATAX_USERNAME_OR_ACCOUNT = "test"
+    settings.AVATAX_PASSWORD_OR_LICENSE = "test"
+    url = fake_avatax_server.api_url + "transactions/createoradjust"
+    data = {"createTransactionModel": {"code": "token", "commit": True}}
+
+    api_post_request_task(url, data)
+
+    assert fake_avatax_server.requests[0]["data"] == data
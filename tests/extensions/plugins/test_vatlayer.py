@@ -18,6 +18,7 @@ from saleor.extensions.plugins.vatlayer import (
     DEFAULT_TAX_RATE_NAME,
     apply_tax_to_price,
     get_tax_rate_by_name,
+    get_tax_rates_table,
     get_taxed_shipping_price,
     get_taxes_for_country,
 )
@@ -595,3 +596,71 @@ def test_apply_taxes_to_product(vatlayer, settings, variant, discount_info):
         variant.product, variant.get_price([discount_info]), country
     )
     assert price == TaxedMoney(net=Money("4.07", "USD"), gross=Money("5.00", "USD"))
+
+
+def test_get_tax_rates_table_is_built_once(vatlayer, django_assert_num_queries):
+    table = get_tax_rates_table()
+
+    with django_assert_num_queries(0):
+        assert get_tax_rates_table() is table
+    assert set(table) == {"PL", "DE"}
+    assert table["PL"]["standard"]["value"] == vatlayer["standard"]["value"]
+
+
+def test_get_tax_rates_table_decodes_vat_rates(vatlayer):
+    table = get_tax_rates_table()
+
+    standard_rate = table["DE"][DEFAULT_TAX_RATE_NAME]["value"]
+    reduced_rate = table["DE"]["books"]["value"]
+    assert isinstance(standard_rate, (int, float, Decimal))
+    assert isinstance(reduced_rate, (int, float, Decimal))
+    assert standard_rate == 19
+    assert reduced_rate == 7
+    assert table["PL"]["foodstuffs"]["value"] == vatlayer["foodstuffs"]["value"]
+
+
+def test_get_tax_rates_table_rebuilt_on_vat_change(vatlayer):
+    assert get_taxes_for_country(Country("FR")) is None
+
+    VAT.objects.create(
+        country_code="FR", data={"standard_rate": 20, "reduced_rates": {}}
+    )
+
+    assert get_taxes_for_country(Country("FR"))["standard"]["value"] == 20
+
+
+def test_apply_taxes_to_products(vatlayer, settings, variant, discount_info):
+    settings.PLUGINS = ["saleor.extensions.plugins.vatlayer.plugin.VatlayerPlugin"]
+    country = Country("PL")
+    manager = get_extensions_manager()
+    variant.product.meta = {
+        "taxes": {"vatlayer": {"code": "standard", "description": "standard"}}
+    }
+    prices = [variant.get_price([discount_info]), variant.get_price()]
+
+    taxed_prices = manager.apply_taxes_to_products(variant.product, prices, country)
+
+    assert taxed_prices == [
+        manager.apply_taxes_to_product(variant.product, price, country)
+        for price in prices
+    ]
+    assert taxed_prices[0] == TaxedMoney(
+        net=Money("4.07", "USD"), gross=Money("5.00", "USD")
+    )
+
+
+def test_apply_taxes_to_products_prices(vatlayer, settings, product_list):
+    settings.PLUGINS = ["saleor.extensions.plugins.vatlayer.plugin.VatlayerPlugin"]
+    country = Country("PL")
+    manager = get_extensions_manager()
+    product_list[0].charge_taxes = False
+    prices = [[product.price, product.price * 2] for product in product_list]
+
+    taxed_prices = manager.apply_taxes_to_products_prices(product_list, prices, country)
+
+    assert taxed_prices == [
+        manager.apply_taxes_to_products(product, product_prices, country)
+        for product, product_prices in zip(product_list, prices)
+    ]
+    assert taxed_prices[0][0].net == taxed_prices[0][0].gross
+    assert taxed_prices[1][0].net != taxed_prices[1][0].gross
@@ -241,6 +241,37 @@ def test_manager_apply_taxes_to_product(product, plugins, price):
     assert TaxedMoney(expected_price, expected_price) == taxed_price
 
 
+@pytest.mark.parametrize(
+    "plugins, price",
+    [(["tests.extensions.test_manager.SamplePlugin"], "1.0"), ([], "10.0")],
+)
+def test_manager_apply_taxes_to_products(product, plugins, price):
+    country = Country("PL")
+    variant = product.variants.all()[0]
+    currency = variant.get_price().currency
+    expected_price = Money(price, currency)
+    taxed_prices = ExtensionsManager(plugins=plugins).apply_taxes_to_products(
+        product, [variant.get_price(), variant.get_price()], country
+    )
+    assert taxed_prices == [TaxedMoney(expected_price, expected_price)] * 2
+
+
+@pytest.mark.parametrize(
+    "plugins, price",
+    [(["tests.extensions.test_manager.SamplePlugin"], "1.0"), ([], "10.0")],
+)
+def test_manager_apply_taxes_to_products_prices(product, plugins, price):
+    country = Country("PL")
+    variant = product.variants.all()[0]
+    currency = variant.get_price().currency
+    expected_price = Money(price, currency)
+    taxed_prices = ExtensionsManager(plugins=plugins).apply_taxes_to_products_prices(
+        [product, product], [[variant.get_price()], [variant.get_price()] * 2], country
+    )
+    taxed_price = TaxedMoney(expected_price, expected_price)
+    assert taxed_prices == [[taxed_price], [taxed_price] * 2]
+
+
 @pytest.mark.parametrize(
     "plugins, price_amount",
     [(["tests.extensions.test_manager.SamplePlugin"], "1.0"), ([], "10.0")],
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from saleor.core.benchmark import (
+    SCENARIOS,
+    find_regressions,
+    percentile,
+    run_benchmarks,
+)
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile([7], 95) == 7
+
+
+def test_find_regressions():
+    baseline = {
+        "budgets": {"queries": 1.0, "p95_ms": 2.0},
+        "results": {"home_page": {"queries": 10, "p95_ms": 5.0}},
+    }
+    results = {
+        "home_page": {"queries": 11, "p95_ms": 9.0},
+        "new_page": {"queries": 100, "p95_ms": 100.0},
+    }
+
+    regressions = find_regressions(results, baseline)
+
+    assert regressions == ["home_page: queries is 11, the budget is 10.0"]
+
+
+def test_run_benchmarks(product, order, site_settings):
+    scenarios = [
+        scenario for scenario in SCENARIOS if scenario.name == "graphql_product_list"
+    ]
+
+    results = run_benchmarks(scenarios, repeat=2, warmup=0)
+
+    metrics = results["graphql_product_list"]
+    assert metrics["queries"] > 0
+    assert metrics["p50_ms"] <= metrics["p95_ms"]
+
+
+def test_run_benchmarks_command_fails_on_regression(
+    product, order, site_settings, tmpdir
+):
+    baseline_path = str(tmpdir.join("baseline.json"))
+    call_command(
+        "run_benchmarks",
+        baseline=baseline_path,
+        update_baseline=True,
+        flow=["dashboard"],
+        repeat=1,
+        warmup=0,
+    )
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    for metrics in baseline["results"].values():
+        metrics["queries"] = 0
+    with open(baseline_path, "w") as f:
+        json.dump(baseline, f)
+
+    with pytest.raises(CommandError):
+        call_command(
+            "run_benchmarks",
+            baseline=baseline_path,
+            flow=["dashboard"],
+            repeat=1,
+            warmup=0,
+        )
@@ -5,12 +5,14 @@ from uuid import uuid4
 import pytest
 from django.contrib.auth.models import AnonymousUser
 from django.core import signing
+from django.core.cache import cache
 from django.urls import reverse
 from measurement.measures import Weight
 from prices import Money, TaxedMoney
 
 from saleor.checkout import forms, utils
 from saleor.checkout.context_processors import checkout_counter
+from saleor.checkout.fetch import fetch_checkout_lines
 from saleor.checkout.models import Checkout
 from saleor.checkout.utils import (
     add_variant_to_checkout,
@@ -285,13 +287,52 @@ def test_shipping_detection(checkout, product):
     assert checkout.is_shipping_required()
 
 
-def test_checkout_counter(monkeypatch):
-    monkeypatch.setattr(
-        "saleor.checkout.context_processors.get_checkout_from_request",
-        Mock(return_value=Mock(quantity=4)),
-    )
-    ret = checkout_counter(Mock())
+def test_checkout_counter(monkeypatch, checkout_request_factory):
+    mock_get_checkout = Mock(return_value=Mock(quantity=4))
+    monkeypatch.setattr(utils, "get_checkout_from_request", mock_get_checkout)
+    request = checkout_request_factory(token=str(uuid4()))
+
+    ret = checkout_counter(request)
+
+    # The checkout is not fetched until the counter is rendered
+    mock_get_checkout.assert_not_called()
     assert ret == {"checkout_counter": 4}
+    mock_get_checkout.assert_called_once_with(request)
+
+
+def test_checkout_counter_reads_cached_quantity(
+    monkeypatch, checkout_request_factory, checkout_with_item
+):
+    mock_get_checkout = Mock()
+    monkeypatch.setattr(utils, "get_checkout_from_request", mock_get_checkout)
+    request = checkout_request_factory(token=str(checkout_with_item.token))
+
+    assert checkout_counter(request) == {"checkout_counter": 3}
+    mock_get_checkout.assert_not_called()
+
+
+def test_checkout_counter_without_token(monkeypatch, checkout_request_factory):
+    mock_get_checkout = Mock()
+    monkeypatch.setattr(utils, "get_checkout_from_request", mock_get_checkout)
+    request = checkout_request_factory()
+
+    assert checkout_counter(request) == {"checkout_counter": 0}
+    mock_get_checkout.assert_not_called()
+
+
+def test_checkout_quantity_cached_for_user(checkout_with_item, customer_user):
+    change_checkout_user(checkout_with_item, customer_user)
+
+    assert cache.get(utils.USER_QUANTITY_CACHE_KEY.format(customer_user.pk)) == 3
+
+
+def test_checkout_quantity_invalidated_on_delete(checkout_with_item):
+    key = utils.QUANTITY_CACHE_KEY.format(checkout_with_item.token)
+    assert cache.get(key) == 3
+
+    checkout_with_item.delete()
+
+    assert cache.get(key) is None
 
 
 def test_get_prices_of_discounted_specific_product(
@@ -308,7 +349,9 @@ def test_get_prices_of_discounted_specific_product(
     voucher.collections.add(collection)
     voucher.categories.add(category)
 
-    prices = utils.get_prices_of_discounted_specific_product(checkout, voucher)
+    prices = utils.get_prices_of_discounted_specific_product(
+        fetch_checkout_lines(checkout), voucher
+    )
 
     excepted_value = [line.variant.get_price() for item in range(line.quantity)]
 
@@ -327,7 +370,9 @@ def test_get_prices_of_discounted_specific_product_only_product(
     add_variant_to_checkout(checkout, product2.variants.get(), 1)
     voucher.products.add(product)
 
-    prices = utils.get_prices_of_discounted_specific_product(checkout, voucher)
+    prices = utils.get_prices_of_discounted_specific_product(
+        fetch_checkout_lines(checkout), voucher
+    )
 
     excepted_value = [line.variant.get_price() for item in range(line.quantity)]
 
@@ -351,7 +396,9 @@ def test_get_prices_of_discounted_specific_product_only_collection(
     product.collections.add(collection)
     voucher.collections.add(collection)
 
-    prices = utils.get_prices_of_discounted_specific_product(checkout, voucher)
+    prices = utils.get_prices_of_discounted_specific_product(
+        fetch_checkout_lines(checkout), voucher
+    )
 
     excepted_value = [line.variant.get_price() for item in range(line.quantity)]
 
@@ -375,7 +422,9 @@ def test_get_prices_of_discounted_specific_product_only_category(
     add_variant_to_checkout(checkout, product2.variants.get(), 1)
     voucher.categories.add(category)
 
-    prices = utils.get_prices_of_discounted_specific_product(checkout, voucher)
+    prices = utils.get_prices_of_discounted_specific_product(
+        fetch_checkout_lines(checkout), voucher
+    )
 
     excepted_value = [line.variant.get_price() for item in range(line.quantity)]
 
@@ -390,7 +439,9 @@ def test_get_prices_of_discounted_specific_product_all_products(
     voucher = voucher_specific_product_type
     line = checkout.lines.first()
 
-    prices = utils.get_prices_of_discounted_specific_product(checkout, voucher)
+    prices = utils.get_prices_of_discounted_specific_product(
+        fetch_checkout_lines(checkout), voucher
+    )
 
     excepted_value = [line.variant.get_price() for item in range(line.quantity)]
 
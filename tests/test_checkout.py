@@ -13,8 +13,10 @@ from saleor.account import CustomerEvents
 from saleor.account.models import Address, CustomerEvent, User
 from saleor.account.utils import store_user_address
 from saleor.checkout import AddressType, views
+from saleor.checkout.fetch import fetch_checkout_lines, get_checkout_lines_info
 from saleor.checkout.forms import CheckoutVoucherForm, CountryForm
 from saleor.checkout.utils import (
+    abort_order_data,
     add_variant_to_checkout,
     add_voucher_to_checkout,
     change_billing_address_in_checkout,
@@ -34,7 +36,9 @@ from saleor.core.exceptions import InsufficientStock
 from saleor.core.taxes import zero_money, zero_taxed_money
 from saleor.discount import DiscountValueType, VoucherType
 from saleor.discount.models import NotApplicable, Voucher
+from saleor.discount.utils import get_voucher_usage
 from saleor.extensions.manager import ExtensionsManager, get_extensions_manager
+from saleor.giftcard.utils import charge_gift_card, get_gift_card_balance
 from saleor.order import OrderEvents, OrderEventsEmails
 from saleor.order.models import OrderEvent
 from saleor.shipping.models import ShippingZone
@@ -302,8 +306,7 @@ def test_view_checkout_summary_finalize_with_voucher(
     assert checkout.pk is None
 
     # Ensure the voucher was updated
-    voucher.refresh_from_db(fields=["used"])
-    assert voucher.used == expected_voucher_usage_count
+    assert get_voucher_usage(voucher) == expected_voucher_usage_count
 
 
 @patch("saleor.checkout.utils.send_order_confirmation")
@@ -727,7 +730,7 @@ def test_create_order_with_gift_card(
     )
 
     assert order.gift_cards.count() == 1
-    assert order.gift_cards.first().current_balance.amount == 0
+    assert get_gift_card_balance(order.gift_cards.first()).amount == 0
     assert order.total.gross == (total_gross_without_gift_cards - gift_cards_balance)
 
 
@@ -756,10 +759,9 @@ def test_create_order_with_gift_card_partial_use(
         user=customer_user,
     )
 
-    gift_card_used.refresh_from_db()
-
     expected_old_balance = (
-        price_without_gift_card.gross.amount + gift_card_used.current_balance_amount
+        price_without_gift_card.gross.amount
+        + get_gift_card_balance(gift_card_used).amount
     )
 
     assert order.gift_cards.count() > 0
@@ -800,17 +802,68 @@ def test_create_order_with_many_gift_cards(
         user=customer_user,
     )
 
-    gift_card_created_by_staff.refresh_from_db()
-    gift_card.refresh_from_db()
     zero_price = zero_money()
     assert order.gift_cards.count() > 0
-    assert gift_card_created_by_staff.current_balance == zero_price
-    assert gift_card.current_balance == zero_price
+    assert get_gift_card_balance(gift_card_created_by_staff) == zero_price
+    assert get_gift_card_balance(gift_card) == zero_price
     assert price_without_gift_card.gross.amount == (
         gift_cards_balance_before_order + order.total.gross.amount
     )
 
 
+def test_get_total_gift_cards_balance_reads_the_ledger(checkout_with_gift_card):
+    checkout = checkout_with_gift_card
+    gift_card = checkout.gift_cards.get()
+
+    # Another checkout charged the card, the cached balance isn't updated yet
+    charge_gift_card(gift_card, Money(4, "USD"))
+
+    gift_card.refresh_from_db()
+    assert gift_card.current_balance == Money(10, "USD")
+    assert checkout.get_total_gift_cards_balance() == Money(6, "USD")
+
+
+def test_prepare_order_data_reserves_gift_cards(
+    checkout_with_gift_card, customer_user, shipping_method
+):
+    checkout = checkout_with_gift_card
+    checkout.billing_address = customer_user.default_billing_address
+    checkout.shipping_address = customer_user.default_billing_address
+    checkout.shipping_method = shipping_method
+    checkout.save()
+    gift_card = checkout.gift_cards.get()
+
+    order_data = prepare_order_data(checkout=checkout, tracking_code="", discounts=None)
+
+    assert get_gift_card_balance(gift_card) == zero_money()
+    entry = gift_card.entries.get()
+    assert order_data["gift_card_entries"] == [entry]
+    assert entry.order is None
+
+    order = create_order(checkout=checkout, order_data=order_data, user=customer_user)
+
+    entry.refresh_from_db()
+    assert entry.order == order
+    assert list(order.gift_cards.all()) == [gift_card]
+
+
+def test_abort_order_data_releases_gift_cards(
+    checkout_with_gift_card, customer_user, shipping_method
+):
+    checkout = checkout_with_gift_card
+    checkout.billing_address = customer_user.default_billing_address
+    checkout.shipping_address = customer_user.default_billing_address
+    checkout.shipping_method = shipping_method
+    checkout.save()
+    gift_card = checkout.gift_cards.get()
+    order_data = prepare_order_data(checkout=checkout, tracking_code="", discounts=None)
+
+    abort_order_data(order_data)
+
+    assert get_gift_card_balance(gift_card) == Money(10, "USD")
+    assert gift_card.entries.count() == 2
+
+
 def test_note_in_created_order(request_checkout_with_item, address, customer_user):
     request_checkout_with_item.shipping_address = address
     request_checkout_with_item.note = "test_note"
@@ -1513,3 +1566,38 @@ def test_store_user_address_create_new_address_if_not_associated(address):
 
     assert user.addresses.count() == expected_user_addresses_count
     assert user.default_billing_address_id != address.pk
+
+
+def test_fetch_checkout_lines(checkout_with_items, django_assert_num_queries):
+    checkout = checkout_with_items
+
+    with django_assert_num_queries(2):
+        lines_info = fetch_checkout_lines(checkout)
+
+    assert [line_info.line for line_info in lines_info] == list(checkout.lines.all())
+    line_info = lines_info[0]
+    assert line_info.product == line_info.variant.product
+    assert line_info.collections == list(line_info.product.collections.all())
+
+
+def test_checkout_lines_info_is_reused(checkout_with_items, django_assert_num_queries):
+    checkout = checkout_with_items
+    lines_info = fetch_checkout_lines(checkout)
+
+    with django_assert_num_queries(0):
+        assert get_checkout_lines_info(checkout) is lines_info
+        checkout.get_subtotal()
+        checkout.get_total_weight()
+        checkout.is_shipping_required()
+
+
+def test_checkout_lines_info_is_fetched_after_lines_change(checkout_with_items):
+    checkout = checkout_with_items
+    lines_info = fetch_checkout_lines(checkout)
+    line = lines_info[0].line
+
+    add_variant_to_checkout(checkout, line.variant, 0, replace=True)
+
+    assert line not in [
+        line_info.line for line_info in get_checkout_lines_info(checkout)
+    ]
@@ -8,14 +8,20 @@ from django.shortcuts import reverse
 from django.templatetags.static import static
 from django.test import Client, RequestFactory, override_settings
 from django.urls import translate_url
+from django_countries.fields import Country
 from measurement.measures import Weight
 from prices import Money
 
 from saleor.account.models import Address, User
 from saleor.account.utils import create_superuser
+from saleor.core.geolocation import CountryResolver
 from saleor.core.storages import S3MediaStorage
+from saleor.core.thumbnails import (
+    create_rendition,
+    is_rendition_created,
+    warm_thumbnails,
+)
 from saleor.core.utils import (
-    Country,
     build_absolute_uri,
     create_thumbnails,
     format_money,
@@ -25,12 +31,20 @@ from saleor.core.utils import (
     get_currency_for_country,
     random_data,
 )
+from saleor.core.utils.benchmark_data import CatalogSize, generate_benchmark_catalog
 from saleor.core.utils.text import get_cleaner, strip_html
 from saleor.core.weight import WeightUnits, convert_weight
 from saleor.discount.models import Sale, Voucher
 from saleor.giftcard.models import GiftCard
-from saleor.order.models import Order
-from saleor.product.models import ProductImage
+from saleor.order.models import Order, OrderLine
+from saleor.product.models import (
+    AssignedProductAttribute,
+    Product,
+    ProductAttributeSortKey,
+    ProductImage,
+    ProductVariant,
+    ProductVideo,
+)
 from saleor.shipping.models import ShippingZone
 
 type_schema = {
@@ -63,7 +77,9 @@ def test_format_money():
     ],
 )
 def test_get_country_by_ip(ip_data, expected_country, monkeypatch):
-    monkeypatch.setattr("saleor.core.utils.georeader.get", Mock(return_value=ip_data))
+    resolver = CountryResolver()
+    resolver._reader = Mock(get=Mock(return_value=ip_data))
+    monkeypatch.setattr("saleor.core.utils.resolver", resolver)
     country = get_country_by_ip("127.0.0.1")
     assert country == expected_country
 
@@ -184,6 +200,65 @@ def test_create_gift_card(db):
     assert GiftCard.objects.count() == 1
 
 
+BENCHMARK_CATALOG_SIZE = CatalogSize(
+    categories=2,
+    products=5,
+    variants_per_product=2,
+    videos_per_product=3,
+    attributes=2,
+    values_per_attribute=3,
+    users=4,
+    orders=6,
+    lines_per_order=2,
+    days=10,
+)
+
+
+def test_generate_benchmark_catalog(db):
+    for _ in generate_benchmark_catalog(BENCHMARK_CATALOG_SIZE, batch_size=4):
+        pass
+
+    assert ProductVariant.objects.count() == 10
+    assert ProductVideo.objects.count() == 15
+    assert User.objects.count() == 4
+    assert AssignedProductAttribute.objects.count() == 10
+    assert ProductAttributeSortKey.objects.count() == 10
+    for product in Product.objects.prefetch_related("attributes__values"):
+        assert product.attribute_value_ids == sorted(
+            value.pk
+            for assigned in product.attributes.all()
+            for value in assigned.values.all()
+        )
+        assert len(product.attribute_value_ids) == 2
+    assert OrderLine.objects.count() == 12
+    for order in Order.objects.prefetch_related("lines"):
+        lines_total = sum(
+            line.unit_price_gross_amount * line.quantity for line in order.lines.all()
+        )
+        assert order.total_gross_amount == lines_total
+        assert order.user.email == order.user_email
+
+
+def test_generate_benchmark_catalog_is_reproducible(db):
+    def get_orders():
+        return list(
+            Order.objects.order_by("pk").values_list(
+                "pk", "created", "user_email", "total_gross_amount"
+            )
+        )
+
+    for _ in generate_benchmark_catalog(BENCHMARK_CATALOG_SIZE, seed=1, batch_size=4):
+        pass
+    orders = get_orders()
+    Order.objects.all().delete()
+    User.objects.all().delete()
+
+    for _ in generate_benchmark_catalog(BENCHMARK_CATALOG_SIZE, seed=1, batch_size=4):
+        pass
+
+    assert get_orders() == orders
+
+
 def test_manifest(client, site_settings):
     response = client.get(reverse("manifest"))
     assert response.status_code == 200
@@ -234,6 +309,51 @@ def test_create_thumbnails(product_with_image, settings):
             )  # noqa
 
 
+@override_settings(VERSATILEIMAGEFIELD_SETTINGS={"create_images_on_demand": False})
+def test_warm_thumbnails_skips_created_renditions(product_with_image, settings):
+    sizeset = settings.VERSATILEIMAGEFIELD_RENDITION_KEY_SETS["products"]
+    product_image = product_with_image.images.first()
+
+    num_created, failed = warm_thumbnails(ProductImage, [product_image.pk], "products")
+    assert num_created == len(sizeset)
+    assert not failed
+    for _name, size_key in sizeset:
+        assert is_rendition_created(product_image.image, size_key)
+
+    with patch("saleor.core.thumbnails._warm_rendition") as mock_warm_rendition:
+        num_created, failed = warm_thumbnails(
+            ProductImage, [product_image.pk], "products"
+        )
+    assert num_created == 0
+    mock_warm_rendition.assert_not_called()
+
+
+def test_create_rendition_skips_rendition_being_created(product_with_image):
+    product_image = product_with_image.images.first()
+    size_key = "thumbnail__60x60"
+    with patch("saleor.core.thumbnails.cache.add", return_value=False), patch(
+        "saleor.core.thumbnails.get_rendition_url"
+    ) as mock_get_rendition_url:
+        url = create_rendition(product_image.image, size_key, wait=False)
+
+    assert url is None
+    mock_get_rendition_url.assert_not_called()
+    assert not is_rendition_created(product_image.image, size_key)
+
+
+@patch("saleor.core.thumbnails.RENDER_WAIT_TIMEOUT", 0)
+def test_create_rendition_waits_for_rendition_being_created(product_with_image):
+    product_image = product_with_image.images.first()
+    size_key = "thumbnail__60x60"
+    with patch("saleor.core.thumbnails.cache.add", return_value=False), patch(
+        "saleor.core.thumbnails.get_rendition_url", return_value="thumbnail.jpg"
+    ) as mock_get_rendition_url:
+        url = create_rendition(product_image.image, size_key)
+
+    assert url == "thumbnail.jpg"
+    mock_get_rendition_url.assert_called_once_with(product_image.image, size_key)
+
+
 @patch("storages.backends.s3boto3.S3Boto3Storage")
 def test_storages_set_s3_bucket_domain(storage, settings):
     settings.AWS_MEDIA_BUCKET_NAME = "media-bucket"
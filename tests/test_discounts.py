@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 import pytest
+from django.db import connection, transaction
 from django.utils import timezone
 from prices import Money
 
@@ -11,8 +13,10 @@ from saleor.discount.utils import (
     add_voucher_usage_by_customer,
     decrease_voucher_usage,
     get_product_discount_on_sale,
+    get_voucher_usage,
     increase_voucher_usage,
     remove_voucher_usage_by_customer,
+    update_voucher_used,
     validate_voucher,
 )
 from saleor.product.models import Product, ProductVariant
@@ -157,8 +161,7 @@ def test_increase_voucher_usage():
         usage_limit=100,
     )
     increase_voucher_usage(voucher)
-    voucher.refresh_from_db()
-    assert voucher.used == 1
+    assert get_voucher_usage(voucher) == 1
 
 
 def test_decrease_voucher_usage():
@@ -171,8 +174,70 @@ def test_decrease_voucher_usage():
         used=10,
     )
     decrease_voucher_usage(voucher)
-    voucher.refresh_from_db()
-    assert voucher.used == 9
+    assert get_voucher_usage(voucher) == 9
+
+
+def test_increase_voucher_usage_over_limit(voucher):
+    voucher.usage_limit = 2
+    voucher.save()
+
+    increase_voucher_usage(voucher)
+    increase_voucher_usage(voucher)
+    with pytest.raises(NotApplicable):
+        increase_voucher_usage(voucher)
+
+    assert get_voucher_usage(voucher) == 2
+
+
+def test_increase_voucher_usage_after_limit_lowered(voucher):
+    voucher.usage_limit = 100
+    voucher.save()
+    increase_voucher_usage(voucher)
+    increase_voucher_usage(voucher)
+
+    voucher.usage_limit = 3
+    voucher.save()
+
+    increase_voucher_usage(voucher)
+    with pytest.raises(NotApplicable):
+        increase_voucher_usage(voucher)
+
+
+def test_update_voucher_used(voucher):
+    increase_voucher_usage(voucher)
+    increase_voucher_usage(voucher)
+
+    update_voucher_used(voucher.pk)
+
+    voucher.refresh_from_db(fields=["used"])
+    assert voucher.used == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_increase_voucher_usage_concurrently_respects_limit():
+    voucher = Voucher.objects.create(
+        code="unique",
+        type=VoucherType.ENTIRE_ORDER,
+        discount_value_type=DiscountValueType.FIXED,
+        discount_value=10,
+        usage_limit=20,
+    )
+
+    def use_voucher(_):
+        try:
+            with transaction.atomic():
+                increase_voucher_usage(voucher)
+            return True
+        except NotApplicable:
+            return False
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(use_voucher, range(50)))
+
+    assert results.count(True) == 20
+    assert get_voucher_usage(voucher) == 20
 
 
 def test_add_voucher_usage_by_customer(voucher, customer_user):
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from saleor.core.tasks import export_to_storage_task
+from saleor.order import OrderStatus
+from saleor.order.models import Order
+
+
+def get_content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+def test_order_export_csv(admin_client, order_with_lines):
+    Order.objects.create(status=OrderStatus.DRAFT)
+
+    response = admin_client.get(reverse("dashboard:order-export"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv"
+    rows = list(csv.reader(io.StringIO(get_content(response))))
+    assert rows[0][:3] == ["id", "created", "status"]
+    assert [row[0] for row in rows[1:]] == [str(order_with_lines.pk)]
+
+
+def test_order_lines_export_ndjson_with_columns(admin_client, order_with_lines):
+    url = reverse("dashboard:order-lines-export")
+
+    response = admin_client.get(url, {"format": "ndjson", "columns": "id,quantity"})
+
+    rows = [json.loads(line) for line in get_content(response).splitlines()]
+    assert rows == [
+        {"id": line.pk, "quantity": line.quantity}
+        for line in order_with_lines.lines.order_by("pk")
+    ]
+
+
+def test_order_export_date_filters(admin_client, order_with_lines):
+    created = order_with_lines.created.date()
+    url = reverse("dashboard:order-export")
+
+    response = admin_client.get(
+        url, {"columns": "id", "date_from": created, "date_to": created}
+    )
+    assert get_content(response).split() == ["id", str(order_with_lines.pk)]
+
+    response = admin_client.get(
+        url, {"columns": "id", "date_from": created.replace(year=created.year + 1)}
+    )
+    assert get_content(response).split() == ["id"]
+
+
+def test_export_invalid_params(admin_client):
+    url = reverse("dashboard:customer-export")
+
+    response = admin_client.get(url, {"columns": "id,password"})
+    assert response.status_code == 400
+    assert json.loads(response.content) == {"error": "Unknown columns: password."}
+
+    response = admin_client.get(url, {"date_from": "yesterday"})
+    assert response.status_code == 400
+
+
+def test_customer_export(admin_client, customer_user, admin_user):
+    url = reverse("dashboard:customer-export")
+
+    response = admin_client.get(url, {"columns": "email"})
+
+    assert get_content(response).split() == ["email", customer_user.email]
+
+
+def test_product_export_requires_permission(staff_client):
+    response = staff_client.get(reverse("dashboard:product-export"))
+
+    assert response.status_code == 302
+
+
+@patch("saleor.core.tasks.export_to_storage_task.delay")
+def test_export_in_background(mocked_task, admin_client, media_root):
+    url = reverse("dashboard:product-export")
+
+    response = admin_client.get(url, {"background": 1, "columns": "id,name"})
+
+    assert response.status_code == 202
+    file_path = json.loads(response.content)["file"]
+    mocked_task.assert_called_once_with(
+        "products", file_path, ["id", "name"], "csv", None, None
+    )
+
+
+def test_export_to_storage_task(order_with_lines, media_root):
+    export_to_storage_task("orders", "exports/orders.csv", ["id"], "csv")
+
+    with default_storage.open("exports/orders.csv") as export_file:
+        assert export_file.read().split() == [b"id", str(order_with_lines.pk).encode()]
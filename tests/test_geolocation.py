@@ -0,0 +1,72 @@
+from unittest.mock import Mock
+
+import pytest
+from django_countries.fields import Country
+
+from saleor.core.geolocation import CountryResolver, get_network_address
+
+
+@pytest.fixture
+def country_resolver():
+    resolver = CountryResolver(cache_size=2)
+    resolver._reader = Mock(get=Mock(return_value={"country": {"iso_code": "PL"}}))
+    return resolver
+
+
+@pytest.mark.parametrize(
+    "ip_address, expected_network_address",
+    [
+        ("83.0.0.1", "83.0.0.0"),
+        ("83.0.0.255", "83.0.0.0"),
+        ("2001:db8:85a3::8a2e:370:7334", "2001:db8:85a3::"),
+        ("::1", "::"),
+    ],
+)
+def test_get_network_address(ip_address, expected_network_address):
+    assert get_network_address(ip_address) == expected_network_address
+
+
+@pytest.mark.parametrize("ip_address", ["256.0.0.1", "1:1:1", "invalid"])
+def test_resolver_invalid_ip(ip_address):
+    with pytest.raises(ValueError):
+        CountryResolver().get_country(ip_address)
+
+
+def test_resolver_caches_countries_by_network(country_resolver):
+    assert country_resolver.get_country("83.0.0.1") == Country("PL")
+    assert country_resolver.get_country("83.0.0.2") == Country("PL")
+
+    country_resolver._reader.get.assert_called_once_with("83.0.0.0")
+    stats = country_resolver.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 1
+
+
+def test_resolver_evicts_least_recently_used(country_resolver):
+    country_resolver.get_country("83.0.0.1")
+    country_resolver.get_country("84.0.0.1")
+    country_resolver.get_country("85.0.0.1")
+    country_resolver.get_country("83.0.0.1")
+
+    assert country_resolver._reader.get.call_count == 4
+    assert country_resolver.get_stats()["size"] == 2
+
+
+def test_resolver_unknown_country(country_resolver):
+    country_resolver._reader.get.return_value = None
+    assert country_resolver.get_country("83.0.0.1") is None
+
+
+def test_resolver_get_currency(settings):
+    resolver = CountryResolver()
+    assert resolver.get_currency(Country("PL")) == "PLN"
+    assert resolver.get_currency(Country("XX")) == settings.DEFAULT_CURRENCY
+
+
+def test_resolver_reads_packaged_database():
+    resolver = CountryResolver()
+    assert resolver.get_country("127.0.0.1") is None
+    resolver.close()
+    assert resolver._reader is None
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.db import connection, transaction
+from prices import Money
+
+from saleor.giftcard.models import GiftCard, GiftCardEntry
+from saleor.giftcard.utils import (
+    _get_last_balance,
+    charge_gift_card,
+    get_gift_card_balance,
+    set_gift_card_balance,
+    update_gift_card_balance,
+)
+
+
+def test_charge_gift_card_partially(gift_card_used, order):
+    charged = charge_gift_card(gift_card_used, Money(30, "USD"), order=order)
+
+    assert charged == Money(30, "USD")
+    assert get_gift_card_balance(gift_card_used) == Money(70, "USD")
+    entry = gift_card_used.entries.get()
+    assert entry.amount == Decimal(-30)
+    assert entry.balance == Decimal(70)
+    assert entry.order == order
+
+
+def test_charge_gift_card_over_balance(gift_card_used):
+    charge_gift_card(gift_card_used, Money(80, "USD"))
+
+    charged = charge_gift_card(gift_card_used, Money(80, "USD"))
+
+    assert charged == Money(20, "USD")
+    assert get_gift_card_balance(gift_card_used) == Money(0, "USD")
+    assert charge_gift_card(gift_card_used, Money(80, "USD")) == Money(0, "USD")
+    assert gift_card_used.entries.count() == 2
+
+
+def test_charge_gift_card_retries_after_concurrent_charge(gift_card_used):
+    def get_last_balance_and_charge_concurrently(gift_card):
+        last_balance = _get_last_balance(gift_card)
+        if not gift_card.entries.exists():
+            # Another checkout charges the card after the balance was read
+            GiftCardEntry.objects.create(
+                gift_card=gift_card, sequence=1, amount=-90, balance=10
+            )
+        return last_balance
+
+    with patch(
+        "saleor.giftcard.utils._get_last_balance",
+        side_effect=get_last_balance_and_charge_concurrently,
+    ):
+        charged = charge_gift_card(gift_card_used, Money(50, "USD"))
+
+    assert charged == Money(10, "USD")
+    assert get_gift_card_balance(gift_card_used) == Money(0, "USD")
+
+
+def test_set_gift_card_balance(gift_card_used):
+    charge_gift_card(gift_card_used, Money(30, "USD"))
+
+    set_gift_card_balance(gift_card_used, Decimal(200))
+
+    assert get_gift_card_balance(gift_card_used) == Money(200, "USD")
+    assert gift_card_used.entries.last().amount == Decimal(130)
+
+
+def test_update_gift_card_balance(gift_card_used):
+    charge_gift_card(gift_card_used, Money(30, "USD"))
+
+    update_gift_card_balance(gift_card_used.pk)
+
+    gift_card_used.refresh_from_db()
+    assert gift_card_used.current_balance == Money(70, "USD")
+    assert gift_card_used.last_used_on == gift_card_used.entries.get().created
+
+
+@pytest.mark.django_db(transaction=True)
+def test_charge_gift_card_concurrently_never_overdraws():
+    gift_card = GiftCard.objects.create(
+        code="shared_card",
+        initial_balance=Money(100, "USD"),
+        current_balance=Money(100, "USD"),
+    )
+
+    def checkout(_):
+        try:
+            with transaction.atomic():
+                return charge_gift_card(gift_card, Money(15, "USD")).amount
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        charged = list(executor.map(checkout, range(30)))
+
+    assert sum(charged) == Decimal(100)
+    assert get_gift_card_balance(gift_card) == Money(0, "USD")
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from saleor.menu.utils import update_menu
+from saleor.site.navigation import (
+    get_menu_from_payload,
+    get_navigation,
+    get_navigation_cache_key,
+    update_navigation_cache,
+)
+
+
+def test_get_navigation_is_cached(site_settings, django_assert_num_queries):
+    navigation = get_navigation("en")
+
+    with django_assert_num_queries(0):
+        assert get_navigation("en") == navigation
+    assert navigation["navigation"]["main"]["name"] == site_settings.top_menu.name
+
+
+def test_get_navigation_contains_menu_tree(
+    site_settings, menu_with_items, category, collection
+):
+    site_settings.top_menu = menu_with_items
+    site_settings.save(update_fields=["top_menu"])
+
+    items = get_navigation("en")["navigation"]["main"]["items"]
+
+    assert [item["name"] for item in items] == ["Link 1", "Link 2"]
+    children = items[1]["child_items"]
+    assert children[0]["category"]["slug"] == category.slug
+    assert children[0]["url"] == category.get_absolute_url()
+    assert children[1]["collection"]["name"] == collection.name
+
+
+def test_get_menu_from_payload_rebuilds_tree_without_queries(
+    site_settings, menu_with_items, category, django_assert_num_queries
+):
+    site_settings.top_menu = menu_with_items
+    site_settings.save(update_fields=["top_menu"])
+    menu_data = get_navigation("en")["navigation"]["main"]
+
+    with django_assert_num_queries(0):
+        menu = get_menu_from_payload(menu_data)
+        parent = menu.prefetched_items[1]
+        child = parent.children.all()[0]
+        assert menu.pk == menu_with_items.pk
+        assert child.category.pk == category.pk
+        assert child.category.name == category.name
+        assert child.parent == parent
+        assert menu.json_content == menu_data["items"]
+
+
+def test_get_menu_from_payload_no_menu():
+    assert get_menu_from_payload(None) is None
+
+
+def test_site_settings_change_invalidates_navigation(site_settings):
+    get_navigation("en")
+
+    site_settings.top_menu = None
+    site_settings.save(update_fields=["top_menu"])
+
+    assert cache.get(get_navigation_cache_key("en")) is None
+    assert get_navigation("en")["navigation"]["main"] is None
+
+
+@patch("saleor.site.models.update_navigation_cache_task.delay")
+def test_update_menu_schedules_navigation_update(mocked_task, site_settings, menu_item):
+    get_navigation("en")
+
+    menu_item.name = "New name"
+    menu_item.save(update_fields=["name"])
+    assert cache.get(get_navigation_cache_key("en")) is None
+
+    with patch("saleor.site.models.transaction.on_commit") as mocked_on_commit:
+        update_menu(menu_item.menu)
+    mocked_on_commit.assert_called_once_with(mocked_task)
+
+
+def test_category_change_invalidates_navigation(
+    site_settings, menu_with_items, category
+):
+    site_settings.top_menu = menu_with_items
+    site_settings.save(update_fields=["top_menu"])
+    get_navigation("en")
+
+    category.name = "Renamed"
+    category.save(update_fields=["name"])
+
+    assert cache.get(get_navigation_cache_key("en")) is None
+    children = get_navigation("en")["navigation"]["main"]["items"][1]["child_items"]
+    assert children[0]["category"]["name"] == "Renamed"
+
+
+def test_page_delete_invalidates_navigation(site_settings, page):
+    get_navigation("en")
+
+    page.delete()
+
+    assert cache.get(get_navigation_cache_key("en")) is None
+
+
+def test_update_navigation_cache_for_all_languages(site_settings, settings):
+    settings.LANGUAGES = [("en", "English"), ("pl", "Polish")]
+
+    update_navigation_cache()
+
+    assert cache.get(get_navigation_cache_key("en")) is not None
+    assert cache.get(get_navigation_cache_key("pl")) is not None
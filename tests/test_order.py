@@ -2,6 +2,8 @@ from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from prices import Money, TaxedMoney
 
@@ -397,6 +399,51 @@ def test_update_order_prices(order_with_lines):
     assert order_with_lines.total == total
 
 
+def _get_num_queries(function, *args):
+    with CaptureQueriesContext(connection) as queries:
+        function(*args)
+    return len(queries)
+
+
+@pytest.mark.parametrize(
+    "function, args", [(recalculate_order, ()), (update_order_prices, (None,))]
+)
+def test_order_recalculation_queries_do_not_depend_on_lines(
+    function, args, order_with_lines
+):
+    num_queries = _get_num_queries(function, order_with_lines, *args)
+    line = order_with_lines.lines.first()
+    for _ in range(3):
+        line.pk = None
+        line.save()
+
+    assert _get_num_queries(function, order_with_lines, *args) == num_queries
+
+
+def test_recalculate_order_ignores_prefetched_lines(order_with_lines):
+    order = Order.objects.prefetch_related("lines").get(pk=order_with_lines.pk)
+    line = order.lines.all()[0]
+    models.OrderLine.objects.filter(pk=line.pk).update(quantity=line.quantity + 1)
+
+    recalculate_order(order)
+
+    order = Order.objects.get(pk=order.pk)
+    lines = order.lines.all()
+    assert order.total == sum(
+        [line.get_total() for line in lines], order.shipping_price
+    )
+    assert order.weight == _calculate_order_weight_from_lines(order)
+
+
+def test_recalculate_order_keeps_manual_discount(order_with_lines):
+    order_with_lines.discount = Money(5, "USD")
+
+    recalculate_order(order_with_lines, update_voucher_discount=False)
+
+    order_with_lines.refresh_from_db()
+    assert order_with_lines.discount == Money(5, "USD")
+
+
 def test_order_payment_flow(
     request_checkout_with_item, client, address, customer_user, shipping_zone
 ):
@@ -653,3 +700,55 @@ def test_display_translated_order_line_name(
     )
     display_name = display_translated_order_line_name(order_line)
     assert display_name == expected_display_name
+
+
+def _get_event_inserts(queries):
+    return [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith('INSERT INTO "order_orderevent"')
+    ]
+
+
+def test_collect_order_events(order, staff_user):
+    with CaptureQueriesContext(connection) as queries:
+        with order_events.collect_order_events():
+            note_event = order_events.order_note_added_event(
+                order=order, user=staff_user, message="Note"
+            )
+            canceled_event = order_events.order_canceled_event(
+                order=order, user=staff_user
+            )
+            assert not order.events.exists()
+
+    assert len(_get_event_inserts(queries)) == 1
+    assert note_event.pk and canceled_event.pk
+    assert list(order.events.all()) == [note_event, canceled_event]
+
+
+def test_collect_order_events_nested(order, staff_user):
+    with CaptureQueriesContext(connection) as queries:
+        with order_events.collect_order_events():
+            order_events.order_canceled_event(order=order, user=staff_user)
+            with order_events.collect_order_events():
+                order_events.order_note_added_event(
+                    order=order, user=staff_user, message="Note"
+                )
+            assert not order.events.exists()
+
+    assert len(_get_event_inserts(queries)) == 1
+    assert order.events.count() == 2
+
+
+def test_collect_order_events_error_in_transaction(order, staff_user):
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            with order_events.collect_order_events():
+                order_events.order_canceled_event(order=order, user=staff_user)
+                raise ValueError()
+
+    assert not order.events.exists()
+
+    # the events are created right away again outside of the block
+    order_events.order_canceled_event(order=order, user=staff_user)
+    assert order.events.count() == 1
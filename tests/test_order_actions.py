@@ -2,6 +2,8 @@ from decimal import Decimal
 from unittest.mock import patch
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from prices import Money, TaxedMoney
 
 from saleor.order import FulfillmentStatus, OrderEvents, OrderEventsEmails, OrderStatus
@@ -149,6 +151,21 @@ def test_cancel_order(fulfilled_order):
     assert fulfilled_order.status == OrderStatus.CANCELED
 
 
+def test_cancel_order_inserts_events_at_once(fulfilled_order, staff_user):
+    with CaptureQueriesContext(connection) as queries:
+        cancel_order(fulfilled_order, staff_user, restock=True)
+
+    event_inserts = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith('INSERT INTO "order_orderevent"')
+    ]
+    assert len(event_inserts) == 1
+    canceled_event, restocked_event = fulfilled_order.events.all()
+    assert canceled_event.type == OrderEvents.CANCELED
+    assert restocked_event.type == OrderEvents.FULFILLMENT_RESTOCKED_ITEMS
+
+
 def test_fulfill_order_line(order_with_lines):
     order = order_with_lines
     line = order.lines.first()
@@ -0,0 +1,217 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prices import Money, TaxedMoney
+
+from saleor.order import OrderStatus
+from saleor.order.models import Order, OrderLine, VariantDailySales
+from saleor.order.rollups import get_sales_date, rebuild_sales, update_variant_sales
+from saleor.order.utils import change_order_line_quantity, delete_order_line
+from saleor.product.utils import calculate_revenue_for_variant
+
+
+def get_daily_sales(order):
+    return {
+        sales.variant_id: sales
+        for sales in VariantDailySales.objects.filter(
+            date=get_sales_date(order.created)
+        )
+    }
+
+
+def test_daily_sales_are_aggregated_from_order_lines(order_with_lines):
+    daily_sales = get_daily_sales(order_with_lines)
+
+    lines = order_with_lines.lines.all()
+    assert len(daily_sales) == len(lines)
+    for line in lines:
+        sales = daily_sales[line.variant_id]
+        assert sales.quantity == line.quantity
+        assert sales.revenue == line.unit_price * line.quantity
+
+
+def test_daily_sales_are_updated_on_line_change(order_with_lines):
+    line = order_with_lines.lines.first()
+
+    change_order_line_quantity(None, line, line.quantity, 1)
+
+    assert get_daily_sales(order_with_lines)[line.variant_id].quantity == 1
+
+
+def test_daily_sales_are_removed_on_line_delete(order_with_lines):
+    line = order_with_lines.lines.first()
+
+    delete_order_line(line)
+
+    assert line.variant_id not in get_daily_sales(order_with_lines)
+
+
+def test_daily_sales_are_moved_on_line_variant_change(
+    order_with_lines, product_with_two_variants
+):
+    line = order_with_lines.lines.first()
+    previous_variant_id = line.variant_id
+    new_variant = product_with_two_variants.variants.first()
+
+    line.variant = new_variant
+    line.save(update_fields=["variant"])
+
+    daily_sales = get_daily_sales(order_with_lines)
+    assert previous_variant_id not in daily_sales
+    assert daily_sales[new_variant.pk].quantity == line.quantity
+    assert daily_sales[new_variant.pk].revenue == line.unit_price * line.quantity
+
+
+def test_daily_sales_are_updated_in_place_on_line_change(order_with_lines):
+    line = order_with_lines.lines.first()
+    line.quantity += 1
+
+    with CaptureQueriesContext(connection) as queries:
+        line.save(update_fields=["quantity"])
+
+    sqls = [query["sql"] for query in queries.captured_queries]
+    assert not [sql for sql in sqls if "pg_advisory_xact_lock" in sql]
+    assert not [sql for sql in sqls if sql.startswith("DELETE")]
+    assert get_daily_sales(order_with_lines)[line.variant_id].quantity == line.quantity
+
+
+def test_line_save_without_sales_fields_does_not_update_sales(order_with_lines):
+    line = order_with_lines.lines.first()
+    line.quantity_fulfilled = 1
+
+    with CaptureQueriesContext(connection) as queries:
+        line.save(update_fields=["quantity_fulfilled"])
+
+    assert len(queries.captured_queries) == 1
+
+
+def test_daily_sales_are_updated_on_order_status_change(order_with_lines):
+    order_with_lines.status = OrderStatus.CANCELED
+    order_with_lines.save()
+    assert not get_daily_sales(order_with_lines)
+
+    order_with_lines.status = OrderStatus.UNFULFILLED
+    order_with_lines.save()
+    assert len(get_daily_sales(order_with_lines)) == order_with_lines.lines.count()
+
+
+def test_order_save_without_status_does_not_read_status(order_with_lines):
+    order_with_lines.customer_note = "Note"
+
+    with CaptureQueriesContext(connection) as queries:
+        order_with_lines.save(update_fields=["customer_note"])
+
+    assert not [
+        query for query in queries.captured_queries if query["sql"].startswith("SELECT")
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_daily_sales_updated_concurrently(order_with_lines):
+    line = order_with_lines.lines.first()
+    first_locked = threading.Event()
+
+    def add_line(is_first):
+        try:
+            if not is_first:
+                first_locked.wait()
+            with transaction.atomic():
+                new_line = OrderLine.objects.get(pk=line.pk)
+                new_line.pk = None
+                new_line.save()
+                if is_first:
+                    # Keep the sales locked while the other transaction adds its line
+                    first_locked.set()
+                    time.sleep(0.5)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(add_line, [True, False]))
+
+    quantity = OrderLine.objects.filter(variant=line.variant).aggregate(
+        total=Sum("quantity")
+    )["total"]
+    assert get_daily_sales(order_with_lines)[line.variant_id].quantity == quantity
+
+
+def test_draft_order_lines_are_not_counted(draft_order):
+    assert not get_daily_sales(draft_order)
+
+
+def test_daily_sales_are_aggregated_per_day(order_with_lines):
+    line = order_with_lines.lines.first()
+    previous_order = Order.objects.create(
+        created=order_with_lines.created - timedelta(days=1),
+        user_email=order_with_lines.user_email,
+    )
+    previous_order.lines.create(
+        product_name=line.product_name,
+        is_shipping_required=line.is_shipping_required,
+        quantity=1,
+        variant=line.variant,
+        unit_price=line.unit_price,
+    )
+
+    sales = line.variant.daily_sales.all()
+
+    assert [(sale.date, sale.quantity) for sale in sales] == [
+        (get_sales_date(previous_order.created), 1),
+        (get_sales_date(order_with_lines.created), line.quantity),
+    ]
+
+
+def test_update_variant_sales_of_other_days(order_with_lines):
+    line = order_with_lines.lines.first()
+    yesterday = get_sales_date(order_with_lines.created - timedelta(days=1))
+
+    update_variant_sales([line.variant_id], [yesterday])
+
+    assert line.variant_id in get_daily_sales(order_with_lines)
+    assert not line.variant.daily_sales.filter(date=yesterday).exists()
+
+
+def test_rebuild_sales(order_with_lines):
+    expected_sales = {
+        variant_id: (sales.quantity, sales.revenue)
+        for variant_id, sales in get_daily_sales(order_with_lines).items()
+    }
+    VariantDailySales.objects.all().delete()
+
+    rebuild_sales()
+
+    assert {
+        variant_id: (sales.quantity, sales.revenue)
+        for variant_id, sales in get_daily_sales(order_with_lines).items()
+    } == expected_sales
+
+
+def test_rebuild_sales_rollups_command(order_with_lines):
+    VariantDailySales.objects.all().delete()
+
+    call_command("rebuild_sales_rollups")
+
+    assert len(get_daily_sales(order_with_lines)) == order_with_lines.lines.count()
+
+
+def test_calculate_revenue_for_variant(order_with_lines):
+    line = order_with_lines.lines.first()
+    start_date = timezone.now() - timedelta(days=1)
+
+    revenue = calculate_revenue_for_variant(line.variant, start_date)
+
+    assert revenue == line.unit_price * line.quantity
+
+
+def test_calculate_revenue_for_variant_without_sales(variant):
+    revenue = calculate_revenue_for_variant(variant, timezone.now())
+
+    assert revenue == TaxedMoney(net=Money(0, "USD"), gross=Money(0, "USD"))
@@ -16,6 +16,7 @@ from saleor.account import events as account_events
 from saleor.checkout import utils
 from saleor.checkout.models import Checkout
 from saleor.checkout.utils import add_variant_to_checkout
+from saleor.core.thumbnails import is_rendition_created
 from saleor.menu.models import MenuItemTranslation
 from saleor.menu.utils import update_menu
 from saleor.product import AttributeInputType, ProductAvailabilityStatus, models
@@ -742,6 +743,32 @@ def test_create_product_thumbnails(mock_create_thumbnails, product_with_image):
     )
 
 
+def test_product_image_thumbnail_view(client, product_with_image):
+    product_image = product_with_image.images.first()
+    url = reverse(
+        "product:image-thumbnail",
+        kwargs={"image_id": product_image.pk, "size_key": "thumbnail__60x60"},
+    )
+
+    response = client.get(url)
+
+    assert response.status_code == 302
+    assert response["Location"] == product_image.image.thumbnail["60x60"].url
+    assert is_rendition_created(product_image.image, "thumbnail__60x60")
+
+
+def test_product_image_thumbnail_view_unknown_size(client, product_with_image):
+    product_image = product_with_image.images.first()
+    url = reverse(
+        "product:image-thumbnail",
+        kwargs={"image_id": product_image.pk, "size_key": "thumbnail__61x61"},
+    )
+
+    response = client.get(url)
+
+    assert response.status_code == 404
+
+
 @pytest.mark.parametrize(
     "expected_price, include_discounts",
     [(Decimal("10.00"), True), (Decimal("15.0"), False)],
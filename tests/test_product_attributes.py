@@ -4,6 +4,7 @@ import pytest
 from prices import Money
 
 from saleor.product import AttributeInputType
+from saleor.product.filters import filter_products_by_attributes_values
 from saleor.product.models import AttributeValue, Product, ProductType, ProductVariant
 from saleor.product.tasks import _update_variants_names
 from saleor.product.utils.attributes import (
@@ -136,3 +137,84 @@ def test_associate_attribute_to_product_instance_without_values(product):
     # Ensure the values were cleared and no new assignment entry was created
     assert new_assignment.pk == old_assignment.pk
     assert new_assignment.values.count() == 0
+
+
+def get_value_ids(instance):
+    return set(instance.attributes.values_list("values__pk", flat=True)) - {None}
+
+
+def test_product_attribute_value_ids_contain_product_and_variant_values(product):
+    variant = product.variants.get()
+    expected_ids = get_value_ids(product) | get_value_ids(variant)
+
+    product.refresh_from_db()
+
+    assert expected_ids
+    assert set(product.attribute_value_ids) == expected_ids
+
+
+def test_product_attribute_value_ids_updated_on_values_change(product):
+    assignment = product.attributes.first()
+    attribute = assignment.attribute
+    old_value = assignment.values.get()
+    new_value = attribute.values.exclude(pk=old_value.pk).first()
+
+    associate_attribute_values_to_instance(product, attribute, new_value)
+
+    assert new_value.pk in product.attribute_value_ids
+    assert old_value.pk not in product.attribute_value_ids
+    product.refresh_from_db()
+    assert new_value.pk in product.attribute_value_ids
+
+
+def test_product_attribute_value_ids_not_overridden_by_loaded_product(product):
+    assignment = product.attributes.first()
+    attribute = assignment.attribute
+    new_value = attribute.values.exclude(pk=assignment.values.get().pk).first()
+    loaded_product = Product.objects.get(pk=product.pk)
+
+    associate_attribute_values_to_instance(product, attribute, new_value)
+    loaded_product.name = "New name"
+    loaded_product.save()
+
+    product.refresh_from_db()
+    assert product.name == "New name"
+    assert new_value.pk in product.attribute_value_ids
+
+
+def test_product_attribute_value_ids_updated_on_variant_delete(product):
+    variant = product.variants.get()
+    variant_value_ids = get_value_ids(variant) - get_value_ids(product)
+
+    variant.delete()
+
+    product.refresh_from_db()
+    assert variant_value_ids
+    assert not variant_value_ids & set(product.attribute_value_ids)
+
+
+def test_product_attribute_value_ids_updated_on_value_delete(product):
+    value = product.attributes.first().values.get()
+
+    value.delete()
+
+    product.refresh_from_db()
+    assert value.pk not in product.attribute_value_ids
+
+
+def test_filter_products_by_attributes_values(product, product_list):
+    product_value = product.attributes.first().values.get()
+    variant_value = product.variants.get().attributes.first().values.get()
+    other_value = product_value.attribute.values.exclude(pk=product_value.pk).first()
+    queries = {
+        product_value.attribute_id: [product_value.pk, other_value.pk],
+        variant_value.attribute_id: [variant_value.pk],
+    }
+
+    products = filter_products_by_attributes_values(Product.objects.all(), queries)
+
+    assert product in products
+    assert not products.query.distinct
+    queries[variant_value.attribute_id] = [other_value.pk]
+    products = filter_products_by_attributes_values(Product.objects.all(), queries)
+    assert product not in products
@@ -9,7 +9,9 @@ from saleor.product import ProductAvailabilityStatus, VariantAvailabilityStatus,
 from saleor.product.utils.availability import (
     get_product_availability,
     get_product_availability_status,
+    get_products_availability,
     get_variant_availability_status,
+    products_with_availability,
 )
 
 
@@ -109,7 +111,9 @@ def test_variant_is_still_available_when_another_variant_is_unavailable(
 def test_availability(product, monkeypatch, settings):
     taxed_price = TaxedMoney(Money("10.0", "USD"), Money("12.30", "USD"))
     monkeypatch.setattr(
-        ExtensionsManager, "apply_taxes_to_product", Mock(return_value=taxed_price)
+        ExtensionsManager,
+        "apply_taxes_to_products",
+        Mock(side_effect=lambda product, prices, country: [taxed_price] * len(prices)),
     )
     availability = get_product_availability(product)
     taxed_price_range = TaxedMoneyRange(start=taxed_price, stop=taxed_price)
@@ -148,3 +152,52 @@ def test_available_products_only_available(product_list):
     available_products = models.Product.objects.published()
     assert available_products.count() == 1
     assert all([product.is_visible for product in available_products])
+
+
+def test_products_availability(product_list, monkeypatch):
+    taxed_price = TaxedMoney(Money("10.0", "USD"), Money("12.30", "USD"))
+    mock_apply_taxes = Mock(
+        side_effect=lambda products, prices, country: [
+            [taxed_price] * len(product_prices) for product_prices in prices
+        ]
+    )
+    monkeypatch.setattr(
+        ExtensionsManager, "apply_taxes_to_products_prices", mock_apply_taxes
+    )
+
+    availabilities = get_products_availability(product_list)
+
+    mock_apply_taxes.assert_called_once()
+    assert len(availabilities) == len(product_list)
+    taxed_price_range = TaxedMoneyRange(start=taxed_price, stop=taxed_price)
+    assert all(
+        availability.price_range == taxed_price_range for availability in availabilities
+    )
+
+
+def test_products_availability_matches_product_availability(
+    product_list, discount_info
+):
+    availabilities = get_products_availability(product_list, [discount_info])
+
+    assert availabilities == [
+        get_product_availability(product, [discount_info]) for product in product_list
+    ]
+
+
+def test_products_with_availability_is_computed_once(product_list, monkeypatch):
+    mock_get_availability = Mock(
+        side_effect=lambda products, *args, **kwargs: [
+            product.pk for product in products
+        ]
+    )
+    monkeypatch.setattr(
+        "saleor.product.utils.availability.get_products_availability",
+        mock_get_availability,
+    )
+
+    products = list(products_with_availability(product_list, None, None, None, None))
+    mock_get_availability.assert_not_called()
+
+    assert all(availability == product.pk for product, availability in products)
+    mock_get_availability.assert_called_once()
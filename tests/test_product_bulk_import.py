@@ -0,0 +1,218 @@
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from prices import Money
+
+from saleor.product.error_codes import ProductErrorCode
+from saleor.product.models import AttributeValue, Product, ProductVariant
+from saleor.product.utils.bulk_import import (
+    ProductBulkImporter,
+    ProductImportError,
+    finish_products_import,
+    import_products,
+    read_csv,
+    read_ndjson,
+)
+
+
+def _get_row(row_category, row_product_type, **kwargs):
+    row = {
+        "name": "Juice",
+        "category": row_category.slug,
+        "product_type": row_product_type.name,
+        "price": "10.00",
+        "is_published": "true",
+        "attributes": [{"slug": "color", "values": ["Red"]}],
+        "variants": [
+            {
+                "sku": "JUICE-1",
+                "price_override": "8.00",
+                "quantity": "5",
+                "attributes": [{"slug": "size", "values": ["Small"]}],
+            }
+        ],
+    }
+    row.update(kwargs)
+    return row
+
+
+def test_import_products(category, product_type):
+    rows = [
+        _get_row(category, product_type),
+        _get_row(
+            category,
+            product_type,
+            name="Tea",
+            attributes=[{"slug": "color", "values": ["Green"]}],
+            variants=[{"sku": "TEA-1"}, {"sku": "TEA-2", "name": "Large"}],
+        ),
+    ]
+
+    product_ids, errors = import_products(rows, batch_size=1)
+
+    assert not errors
+    juice, tea = Product.objects.filter(pk__in=product_ids).order_by("pk")
+    assert juice.name == "Juice"
+    assert juice.is_published
+    assert juice.category == category
+    juice_variant = juice.variants.get()
+    assert juice_variant.sku == "JUICE-1"
+    assert juice_variant.name == "Small"
+    assert juice_variant.quantity == 5
+    assert juice_variant.quantity_allocated == 0
+    assert juice_variant.price_override_amount == Decimal("8.00")
+    assert juice.attributes.get().values.get().slug == "red"
+    assert juice_variant.attributes.get().values.get().slug == "small"
+    assert set(juice.attribute_value_ids) == {
+        juice.attributes.get().values.get().pk,
+        juice_variant.attributes.get().values.get().pk,
+    }
+    assert juice.attribute_sort_keys.get().sort_key == "Red"
+
+    # The missing values are created
+    assert tea.attributes.get().values.get().name == "Green"
+    assert AttributeValue.objects.filter(slug="green").count() == 1
+    assert list(tea.variants.order_by("pk").values_list("name", flat=True)) == [
+        "",
+        "Large",
+    ]
+
+
+def test_import_products_skips_invalid_rows(category, product_type):
+    product = Product.objects.create(
+        name="Existing", price=Money("10.00", "USD"), category=category
+    )
+    existing_sku = ProductVariant.objects.create(product=product, sku="EXISTING").sku
+    rows = [
+        _get_row(category, product_type, category="missing"),
+        _get_row(category, product_type, price="-1"),
+        _get_row(
+            category, product_type, variants=[{"sku": existing_sku, "quantity": "x"}]
+        ),
+        _get_row(category, product_type, attributes=[{"slug": "size", "values": []}]),
+        _get_row(category, product_type),
+        _get_row(category, product_type),
+        _get_row(
+            category,
+            product_type,
+            name="Tea",
+            attributes=[{"slug": "color", "values": "Green"}],
+            variants=[{"sku": "TEA-1"}],
+        ),
+    ]
+
+    product_ids, errors = import_products(rows)
+
+    assert len(product_ids) == 1
+    assert Product.objects.get(pk=product_ids[0]).variants.get().sku == "JUICE-1"
+    assert {
+        (field, error.params["index"], error.code)
+        for field, field_errors in errors.items()
+        for error in field_errors
+    } == {
+        ("category", 0, ProductErrorCode.NOT_FOUND),
+        ("price", 1, ProductErrorCode.INVALID),
+        ("sku", 2, ProductErrorCode.UNIQUE),
+        ("quantity", 2, ProductErrorCode.INVALID),
+        ("attributes", 3, ProductErrorCode.ATTRIBUTE_CANNOT_BE_ASSIGNED),
+        ("sku", 5, ProductErrorCode.UNIQUE),
+        ("attributes", 6, ProductErrorCode.INVALID),
+    }
+
+
+def test_import_products_requires_single_variant_without_variants(
+    category, product_type_without_variant
+):
+    row = _get_row(
+        category,
+        product_type_without_variant,
+        attributes=[],
+        variants=[{"sku": "A"}, {"sku": "B"}],
+    )
+
+    product_ids, errors = import_products([row])
+
+    assert not product_ids
+    assert errors["variants"][0].code == ProductErrorCode.ATTRIBUTE_VARIANTS_DISABLED
+
+
+def test_product_bulk_importer_validates_batch_in_few_queries(
+    category, product_type, django_assert_max_num_queries
+):
+    rows = [
+        _get_row(
+            category,
+            product_type,
+            variants=[{"sku": "SKU-%d" % number, "attributes": []}],
+        )
+        for number in range(50)
+    ]
+    importer = ProductBulkImporter()
+
+    with django_assert_max_num_queries(5):
+        cleaned = importer.clean(rows)
+
+    assert len(cleaned) == 50
+    assert not importer.errors
+
+
+@patch("saleor.product.utils.bulk_import.warm_thumbnails")
+def test_finish_products_import(mock_warm_thumbnails, category, product_type):
+    product_ids, _errors = import_products([_get_row(category, product_type)])
+
+    finish_products_import(product_ids)
+
+    product = Product.objects.get(pk=product_ids[0])
+    assert product.minimal_variant_price_amount == Decimal("8.00")
+    mock_warm_thumbnails.assert_called_once()
+
+
+def test_read_csv():
+    lines = [
+        "product,name,category,product_type,price,attribute:color,"
+        "sku,quantity,variant-attribute:size,images\n",
+        "1,Juice,drinks,Default Type,10,Red|Blue,J-1,5,Small,a.jpg|b.jpg\n",
+        "1,,,,,,J-2,3,Big,\n",
+        ",Tea,drinks,Default Type,5,,,,,\n",
+    ]
+
+    products = list(read_csv(lines))
+
+    assert len(products) == 2
+    juice, tea = products
+    assert juice["name"] == "Juice"
+    assert juice["attributes"] == [{"slug": "color", "values": ["Red", "Blue"]}]
+    assert juice["images"] == ["a.jpg", "b.jpg"]
+    assert [variant["sku"] for variant in juice["variants"]] == ["J-1", "J-2"]
+    assert juice["variants"][1]["attributes"] == [{"slug": "size", "values": ["Big"]}]
+    assert tea["variants"] == []
+
+
+def test_read_ndjson():
+    lines = ['{"name": "Juice"}\n', "\n", '{"name": "Tea"}\n']
+
+    assert list(read_ndjson(lines)) == [{"name": "Juice"}, {"name": "Tea"}]
+
+    with pytest.raises(ProductImportError):
+        list(read_ndjson(["{"]))
+
+
+@patch("saleor.product.management.commands.import_products.finish_products_import")
+def test_import_products_command(
+    mock_finish_products_import, tmpdir, category, product_type
+):
+    path = tmpdir.join("products.ndjson")
+    path.write(
+        '{"name": "Juice", "category": "%s", "product_type": "%s", "price": "1", '
+        '"variants": [{"sku": "J-1"}]}\n' % (category.slug, product_type.name)
+    )
+    stdout = StringIO()
+
+    call_command("import_products", str(path), stdout=stdout)
+
+    assert "Imported 1 products." in stdout.getvalue()
+    variant = ProductVariant.objects.get(sku="J-1")
+    mock_finish_products_import.assert_called_once_with([variant.product_id])
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from prices import Money
+
+from saleor.product.facets import get_price_range, get_product_facets
+from saleor.product.filters import ProductGeneralFilter
+from saleor.product.models import Product
+
+
+def test_get_product_facets_counts_attribute_values(product, product_list):
+    product_value = product.attributes.first().values.get()
+    variant_value = product.variants.get().attributes.first().values.get()
+
+    facets = get_product_facets(Product.objects.all())
+
+    assert facets.attribute_values[product_value.pk] >= 1
+    assert facets.attribute_values[variant_value.pk] >= 1
+    assert sum(facet.count for facet in facets.price_ranges) == Product.objects.count()
+
+
+def test_get_product_facets_counts_price_ranges(product):
+    facets = get_product_facets(Product.objects.filter(pk=product.pk))
+
+    assert len(facets.price_ranges) == 1
+    price_range = facets.price_ranges[0]
+    assert price_range.start <= product.minimal_variant_price
+    assert price_range.stop > product.minimal_variant_price
+    assert price_range.count == 1
+
+
+def test_get_product_facets_is_cached(product, django_assert_num_queries):
+    qs = Product.objects.filter(pk=product.pk)
+    facets = get_product_facets(qs)
+
+    with django_assert_num_queries(0):
+        assert get_product_facets(qs) == facets
+
+
+def test_get_price_range():
+    assert get_price_range(0, "USD") == (None, Money(Decimal(10), "USD"))
+    assert get_price_range(1, "USD") == (
+        Money(Decimal(10), "USD"),
+        Money(Decimal(25), "USD"),
+    )
+    assert get_price_range(6, "USD") == (Money(Decimal(500), "USD"), None)
+
+
+def test_product_filter_add_facet_counts(product):
+    product_filter = ProductGeneralFilter(queryset=Product.objects.all())
+    value = product.attributes.first().values.get()
+    attribute = value.attribute
+
+    product_filter.add_facet_counts(get_product_facets(product_filter.qs))
+
+    choices = dict(product_filter.form.fields[attribute.slug].choices)
+    assert choices[value.pk] == "%s (1)" % value.translated.name
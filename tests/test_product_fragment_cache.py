@@ -0,0 +1,167 @@
+import datetime
+from unittest.mock import Mock
+
+from django.template import Context, Template
+from django.utils import translation
+from freezegun import freeze_time
+from prices import Money
+
+from saleor.discount.models import Sale
+from saleor.product.fragment_cache import (
+    get_or_set_product_fragment,
+    get_product_fragment_key,
+    invalidate_pricing_version,
+)
+from saleor.product.models import (
+    AttributeTranslation,
+    AttributeValueTranslation,
+    Product,
+    ProductTranslation,
+    ProductVariant,
+)
+
+
+def _get_request(rf):
+    request = rf.get("/")
+    request.currency = "USD"
+    request.country = "US"
+    return request
+
+
+def _create_product(category):
+    return Product.objects.create(
+        name="Juice", price=Money("10.00", "USD"), category=category
+    )
+
+
+def test_product_fragment_key_changes_with_product(rf, category):
+    product = _create_product(category)
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    ProductVariant.objects.create(product=product, sku="JUICE-1")
+    product.refresh_from_db()
+
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_does_not_change_with_stock(rf, category):
+    product = _create_product(category)
+    variant = ProductVariant.objects.create(product=product, sku="JUICE-1")
+    product.refresh_from_db()
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    variant.quantity = 5
+    variant.save(update_fields=["quantity"])
+    product.refresh_from_db()
+
+    assert get_product_fragment_key(_get_request(rf), "card", product) == key
+
+
+def test_product_fragment_key_changes_with_translation(rf, category):
+    product = _create_product(category)
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    ProductTranslation.objects.create(product=product, language_code="pl", name="Sok")
+    product.refresh_from_db()
+
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_changes_with_attribute_value(rf, product):
+    value = product.attributes.first().values.get()
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    AttributeValueTranslation.objects.create(
+        attribute_value=value, language_code="pl", name="Czerwony"
+    )
+    product.refresh_from_db()
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+    value.name = "Crimson"
+    value.save()
+    product.refresh_from_db()
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_changes_with_attribute(rf, product):
+    attribute = product.attributes.first().assignment.attribute
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    AttributeTranslation.objects.create(
+        attribute=attribute, language_code="pl", name="Kolor"
+    )
+    product.refresh_from_db()
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+    attribute.name = "Shade"
+    attribute.save()
+    product.refresh_from_db()
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_changes_once_published(rf, category):
+    product = _create_product(category)
+    product.is_published = True
+    product.publication_date = datetime.date(2020, 1, 10)
+
+    with freeze_time("2020-01-10"):
+        key = get_product_fragment_key(_get_request(rf), "card", product)
+    with freeze_time("2020-01-11"):
+        assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_changes_with_pricing(rf, category):
+    product = _create_product(category)
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+
+    invalidate_pricing_version()
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+    key = get_product_fragment_key(_get_request(rf), "card", product)
+    Sale.objects.create(name="Sale", value=10)
+    assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_product_fragment_key_changes_with_request(rf, category):
+    product = _create_product(category)
+    request = _get_request(rf)
+    key = get_product_fragment_key(request, "card", product)
+
+    request.currency = "EUR"
+    assert get_product_fragment_key(request, "card", product) != key
+
+    with translation.override("pl"):
+        assert get_product_fragment_key(_get_request(rf), "card", product) != key
+
+
+def test_get_or_set_product_fragment(rf, category):
+    product = _create_product(category)
+    compute = Mock(return_value="fragment")
+
+    for _ in range(2):
+        fragment = get_or_set_product_fragment(
+            _get_request(rf), "card", product, compute
+        )
+
+    assert fragment == "fragment"
+    compute.assert_called_once_with()
+
+
+def test_cache_product_fragment_tag(rf, category):
+    product = _create_product(category)
+    template = Template(
+        "{% load cache_product_fragment from product_fragments %}"
+        '{% cache_product_fragment "card" product %}'
+        "{{ product.name }}"
+        "{% endcache_product_fragment %}"
+    )
+    context = {"request": _get_request(rf), "product": product}
+
+    assert template.render(Context(context)) == "Juice"
+
+    # The product isn't saved so the cached fragment is rendered
+    product.name = "Tea"
+    assert template.render(Context(context)) == "Juice"
+    assert template.render(Context({"product": product})) == "Tea"
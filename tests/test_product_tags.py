@@ -3,7 +3,9 @@ from unittest.mock import Mock, patch
 import pytest
 from django.templatetags.static import static
 from django.test import override_settings
+from django.urls import reverse
 
+from saleor.core.thumbnails import create_rendition
 from saleor.product.templatetags.product_images import (
     choose_placeholder,
     get_product_image_thumbnail,
@@ -130,3 +132,25 @@ def test_choose_placeholder(settings):
 
     # when too big requested, choose the biggest available
     assert choose_placeholder("1500x1500") == settings.PLACEHOLDER_IMAGES[30]
+
+
+@override_settings(VERSATILEIMAGEFIELD_SETTINGS={"create_images_on_demand": False})
+def test_get_product_image_thumbnail_not_created(product_with_image):
+    product_image = product_with_image.images.first()
+
+    url = get_product_image_thumbnail(product_image, 60, method="thumbnail")
+
+    assert url == reverse(
+        "product:image-thumbnail",
+        kwargs={"image_id": product_image.pk, "size_key": "thumbnail__60x60"},
+    )
+
+
+@override_settings(VERSATILEIMAGEFIELD_SETTINGS={"create_images_on_demand": False})
+def test_get_product_image_thumbnail_created(product_with_image):
+    product_image = product_with_image.images.first()
+    create_rendition(product_image.image, "thumbnail__60x60")
+
+    url = get_product_image_thumbnail(product_image, 60, method="thumbnail")
+
+    assert url == product_image.image.thumbnail["60x60"].url
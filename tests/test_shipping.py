@@ -1,9 +1,17 @@
+from unittest.mock import patch
+
 import pytest
 from measurement.measures import Weight
 from prices import Money
 
 from saleor.core.utils import format_money
 from saleor.shipping.models import ShippingMethod, ShippingMethodType, ShippingZone
+from saleor.shipping.utils import (
+    bump_shipping_table_version,
+    get_applicable_shipping_methods,
+    get_shipping_table,
+    get_shipping_table_version,
+)
 
 from .utils import money
 
@@ -149,6 +157,78 @@ def test_use_default_shipping_zone(shipping_zone):
     assert result[0] == weight_method
 
 
+@pytest.mark.parametrize(
+    "price, weight, country_code",
+    ((5, 5, "PL"), (5, 5, "DE"), (50, 5, "PL"), (5, 50, "PL"), (5, 5, "GB")),
+)
+def test_shipping_table_matches_queryset(shipping_zone, price, weight, country_code):
+    shipping_zone.countries = ["PL", "GB"]
+    shipping_zone.save()
+    shipping_zone.shipping_methods.create(
+        minimum_order_price=money(1),
+        maximum_order_price=money(10),
+        price=money(3),
+        type=ShippingMethodType.PRICE_BASED,
+    )
+    shipping_zone.shipping_methods.create(
+        minimum_order_weight=Weight(kg=1),
+        maximum_order_weight=Weight(kg=10),
+        price=money(7),
+        type=ShippingMethodType.WEIGHT_BASED,
+    )
+    default_zone = ShippingZone.objects.create(default=True, name="Default")
+    default_zone.shipping_methods.create(
+        minimum_order_price=money(0), type=ShippingMethodType.PRICE_BASED
+    )
+
+    expected = ShippingMethod.objects.applicable_shipping_methods(
+        price=money(price), weight=Weight(kg=weight), country_code=country_code
+    )
+    result = get_applicable_shipping_methods(
+        price=money(price), weight=Weight(kg=weight), country_code=country_code
+    )
+
+    assert result == list(expected)
+
+
+def test_shipping_table_resolves_methods_without_queries(
+    shipping_zone, django_assert_num_queries
+):
+    get_shipping_table()
+
+    with django_assert_num_queries(0):
+        result = get_applicable_shipping_methods(
+            price=money(5), weight=Weight(kg=5), country_code="PL"
+        )
+        assert result[0].translated.name == "DHL"
+
+    assert result == [shipping_zone.shipping_methods.get()]
+
+
+def test_shipping_table_rebuilt_after_method_changed(shipping_zone):
+    method = shipping_zone.shipping_methods.get()
+    assert get_applicable_shipping_methods(
+        price=money(5), weight=Weight(kg=5), country_code="PL"
+    ) == [method]
+
+    method.minimum_order_price = money(10)
+    method.save()
+
+    assert not get_applicable_shipping_methods(
+        price=money(5), weight=Weight(kg=5), country_code="PL"
+    )
+
+
+def test_shipping_table_version_bumped_again_after_commit(shipping_zone):
+    version = get_shipping_table_version()
+
+    with patch("saleor.shipping.utils.transaction.on_commit") as mocked_on_commit:
+        shipping_zone.save()
+
+    assert get_shipping_table_version() != version
+    mocked_on_commit.assert_called_once_with(bump_shipping_table_version)
+
+
 @pytest.mark.parametrize(
     "countries, result",
     (